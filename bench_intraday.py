@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Intraday backtest benchmark: throughput and peak memory of a streamed run.
+
+Writes synthetic 1-minute bars (390 per session, each symbol missing a
+few minutes) for a universe into a bar store, then runs
+``BacktestEngine.run_intraday`` over it offline and reports bars per
+second and the process's peak RSS. Exits 1 if the peak exceeds the budget.
+
+    python bench_intraday.py [--symbols 100] [--days 252] [--strategy simple]
+                             [--root data/bench/intraday] [--budget-mb 900]
+"""
+import argparse
+import asyncio
+import logging
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from optifire.backtest.bar_store import BarStore
+from optifire.backtest.engine import BacktestConfig, BacktestEngine
+from optifire.backtest.strategies import STRATEGIES
+
+START = "2023-01-02"
+
+
+def write_bars(store: BarStore, symbols, days: pd.DatetimeIndex, seed: int = 0) -> int:
+    """Random-walk minute bars for every symbol (skipped if already stored)."""
+    rng = np.random.default_rng(seed)
+    minutes = (days.values[:, None] + np.timedelta64(14 * 60 + 30, "m") + np.arange(390) * np.timedelta64(1, "m")).ravel()
+    rows = 0
+    for symbol in symbols:
+        if store.coverage(symbol, "1Min") == (days[0].date(), days[-1].date()):
+            rows += len(store.load(symbol, "1Min"))
+            continue
+        t = minutes[rng.random(len(minutes)) < 0.98]
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(t))))
+        store.write(symbol, "1Min", pd.DataFrame({
+            "timestamp": t, "open": close, "high": close * 1.0005, "low": close * 0.9995,
+            "close": close, "volume": 1000.0,
+        }), days[0], days[-1])
+        rows += len(t)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed intraday backtests")
+    parser.add_argument("--symbols", type=int, default=100, help="Universe size (default: 100)")
+    parser.add_argument("--days", type=int, default=252, help="Trading days (default: 252)")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default="simple")
+    parser.add_argument("--chunk-rows", type=int, default=4096, help="Bars per symbol read at a time")
+    parser.add_argument("--root", type=str, help="Bar store directory (default: a temporary one)")
+    parser.add_argument("--budget-mb", type=float, default=900.0, help="Peak RSS budget (default: 900)")
+    args = parser.parse_args()
+
+    logging.getLogger("optifire").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(args.root or tmp)
+        store = BarStore(root)
+        days = pd.bdate_range(START, periods=args.days)
+        symbols = [f"SYM{k:03d}" for k in range(args.symbols)]
+
+        t = time.perf_counter()
+        rows = write_bars(store, symbols, days)
+        print(f"Bars:    {rows:,} ({args.symbols} symbols x {args.days} days) ready in {time.perf_counter() - t:.1f}s")
+
+        config = BacktestConfig(
+            str(days[0].date()), str(days[-1].date()), symbols=symbols, timeframe="1Min"
+        )
+        engine = BacktestEngine(config, store=store)
+        t = time.perf_counter()
+        metrics = asyncio.run(engine.run_intraday(STRATEGIES[args.strategy](), chunk_rows=args.chunk_rows))
+        elapsed = time.perf_counter() - t
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Run:     {elapsed:.1f}s, {rows / elapsed:,.0f} bars/s, {metrics['bars']:,} steps, "
+          f"{metrics['total_trades']:,} trades")
+    print(f"Peak:    {peak_mb:.0f}MB RSS (budget {args.budget_mb:.0f}MB)")
+    if peak_mb > args.budget_mb:
+        print("❌ Over budget")
+        sys.exit(1)
+    print("✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Plugin benchmark: latency, CPU and peak memory per plugin and input size.
+
+Runs every plugin in the manifest (or those given) offline against
+synthetic inputs, appends the results to a JSON history, and reports
+regressions against earlier runs on this host as well as declared
+est_cpu_ms / est_mem_mb estimates that are off. Exits 1 on regressions.
+
+    python bench_plugins.py [--plugins fe_garch,fe_kalman] [--cases 100,10k]
+                            [--repeats 5] [--no-record] [--strict]
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from optifire.plugins.benchmark import (
+    DEFAULT_CASES,
+    HISTORY_PATH,
+    append_history,
+    find_regressions,
+    load_history,
+    run_benchmarks,
+)
+
+
+def print_plugin(plugin_id, results):
+    print(f"\n{plugin_id}")
+    for case, r in results.items():
+        if r["status"] != "ok":
+            print(f"  {case:>7}  {r['status']:<8} {r.get('error') or ''}")
+            continue
+        print(
+            f"  {case:>7}  p50 {r['p50_ms']:9.2f}ms  p90 {r['p90_ms']:9.2f}ms  "
+            f"p99 {r['p99_ms']:9.2f}ms  cpu {r['cpu_ms']:9.2f}ms  "
+            f"peak {r['peak_mb']:7.2f}MB  (n={r['runs']})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--plugins", help="Comma-separated plugin IDs (default: all)")
+    parser.add_argument("--cases", help="Comma-separated case names (default: all)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-case-seconds", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-run limit (s)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Regression threshold")
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    parser.add_argument("--no-record", action="store_true", help="Do not append to the history")
+    parser.add_argument("--strict", action="store_true", help="Also fail on wrong estimates")
+    args = parser.parse_args()
+
+    # Plugin errors are reported in the table
+    logging.getLogger("optifire").setLevel(logging.CRITICAL)
+
+    cases = DEFAULT_CASES
+    if args.cases:
+        wanted = args.cases.split(",")
+        cases = tuple(c for c in DEFAULT_CASES if c.name in wanted)
+
+    print("=" * 70)
+    print("OptiFIRE plugin benchmark")
+    print("=" * 70)
+
+    history = load_history(args.history)
+    run = run_benchmarks(
+        args.plugins.split(",") if args.plugins else None,
+        cases,
+        progress=print_plugin,
+        repeats=args.repeats,
+        max_case_s=args.max_case_seconds,
+        timeout_s=args.timeout,
+    )
+    regressions = find_regressions(run, history, tolerance=args.tolerance)
+    if not args.no_record:
+        append_history(run, args.history)
+
+    statuses = [r["status"] for cases_ in run["results"].values() for r in cases_.values()]
+    print("\n" + "=" * 70)
+    print(
+        f"{len(run['results'])} plugins, {statuses.count('ok')} cases ok, "
+        f"{statuses.count('error')} errors, {statuses.count('timeout')} timeouts"
+    )
+
+    if run["estimates"]:
+        print(f"\nEstimates off ({len(run['estimates'])} plugins):")
+        for plugin_id, flags in sorted(run["estimates"].items()):
+            print(f"  {plugin_id}: {'; '.join(flags)}")
+
+    if regressions:
+        print(f"\nRegressions ({len(regressions)}):")
+        for r in regressions:
+            print(f"  {r['plugin']} [{r['case']}] {r['metric']}: {r['baseline']} -> {r['current']}")
+    else:
+        print("\nNo regressions")
+
+    if regressions or (args.strict and run["estimates"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
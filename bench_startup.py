@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time of the entry points.
+
+Each target is imported in a fresh interpreter with ``-X importtime``;
+the median over several runs is reported together with the heaviest
+modules and whether the heavy numeric/network stacks were pulled in.
+
+    python bench_startup.py [--runs 5] [--top 10]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+TARGETS = ["main", "optifire.services.runner"]
+HEAVY = ["numpy", "scipy", "pandas", "yfinance", "openai", "sklearn", "torch"]
+
+
+def import_profile(module: str):
+    """Import a module in a fresh interpreter; return {module: (self_us, cumulative_us)}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def bench_discovery(runs: int) -> float:
+    """Median time to index all plugins from the manifest (ms)."""
+    code = (
+        "import time; from optifire.plugins import registry; "
+        "t = time.perf_counter(); n = registry.discover(); "
+        "print(n, (time.perf_counter() - t) * 1000)"
+    )
+    times = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        times.append(float(out[1]))
+    print(f"\nPlugin discovery: {out[0]} plugins in {statistics.median(times):.1f}ms (median)")
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("OptiFIRE startup import benchmark")
+    print("=" * 70)
+
+    for target in TARGETS:
+        totals = []
+        wall = []
+        profile = {}
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            profile = import_profile(target)
+            wall.append((time.perf_counter() - start) * 1000)
+            totals.append(profile[target][1] / 1000)
+
+        print(f"\nimport {target}")
+        print(f"  import time:   {statistics.median(totals):8.1f} ms (median of {args.runs})")
+        print(f"  process wall:  {statistics.median(wall):8.1f} ms (incl. interpreter start)")
+        print(f"  modules:       {len(profile)}")
+        loaded = [name for name in HEAVY if name in profile]
+        print(f"  heavy stacks:  {', '.join(loaded) or 'none'}")
+
+        print(f"  top {args.top} by self time:")
+        heaviest = sorted(profile.items(), key=lambda kv: kv[1][0], reverse=True)[:args.top]
+        for name, (self_us, cumulative_us) in heaviest:
+            print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+    bench_discovery(args.runs)
+
+
+if __name__ == "__main__":
+    main()
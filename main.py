@@ -13,7 +13,11 @@ from optifire.core.config import Config
 from optifire.core.flags import FeatureFlags
 from optifire.core.db import Database
 from optifire.core.bus import EventBus
+from optifire.core.journal import EventJournal
+from optifire.core.tickstore import configure_tick_store
 from optifire.exec.broker_alpaca import AlpacaBroker
+from optifire.exec.market_cache import CachedBroker
+from optifire.exec.market_stream import MarketStream, set_market_stream
 from optifire.ai.openai_client import OpenAIClient
 from optifire.auto_trader import AutoTrader
 
@@ -43,7 +47,9 @@ class GlobalState:
         self.flags: FeatureFlags = None
         self.db: Database = None
         self.bus: EventBus = None
-        self.broker: AlpacaBroker = None
+        self.journal: EventJournal = None
+        self.broker: CachedBroker = None
+        self.stream: MarketStream = None
         self.openai: OpenAIClient = None
         self.auto_trader: AutoTrader = None
         self.auto_trader_task = None
@@ -108,12 +114,34 @@ plugins:
         await self.db.initialize()
 
         # Initialize event bus
-        self.bus = EventBus()
+        self.bus = EventBus(
+            dispatch_mode=self.config.get("bus.dispatch_mode", "concurrent"),
+            max_queue_size=self.config.get("bus.max_queue_size", 10000),
+            queue_policy=self.config.get("bus.queue_policy", "block"),
+        )
         await self.bus.start()
 
+        # Optional event journal (replayable with optifire.core.journal.replay_journal)
+        if self.config.get("bus.journal_enabled", False):
+            self.journal = EventJournal(
+                Path(self.config.get("bus.journal_dir", "data/journal")),
+                segment_size_mb=self.config.get("bus.journal_segment_mb", 64),
+            )
+            await self.journal.attach(self.bus)
+
         # Initialize Alpaca broker
         paper = os.getenv("ALPACA_PAPER", "true").lower() == "true"
-        self.broker = AlpacaBroker(paper=paper)
+        # Reads go through a single-flight cache; callers opt into staleness
+        self.broker = CachedBroker(AlpacaBroker(
+            paper=paper,
+            max_connections=self.config.get("alpaca.max_connections", 10),
+            max_keepalive=self.config.get("alpaca.max_keepalive", 5),
+            keepalive_s=self.config.get("alpaca.keepalive_seconds", 30),
+            http2=self.config.get("alpaca.http2", False),
+            timeout_s=self.config.get("alpaca.timeout_seconds", 10),
+            max_concurrency=self.config.get("alpaca.max_concurrency", 4),
+            symbols_per_request=self.config.get("alpaca.symbols_per_request", 100),
+        ))
 
         # Test broker connection
         try:
@@ -122,6 +150,24 @@ plugins:
         except Exception as e:
             logger.warning(f"Alpaca connection failed (will use mock data): {e}")
 
+        # Streaming trades/quotes/bars into ring buffers (read by AutoTrader and plugins)
+        if self.config.get("stream.enabled", True) and os.getenv("ALPACA_API_KEY"):
+            configure_tick_store(max_rows=self.config.get("stream.tape_max_rows", 200_000))
+            self.stream = MarketStream(
+                symbols=self.config.get("stream.symbols", ["SPY", "QQQ"]),
+                bus=self.bus,
+                feed=self.config.get("stream.feed", "iex"),
+                capacity={
+                    "trade": self.config.get("stream.trade_capacity", 2048),
+                    "quote": self.config.get("stream.quote_capacity", 2048),
+                    "bar": self.config.get("stream.bar_capacity", 1024),
+                },
+                max_age_s=self.config.get("stream.max_age_s", 60.0),
+            )
+            await self.stream.start()
+            set_market_stream(self.stream)
+            logger.info("✓ Market data stream started")
+
         # Initialize OpenAI client
         self.openai = OpenAIClient()
         if os.getenv("OPENAI_API_KEY"):
@@ -136,7 +182,7 @@ plugins:
         """Start the auto-trader (called by FastAPI lifespan)."""
         auto_trading_enabled = os.getenv("AUTO_TRADING_ENABLED", "true").lower() == "true"
         if auto_trading_enabled:
-            self.auto_trader = AutoTrader(broker=self.broker, db=self.db)
+            self.auto_trader = AutoTrader(broker=self.broker, db=self.db, stream=self.stream)
             # Start auto-trader in background task
             self.auto_trader_task = asyncio.create_task(self.auto_trader.start())
             logger.info("✓ Auto-trader started (earnings scanner, news scanner, position manager)")
@@ -157,10 +203,23 @@ plugins:
                 except asyncio.CancelledError:
                     pass
 
+        # Close market data stream
+        if self.stream:
+            await self.stream.stop()
+            set_market_stream(None)
+
+        # Flush event journal
+        if self.journal:
+            await self.journal.close()
+
         # Stop event bus
         if self.bus:
             await self.bus.stop()
 
+        # Close pooled broker connections
+        if self.broker:
+            await self.broker.close()
+
         logger.info("Shutdown complete")
 
 
@@ -1,8 +1,15 @@
 """Metrics and dashboard data routes."""
+from datetime import datetime, timedelta
+
 from fastapi import APIRouter, HTTPException, Request
 
+from optifire.core.memo import get_memo_cache
+
 router = APIRouter()
 
+# Dashboard views accept broker data this old (shared with the SSE stream)
+DASHBOARD_MAX_AGE_S = 2.0
+
 
 @router.get("/portfolio")
 async def get_portfolio_metrics(request: Request):
@@ -11,7 +18,7 @@ async def get_portfolio_metrics(request: Request):
     broker = g.broker
 
     try:
-        account = await broker.get_account()
+        account = await broker.get_account(max_age_s=DASHBOARD_MAX_AGE_S)
 
         equity = float(account.get("equity", 0))
         cash = float(account.get("cash", 0))
@@ -38,7 +45,7 @@ async def get_positions(request: Request):
     broker = g.broker
 
     try:
-        positions = await broker.get_positions()
+        positions = await broker.get_positions(max_age_s=DASHBOARD_MAX_AGE_S)
 
         formatted = []
         for pos in positions:
@@ -68,11 +75,11 @@ async def get_risk_metrics(request: Request):
 
     try:
         # Get account
-        account = await broker.get_account()
+        account = await broker.get_account(max_age_s=DASHBOARD_MAX_AGE_S)
         equity = float(account.get("equity", 100000))
 
         # Get positions
-        positions = await broker.get_positions()
+        positions = await broker.get_positions(max_age_s=DASHBOARD_MAX_AGE_S)
 
         # Calculate total exposure
         total_exposure = sum(abs(float(p["market_value"])) for p in positions)
@@ -118,7 +125,7 @@ async def get_performance(request: Request):
     db = g.db
 
     try:
-        account = await broker.get_account()
+        account = await broker.get_account(max_age_s=DASHBOARD_MAX_AGE_S)
 
         # Get performance from database
         perf_metrics = await db.fetch_all(
@@ -154,17 +161,20 @@ async def get_performance(request: Request):
 
 
 @router.get("/plugins")
-async def get_plugin_status(request: Request):
-    """Get plugin execution status."""
+async def get_plugin_status(request: Request, hours: int = 24):
+    """Get plugin execution status and per-plugin resource usage over the last `hours`."""
     g = request.app.state.g
     db = g.db
     flags = g.flags
 
     try:
+        since = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
+        usage = await db.get_plugin_usage(since)
+
         # Get recent plugin executions
         recent_logs = await db.fetch_all(
             """
-            SELECT plugin_id, status, cpu_ms, mem_mb, started_at, completed_at
+            SELECT plugin_id, status, cpu_ms, mem_mb, wall_ms, started_at, completed_at
             FROM plugin_log
             ORDER BY started_at DESC
             LIMIT 100
@@ -189,8 +199,46 @@ async def get_plugin_status(request: Request):
                 "last_run": last_run["completed_at"] if last_run else None,
                 "cpu_ms": last_run["cpu_ms"] if last_run else None,
                 "mem_mb": last_run["mem_mb"] if last_run else None,
+                "wall_ms": last_run["wall_ms"] if last_run else None,
             })
 
-        return {"plugins": plugins}
+        return {
+            "plugins": plugins,
+            "usage": usage,
+            "window_hours": hours,
+            "memo": get_memo_cache().get_stats(),
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get plugin status: {str(e)}")
+
+
+@router.get("/broker")
+async def get_broker_stats(request: Request):
+    """Get per-endpoint broker latency and connection pool settings."""
+    g = request.app.state.g
+
+    try:
+        return g.broker.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get broker stats: {str(e)}")
+
+
+@router.get("/stream")
+async def get_stream_stats(request: Request):
+    """Get market data stream connection state and message counts."""
+    g = request.app.state.g
+
+    if getattr(g, "stream", None) is None:
+        return {"enabled": False}
+    return {"enabled": True, **g.stream.get_stats()}
+
+
+@router.get("/bus")
+async def get_bus_stats(request: Request):
+    """Get event bus counters (published, dropped, coalesced) and queue depths."""
+    g = request.app.state.g
+
+    try:
+        return g.bus.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get bus stats: {str(e)}")
@@ -5,8 +5,14 @@ import asyncio
 import json
 from datetime import datetime
 
+from optifire.api.routes_metrics import DASHBOARD_MAX_AGE_S
+from optifire.core.bus import OverflowPolicy
+
 router = APIRouter()
 
+# Max pending bus events per SSE client
+SSE_QUEUE_SIZE = 256
+
 
 async def event_generator(request: Request):
     """Generate SSE events from EventBus."""
@@ -14,15 +20,11 @@ async def event_generator(request: Request):
     broker = g.broker
     bus = g.bus
 
-    # Create a queue to receive events
-    event_queue = asyncio.Queue()
-
-    # Subscribe to all events
-    async def event_handler(event):
-        """Handle events from bus."""
-        await event_queue.put(event)
-
-    await bus.subscribe("*", event_handler)
+    # Bounded per-client queue: a stalled tab keeps only the latest event of
+    # each type instead of growing without limit
+    event_queue = await bus.subscribe_queue(
+        "*", maxsize=SSE_QUEUE_SIZE, policy=OverflowPolicy.COALESCE
+    )
 
     try:
         # Send initial connection event
@@ -33,7 +35,7 @@ async def event_generator(request: Request):
             # Send periodic portfolio updates
             try:
                 # Try to get portfolio data
-                account = await broker.get_account()
+                account = await broker.get_account(max_age_s=DASHBOARD_MAX_AGE_S)
                 portfolio_data = {
                     "type": "portfolio_update",
                     "equity": float(account.get("equity", 0)),
@@ -49,13 +51,10 @@ async def event_generator(request: Request):
             # Check for events from the bus (non-blocking)
             try:
                 event = await asyncio.wait_for(event_queue.get(), timeout=2.0)
-                event_data = {
-                    "type": event.type,
-                    "data": event.data,
-                    "source": event.source,
-                    "timestamp": event.timestamp.isoformat(),
-                }
-                yield f"data: {json.dumps(event_data)}\n\n"
+                # Encoded once per event and shared by every connected client
+                yield event.to_sse()
+                while not event_queue.empty():
+                    yield event_queue.get_nowait().to_sse()
             except asyncio.TimeoutError:
                 # No events, continue
                 pass
@@ -64,7 +63,7 @@ async def event_generator(request: Request):
 
     finally:
         # Cleanup: unsubscribe from bus
-        await bus.unsubscribe("*", event_handler)
+        await bus.unsubscribe_queue("*", event_queue)
 
 
 @router.get("/stream")
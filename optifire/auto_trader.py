@@ -8,23 +8,27 @@ from typing import Dict, List, Optional
 import pytz
 
 from optifire.core.logger import logger
-from optifire.core.bus import EventBus
+from optifire.core.bus import EventBus, OverflowPolicy
 from optifire.exec.executor import OrderExecutor
 from optifire.exec.broker_alpaca import AlpacaBroker
+from optifire.exec.market_cache import CachedBroker
+from optifire.exec.market_stream import MarketStream, get_market_stream
+from optifire.fe.indicators import EMA, SymbolIndex
 from optifire.ai.openai_client import OpenAIClient
 from optifire.services.earnings_calendar import EarningsCalendar
 from optifire.services.news_scanner import NewsScanner
 from optifire.services.ipo_scanner import IPOScanner
+from optifire.plugins import registry
 
-# Import plugins for signal generation
-from optifire.plugins.alpha_vix_regime.impl import AlphaVixRegime
-from optifire.plugins.alpha_cross_asset_corr.impl import AlphaCrossAssetCorr
-from optifire.plugins.alpha_vrp.impl import AlphaVrp
-from optifire.plugins.risk_var_budget.impl import RiskVarBudget
-from optifire.plugins.risk_drawdown_derisk.impl import RiskDrawdownDerisk
-from optifire.plugins.risk_vol_target.impl import RiskVolTarget
-from optifire.plugins.fe_garch.impl import FeGarch
-from optifire.plugins.fe_entropy.impl import FeEntropy
+# Monitoring loops accept account/quote data this old (trading decisions fetch fresh)
+MONITOR_MAX_AGE_S = 5.0
+# With a market stream, loops wake on its bus events but re-evaluate at most
+# this often; positions (changed only by fills) are re-read this rarely
+STREAM_MIN_INTERVAL_S = 1.0
+POSITIONS_MAX_AGE_S = 30.0
+# Index trend: EMA crossover on streamed 1-minute closes
+TREND_FAST_PERIOD = 9
+TREND_SLOW_PERIOD = 21
 
 
 class Signal:
@@ -64,24 +68,29 @@ class AutoTrader:
     - Take profit / stop loss
     """
 
-    def __init__(self, broker=None, db=None):
-        self.broker = broker or AlpacaBroker(paper=True)
+    def __init__(self, broker=None, db=None, stream: Optional[MarketStream] = None):
+        self._owns_broker = broker is None
+        broker = broker or AlpacaBroker(paper=True)
+        self.broker = broker if isinstance(broker, CachedBroker) else CachedBroker(broker)
         self.executor = OrderExecutor(self.broker, db) if db else None
         self.openai = OpenAIClient()
         self.bus = EventBus()
+        # Streaming quotes/trades (None = poll the broker on a timer)
+        self.stream = stream if stream is not None else get_market_stream()
         self.earnings_calendar = EarningsCalendar()
         self.news_scanner = NewsScanner()
         self.ipo_scanner = IPOScanner()
 
-        # Initialize plugins
-        self.vix_regime_plugin = AlphaVixRegime()
-        self.cross_asset_plugin = AlphaCrossAssetCorr()
-        self.vrp_plugin = AlphaVrp()
-        self.var_budget_plugin = RiskVarBudget()
-        self.drawdown_plugin = RiskDrawdownDerisk()
-        self.vol_target_plugin = RiskVolTarget()
-        self.garch_plugin = FeGarch()
-        self.entropy_plugin = FeEntropy()
+        # Plugins (imported on first run, not at startup)
+        registry.discover()
+        self.vix_regime_plugin = registry.lazy("alpha_vix_regime")
+        self.cross_asset_plugin = registry.lazy("alpha_cross_asset_corr")
+        self.vrp_plugin = registry.lazy("alpha_vrp")
+        self.var_budget_plugin = registry.lazy("risk_var_budget")
+        self.drawdown_plugin = registry.lazy("risk_drawdown_derisk")
+        self.vol_target_plugin = registry.lazy("risk_vol_target")
+        self.garch_plugin = registry.lazy("fe_garch")
+        self.entropy_plugin = registry.lazy("fe_entropy")
 
         self.active = True
         self.signals: List[Signal] = []
@@ -99,6 +108,10 @@ class AutoTrader:
         self.market_regime = "NEUTRAL"  # RISK_ON, RISK_OFF, NEUTRAL
         self.spy_trend = "NEUTRAL"  # UP, DOWN, NEUTRAL
         self.qqq_trend = "NEUTRAL"
+        self.trend_index = SymbolIndex(["SPY", "QQQ"])
+        self.trend_fast = EMA(TREND_FAST_PERIOD, n=2)
+        self.trend_slow = EMA(TREND_SLOW_PERIOD, n=2)
+        self._trend_bar_t: Dict[str, int] = {}  # Last bar fed per symbol
 
         # Config - OPTIMIZED via backtesting (162 combinations tested - Nov 2025)
         # Best config: 10 positions × 2% = 20% max exposure (vs 2 positions × 5% = 10%)
@@ -158,8 +171,8 @@ class AutoTrader:
     async def update_vix_regime(self):
         """Update VIX regime and exposure multiplier with REAL VIX data."""
         try:
-            # Get real VIX data from broker
-            vix_quote = await self.broker.get_quote("VIX")
+            # Get real VIX data (stream buffers, else broker)
+            vix_quote = (await self.get_quotes(["VIX"], max_age_s=MONITOR_MAX_AGE_S)).get("VIX", {})
             vix_level = float(vix_quote.get("ap", 20.0))  # Ask price
 
             if vix_level == 0:
@@ -208,7 +221,7 @@ class AutoTrader:
         """Update drawdown multiplier based on current portfolio DD."""
         try:
             # Get portfolio metrics
-            account = await self.broker.get_account()
+            account = await self.broker.get_account(max_age_s=MONITOR_MAX_AGE_S)
             equity = float(account.get("equity", 1000))
 
             # Calculate high-water mark and drawdown
@@ -273,22 +286,27 @@ class AutoTrader:
     async def index_monitor_loop(self):
         """Monitor market indices (SPY, QQQ, VIX) for systemic signals."""
         logger.info("📊 Index monitor started")
+        updates = await self._market_updates("market.quote.*", ["SPY", "QQQ", "VIX"])
 
         while self.active:
             try:
-                # Get index data
-                spy_quote = await self.broker.get_quote("SPY")
-                qqq_quote = await self.broker.get_quote("QQQ")
-                vix_quote = await self.broker.get_quote("VIX")
+                # Get index data (stream buffers, else one request for all three)
+                quotes = await self.get_quotes(["SPY", "QQQ", "VIX"], max_age_s=MONITOR_MAX_AGE_S)
+                spy_quote = quotes.get("SPY", {})
+                qqq_quote = quotes.get("QQQ", {})
+                vix_quote = quotes.get("VIX", {})
 
                 spy_price = float(spy_quote.get("ap", 0))
                 qqq_price = float(qqq_quote.get("ap", 0))
                 vix_price = float(vix_quote.get("ap", 0))
 
-                # Detect trends (simplified - should use proper technical indicators)
-                # For now, track direction
+                # Detect trends from the streamed minute bars
+                self.update_index_trend()
                 if spy_price > 0:
-                    logger.debug(f"SPY: ${spy_price:.2f}, QQQ: ${qqq_price:.2f}, VIX: {vix_price:.1f}")
+                    logger.debug(
+                        f"SPY: ${spy_price:.2f} ({self.spy_trend}), QQQ: ${qqq_price:.2f} ({self.qqq_trend}), "
+                        f"VIX: {vix_price:.1f}"
+                    )
 
                 # Check for market-wide selloff signals
                 # Example: If VIX > 30 and rising, generate defensive signals
@@ -296,13 +314,40 @@ class AutoTrader:
                     logger.warning(f"🚨 High VIX detected: {vix_price:.1f} - Market stress!")
                     # Could generate defensive signals here (TLT, GLD)
 
-                # Run every 1 minute (real-time index monitoring)
-                await asyncio.sleep(60)
+                # On the next quote update (or every 1 minute without a stream)
+                await self._next_update(updates, 60)
 
             except Exception as e:
                 logger.error(f"Index monitor error: {e}", exc_info=True)
                 await asyncio.sleep(60)
 
+    def update_index_trend(self):
+        """Feed new completed minute bars of SPY/QQQ into the trend EMAs."""
+        if self.stream is None:
+            return
+
+        for symbol in ("SPY", "QQQ"):
+            bars = self.stream.bars(symbol)
+            # The newest bar may still be revised; only closed bars are fed
+            closed = slice(0, max(len(bars["t"]) - 1, 0))
+            fresh = bars["t"][closed] > self._trend_bar_t.get(symbol, -1)
+            if not fresh.any():
+                continue
+            column = [self.trend_index[symbol]]
+            for close in bars["c"][closed][fresh]:
+                self.trend_fast.update_at(column, [close])
+                self.trend_slow.update_at(column, [close])
+            self._trend_bar_t[symbol] = int(bars["t"][closed][fresh][-1])
+
+            trend = "NEUTRAL"
+            if self.trend_slow.count[column[0]] >= TREND_SLOW_PERIOD:
+                fast, slow = self.trend_fast.at(column)[0], self.trend_slow.at(column)[0]
+                trend = "UP" if fast > slow else "DOWN" if fast < slow else "NEUTRAL"
+            attr = f"{symbol.lower()}_trend"
+            if trend != getattr(self, attr):
+                logger.info(f"📈 {symbol} trend: {getattr(self, attr)} -> {trend}")
+                setattr(self, attr, trend)
+
     async def macro_news_loop(self):
         """Scan macro news (Fed, inflation, geopolitics) every 2 hours."""
         logger.info("🌍 Macro news scanner started")
@@ -503,15 +548,24 @@ class AutoTrader:
     async def position_manager_loop(self):
         """Manage open positions - take profit and stop loss."""
         logger.info("💼 Position manager started")
+        updates = await self._market_updates("market.trade.*")
 
         while self.active:
             try:
-                # Monitor positions 24/7, but only execute during market hours
-                positions = await self.broker.get_positions()
+                # Monitor positions 24/7, but only execute during market hours.
+                # With a stream, prices come from its buffers and the position
+                # list (invalidated on our own orders) is re-read every 30s.
+                positions = await self.broker.get_positions(
+                    max_age_s=POSITIONS_MAX_AGE_S if updates is not None else 0.0
+                )
+                if self.stream is not None:
+                    await self.stream.subscribe(pos.get("symbol") for pos in positions)
 
                 for pos in positions:
                     symbol = pos.get("symbol")
                     current_price = float(pos.get("current_price", 0))
+                    if self.stream is not None:
+                        current_price = self.stream.last_price(symbol) or current_price
                     avg_entry = float(pos.get("avg_entry_price", 0))
                     qty = float(pos.get("qty", 0))
 
@@ -555,8 +609,8 @@ class AutoTrader:
                         else:
                             logger.warning(f"⏰ Waiting for market open to close {symbol}")
 
-                # Check every 30 seconds
-                await asyncio.sleep(30)
+                # On the next trade update (or every 30 seconds without a stream)
+                await self._next_update(updates, 30)
 
             except Exception as e:
                 logger.error(f"Position manager error: {e}", exc_info=True)
@@ -601,8 +655,14 @@ class AutoTrader:
                 logger.warning(f"⛔ Signal BLOCKED - drawdown de-risking active")
                 return
 
+            # Positions, account and quote in one concurrent round-trip
+            existing_positions, account, quotes = await asyncio.gather(
+                self.broker.get_positions(),
+                self.broker.get_account(),
+                self.get_quotes([signal.symbol]),
+            )
+
             # SAFETY CHECK 1: Prevent duplicate positions
-            existing_positions = await self.broker.get_positions()
             existing_symbols = [pos.get("symbol") for pos in existing_positions]
 
             if signal.symbol in existing_symbols:
@@ -610,8 +670,7 @@ class AutoTrader:
                 logger.warning(f"   Prevent duplicate position to avoid over-concentration")
                 return
 
-            # Get account info
-            account = await self.broker.get_account()
+            # Account info
             buying_power = float(account.get("buying_power", 0))
             equity = float(account.get("equity", 1000))
 
@@ -661,8 +720,8 @@ class AutoTrader:
                 logger.warning(f"   Max allowed: {max_total_exposure:.0%}")
                 return
 
-            # Get current price
-            quote = await self.broker.get_quote(signal.symbol)
+            # Current price
+            quote = quotes.get(signal.symbol.upper(), {})
             current_price = float(quote.get("ap", 0))  # Ask price
 
             if current_price == 0:
@@ -902,6 +961,44 @@ Respond in JSON format:
             logger.error(f"Error scanning news for {symbol}: {e}")
             return None
 
+    async def get_quotes(self, symbols: List[str], max_age_s: float = 0.0) -> Dict[str, Dict]:
+        """Quotes from the stream buffers; the broker is asked only for the rest."""
+        quotes = self.stream.get_quotes(symbols) if self.stream is not None else {}
+        missing = [s for s in symbols if s.upper() not in quotes]
+        if missing:
+            quotes.update(await self.broker.get_quotes(missing, max_age_s=max_age_s))
+        return quotes
+
+    async def _market_updates(self, pattern: str, symbols: Optional[List[str]] = None):
+        """
+        Coalescing queue of stream events matching ``pattern`` (None without
+        a stream; the caller then polls on a timer).
+        """
+        if self.stream is None or self.stream.bus is None:
+            return None
+        if symbols:
+            await self.stream.subscribe(symbols)
+        return await self.stream.bus.subscribe_queue(pattern, maxsize=256, policy=OverflowPolicy.COALESCE)
+
+    async def _next_update(self, updates, interval_s: float) -> None:
+        """
+        Wait for the next market update, at most ``interval_s`` (a plain
+        sleep without a stream). Updates arriving within STREAM_MIN_INTERVAL_S
+        are coalesced into one wake-up.
+        """
+        if updates is None:
+            await asyncio.sleep(interval_s)
+            return
+        await asyncio.sleep(STREAM_MIN_INTERVAL_S)
+        try:
+            await asyncio.wait_for(updates.get(), timeout=max(interval_s - STREAM_MIN_INTERVAL_S, 0.1))
+            updates.task_done()
+        except asyncio.TimeoutError:
+            return
+        while not updates.empty():
+            updates.get_nowait()
+            updates.task_done()
+
     def is_market_hours(self) -> bool:
         """Check if market is open."""
         now = datetime.now(pytz.timezone('America/New_York'))
@@ -920,6 +1017,8 @@ Respond in JSON format:
         """Stop the auto-trader."""
         logger.info("🛑 AutoTrader stopping...")
         self.active = False
+        if self._owns_broker:
+            await self.broker.close()
 
 
 # Standalone runner
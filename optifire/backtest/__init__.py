@@ -1,4 +1,11 @@
 """OptiFIRE Backtesting Module"""
+from optifire.backtest.bar_store import BarStore
 from optifire.backtest.engine import BacktestEngine, BacktestConfig, Trade, Position
+from optifire.backtest.panel import BarSlice, PanelView, PricePanel
+from optifire.backtest.sweep import ParameterSweep
+from optifire.backtest.validation import BacktestValidator
 
-__all__ = ["BacktestEngine", "BacktestConfig", "Trade", "Position"]
+__all__ = [
+    "BacktestEngine", "BacktestConfig", "Trade", "Position", "BarStore",
+    "PricePanel", "PanelView", "BarSlice", "ParameterSweep", "BacktestValidator",
+]
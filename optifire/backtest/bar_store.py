@@ -0,0 +1,406 @@
+"""
+Local columnar OHLCV store.
+
+Bars are kept per timeframe and symbol as one ``.npy`` file per column
+(``data/market/1Day/SPY/{t,open,high,low,close,volume}.npy``) plus a small
+``meta.json`` recording which date range has been fetched. Columns are
+memory-mapped on load and sliced by binary search on the timestamp column,
+so loading a symbol is a handful of syscalls and no parsing or copying.
+
+``update()`` asks a fetcher only for the date ranges not on disk yet (the
+last stored day is fetched again, since its bar may have been partial, and
+so is today whenever it is requested) and merges the result in, so a warm
+run over past dates needs no network access. A range only counts as
+fetched for symbols that came back with bars; an empty result (a failed
+download, an unknown symbol) is asked for again next time.
+
+For series too long to hold (a year of minute bars for a universe),
+``stream()`` reads each symbol a chunk at a time and merges the symbols
+into time order with a heap, so memory is bounded by one chunk per symbol.
+"""
+import asyncio
+import heapq
+import inspect
+import json
+import os
+import shutil
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from optifire.core.logger import logger
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+
+DateLike = Union[str, date, datetime, None]
+Range = Tuple[date, date]
+# fetch(symbols, start, end) -> {symbol: DataFrame with timestamp + COLUMNS}; may be async
+Fetcher = Callable[[List[str], date, date], Union[Dict[str, pd.DataFrame], Awaitable[Dict[str, pd.DataFrame]]]]
+
+
+def _to_date(value: DateLike) -> Optional[date]:
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def _day_ns(day: date) -> int:
+    return pd.Timestamp(day).value
+
+
+class BarStore:
+    """Per-symbol, per-timeframe columnar bar files with incremental updates."""
+
+    def __init__(self, root: Path = Path("data/market")):
+        """
+        Initialize store.
+
+        Args:
+            root: Directory holding ``<timeframe>/<SYMBOL>/`` column files
+        """
+        self.root = Path(root)
+
+    def _dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / timeframe / symbol.upper()
+
+    def coverage(self, symbol: str, timeframe: str = "1Day") -> Optional[Range]:
+        """Fetched date range (inclusive), or None if nothing is stored."""
+        try:
+            meta = json.loads((self._dir(symbol, timeframe) / "meta.json").read_text())
+            return date.fromisoformat(meta["start"]), date.fromisoformat(meta["end"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def missing(self, symbol: str, timeframe: str, start: DateLike, end: DateLike) -> List[Range]:
+        """
+        Date ranges to fetch so that [start, end] is covered.
+
+        The tail range starts at the last covered day (re-fetched, as its bar
+        may have been incomplete) and never extends past today. Today is
+        fetched again even when already covered: its session may still be open.
+        """
+        today = date.today()
+        start, end = _to_date(start), min(_to_date(end) or today, today)
+        if start > end:
+            return []
+        covered = self.coverage(symbol, timeframe)
+        if covered is None:
+            return [(start, end)]
+
+        ranges = []
+        if start < covered[0]:
+            ranges.append((start, covered[0] - timedelta(days=1)))
+        if end > covered[1]:
+            ranges.append((covered[1], end))
+        elif end == today:
+            ranges.append((today, today))
+        return ranges
+
+    def load(
+        self,
+        symbol: str,
+        timeframe: str = "1Day",
+        start: DateLike = None,
+        end: DateLike = None,
+    ) -> pd.DataFrame:
+        """
+        Stored bars as a DataFrame backed by the memory-mapped files.
+
+        Args:
+            symbol: Symbol
+            timeframe: Bar timeframe
+            start: First day (inclusive, default: first stored)
+            end: Last day (inclusive, default: last stored)
+
+        Returns:
+            DataFrame with columns timestamp (naive UTC), open, high, low,
+            close, volume (empty if nothing is stored). Treat it as read-only.
+        """
+        path = self._dir(symbol, timeframe)
+        if not (path / "t.npy").exists():
+            return pd.DataFrame(columns=["timestamp", *COLUMNS])
+
+        t = np.load(path / "t.npy", mmap_mode="r")
+        lo, hi = self._bounds(t, start, end)
+        columns = {"timestamp": t[lo:hi].view("datetime64[ns]")}
+        for name in COLUMNS:
+            columns[name] = np.load(path / f"{name}.npy", mmap_mode="r")[lo:hi]
+        return pd.DataFrame(columns, copy=False)
+
+    @staticmethod
+    def _bounds(t: np.ndarray, start: DateLike, end: DateLike) -> Tuple[int, int]:
+        """Row range of the days [start, end] in a timestamp column."""
+        lo = 0 if start is None else int(np.searchsorted(t, _day_ns(_to_date(start)), "left"))
+        hi = len(t) if end is None else int(
+            np.searchsorted(t, _day_ns(_to_date(end) + timedelta(days=1)), "left")
+        )
+        return lo, hi
+
+    def iter_chunks(
+        self,
+        symbol: str,
+        timeframe: str = "1Day",
+        start: DateLike = None,
+        end: DateLike = None,
+        chunk_rows: int = 4096,
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Stored bars in [start, end] as in-memory chunks of at most ``chunk_rows``.
+
+        The files are mapped afresh for every chunk and unmapped after the
+        copy, so only the chunk being read stays resident.
+
+        Yields:
+            {"t": int64 ns timestamps, "open": ..., "volume": ...}
+        """
+        path = self._dir(symbol, timeframe)
+        if not (path / "t.npy").exists():
+            return
+        lo, hi = self._bounds(np.load(path / "t.npy", mmap_mode="r"), start, end)
+        for a in range(lo, hi, chunk_rows):
+            b = min(a + chunk_rows, hi)
+            yield {
+                name: np.array(np.load(path / f"{name}.npy", mmap_mode="r")[a:b])
+                for name in ("t", *COLUMNS)
+            }
+
+    def stream(
+        self,
+        symbols: Sequence[str],
+        timeframe: str,
+        start: DateLike = None,
+        end: DateLike = None,
+        chunk_rows: int = 4096,
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]]:
+        """
+        Stored bars of several symbols merged into time order, in blocks.
+
+        A heap holds each symbol's current chunk keyed by its last
+        timestamp; the smallest key is a horizon up to which every symbol's
+        bars are in memory. All rows up to the horizon are emitted as one
+        block, and the symbols whose chunk ended there read their next one.
+
+        Yields:
+            (int64 ns timestamps, index into ``symbols``, {column: values})
+            per block, sorted by timestamp then symbol; the rows of one
+            timestamp never span two blocks
+        """
+        readers = [self.iter_chunks(symbol, timeframe, start, end, chunk_rows) for symbol in symbols]
+        pending: Dict[int, Dict[str, np.ndarray]] = {}
+        heap: List[Tuple[int, int]] = []
+
+        def advance(j: int) -> None:
+            chunk = next(readers[j], None)
+            if chunk is None:
+                pending.pop(j, None)
+            else:
+                pending[j] = chunk
+                heapq.heappush(heap, (int(chunk["t"][-1]), j))
+
+        for j in range(len(symbols)):
+            advance(j)
+
+        while heap:
+            horizon = heap[0][0]
+            parts, owners = [], []
+            for j, chunk in pending.items():
+                k = int(np.searchsorted(chunk["t"], horizon, "right"))
+                if k:
+                    parts.append({name: values[:k] for name, values in chunk.items()})
+                    owners.append(np.full(k, j, dtype=np.int32))
+                    pending[j] = {name: values[k:] for name, values in chunk.items()}
+
+            t = np.concatenate([part["t"] for part in parts])
+            owner = np.concatenate(owners)
+            order = np.lexsort((owner, t))
+            yield t[order], owner[order], {
+                name: np.concatenate([part[name] for part in parts])[order] for name in COLUMNS
+            }
+
+            while heap and heap[0][0] == horizon:
+                advance(heapq.heappop(heap)[1])
+
+    def load_many(
+        self, symbols: Sequence[str], timeframe: str = "1Day", start: DateLike = None, end: DateLike = None
+    ) -> Dict[str, pd.DataFrame]:
+        """``load()`` for several symbols."""
+        return {symbol: self.load(symbol, timeframe, start, end) for symbol in symbols}
+
+    def write(self, symbol: str, timeframe: str, bars: pd.DataFrame, start: DateLike, end: DateLike) -> int:
+        """
+        Merge fetched bars into the store and extend its coverage.
+
+        Args:
+            symbol: Symbol
+            timeframe: Bar timeframe
+            bars: DataFrame with timestamp and OHLCV columns (may be empty)
+            start: First day the fetch covered
+            end: Last day the fetch covered
+
+        Returns:
+            Number of stored bars
+        """
+        path = self._dir(symbol, timeframe)
+        start, end = _to_date(start), _to_date(end)
+
+        frames = []
+        stored = self.load(symbol, timeframe)
+        if not stored.empty:
+            frames.append(stored)
+        if bars is not None and not bars.empty:
+            ts = pd.to_datetime(bars["timestamp"])
+            if ts.dt.tz is not None:
+                ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+            fresh = pd.DataFrame({"timestamp": ts.astype("datetime64[ns]")})
+            for name in COLUMNS:
+                fresh[name] = pd.to_numeric(bars[name], errors="coerce").astype(float).to_numpy()
+            frames.append(fresh)
+
+        merged = (
+            pd.concat(frames, ignore_index=True)
+            .drop_duplicates("timestamp", keep="last")
+            .sort_values("timestamp")
+            if frames else pd.DataFrame(columns=["timestamp", *COLUMNS])
+        )
+
+        covered = self.coverage(symbol, timeframe)
+        if covered is not None:
+            start, end = min(start, covered[0]), max(end, covered[1])
+
+        # Write a complete copy next to the old one, then swap directories
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / "t.npy", merged["timestamp"].to_numpy("datetime64[ns]").view("int64"))
+        for name in COLUMNS:
+            np.save(tmp / f"{name}.npy", merged[name].to_numpy(dtype=float))
+        (tmp / "meta.json").write_text(json.dumps({
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "rows": len(merged),
+        }))
+
+        old = path.with_name(path.name + ".old")
+        if path.exists():
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        return len(merged)
+
+    def _plan(
+        self, symbols: Sequence[str], timeframe: str, start: DateLike, end: DateLike, batch_size: Optional[int] = None
+    ) -> List[Tuple[Range, List[str]]]:
+        """
+        Group symbols by missing range, so each range is one multi-symbol
+        fetch (split into fetches of at most ``batch_size`` symbols).
+        """
+        groups: Dict[Range, List[str]] = {}
+        for symbol in dict.fromkeys(symbols):
+            for missing in self.missing(symbol, timeframe, start, end):
+                groups.setdefault(missing, []).append(symbol)
+        size = batch_size or max(len(symbols), 1)
+        return [
+            (span, group[k:k + size])
+            for span, group in groups.items()
+            for k in range(0, len(group), size)
+        ]
+
+    def _store_fetched(self, symbols: List[str], timeframe: str, span: Range, fetched: Dict[str, pd.DataFrame]) -> None:
+        for symbol in symbols:
+            bars = fetched.get(symbol)
+            if bars is None:
+                bars = fetched.get(symbol.upper())
+            if bars is None or bars.empty:
+                # Failed downloads look like this too: leave the range missing
+                logger.debug(f"Bar store: no {symbol} {timeframe} bars for {span[0]}..{span[1]}")
+                continue
+            rows = self.write(symbol, timeframe, bars, *span)
+            logger.debug(f"Bar store: {symbol} {timeframe} {span[0]}..{span[1]} -> {rows} bars")
+
+    async def update(
+        self,
+        symbols: Sequence[str],
+        timeframe: str,
+        start: DateLike,
+        end: DateLike,
+        fetch: Fetcher,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch what is missing for [start, end], store it, and load the range.
+
+        Args:
+            symbols: Symbols
+            timeframe: Bar timeframe
+            start: First day (inclusive)
+            end: Last day (inclusive, default today)
+            fetch: fetch(symbols, start, end) -> {symbol: DataFrame}, sync or async;
+                called once per distinct missing range
+            batch_size: Fetch at most this many symbols at a time (bounds the
+                size of one fetch result; default all)
+
+        Returns:
+            symbol -> bars in [start, end]
+        """
+        await self.sync(symbols, timeframe, start, end, fetch, batch_size)
+        return self.load_many(symbols, timeframe, start, end)
+
+    async def sync(
+        self,
+        symbols: Sequence[str],
+        timeframe: str,
+        start: DateLike,
+        end: DateLike,
+        fetch: Fetcher,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        """``update()`` without loading the range afterwards."""
+        for span, group in self._plan(symbols, timeframe, start, end, batch_size):
+            try:
+                fetched = fetch(group, *span)
+                if inspect.isawaitable(fetched):
+                    fetched = await fetched
+            except Exception as e:
+                logger.warning(f"Bar store: fetch {group} {span[0]}..{span[1]} failed: {e}")
+                continue
+            self._store_fetched(group, timeframe, span, fetched)
+
+    def update_sync(
+        self,
+        symbols: Sequence[str],
+        timeframe: str,
+        start: DateLike,
+        end: DateLike,
+        fetch: Fetcher,
+    ) -> Dict[str, pd.DataFrame]:
+        """``update()`` for scripts without an event loop (no loop is started on a warm run)."""
+        for span, group in self._plan(symbols, timeframe, start, end):
+            try:
+                fetched = fetch(group, *span)
+                if inspect.isawaitable(fetched):
+                    fetched = asyncio.run(fetched)
+            except Exception as e:
+                logger.warning(f"Bar store: fetch {group} {span[0]}..{span[1]} failed: {e}")
+                continue
+            self._store_fetched(group, timeframe, span, fetched)
+        return self.load_many(symbols, timeframe, start, end)
+
+
+def fetch_yfinance(symbols: List[str], start: date, end: date) -> Dict[str, pd.DataFrame]:
+    """Daily bars from Yahoo Finance, as a ``BarStore`` fetcher."""
+    import yfinance as yf
+
+    frames = {}
+    for symbol in symbols:
+        # yfinance treats end as exclusive
+        df = yf.download(symbol, start=str(start), end=str(end + timedelta(days=1)), progress=False)
+        if df.empty:
+            continue
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        df = df.rename(columns=str.lower).reset_index()
+        frames[symbol] = df.rename(columns={df.columns[0]: "timestamp"})
+    return frames
@@ -0,0 +1,87 @@
+"""
+Append-only columnar buffers for long backtests.
+
+Rows are written into preallocated numpy chunks, one array per column.
+When a chunk fills up it is either kept in memory or, with a spill
+directory, saved as ``part-00000.<column>.npy`` files and its arrays are
+reused, so resident memory stays at one chunk however many rows are
+appended. Spilled columns are read back memory-mapped, chunk by chunk.
+"""
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+import numpy as np
+
+
+class ColumnBuffer:
+    """Append-only table of fixed-dtype columns, optionally spilled to disk."""
+
+    def __init__(
+        self,
+        columns: Mapping[str, Any],
+        chunk_rows: int = 65536,
+        spill_dir: Optional[Path] = None,
+    ):
+        """
+        Initialize buffer.
+
+        Args:
+            columns: {name: numpy dtype}, in ``append`` argument order
+            chunk_rows: Rows per chunk
+            spill_dir: Save full chunks here (emptied first) instead of keeping them
+        """
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in columns.items()}
+        self.chunk_rows = chunk_rows
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        if self.spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir.mkdir(parents=True)
+        self._parts: List[Dict[str, np.ndarray]] = []  # Full chunks kept in memory
+        self._spilled = 0
+        self._new_chunk()
+        self._rows = 0
+
+    def _new_chunk(self) -> None:
+        self._chunk = {name: np.empty(self.chunk_rows, dtype) for name, dtype in self.dtypes.items()}
+        self._arrays = list(self._chunk.values())
+        self._fill = 0
+
+    def append(self, *values) -> None:
+        """Add one row (one value per column, in column order)."""
+        i = self._fill
+        for array, value in zip(self._arrays, values):
+            array[i] = value
+        self._fill = i + 1
+        self._rows += 1
+        if self._fill == self.chunk_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.spill_dir:
+            for name, array in self._chunk.items():
+                np.save(self.spill_dir / f"part-{self._spilled:05d}.{name}.npy", array[:self._fill])
+            self._spilled += 1
+            self._fill = 0
+        else:
+            self._parts.append({name: array[:self._fill] for name, array in self._chunk.items()})
+            self._new_chunk()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """All rows as successive {column: values} chunks (spilled ones memory-mapped)."""
+        for k in range(self._spilled):
+            yield {
+                name: np.load(self.spill_dir / f"part-{k:05d}.{name}.npy", mmap_mode="r")
+                for name in self.dtypes
+            }
+        yield from self._parts
+        if self._fill:
+            yield {name: array[:self._fill] for name, array in self._chunk.items()}
+
+    def column(self, name: str) -> np.ndarray:
+        """One column as a single in-memory array."""
+        parts = [chunk[name] for chunk in self.chunks()]
+        return np.concatenate(parts) if parts else np.empty(0, self.dtypes[name])
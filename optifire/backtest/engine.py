@@ -3,16 +3,30 @@ OptiFIRE Backtesting Engine
 
 Simulates trading strategies on historical data to evaluate performance.
 """
-import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+import inspect
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-import httpx
-import os
 
 from optifire.core.logger import logger
+from optifire.backtest.bar_store import BarStore
+from optifire.backtest.columnar import ColumnBuffer
+from optifire.backtest.panel import FIELDS, BarSlice, PanelView, PricePanel
+from optifire.exec.broker_alpaca import AlpacaBroker
+
+NS_PER_DAY = 86_400 * 10**9
+# Intraday runs sample daily equity per exchange session, not per UTC day
+# (extended-hours bars cross UTC midnight)
+SESSION_TZ = "America/New_York"
+
+
+def session_days(t: np.ndarray) -> np.ndarray:
+    """Session date (days since epoch, ``SESSION_TZ``) of naive-UTC nanosecond timestamps."""
+    local = pd.DatetimeIndex(np.asarray(t).view("datetime64[ns]")).tz_localize("UTC").tz_convert(SESSION_TZ)
+    return local.tz_localize(None).asi8 // NS_PER_DAY
 
 
 @dataclass
@@ -29,14 +43,23 @@ class BacktestConfig:
     max_total_exposure: float = 0.30  # 30% total exposure
     stop_loss_pct: float = 0.03  # 3% stop loss
     take_profit_pct: float = 0.07  # 7% take profit
+    trailing_stop: bool = False  # Ratchet the stop behind the best price seen
+    max_positions: Optional[int] = None  # Open position limit (None = exposure limits only)
 
     # Strategy symbols
     symbols: List[str] = None  # Default watchlist
 
+    # Bar timeframe ("1Day", or intraday "1Min", "5Min", "1Hour", ...)
+    timeframe: str = "1Day"
+
     def __post_init__(self):
         if self.symbols is None:
             self.symbols = ["SPY", "QQQ", "AAPL", "NVDA", "TSLA", "MSFT", "GOOGL", "META", "AMZN"]
 
+    @property
+    def intraday(self) -> bool:
+        return self.timeframe.endswith(("Min", "Hour"))
+
 
 @dataclass
 class Trade:
@@ -65,19 +88,112 @@ class Position:
     reason: str = ""
 
 
+# Per-trade fields in backtest metrics ("trades") and trade CSVs
+TRADE_FIELDS = ("timestamp", "symbol", "action", "price", "shares", "pnl", "reason")
+
+
+class TradeLog:
+    """
+    Trades as columns instead of ``Trade`` objects (symbols and reasons
+    interned), for runs with too many trades to keep as a list. Supports
+    the list operations the engine uses: ``append``, ``len`` and iteration
+    (which rebuilds ``Trade`` objects).
+    """
+
+    ACTIONS = ("BUY", "SELL", "SHORT", "COVER")
+
+    def __init__(self, chunk_rows: int = 65536, spill_dir: Optional[Path] = None):
+        """
+        Args:
+            chunk_rows: Trades per column chunk
+            spill_dir: Save full chunks here (default: keep in memory)
+        """
+        self.buffer = ColumnBuffer({
+            "timestamp": "int64", "symbol": "int32", "action": "int8",
+            "price": float, "shares": "int64", "commission": float,
+            "slippage": float, "pnl": float, "reason": "int32",
+        }, chunk_rows, spill_dir)
+        self._codes: Dict[str, Dict[str, int]] = {"symbol": {}, "reason": {}}
+        self._names: Dict[str, List[str]] = {"symbol": [], "reason": []}
+
+    def _code(self, kind: str, value: str) -> int:
+        codes = self._codes[kind]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self._names[kind].append(value)
+        return code
+
+    def append(self, trade: Trade) -> None:
+        self.buffer.append(
+            pd.Timestamp(trade.timestamp).value, self._code("symbol", trade.symbol),
+            self.ACTIONS.index(trade.action), trade.price, trade.shares, trade.commission,
+            trade.slippage, trade.pnl, self._code("reason", trade.reason),
+        )
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def pnl_stats(self) -> Dict[str, float]:
+        """Trade count, win/loss counts and P&L sums, read chunk by chunk."""
+        stats = dict.fromkeys(("trades", "wins", "losses", "win_pnl", "loss_pnl", "pnl"), 0)
+        for chunk in self.buffer.chunks():
+            pnl = np.asarray(chunk["pnl"])
+            won, lost = pnl[pnl > 0], pnl[pnl < 0]
+            stats["trades"] += len(pnl)
+            stats["wins"] += len(won)
+            stats["losses"] += len(lost)
+            stats["win_pnl"] += float(won.sum())
+            stats["loss_pnl"] += float(lost.sum())
+            stats["pnl"] += float(pnl.sum())
+        return stats
+
+    def to_csv(self, path: Path) -> None:
+        """Write the metrics trade columns to a CSV file, one chunk at a time."""
+        symbols, reasons = np.array(self._names["symbol"], dtype=object), np.array(self._names["reason"], dtype=object)
+        header = True
+        for chunk in self.buffer.chunks():
+            pd.DataFrame({
+                "timestamp": [pd.Timestamp(t).isoformat() for t in chunk["timestamp"].tolist()],
+                "symbol": symbols[chunk["symbol"]],
+                "action": np.array(self.ACTIONS, dtype=object)[chunk["action"]],
+                "price": chunk["price"], "shares": chunk["shares"], "pnl": chunk["pnl"],
+                "reason": reasons[chunk["reason"]],
+            }).to_csv(path, mode="w" if header else "a", header=header, index=False)
+            header = False
+        if header:
+            pd.DataFrame(columns=TRADE_FIELDS).to_csv(path, index=False)
+
+    def __iter__(self) -> Iterator[Trade]:
+        symbols, reasons = self._names["symbol"], self._names["reason"]
+        for chunk in self.buffer.chunks():
+            for t, symbol, action, price, shares, commission, slippage, pnl, reason in zip(
+                *(chunk[name].tolist() for name in self.buffer.dtypes)
+            ):
+                yield Trade(
+                    pd.Timestamp(t), symbols[symbol], self.ACTIONS[action], price,
+                    shares, commission, slippage, pnl, reasons[reason],
+                )
+
+
 class BacktestEngine:
     """
     Event-driven backtesting engine.
 
     Features:
-    - Historical data loading from Alpaca
+    - Historical data loading from Alpaca (cached in the local bar store)
+    - Symbols aligned once into a (trading day x symbol) panel; per-day
+      dict strategies (``run``) or vectorized strategies (``run_panel``)
+    - Intraday timeframes streamed from the bar store in bounded memory
+      (``run_intraday``)
     - Position tracking with stop loss / take profit
     - Commission and slippage modeling
     - Performance metrics calculation
     """
 
-    def __init__(self, config: BacktestConfig):
+    def __init__(self, config: BacktestConfig, store: Optional[BarStore] = None):
         self.config = config
+        self.store = store or BarStore()
         self.capital = config.initial_capital
         self.initial_capital = config.initial_capital
 
@@ -86,18 +202,11 @@ class BacktestEngine:
         self.trades: List[Trade] = []
         self.equity_curve: List[Tuple[datetime, float]] = []
         self.cash_history: List[Tuple[datetime, float]] = []
+        self.equity_log: Optional[ColumnBuffer] = None  # Per-bar equity (intraday runs)
 
         # Historical data cache
         self.price_data: Dict[str, pd.DataFrame] = {}
 
-        # Alpaca credentials
-        self.api_key = os.getenv("ALPACA_API_KEY")
-        self.api_secret = os.getenv("ALPACA_API_SECRET")
-        self.headers = {
-            "APCA-API-KEY-ID": self.api_key or "",
-            "APCA-API-SECRET-KEY": self.api_secret or "",
-        }
-
     async def load_historical_data(self, symbol: str) -> pd.DataFrame:
         """
         Load historical OHLCV data from Alpaca.
@@ -105,50 +214,56 @@ class BacktestEngine:
         Returns:
             DataFrame with columns: timestamp, open, high, low, close, volume
         """
-        if symbol in self.price_data:
-            return self.price_data[symbol]
-
-        logger.info(f"Loading historical data for {symbol}...")
-
-        # Alpaca data API
-        url = f"https://data.alpaca.markets/v2/stocks/{symbol}/bars"
-        params = {
-            "start": self.config.start_date,
-            "end": self.config.end_date,
-            "timeframe": "1Day",  # Daily bars
-            "adjustment": "all",  # Adjust for splits/dividends
-        }
+        frames = await self.load_historical_data_multi([symbol])
+        return frames.get(symbol, pd.DataFrame())
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=30.0,
-                )
-                response.raise_for_status()
-                data = response.json()
+    async def load_historical_data_multi(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Load historical OHLCV data for many symbols.
 
-            if "bars" not in data or not data["bars"]:
-                logger.warning(f"No data for {symbol}")
-                return pd.DataFrame()
+        Bars come from the local bar store; only date ranges it does not
+        hold yet are downloaded (with multi-symbol Alpaca requests).
 
+        Returns:
+            symbol -> DataFrame with columns: timestamp, open, high, low, close, volume
+            (empty DataFrame for symbols without data)
+        """
+        missing = [s for s in symbols if s not in self.price_data]
+        if missing:
+            frames = await self.store.update(
+                missing, self.config.timeframe, self.config.start_date, self.config.end_date, self._download_bars
+            )
+            for symbol, df in frames.items():
+                if df.empty:
+                    logger.warning(f"No data for {symbol}")
+                    continue
+                self.price_data[symbol] = df
+                logger.info(f"Loaded {len(df)} bars for {symbol}")
+
+        return {s: self.price_data.get(s, pd.DataFrame()) for s in symbols}
+
+    async def _download_bars(self, symbols: List[str], start, end) -> Dict[str, pd.DataFrame]:
+        """Bars of the configured timeframe from Alpaca (bar store fetcher)."""
+        logger.info(f"Downloading {start}..{end} for {len(symbols)} symbols...")
+        async with AlpacaBroker(timeout_s=30.0) as broker:
+            bars = await broker.get_bars_multi(
+                symbols,
+                timeframe=self.config.timeframe,
+                start=str(start),
+                end=str(end),
+                adjustment="all",  # Adjust for splits/dividends
+            )
+
+        frames = {}
+        for symbol in symbols:
+            if not bars.get(symbol.upper()):
+                continue
             # Convert to DataFrame
-            bars = data["bars"]
-            df = pd.DataFrame(bars)
+            df = pd.DataFrame(bars[symbol.upper()])
             df["timestamp"] = pd.to_datetime(df["t"])
             df = df.rename(columns={"o": "open", "h": "high", "l": "low", "c": "close", "v": "volume"})
-            df = df[["timestamp", "open", "high", "low", "close", "volume"]]
-            df = df.sort_values("timestamp")
-
-            self.price_data[symbol] = df
-            logger.info(f"Loaded {len(df)} bars for {symbol}")
-            return df
-
-        except Exception as e:
-            logger.error(f"Failed to load data for {symbol}: {e}")
-            return pd.DataFrame()
+            frames[symbol] = df[["timestamp", "open", "high", "low", "close", "volume"]]
+        return frames
 
     def calculate_slippage(self, price: float, action: str) -> float:
         """Calculate slippage based on action."""
@@ -170,6 +285,10 @@ class BacktestEngine:
         if cost > self.capital:
             return False
 
+        # Check position count
+        if self.config.max_positions is not None and len(self.positions) >= self.config.max_positions:
+            return False
+
         # Check position size limit
         # Create price dict for valuation
         current_prices = {s: price for s in self.positions.keys()}
@@ -301,6 +420,13 @@ class BacktestEngine:
             if low <= position.take_profit:
                 return self.close_position(timestamp, symbol, position.take_profit, "Take Profit")
 
+        if self.config.trailing_stop:
+            # Effective from the next bar (intraday order of high and low is unknown)
+            if position.side == "LONG":
+                position.stop_loss = max(position.stop_loss, high * (1 - self.config.stop_loss_pct))
+            else:
+                position.stop_loss = min(position.stop_loss, low * (1 + self.config.stop_loss_pct))
+
         return None
 
     def get_total_value(self, current_prices: Dict[str, float] = None) -> float:
@@ -321,106 +447,299 @@ class BacktestEngine:
         self.equity_curve.append((timestamp, total_value))
         self.cash_history.append((timestamp, self.capital))
 
+    async def build_panel(self) -> PricePanel:
+        """Load all configured symbols and align them into one (day x symbol) panel."""
+        if self.config.intraday:
+            raise ValueError(f"{self.config.timeframe} bars do not fit a daily panel; use run_intraday()")
+        logger.info(f"Loading data for {len(self.config.symbols)} symbols...")
+        frames = await self.load_historical_data_multi(self.config.symbols)
+        return PricePanel.from_frames(
+            frames, self.config.symbols, self.config.start_date, self.config.end_date
+        )
+
     async def run(self, signal_generator) -> Dict:
         """
-        Run backtest with a signal generator.
+        Run backtest with a per-day signal generator.
 
         Args:
             signal_generator: Async function that takes (timestamp, price_data) and returns signals
+                            price_data: {symbol: {timestamp, open, high, low, close, volume}} for symbols trading that day
                             Signal format: {"symbol": str, "action": "BUY"|"SELL", "confidence": float, "reason": str}
 
         Returns:
             Dictionary with backtest results and metrics
         """
+        if self.config.intraday:
+            return await self.run_intraday(signal_generator)
+        panel = await self.build_panel()
+        fields = [(name, panel.fields[name]) for name in FIELDS]
+        close = panel.close
+
+        def day_signals(i: int, timestamp: pd.Timestamp):
+            day_data = {
+                panel.symbols[j]: {"timestamp": timestamp, **{name: values[i, j] for name, values in fields}}
+                for j in np.flatnonzero(~np.isnan(close[i]))
+            }
+            return signal_generator(timestamp, day_data)
+
+        return await self._simulate(panel, day_signals)
+
+    async def run_panel(self, strategy, panel: Optional[PricePanel] = None) -> Dict:
+        """
+        Run backtest with a vectorized strategy (panel mode).
+
+        The strategy sees each trading day as a ``PanelView`` (array views
+        over all symbols, no lookahead) instead of per-symbol dicts, so its
+        cost does not grow with a Python loop over symbols.
+
+        Args:
+            strategy: Object with ``generate_panel_signals(view)`` (sync or
+                async, returns signal dicts as for ``run``) and optionally
+                ``prepare(panel)``, called once before the first day; or
+                the signal function itself
+            panel: Prices to run on (default: ``build_panel()``; intraday
+                timeframes run through ``run_intraday``)
+
+        Returns:
+            Dictionary with backtest results and metrics
+        """
+        if panel is None:
+            if self.config.intraday:
+                return await self.run_intraday(strategy)
+            panel = await self.build_panel()
+        prepare = getattr(strategy, "prepare", None)
+        if prepare is not None:
+            prepare(panel)
+        generate = getattr(strategy, "generate_panel_signals", strategy)
+        return await self._simulate(panel, lambda i, timestamp: generate(PanelView(panel, i)))
+
+    async def _simulate(self, panel: PricePanel, day_signals) -> Dict:
+        """
+        Walk the panel's trading days by index: stops/targets, then signals,
+        then the equity point.
+
+        Args:
+            panel: Aligned prices
+            day_signals: (day index, timestamp) -> signals (or awaitable)
+        """
         logger.info(f"Starting backtest from {self.config.start_date} to {self.config.end_date}")
         logger.info(f"Initial capital: ${self.config.initial_capital:,.2f}")
 
-        # Load data for all symbols
-        logger.info(f"Loading data for {len(self.config.symbols)} symbols...")
-        for symbol in self.config.symbols:
-            await self.load_historical_data(symbol)
+        close, high, low = panel.close, panel.fields["high"], panel.fields["low"]
+        columns = {symbol: j for j, symbol in enumerate(panel.symbols)}
 
-        # Get date range
-        start = pd.to_datetime(self.config.start_date)
-        end = pd.to_datetime(self.config.end_date)
+        for i in range(len(panel)):
+            timestamp = panel.timestamp(i)
+            today = close[i]
 
-        # Simulate day by day
-        current_date = start
-        days_processed = 0
+            # Check stop loss / take profit for existing positions
+            for symbol in list(self.positions.keys()):
+                j = columns.get(symbol)
+                if j is not None and today[j] == today[j]:
+                    self.check_stop_loss_take_profit(timestamp, symbol, low[i, j], high[i, j])
 
-        while current_date <= end:
-            # Get prices for all symbols on this day
-            day_prices = {}
-            day_data = {}
+            # Generate signals
+            signals = day_signals(i, timestamp)
+            if inspect.isawaitable(signals):
+                signals = await signals
 
-            for symbol in self.config.symbols:
-                if symbol not in self.price_data or self.price_data[symbol].empty:
-                    continue
+            # Execute signals
+            self._execute_signals(
+                timestamp,
+                signals,
+                lambda symbol: today[columns[symbol]] if symbol in columns else np.nan,
+                lambda: self._held_prices(today, columns),
+            )
 
-                df = self.price_data[symbol]
-                day_df = df[df["timestamp"].dt.date == current_date.date()]
+            # Record equity
+            self.record_equity(timestamp, self._held_prices(today, columns))
 
-                if not day_df.empty:
-                    row = day_df.iloc[0]
-                    day_prices[symbol] = row["close"]
-                    day_data[symbol] = row.to_dict()
+        # Close all remaining positions
+        logger.info("Closing remaining positions...")
+        end = pd.to_datetime(self.config.end_date)
+        final_prices = panel.last_valid("close")
+        for symbol in list(self.positions.keys()):
+            j = columns.get(symbol)
+            if j is not None and final_prices[j] == final_prices[j]:
+                self.close_position(end, symbol, final_prices[j], "Backtest End")
 
-            if day_prices:
-                # Check stop loss / take profit for existing positions
-                for symbol in list(self.positions.keys()):
-                    if symbol in day_data:
-                        self.check_stop_loss_take_profit(
-                            current_date,
-                            symbol,
-                            day_data[symbol]["low"],
-                            day_data[symbol]["high"],
-                        )
+        logger.info(f"Backtest complete. Processed {len(panel)} days, {len(self.trades)} trades")
 
-                # Generate signals
-                signals = await signal_generator(current_date, day_data)
+        # Calculate metrics
+        return self.calculate_metrics()
 
-                # Execute signals
-                for signal in signals:
-                    symbol = signal.get("symbol")
-                    action = signal.get("action")
-                    confidence = signal.get("confidence", 0.5)
-                    reason = signal.get("reason", "Signal")
+    async def run_intraday(self, strategy, chunk_rows: int = 4096, spill_dir: Optional[Path] = None) -> Dict:
+        """
+        Run backtest on intraday bars (``config.timeframe``) streamed from the bar store.
+
+        Each symbol is read ``chunk_rows`` bars at a time and the symbols are
+        heap-merged into time order (``BarStore.stream``); every timestamp
+        is one step: stops/targets for held symbols with a bar, then
+        signals, then the equity point. Per-bar equity (``self.equity_log``)
+        and trades (``self.trades``, a ``TradeLog``) go to columnar buffers,
+        spilled to ``spill_dir`` if given, so memory does not grow with the
+        number of bars. Metrics use end-of-session equity (``self.equity_curve``,
+        one point per New York session date, extended hours included)
+        and the intraday maximum drawdown; trade statistics are summed over
+        the trade columns, which are not returned as a "trades" list
+        ("trades_spill_dir" says where they were spilled, if anywhere).
 
-                    if symbol not in day_prices:
-                        continue
+        Args:
+            strategy: As for ``run_panel``, called with a ``BarSlice`` per
+                timestamp (``prepare`` is not called: there is no panel), or
+                an object with ``generate_signals(timestamp, price_data)`` or
+                a signal function as for ``run``
+            chunk_rows: Bars per symbol read at a time
+            spill_dir: Directory for the equity and trade columns (default: memory)
 
-                    price = day_prices[symbol]
+        Returns:
+            Dictionary with backtest results and metrics
+        """
+        config = self.config
+        symbols = list(config.symbols)
+        columns = {symbol: j for j, symbol in enumerate(symbols)}
+        # One symbol per download, so a fetch result is one symbol's bars
+        await self.store.sync(
+            symbols, config.timeframe, config.start_date, config.end_date, self._download_bars, batch_size=1
+        )
 
-                    # Size position based on confidence
-                    target_value = self.get_total_value(day_prices) * self.config.max_position_size
-                    shares = int(target_value * confidence / price)
+        spill_dir = Path(spill_dir) if spill_dir else None
+        self.trades = TradeLog(spill_dir=spill_dir / "trades" if spill_dir else None)
+        self.equity_log = ColumnBuffer(
+            {"timestamp": "int64", "equity": float, "cash": float},
+            spill_dir=spill_dir / "equity" if spill_dir else None,
+        )
+        generate = getattr(strategy, "generate_panel_signals", None)
+        signal_generator = getattr(strategy, "generate_signals", strategy)
+
+        logger.info(f"Starting {config.timeframe} backtest from {config.start_date} to {config.end_date}")
+        logger.info(f"Initial capital: ${config.initial_capital:,.2f}")
+
+        last_close = np.full(len(symbols), np.nan)
+        held = lambda: {symbol: last_close[columns[symbol]] for symbol in self.positions}
+        peak, max_drawdown = 0.0, 0.0
+        day, day_end = None, None
+        steps = 0
+
+        stream = self.store.stream(symbols, config.timeframe, config.start_date, config.end_date, chunk_rows)
+        for t, rows, bars in stream:
+            bounds = np.flatnonzero(np.diff(t)) + 1
+            sessions = session_days(t)
+            for a, b in zip([0, *bounds.tolist()], [*bounds.tolist(), len(t)]):
+                ns = int(t[a])
+                timestamp = pd.Timestamp(ns)
+                step_rows = rows[a:b]
+                step_bars = {name: values[a:b] for name, values in bars.items()}
+                close = step_bars["close"]
+
+                # End-of-day equity point once a new day starts
+                if day is not None and sessions[a] != day:
+                    self.equity_curve.append(day_end[:2])
+                    self.cash_history.append((day_end[0], day_end[2]))
+
+                def bar_of(symbol: str) -> int:
+                    """Row of ``symbol`` in this step (-1 if it has no bar)."""
+                    j = columns.get(symbol, -1)
+                    k = int(np.searchsorted(step_rows, j))
+                    return k if k < len(step_rows) and step_rows[k] == j else -1
+
+                def price_of(symbol: str) -> float:
+                    k = bar_of(symbol)
+                    return close[k] if k >= 0 else np.nan
+
+                # Check stop loss / take profit for held symbols with a bar
+                for symbol in list(self.positions.keys()):
+                    k = bar_of(symbol)
+                    if k >= 0 and close[k] == close[k]:
+                        self.check_stop_loss_take_profit(timestamp, symbol, step_bars["low"][k], step_bars["high"][k])
+                last_close[step_rows] = close
 
-                    if action == "BUY" and shares > 0:
-                        if symbol not in self.positions:
-                            self.open_position(current_date, symbol, price, shares, "LONG", reason)
-                    elif action == "SELL" and symbol in self.positions:
-                        self.close_position(current_date, symbol, price, reason)
+                # Generate signals
+                if generate is not None:
+                    signals = generate(BarSlice(symbols, timestamp, step_rows, step_bars))
+                else:
+                    signals = signal_generator(timestamp, {
+                        symbols[j]: {"timestamp": timestamp, **{name: step_bars[name][k] for name in FIELDS}}
+                        for k, j in enumerate(step_rows.tolist())
+                    })
+                if inspect.isawaitable(signals):
+                    signals = await signals
+
+                self._execute_signals(timestamp, signals, price_of, held)
 
                 # Record equity
-                self.record_equity(current_date, day_prices)
-                days_processed += 1
+                equity = self.get_total_value(held())
+                self.equity_log.append(ns, equity, self.capital)
+                peak = max(peak, equity)
+                max_drawdown = min(max_drawdown, (equity - peak) / peak)
+                day, day_end = sessions[a], (timestamp, equity, self.capital)
+                steps += 1
 
-            current_date += timedelta(days=1)
+        if day_end is not None:
+            self.equity_curve.append(day_end[:2])
+            self.cash_history.append((day_end[0], day_end[2]))
 
         # Close all remaining positions
         logger.info("Closing remaining positions...")
-        final_prices = {symbol: df.iloc[-1]["close"]
-                       for symbol, df in self.price_data.items()
-                       if not df.empty}
-
+        end = pd.to_datetime(config.end_date)
         for symbol in list(self.positions.keys()):
-            if symbol in final_prices:
-                self.close_position(end, symbol, final_prices[symbol], "Backtest End")
+            price = last_close[columns[symbol]]
+            if price == price:
+                self.close_position(end, symbol, price, "Backtest End")
 
-        logger.info(f"Backtest complete. Processed {days_processed} days, {len(self.trades)} trades")
+        logger.info(f"Backtest complete. Processed {steps} bars, {len(self.trades)} trades")
 
-        # Calculate metrics
-        return self.calculate_metrics()
+        metrics = self.calculate_metrics()
+        if "error" not in metrics:
+            metrics["max_drawdown"] = min(metrics["max_drawdown"], max_drawdown)
+            metrics["max_drawdown_pct"] = metrics["max_drawdown"] * 100
+            metrics["bars"] = steps
+        return metrics
+
+    def _execute_signals(
+        self,
+        timestamp: datetime,
+        signals: List[Dict],
+        price_of: Callable[[str], float],
+        held_prices: Callable[[], Dict[str, float]],
+    ) -> None:
+        """
+        Size and execute signals at the current close.
+
+        Args:
+            timestamp: Current bar time
+            signals: Signal dicts
+            price_of: symbol -> current close (NaN if it has no bar now)
+            held_prices: () -> valuation prices of held symbols
+        """
+        for signal in signals:
+            symbol = signal.get("symbol")
+            action = signal.get("action")
+            confidence = signal.get("confidence", 0.5)
+            reason = signal.get("reason", "Signal")
+
+            price = price_of(symbol)
+            if price != price:
+                continue
+
+            # Size position based on confidence
+            target_value = self.get_total_value(held_prices()) * self.config.max_position_size
+            shares = int(target_value * confidence / price)
+
+            if action == "BUY" and shares > 0:
+                if symbol not in self.positions:
+                    self.open_position(timestamp, symbol, price, shares, "LONG", reason)
+            elif action == "SELL" and symbol in self.positions:
+                self.close_position(timestamp, symbol, price, reason)
+
+    def _held_prices(self, today: np.ndarray, columns: Dict[str, int]) -> Dict[str, float]:
+        """Today's closes of held symbols that traded today (valuation input)."""
+        prices = {}
+        for symbol in self.positions:
+            j = columns.get(symbol)
+            if j is not None and today[j] == today[j]:
+                prices[symbol] = today[j]
+        return prices
 
     def calculate_metrics(self) -> Dict:
         """Calculate performance metrics."""
@@ -436,12 +755,19 @@ class BacktestEngine:
         total_return = (final_equity - self.initial_capital) / self.initial_capital
 
         # Trade statistics
-        winning_trades = [t for t in self.trades if t.pnl > 0]
-        losing_trades = [t for t in self.trades if t.pnl < 0]
-        win_rate = len(winning_trades) / len(self.trades) if self.trades else 0
+        if isinstance(self.trades, TradeLog):
+            stats = self.trades.pnl_stats()
+        else:
+            pnl = np.array([t.pnl for t in self.trades], dtype=float)
+            stats = {
+                "trades": len(pnl), "wins": int((pnl > 0).sum()), "losses": int((pnl < 0).sum()),
+                "win_pnl": pnl[pnl > 0].sum(), "loss_pnl": pnl[pnl < 0].sum(), "pnl": pnl.sum(),
+            }
+        n_trades, n_wins, n_losses = stats["trades"], stats["wins"], stats["losses"]
+        win_rate = n_wins / n_trades if n_trades else 0
 
-        avg_win = np.mean([t.pnl for t in winning_trades]) if winning_trades else 0
-        avg_loss = np.mean([t.pnl for t in losing_trades]) if losing_trades else 0
+        avg_win = stats["win_pnl"] / n_wins if n_wins else 0
+        avg_loss = stats["loss_pnl"] / n_losses if n_losses else 0
 
         # Drawdown
         df["cummax"] = df["equity"].cummax()
@@ -468,16 +794,16 @@ class BacktestEngine:
             "total_return_pct": total_return * 100,
             "total_pnl": final_equity - self.initial_capital,
 
-            "total_trades": len(self.trades),
-            "winning_trades": len(winning_trades),
-            "losing_trades": len(losing_trades),
+            "total_trades": n_trades,
+            "winning_trades": n_wins,
+            "losing_trades": n_losses,
             "win_rate": win_rate,
             "win_rate_pct": win_rate * 100,
 
             "avg_win": avg_win,
             "avg_loss": avg_loss,
-            "avg_trade": np.mean([t.pnl for t in self.trades]) if self.trades else 0,
-            "profit_factor": abs(sum(t.pnl for t in winning_trades) / sum(t.pnl for t in losing_trades)) if losing_trades else 0,
+            "avg_trade": stats["pnl"] / n_trades if n_trades else 0,
+            "profit_factor": abs(stats["win_pnl"] / stats["loss_pnl"]) if n_losses else 0,
 
             "max_drawdown": max_drawdown,
             "max_drawdown_pct": max_drawdown * 100,
@@ -486,7 +812,14 @@ class BacktestEngine:
             "sortino_ratio": sortino,
 
             "equity_curve": df[["timestamp", "equity"]].to_dict("records"),
-            "trades": [
+        }
+
+        if isinstance(self.trades, TradeLog):
+            # Not materialized: read engine.trades or TradeLog.to_csv instead
+            spill_dir = self.trades.buffer.spill_dir
+            metrics["trades_spill_dir"] = str(spill_dir) if spill_dir else None
+        else:
+            metrics["trades"] = [
                 {
                     "timestamp": t.timestamp.isoformat(),
                     "symbol": t.symbol,
@@ -497,7 +830,6 @@ class BacktestEngine:
                     "reason": t.reason,
                 }
                 for t in self.trades
-            ],
-        }
+            ]
 
         return metrics
@@ -0,0 +1,160 @@
+"""
+Aligned (trading day x symbol) price panels for backtesting.
+
+``PricePanel.from_frames`` aligns every symbol's bars onto the union of
+their trading days once; each OHLCV field becomes one 2-D float array
+(NaN where a symbol has no bar). The engine then walks days by integer
+index and hands strategies a ``PanelView``, whose rows and trailing
+windows are numpy views into the panel, never copies.
+
+Intraday runs never hold a panel; each timestamp of the merged bar stream
+reaches the same strategies as a ``BarSlice``, which has a ``PanelView``'s
+row interface but no history.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass
+class PricePanel:
+    """OHLCV fields as (n_days, n_symbols) arrays over shared trading days."""
+
+    dates: np.ndarray  # datetime64[D], ascending
+    symbols: List[str]
+    fields: Dict[str, np.ndarray]
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Mapping[str, pd.DataFrame],
+        symbols: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> "PricePanel":
+        """
+        Align per-symbol bar frames (timestamp + OHLCV columns).
+
+        Bars are keyed by calendar date; if a symbol has several bars on one
+        date the first is used.
+
+        Args:
+            frames: symbol -> DataFrame (empty or missing frames give NaN columns)
+            symbols: Column order (default: frame order)
+            start: First date kept (inclusive)
+            end: Last date kept (inclusive)
+        """
+        symbols = list(symbols if symbols is not None else frames)
+        days = {}
+        for symbol in symbols:
+            df = frames.get(symbol)
+            if df is None or df.empty:
+                continue
+            symbol_days = pd.to_datetime(df["timestamp"]).to_numpy("datetime64[ns]").astype("datetime64[D]")
+            days[symbol] = np.unique(symbol_days, return_index=True)
+
+        dates = np.unique(np.concatenate([d for d, _ in days.values()])) if days else np.array([], "datetime64[D]")
+        if start is not None:
+            dates = dates[dates >= np.datetime64(pd.Timestamp(start).date(), "D")]
+        if end is not None:
+            dates = dates[dates <= np.datetime64(pd.Timestamp(end).date(), "D")]
+
+        fields = {name: np.full((len(dates), len(symbols)), np.nan) for name in FIELDS}
+        for j, symbol in enumerate(symbols):
+            if symbol not in days:
+                continue
+            symbol_days, first = days[symbol]
+            rows = np.searchsorted(dates, symbol_days)
+            keep = (rows < len(dates)) & (dates[np.minimum(rows, len(dates) - 1)] == symbol_days)
+            df = frames[symbol]
+            for name in FIELDS:
+                fields[name][rows[keep], j] = df[name].to_numpy(dtype=float)[first[keep]]
+        return cls(dates, symbols, fields)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.fields["close"]
+
+    def column(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def timestamp(self, i: int) -> pd.Timestamp:
+        """Day ``i`` as a midnight timestamp."""
+        return pd.Timestamp(self.dates[i])
+
+    def last_valid(self, field: str = "close") -> np.ndarray:
+        """Last non-NaN value per symbol (NaN for symbols without data)."""
+        values = self.fields[field]
+        if not len(values):
+            return np.full(len(self.symbols), np.nan)
+        valid = ~np.isnan(values)
+        last_row = len(values) - 1 - np.argmax(valid[::-1], axis=0)
+        return values[last_row, np.arange(values.shape[1])]
+
+
+class PanelView:
+    """A strategy's window onto the panel at day ``i`` (no lookahead)."""
+
+    __slots__ = ("panel", "i")
+
+    def __init__(self, panel: PricePanel, i: int):
+        self.panel = panel
+        self.i = i
+
+    @property
+    def symbols(self) -> List[str]:
+        return self.panel.symbols
+
+    @property
+    def date(self) -> pd.Timestamp:
+        return self.panel.timestamp(self.i)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """Today's row of a field (view, NaN where a symbol has no bar)."""
+        return self.panel.fields[field][self.i]
+
+    def history(self, field: str = "close", n: Optional[int] = None) -> np.ndarray:
+        """Last ``n`` rows up to and including today (default all; view)."""
+        start = 0 if n is None else max(self.i + 1 - n, 0)
+        return self.panel.fields[field][start:self.i + 1]
+
+
+class BarSlice:
+    """
+    The bars of one intraday timestamp, shaped like a ``PanelView`` row.
+
+    There is no ``history()``: strategies keep whatever state they need
+    (e.g. streaming indicators), so memory does not grow with the run.
+    """
+
+    __slots__ = ("symbols", "date", "rows", "bars", "_full")
+
+    def __init__(self, symbols: List[str], date: pd.Timestamp, rows: np.ndarray, bars: Mapping[str, np.ndarray]):
+        """
+        Args:
+            symbols: The run's universe
+            date: Bar timestamp
+            rows: Indices into ``symbols`` that have a bar at ``date``
+            bars: field -> values aligned with ``rows``
+        """
+        self.symbols = symbols
+        self.date = date
+        self.rows = rows
+        self.bars = bars
+        self._full: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """A field over the whole universe (NaN where a symbol has no bar)."""
+        values = self._full.get(field)
+        if values is None:
+            values = np.full(len(self.symbols), np.nan)
+            values[self.rows] = self.bars[field]
+            self._full[field] = values
+        return values
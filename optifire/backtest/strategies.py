@@ -1,44 +1,45 @@
 """
 Example trading strategies for backtesting.
+
+Each strategy has a per-day ``generate_signals`` for ``BacktestEngine.run``
+and a vectorized ``generate_panel_signals`` for ``BacktestEngine.run_panel``.
+Both feed the day's bars into the same streaming indicators
+(``optifire.fe.indicators``), which update in O(1) per symbol per bar, so
+the two entry points produce identical signals.
 """
 from datetime import datetime
-from typing import Dict, List
-import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
 import numpy as np
 
+from optifire.backtest.panel import PanelView
+from optifire.fe.indicators import RSI, SMA, Bollinger, RollingWindow, SymbolIndex
+
+# (buy mask, sell mask, BUY fields for row j, SELL fields for row j)
+Decision = Tuple[np.ndarray, np.ndarray, Callable[[int], Dict], Callable[[int], Dict]]
 
-class SimpleStrategy:
+
+class StreamingStrategy:
     """
-    Simple momentum + mean reversion strategy.
+    Base for strategies driven by streaming indicators.
 
-    Rules:
-    - BUY when price crosses above 20-day MA and RSI < 70
-    - SELL when price crosses below 20-day MA or RSI > 80
+    Subclasses implement ``step(columns, bars)``: advance their indicators
+    by one bar for the given indicator columns and decide on those rows.
     """
 
     def __init__(self):
-        self.price_history: Dict[str, List[float]] = {}
-        self.ma_period = 20
-        self.rsi_period = 14
-
-    def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
-        """Calculate RSI indicator."""
-        if len(prices) < period + 1:
-            return 50.0
-
-        deltas = np.diff(prices[-period-1:])
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
+        self.index = SymbolIndex()
+        self._panel_columns: Optional[np.ndarray] = None
 
-        avg_gain = np.mean(gains)
-        avg_loss = np.mean(losses)
+    def step(self, columns: np.ndarray, bars: Dict[str, np.ndarray]) -> Decision:
+        raise NotImplementedError
 
-        if avg_loss == 0:
-            return 100.0
-
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+    def _signals(self, symbols: List[str], columns: np.ndarray, bars: Dict[str, np.ndarray]) -> List[Dict]:
+        """Signal dicts in symbol order (BUY wins where both masks are set)."""
+        buy, sell, make_buy, make_sell = self.step(columns, bars)
+        signals = []
+        for j in np.flatnonzero(buy | sell):
+            signals.append({"symbol": symbols[j], **(make_buy(j) if buy[j] else make_sell(j))})
+        return signals
 
     async def generate_signals(self, timestamp: datetime, price_data: Dict[str, Dict]) -> List[Dict]:
         """
@@ -51,52 +52,74 @@ class SimpleStrategy:
         Returns:
             List of signal dicts
         """
-        signals = []
-
-        for symbol, data in price_data.items():
-            close = data["close"]
-
-            # Update price history
-            if symbol not in self.price_history:
-                self.price_history[symbol] = []
-            self.price_history[symbol].append(close)
-
-            # Need enough history
-            if len(self.price_history[symbol]) < self.ma_period:
-                continue
-
-            prices = self.price_history[symbol]
-
-            # Calculate indicators
-            ma20 = np.mean(prices[-self.ma_period:])
-            rsi = self.calculate_rsi(prices, self.rsi_period)
-
-            # Previous price for crossover detection
-            prev_price = prices[-2] if len(prices) > 1 else close
-            prev_ma = np.mean(prices[-self.ma_period-1:-1]) if len(prices) > self.ma_period else ma20
-
-            # BUY signal: price crosses above MA and RSI not overbought
-            if prev_price < prev_ma and close > ma20 and rsi < 70:
-                signals.append({
-                    "symbol": symbol,
-                    "action": "BUY",
-                    "confidence": min(0.8, (70 - rsi) / 70),  # Higher confidence when RSI lower
-                    "reason": f"MA Crossover (RSI: {rsi:.1f})",
-                })
-
-            # SELL signal: price crosses below MA or RSI overbought
-            elif (prev_price > prev_ma and close < ma20) or rsi > 80:
-                signals.append({
-                    "symbol": symbol,
-                    "action": "SELL",
-                    "confidence": 0.9,
-                    "reason": f"MA Crossunder / Overbought (RSI: {rsi:.1f})",
-                })
-
-        return signals
+        symbols = list(price_data)
+        bars = {
+            field: np.array([price_data[symbol][field] for symbol in symbols], dtype=float)
+            for field in ("high", "low", "close")
+        }
+        return self._signals(symbols, self.index.columns(symbols), bars)
+
+    def generate_panel_signals(self, view: PanelView) -> List[Dict]:
+        """``generate_signals`` for every symbol trading on the view's day."""
+        if self._panel_columns is None:
+            self._panel_columns = self.index.columns(view.symbols)
+        trading = np.flatnonzero(~np.isnan(view["close"]))
+        bars = {field: view[field][trading] for field in ("high", "low", "close")}
+        symbols = [view.symbols[j] for j in trading]
+        return self._signals(symbols, self._panel_columns[trading], bars)
+
+
+class SimpleStrategy(StreamingStrategy):
+    """
+    Simple momentum + mean reversion strategy.
 
+    Rules:
+    - BUY when price crosses above 20-day MA and RSI < 70
+    - SELL when price crosses below 20-day MA or RSI > 80
+    """
 
-class TrendFollowingStrategy:
+    def __init__(self):
+        super().__init__()
+        self.ma_period = 20
+        self.rsi_period = 14
+        self.ma = SMA(self.ma_period)
+        self.rsi = RSI(self.rsi_period)
+        self.closes = RollingWindow(2)
+
+    def step(self, columns: np.ndarray, bars: Dict[str, np.ndarray]) -> Decision:
+        close = bars["close"]
+        prev_ma = self.ma.at(columns)
+        for indicator in (self.ma, self.rsi, self.closes):
+            indicator.update_at(columns, close)
+
+        ma20 = self.ma.at(columns)
+        rsi = self.rsi.at(columns)
+
+        # Previous price and MA for crossover detection
+        prev_price = self.closes.ago(1, columns)
+        prev_ma = np.where(np.isnan(prev_ma), ma20, prev_ma)
+
+        ready = ~np.isnan(ma20)
+        # BUY: price crosses above MA and RSI not overbought
+        buy = ready & (prev_price < prev_ma) & (close > ma20) & (rsi < 70)
+        # SELL: price crosses below MA or RSI overbought
+        sell = ready & (((prev_price > prev_ma) & (close < ma20)) | (rsi > 80))
+        return (
+            buy, sell,
+            lambda j: {
+                "action": "BUY",
+                "confidence": min(0.8, (70 - rsi[j]) / 70),  # Higher confidence when RSI lower
+                "reason": f"MA Crossover (RSI: {rsi[j]:.1f})",
+            },
+            lambda j: {
+                "action": "SELL",
+                "confidence": 0.9,
+                "reason": f"MA Crossunder / Overbought (RSI: {rsi[j]:.1f})",
+            },
+        )
+
+
+class TrendFollowingStrategy(StreamingStrategy):
     """
     Trend following strategy using dual moving averages.
 
@@ -106,58 +129,42 @@ class TrendFollowingStrategy:
     """
 
     def __init__(self, fast_period: int = 10, slow_period: int = 50):
+        super().__init__()
         self.fast_period = fast_period
         self.slow_period = slow_period
-        self.price_history: Dict[str, List[float]] = {}
-
-    async def generate_signals(self, timestamp: datetime, price_data: Dict[str, Dict]) -> List[Dict]:
-        """Generate trend following signals."""
-        signals = []
-
-        for symbol, data in price_data.items():
-            close = data["close"]
-
-            # Update history
-            if symbol not in self.price_history:
-                self.price_history[symbol] = []
-            self.price_history[symbol].append(close)
-
-            prices = self.price_history[symbol]
-
-            # Need enough history
-            if len(prices) < self.slow_period:
-                continue
-
-            # Calculate MAs
-            fast_ma = np.mean(prices[-self.fast_period:])
-            slow_ma = np.mean(prices[-self.slow_period:])
-
-            # Previous MAs
-            prev_fast = np.mean(prices[-self.fast_period-1:-1])
-            prev_slow = np.mean(prices[-self.slow_period-1:-1])
-
-            # Golden cross: fast crosses above slow
-            if prev_fast < prev_slow and fast_ma > slow_ma:
-                signals.append({
-                    "symbol": symbol,
-                    "action": "BUY",
-                    "confidence": 0.7,
-                    "reason": f"Golden Cross ({self.fast_period}/{self.slow_period} MA)",
-                })
-
-            # Death cross: fast crosses below slow
-            elif prev_fast > prev_slow and fast_ma < slow_ma:
-                signals.append({
-                    "symbol": symbol,
-                    "action": "SELL",
-                    "confidence": 0.9,
-                    "reason": f"Death Cross ({self.fast_period}/{self.slow_period} MA)",
-                })
-
-        return signals
-
-
-class MomentumStrategy:
+        self.fast = SMA(fast_period)
+        self.slow = SMA(slow_period)
+
+    def step(self, columns: np.ndarray, bars: Dict[str, np.ndarray]) -> Decision:
+        close = bars["close"]
+
+        # Previous MAs (NaN until a full slow window has been seen)
+        prev_fast = self.fast.at(columns)
+        prev_slow = self.slow.at(columns)
+        self.fast.update_at(columns, close)
+        self.slow.update_at(columns, close)
+        fast_ma = self.fast.at(columns)
+        slow_ma = self.slow.at(columns)
+
+        # Golden cross: fast crosses above slow; death cross: below
+        buy = (prev_fast < prev_slow) & (fast_ma > slow_ma)
+        sell = (prev_fast > prev_slow) & (fast_ma < slow_ma)
+        return (
+            buy, sell,
+            lambda j: {
+                "action": "BUY",
+                "confidence": 0.7,
+                "reason": f"Golden Cross ({self.fast_period}/{self.slow_period} MA)",
+            },
+            lambda j: {
+                "action": "SELL",
+                "confidence": 0.9,
+                "reason": f"Death Cross ({self.fast_period}/{self.slow_period} MA)",
+            },
+        )
+
+
+class MomentumStrategy(StreamingStrategy):
     """
     Momentum strategy - buy winners, sell losers.
 
@@ -167,53 +174,37 @@ class MomentumStrategy:
     """
 
     def __init__(self):
-        self.price_history: Dict[str, List[float]] = {}
-
-    async def generate_signals(self, timestamp: datetime, price_data: Dict[str, Dict]) -> List[Dict]:
-        """Generate momentum signals."""
-        signals = []
-
-        for symbol, data in price_data.items():
-            close = data["close"]
-
-            # Update history
-            if symbol not in self.price_history:
-                self.price_history[symbol] = []
-            self.price_history[symbol].append(close)
-
-            prices = self.price_history[symbol]
-
-            # Need 20 days of history
-            if len(prices) < 20:
-                continue
-
-            # Calculate returns
-            ret_5d = (prices[-1] - prices[-5]) / prices[-5]
-            ret_20d = (prices[-1] - prices[-20]) / prices[-20]
-
-            # BUY: strong momentum
-            if ret_5d > 0.02 and ret_20d > 0.05:
-                confidence = min(0.9, ret_20d * 5)  # Higher confidence for stronger momentum
-                signals.append({
-                    "symbol": symbol,
-                    "action": "BUY",
-                    "confidence": confidence,
-                    "reason": f"Strong Momentum ({ret_20d*100:.1f}% 20d)",
-                })
-
-            # SELL: momentum reversal
-            elif ret_5d < -0.02:
-                signals.append({
-                    "symbol": symbol,
-                    "action": "SELL",
-                    "confidence": 0.8,
-                    "reason": f"Momentum Reversal ({ret_5d*100:.1f}% 5d)",
-                })
-
-        return signals
-
-
-class MeanReversionStrategy:
+        super().__init__()
+        self.closes = RollingWindow(20)
+
+    def step(self, columns: np.ndarray, bars: Dict[str, np.ndarray]) -> Decision:
+        self.closes.update_at(columns, bars["close"])
+
+        # Returns over the last 5 and 20 closes (NaN without 20 days of history)
+        close = self.closes.ago(0, columns)
+        ret_5d = (close - self.closes.ago(4, columns)) / self.closes.ago(4, columns)
+        ret_20d = (close - self.closes.ago(19, columns)) / self.closes.ago(19, columns)
+        ready = ~np.isnan(ret_20d)
+
+        # BUY: strong momentum; SELL: momentum reversal
+        buy = ready & (ret_5d > 0.02) & (ret_20d > 0.05)
+        sell = ready & (ret_5d < -0.02)
+        return (
+            buy, sell,
+            lambda j: {
+                "action": "BUY",
+                "confidence": min(0.9, ret_20d[j] * 5),  # Higher confidence for stronger momentum
+                "reason": f"Strong Momentum ({ret_20d[j]*100:.1f}% 20d)",
+            },
+            lambda j: {
+                "action": "SELL",
+                "confidence": 0.8,
+                "reason": f"Momentum Reversal ({ret_5d[j]*100:.1f}% 5d)",
+            },
+        )
+
+
+class MeanReversionStrategy(StreamingStrategy):
     """
     Mean reversion strategy using Bollinger Bands.
 
@@ -223,56 +214,56 @@ class MeanReversionStrategy:
     """
 
     def __init__(self, period: int = 20, std_dev: float = 2.0):
+        super().__init__()
         self.period = period
         self.std_dev = std_dev
-        self.price_history: Dict[str, List[float]] = {}
-
-    async def generate_signals(self, timestamp: datetime, price_data: Dict[str, Dict]) -> List[Dict]:
-        """Generate mean reversion signals."""
-        signals = []
-
-        for symbol, data in price_data.items():
-            close = data["close"]
-
-            # Update history
-            if symbol not in self.price_history:
-                self.price_history[symbol] = []
-            self.price_history[symbol].append(close)
-
-            prices = self.price_history[symbol]
-
-            if len(prices) < self.period:
-                continue
+        # Population standard deviation, as the bands have always used
+        self.bands = Bollinger(period, std_dev, ddof=0)
+
+    def step(self, columns: np.ndarray, bars: Dict[str, np.ndarray]) -> Decision:
+        close = bars["close"]
+        self.bands.update_at(columns, close)
+        upper_band, _, lower_band = self.bands.at(columns)
+
+        # BUY: price at lower band (oversold); SELL: at upper band (overbought)
+        buy = close <= lower_band
+        sell = close >= upper_band
+        return (
+            buy, sell,
+            lambda j: {
+                "action": "BUY",
+                # Distance from lower band as confidence
+                "confidence": min(0.9, 0.5 + (lower_band[j] - close[j]) / lower_band[j] * 10),
+                "reason": "Oversold (BB Lower)",
+            },
+            lambda j: {"action": "SELL", "confidence": 0.8, "reason": "Overbought (BB Upper)"},
+        )
 
-            # Calculate Bollinger Bands
-            ma = np.mean(prices[-self.period:])
-            std = np.std(prices[-self.period:])
-            upper_band = ma + (self.std_dev * std)
-            lower_band = ma - (self.std_dev * std)
 
-            # BUY: price at lower band (oversold)
-            if close <= lower_band:
-                # Distance from lower band as confidence
-                distance = (lower_band - close) / lower_band
-                confidence = min(0.9, 0.5 + distance * 10)
+class BreakoutStrategy(StreamingStrategy):
+    """
+    Breakout strategy - buy near the recent high, let stops and targets exit.
 
-                signals.append({
-                    "symbol": symbol,
-                    "action": "BUY",
-                    "confidence": confidence,
-                    "reason": f"Oversold (BB Lower)",
-                })
+    Rules:
+    - BUY when close is within ``tolerance`` of the ``period``-day high
+    - No SELL signals (exits come from the engine's stop loss / take profit)
+    """
 
-            # SELL: price at upper band (overbought)
-            elif close >= upper_band:
-                signals.append({
-                    "symbol": symbol,
-                    "action": "SELL",
-                    "confidence": 0.8,
-                    "reason": f"Overbought (BB Upper)",
-                })
+    def __init__(self, period: int = 20, tolerance: float = 0.02):
+        super().__init__()
+        self.period = period
+        self.tolerance = tolerance
+        self.highs = RollingWindow(period)
 
-        return signals
+    def step(self, columns: np.ndarray, bars: Dict[str, np.ndarray]) -> Decision:
+        self.highs.update_at(columns, bars["high"])
+        # NaN until a full window, so new symbols never fire
+        buy = bars["close"] >= self.highs.max(columns) * (1 - self.tolerance)
+        return (
+            buy, np.zeros_like(buy),
+            lambda j: {"action": "BUY", "confidence": 1.0, "reason": f"Breakout ({self.period}d high)"},
+            lambda j: {},
+        )
 
 
 class BuyAndHoldStrategy:
@@ -303,3 +294,25 @@ class BuyAndHoldStrategy:
                 self.positions_opened.add(symbol)
 
         return signals
+
+    def generate_panel_signals(self, view: PanelView) -> List[Dict]:
+        """``generate_signals`` for every symbol trading on the view's day."""
+        trading = ~np.isnan(view["close"])
+        signals = []
+        for j in np.flatnonzero(trading):
+            symbol = view.symbols[j]
+            if symbol not in self.positions_opened:
+                signals.append({"symbol": symbol, "action": "BUY", "confidence": 1.0, "reason": "Buy and Hold"})
+                self.positions_opened.add(symbol)
+        return signals
+
+
+# Strategy classes by CLI / plugin name
+STRATEGIES = {
+    "simple": SimpleStrategy,
+    "trend": TrendFollowingStrategy,
+    "momentum": MomentumStrategy,
+    "mean_reversion": MeanReversionStrategy,
+    "breakout": BreakoutStrategy,
+    "buy_hold": BuyAndHoldStrategy,
+}
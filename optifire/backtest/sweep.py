@@ -0,0 +1,279 @@
+"""
+Parallel parameter sweeps over one shared price panel.
+
+The panel is loaded once and copied into a single shared-memory block;
+worker processes map it as numpy arrays (no pickling or reloading per
+point) and each runs ``BacktestEngine.run_panel`` for its parameter
+combinations. Finished points are cached by a hash of their parameters,
+the strategy, the base config and the panel contents, so a re-run only
+computes new points. Rows are appended to a CSV as they complete:
+
+    panel = PricePanel.from_frames(BarStore().load_many(symbols), symbols)
+    sweep = ParameterSweep(panel, BacktestConfig(start, end, symbols=symbols),
+                           BreakoutStrategy, results_path="optimization_results.csv")
+    results = sweep.run({"stop_loss_pct": [0.02, 0.03], "period": [10, 20]})
+
+Grid keys that are ``BacktestConfig`` fields override the base config; the
+rest are passed to the strategy factory. With ``keep_returns`` each row also
+carries the point's daily returns (one per panel day), which is what
+``optifire.backtest.validation`` splits into folds.
+"""
+import asyncio
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields, replace
+from itertools import product
+from multiprocessing import get_context, shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from optifire.backtest.engine import BacktestConfig, BacktestEngine
+from optifire.backtest.panel import FIELDS, PricePanel
+from optifire.core.logger import logger
+from optifire.core.memo import MemoCache, hash_inputs
+
+CONFIG_FIELDS = {f.name for f in fields(BacktestConfig)}
+
+# Scalar metrics kept per point (equity curve and trade list are dropped)
+SUMMARY_COLUMNS = (
+    "final_equity", "total_return_pct", "total_pnl",
+    "total_trades", "winning_trades", "losing_trades", "win_rate_pct",
+    "avg_win", "avg_loss", "avg_trade", "profit_factor",
+    "max_drawdown_pct", "sharpe_ratio", "sortino_ratio",
+)
+
+
+def param_grid(grid: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of a {name: values} grid, in grid order."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in product(*(grid[name] for name in names))]
+
+
+class SharedPanel:
+    """A ``PricePanel``'s field arrays in one shared-memory block."""
+
+    def __init__(self, panel: PricePanel):
+        shape = (len(FIELDS), len(panel), len(panel.symbols))
+        self.shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+        block = np.ndarray(shape, dtype=float, buffer=self.shm.buf)
+        for k, name in enumerate(FIELDS):
+            block[k] = panel.fields[name]
+        # Everything a worker needs to map the block (small enough to pickle)
+        self.spec = (self.shm.name, shape, panel.dates, list(panel.symbols))
+
+    @staticmethod
+    def attach(spec: Tuple) -> Tuple[shared_memory.SharedMemory, PricePanel]:
+        """Map a block created by another process as a read-only panel."""
+        name, shape, dates, symbols = spec
+        shm = shared_memory.SharedMemory(name=name)
+        block = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        block.flags.writeable = False
+        return shm, PricePanel(dates, symbols, {name: block[k] for k, name in enumerate(FIELDS)})
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedPanel":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# Per-worker state, set by the pool initializer
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_panel: Optional[PricePanel] = None
+
+
+def _attach_worker(spec: Tuple) -> None:
+    global _worker_shm, _worker_panel
+    _worker_shm, _worker_panel = SharedPanel.attach(spec)
+
+
+def run_point(
+    panel: PricePanel,
+    config: BacktestConfig,
+    strategy_factory: Callable[..., Any],
+    strategy_kwargs: Dict[str, Any],
+    params: Dict[str, Any],
+    keep_returns: bool = False,
+) -> Dict[str, Any]:
+    """
+    Backtest one parameter combination on a panel.
+
+    Returns:
+        The parameters plus ``SUMMARY_COLUMNS`` (or an "error" entry), and
+        "returns" (daily equity returns, one per panel day) if requested
+    """
+    config_params = {k: v for k, v in params.items() if k in CONFIG_FIELDS}
+    strategy_params = {k: v for k, v in params.items() if k not in CONFIG_FIELDS}
+    engine = BacktestEngine(replace(config, **config_params))
+    strategy = strategy_factory(**strategy_kwargs, **strategy_params)
+    metrics = asyncio.run(engine.run_panel(strategy, panel=panel))
+    if "error" in metrics:
+        return {**params, "error": metrics["error"]}
+    row = {**params, **{name: float(metrics[name]) for name in SUMMARY_COLUMNS}}
+    if keep_returns:
+        equity = np.array([value for _, value in engine.equity_curve])
+        previous = np.concatenate(([engine.initial_capital], equity[:-1]))
+        row["returns"] = equity / previous - 1
+    return row
+
+
+def _run_worker_point(*args) -> Dict[str, Any]:
+    return run_point(_worker_panel, *args)
+
+
+class ParameterSweep:
+    """Grid search over ``BacktestEngine`` runs across worker processes."""
+
+    def __init__(
+        self,
+        panel: PricePanel,
+        config: BacktestConfig,
+        strategy_factory: Callable[..., Any],
+        strategy_kwargs: Optional[Dict[str, Any]] = None,
+        workers: Optional[int] = None,
+        cache_dir: Optional[Path] = Path("data/sweeps"),
+        results_path: Optional[Path] = None,
+        score: Optional[Callable[[Dict[str, Any]], float]] = None,
+        keep_returns: bool = False,
+    ):
+        """
+        Initialize sweep.
+
+        Args:
+            panel: Prices shared by every point (e.g. ``BacktestEngine.build_panel()``)
+            config: Base backtest config
+            strategy_factory: Picklable callable (e.g. a strategy class) returning
+                a panel strategy; called once per point
+            strategy_kwargs: Fixed strategy arguments
+            workers: Worker processes (default: CPU count; 1 = run in this process)
+            cache_dir: Persist finished points here (None = memory only)
+            results_path: CSV that rows are appended to as points finish
+            score: Optional row -> float, stored in a "score" column
+            keep_returns: Add each point's daily returns to its row ("returns")
+        """
+        self.panel = panel
+        self.config = config
+        self.strategy_factory = strategy_factory
+        self.strategy_kwargs = strategy_kwargs or {}
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = MemoCache(max_entries=1_000_000, max_mb=256, ttl_s=float("inf"), disk_dir=cache_dir)
+        self.results_path = Path(results_path) if results_path else None
+        self.score = score
+        self.keep_returns = keep_returns
+        self._data_key = hash_inputs(panel.dates.view("int64"), list(panel.symbols), panel.fields)
+        self.stats = {"points": 0, "cached": 0, "computed": 0, "failed": 0}
+
+    def key(self, params: Dict[str, Any]) -> str:
+        """Cache key of one point."""
+        factory = f"{self.strategy_factory.__module__}.{self.strategy_factory.__qualname__}"
+        return hash_inputs(
+            "sweep", self._data_key, asdict(self.config), factory, self.strategy_kwargs, params, self.keep_returns
+        )
+
+    def run(
+        self,
+        grid: Mapping[str, Sequence[Any]],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate every combination of a parameter grid.
+
+        Args:
+            grid: {parameter: values}
+            on_result: Called with each row as it becomes available
+
+        Returns:
+            Rows (parameters + metrics) in grid order
+        """
+        points = param_grid(grid)
+        keys = [self.key(params) for params in points]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(points)
+        self.stats = {"points": len(points), "cached": 0, "computed": 0, "failed": 0}
+
+        writer = None
+        out = None
+        if self.results_path:
+            out = self.results_path.open("w", newline="")
+            columns = [*grid, *SUMMARY_COLUMNS, *(["score"] if self.score else []), "error"]
+            writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+
+        def emit(i: int, row: Dict[str, Any]) -> None:
+            if self.score and "error" not in row:
+                row = {**row, "score": self.score(row)}
+            results[i] = row
+            if writer:
+                writer.writerow(row)
+                out.flush()
+            if on_result:
+                on_result(row)
+
+        try:
+            todo = []
+            for i, key in enumerate(keys):
+                hit, row = self.cache.get(key)
+                if hit:
+                    self.stats["cached"] += 1
+                    emit(i, row)
+                else:
+                    todo.append(i)
+
+            logger.info(
+                f"Sweep: {len(points)} points, {len(points) - len(todo)} cached, "
+                f"{len(todo)} to run on {min(self.workers, len(todo)) or 1} worker(s)"
+            )
+            for i, row in self._compute([points[i] for i in todo], todo):
+                if "error" in row:
+                    self.stats["failed"] += 1
+                else:
+                    self.stats["computed"] += 1
+                    self.cache.set(keys[i], row)
+                emit(i, row)
+        finally:
+            if out:
+                out.close()
+
+        return results
+
+    def _compute(self, points: List[Dict[str, Any]], indices: List[int]):
+        """Yield (index, row) as points finish."""
+        args = (self.config, self.strategy_factory, self.strategy_kwargs)
+        if self.workers <= 1 or len(points) <= 1:
+            for i, params in zip(indices, points):
+                yield i, self._guarded(params, run_point, self.panel, *args, params, self.keep_returns)
+            return
+
+        # spawn: sweeps also run from plugins, inside a process with an event
+        # loop and threads that must not be forked
+        with SharedPanel(self.panel) as shared, ProcessPoolExecutor(
+            max_workers=min(self.workers, len(points)),
+            mp_context=get_context("spawn"),
+            initializer=_attach_worker,
+            initargs=(shared.spec,),
+        ) as pool:
+            futures = {
+                pool.submit(_run_worker_point, *args, params, self.keep_returns): (i, params)
+                for i, params in zip(indices, points)
+            }
+            for future in as_completed(futures):
+                i, params = futures[future]
+                try:
+                    yield i, future.result()
+                except Exception as e:
+                    logger.warning(f"Sweep point {params} failed: {e}")
+                    yield i, {**params, "error": str(e)}
+
+    @staticmethod
+    def _guarded(params: Dict[str, Any], fn: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+        try:
+            return fn(*args)
+        except Exception as e:
+            logger.warning(f"Sweep point {params} failed: {e}")
+            return {**params, "error": str(e)}
@@ -0,0 +1,375 @@
+"""
+Walk-forward and combinatorial purged cross-validation (CPCV) of strategy
+parameters.
+
+Every combination of a parameter grid is backtested once over the whole
+panel, in parallel worker processes sharing the loaded panel
+(``ParameterSweep``), which gives a (day x trial) matrix of daily returns.
+Indicator state and open positions run continuously across fold
+boundaries as they would live; folds only decide which days count as
+in-sample (IS) and which as out-of-sample (OOS). Training days within
+``purge`` days before an OOS block and ``embargo`` days after it are
+dropped, so positions spanning a boundary do not leak into both.
+
+For each split the trial with the best IS Sharpe is selected, and its OOS
+Sharpe and OOS rank among all trials are recorded. From these come the
+probability of backtest overfitting (PBO: the share of splits where the
+IS winner ranks at or below the OOS median) and the OOS Sharpe decay (the
+share of the winners' IS Sharpe lost OOS).
+
+    validator = BacktestValidator(panel, config, TrendFollowingStrategy)
+    report = validator.cpcv({"fast_period": [5, 10, 20], "slow_period": [50, 100]})
+    report.pbo, report.sharpe_decay
+"""
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from optifire.backtest.bar_store import BarStore
+from optifire.backtest.engine import BacktestConfig
+from optifire.backtest.panel import PricePanel
+from optifire.backtest.sweep import ParameterSweep
+
+TRADING_DAYS = 252
+# Default worker processes for sweeps started by plugins (report_from_params)
+PLUGIN_SWEEP_WORKERS = 2
+
+
+@dataclass
+class Split:
+    """Day indices of one fold (training days already purged and embargoed)."""
+
+    train: np.ndarray
+    test: np.ndarray
+    test_groups: Tuple[int, ...]
+
+
+def day_groups(n_days: int, n_groups: int) -> List[np.ndarray]:
+    """Consecutive, near-equal blocks of day indices."""
+    if not 2 <= n_groups <= n_days:
+        raise ValueError(f"Cannot split {n_days} days into {n_groups} groups")
+    return np.array_split(np.arange(n_days), n_groups)
+
+
+def _split(
+    n_days: int,
+    groups: List[np.ndarray],
+    train_groups: Sequence[int],
+    test_groups: Sequence[int],
+    purge: int,
+    embargo: int,
+) -> Split:
+    train = np.zeros(n_days, dtype=bool)
+    for g in train_groups:
+        train[groups[g]] = True
+    for g in test_groups:
+        start, end = groups[g][0], groups[g][-1]
+        train[max(start - purge, 0):start] = False
+        train[end + 1:end + 1 + embargo] = False
+    test = np.concatenate([groups[g] for g in test_groups])
+    return Split(np.flatnonzero(train), test, tuple(test_groups))
+
+
+def walk_forward_splits(
+    n_days: int,
+    n_groups: int = 6,
+    purge: int = 5,
+    window: Optional[int] = None,
+) -> List[Split]:
+    """
+    Test on each group in turn, training on the groups before it.
+
+    Args:
+        n_days: Panel length
+        n_groups: Number of blocks (the first is only ever trained on)
+        purge: Training days dropped right before each test block
+        window: Train on at most this many preceding groups (None = expanding)
+    """
+    groups = day_groups(n_days, n_groups)
+    return [
+        _split(n_days, groups, range(0 if window is None else max(k - window, 0), k), [k], purge, 0)
+        for k in range(1, n_groups)
+    ]
+
+
+def cpcv_splits(
+    n_days: int,
+    n_groups: int = 6,
+    n_test_groups: int = 2,
+    purge: int = 5,
+    embargo: int = 5,
+) -> List[Split]:
+    """
+    Every choice of ``n_test_groups`` test blocks out of ``n_groups``,
+    training on the rest (C(n_groups, n_test_groups) splits).
+
+    Args:
+        n_days: Panel length
+        n_groups: Number of blocks
+        n_test_groups: Blocks held out per split
+        purge: Training days dropped right before each test block
+        embargo: Training days dropped right after each test block
+    """
+    if not 1 <= n_test_groups < n_groups:
+        raise ValueError(f"n_test_groups must be in [1, {n_groups - 1}]")
+    groups = day_groups(n_days, n_groups)
+    return [
+        _split(n_days, groups, [g for g in range(n_groups) if g not in test], test, purge, embargo)
+        for test in combinations(range(n_groups), n_test_groups)
+    ]
+
+
+def sharpe_ratio(returns: np.ndarray) -> np.ndarray:
+    """Annualized Sharpe ratio per column of daily returns (0 where flat)."""
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) < 2:
+        return np.zeros(returns.shape[1:])
+    std = returns.std(axis=0, ddof=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = returns.mean(axis=0) / std * np.sqrt(TRADING_DAYS)
+    return np.where(std > 0, sharpe, 0.0)
+
+
+@dataclass
+class ValidationReport:
+    """IS/OOS results of the IS-selected trial on every split."""
+
+    method: str
+    trials: List[Dict[str, Any]]
+    selected: List[int]  # Trial chosen on each split's IS days
+    is_sharpe: np.ndarray
+    oos_sharpe: np.ndarray
+    logits: np.ndarray  # log(w / (1 - w)), w = OOS relative rank of the selected trial
+    pbo: float  # Probability of backtest overfitting (NaN with fewer than 2 trials)
+    sharpe_decay: float  # 1 - mean OOS / mean IS Sharpe of the selected trials
+    degradation_slope: float  # Slope of OOS on IS Sharpe across splits
+    prob_oos_loss: float  # Share of splits with negative OOS Sharpe
+    best_params: Dict[str, Any] = field(default_factory=dict)  # Most often selected
+
+    @property
+    def is_overfit(self) -> bool:
+        return bool(self.pbo > 0.5)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly summary."""
+        return {
+            "method": self.method,
+            "splits": len(self.selected),
+            "trials": len(self.trials),
+            "pbo": float(self.pbo),
+            "is_overfit": self.is_overfit,
+            "is_sharpe": float(np.mean(self.is_sharpe)),
+            "oos_sharpe": float(np.mean(self.oos_sharpe)),
+            "sharpe_decay": float(self.sharpe_decay),
+            "degradation_slope": float(self.degradation_slope),
+            "prob_oos_loss": float(self.prob_oos_loss),
+            "best_params": self.best_params,
+            "is_sharpe_by_split": self.is_sharpe.tolist(),
+            "oos_sharpe_by_split": self.oos_sharpe.tolist(),
+        }
+
+
+def validate_returns(
+    returns: np.ndarray,
+    splits: List[Split],
+    trials: Optional[List[Dict[str, Any]]] = None,
+    method: str = "custom",
+) -> ValidationReport:
+    """
+    Score a (day x trial) matrix of daily returns on the given splits.
+
+    Args:
+        returns: Daily returns, one column per trial
+        splits: Folds over its rows
+        trials: Parameters of each column (for ``best_params``)
+        method: Label for the report
+    """
+    returns = np.asarray(returns, dtype=float)
+    if returns.ndim == 1:
+        returns = returns[:, None]
+    n_trials = returns.shape[1]
+    trials = trials if trials is not None else [{"trial": k} for k in range(n_trials)]
+
+    selected, is_best, oos_best, logits = [], [], [], []
+    for split in splits:
+        is_sharpe = sharpe_ratio(returns[split.train])
+        oos_sharpe = sharpe_ratio(returns[split.test])
+        best = int(np.argmax(is_sharpe))
+        # Average rank (1 = worst) of the IS winner among the OOS results
+        rank = (oos_sharpe < oos_sharpe[best]).sum() + ((oos_sharpe == oos_sharpe[best]).sum() + 1) / 2
+        w = rank / (n_trials + 1)
+        selected.append(best)
+        is_best.append(is_sharpe[best])
+        oos_best.append(oos_sharpe[best])
+        logits.append(np.log(w / (1 - w)))
+
+    is_best, oos_best, logits = np.array(is_best), np.array(oos_best), np.array(logits)
+    mean_is = is_best.mean() if len(is_best) else np.nan
+    slope = np.nan
+    if len(is_best) > 1 and np.ptp(is_best) > 0:
+        slope = np.polyfit(is_best, oos_best, 1)[0]
+    most_selected = Counter(selected).most_common(1)
+    return ValidationReport(
+        method=method,
+        trials=trials,
+        selected=selected,
+        is_sharpe=is_best,
+        oos_sharpe=oos_best,
+        logits=logits,
+        pbo=float((logits <= 0).mean()) if n_trials > 1 and len(logits) else np.nan,
+        sharpe_decay=float(1 - oos_best.mean() / mean_is) if mean_is > 0 else np.nan,
+        degradation_slope=float(slope),
+        prob_oos_loss=float((oos_best < 0).mean()) if len(oos_best) else np.nan,
+        best_params=dict(trials[most_selected[0][0]]) if most_selected else {},
+    )
+
+
+class BacktestValidator:
+    """Walk-forward and CPCV validation of a strategy's parameter grid."""
+
+    def __init__(
+        self,
+        panel: PricePanel,
+        config: BacktestConfig,
+        strategy_factory: Callable[..., Any],
+        strategy_kwargs: Optional[Dict[str, Any]] = None,
+        workers: Optional[int] = None,
+        cache_dir: Optional[Path] = Path("data/sweeps"),
+    ):
+        """
+        Initialize validator.
+
+        Args:
+            panel: Prices (loaded once, shared with the worker processes)
+            config: Base backtest config
+            strategy_factory: Picklable strategy class / factory
+            strategy_kwargs: Fixed strategy arguments
+            workers: Worker processes (default: CPU count)
+            cache_dir: Cache of finished trials (None = memory only)
+        """
+        self.panel = panel
+        self.sweep = ParameterSweep(
+            panel, config, strategy_factory, strategy_kwargs,
+            workers=workers, cache_dir=cache_dir, keep_returns=True,
+        )
+
+    @classmethod
+    def from_store(
+        cls,
+        strategy_factory: Callable[..., Any],
+        symbols: List[str],
+        start: str,
+        end: str,
+        store: Optional[BarStore] = None,
+        config: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> "BacktestValidator":
+        """
+        Validator over daily bars already in the bar store (nothing is fetched).
+
+        Args:
+            strategy_factory: Strategy class / factory
+            symbols: Symbols
+            start: First day
+            end: Last day
+            store: Bar store (default: data/market)
+            config: Extra ``BacktestConfig`` fields
+            **kwargs: Passed to ``BacktestValidator``
+
+        Raises:
+            ValueError: If the store has no bars for the range
+        """
+        store = store or BarStore()
+        panel = PricePanel.from_frames(store.load_many(symbols, "1Day", start, end), symbols, start, end)
+        if not len(panel):
+            raise ValueError(f"No stored daily bars for {symbols} {start}..{end} (run a backtest to download them)")
+        base = BacktestConfig(start, end, symbols=symbols, **(config or {}))
+        return cls(panel, base, strategy_factory, **kwargs)
+
+    def returns(self, grid: Mapping[str, Sequence[Any]]) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Backtest every grid point once; returns (trials, day x trial returns)."""
+        rows = [row for row in self.sweep.run(grid) if "error" not in row]
+        if not rows:
+            raise ValueError("No parameter combination could be backtested")
+        trials = [{name: row[name] for name in grid} for row in rows]
+        return trials, np.column_stack([row["returns"] for row in rows])
+
+    def walk_forward(
+        self,
+        grid: Mapping[str, Sequence[Any]],
+        n_groups: int = 6,
+        purge: int = 5,
+        window: Optional[int] = None,
+    ) -> ValidationReport:
+        """Walk-forward validation (see ``walk_forward_splits``); splits are in time order."""
+        trials, returns = self.returns(grid)
+        splits = walk_forward_splits(len(returns), n_groups, purge, window)
+        return validate_returns(returns, splits, trials, "walk_forward")
+
+    def cpcv(
+        self,
+        grid: Mapping[str, Sequence[Any]],
+        n_groups: int = 6,
+        n_test_groups: int = 2,
+        purge: int = 5,
+        embargo: int = 5,
+    ) -> ValidationReport:
+        """Combinatorial purged cross-validation (see ``cpcv_splits``)."""
+        trials, returns = self.returns(grid)
+        splits = cpcv_splits(len(returns), n_groups, n_test_groups, purge, embargo)
+        return validate_returns(returns, splits, trials, "cpcv")
+
+
+def report_from_params(params: Dict[str, Any], method: str) -> ValidationReport:
+    """
+    Run a validation described by plugin parameters.
+
+    Either ``returns`` (day x trial daily returns) is given, or a backtest:
+    ``strategy`` (name in ``STRATEGIES``), ``grid``, ``symbols``, ``start``,
+    ``end`` (default: last two years) and ``workers`` (default:
+    ``PLUGIN_SWEEP_WORKERS``, so a plugin run does not take every core
+    from the trading loop). Fold settings:
+    ``n_groups``, ``n_test_groups``, ``purge``, ``embargo``, ``window``.
+
+    Args:
+        params: Parameters as above
+        method: "walk_forward" or "cpcv"
+    """
+    from optifire.backtest.strategies import STRATEGIES
+
+    n_groups = int(params.get("n_groups", 6))
+    purge = int(params.get("purge", 5))
+
+    def splits(n_days: int) -> List[Split]:
+        if method == "walk_forward":
+            return walk_forward_splits(n_days, n_groups, purge, params.get("window"))
+        return cpcv_splits(n_days, n_groups, int(params.get("n_test_groups", 2)), purge, int(params.get("embargo", 5)))
+
+    if params.get("returns") is not None:
+        returns = np.asarray(params["returns"], dtype=float)
+        return validate_returns(returns, splits(len(returns)), method=method)
+
+    strategy = params.get("strategy", "trend")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r} (one of {sorted(STRATEGIES)})")
+    end = params.get("end") or datetime.now().strftime("%Y-%m-%d")
+    start = params.get("start") or (datetime.now() - timedelta(days=730)).strftime("%Y-%m-%d")
+    validator = BacktestValidator.from_store(
+        STRATEGIES[strategy],
+        [s.upper() for s in params.get("symbols") or BacktestConfig(start, end).symbols],
+        start, end,
+        workers=int(params.get("workers") or PLUGIN_SWEEP_WORKERS),
+    )
+    trials, returns = validator.returns(params.get("grid") or {})
+    return validate_returns(returns, splits(len(returns)), trials, method)
+
+
+async def report_from_params_async(params: Dict[str, Any], method: str) -> ValidationReport:
+    """``report_from_params`` off the event loop."""
+    return await asyncio.to_thread(report_from_params, params, method)
@@ -0,0 +1,247 @@
+"""
+Resource-budget admission control for plugin runs.
+
+Plugin runs ask for a worker slot and a memory reservation (their budget
+from features.yaml or PluginMetadata.est_mem_mb) before they start. Runs
+are admitted in priority order (risk before execution before alpha ... before
+diagnostics) and packed into ``system.max_workers`` slots and the plugin
+memory budget. A blocked high-priority run is never overtaken by a
+lower-priority one that would eat its memory. When the box is saturated,
+low-priority work is shed instead of queued, and queued work that waits
+too long is shed as well.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .errors import AdmissionRejected
+from .logger import logger
+
+
+# Lower value = more important. Keyed by plugin ID prefix or metadata category.
+PRIORITIES: Dict[str, int] = {
+    "risk": 0,
+    "exec": 1,
+    "execution": 1,
+    "alpha": 2,
+    "data": 3,
+    "fe": 3,
+    "feature_engineering": 3,
+    "ml": 4,
+    "ai": 4,
+    "sl": 5,
+    "self_learning": 5,
+    "infra": 6,
+    "infrastructure": 6,
+    "extra": 6,
+    "ux": 7,
+    "diag": 8,
+    "diagnostics": 8,
+}
+DEFAULT_PRIORITY = 5
+
+
+def plugin_priority(plugin_id: str, category: Optional[str] = None) -> int:
+    """Priority for a plugin from its ID prefix, falling back to its category."""
+    prefix = plugin_id.split("_", 1)[0]
+    if prefix in PRIORITIES:
+        return PRIORITIES[prefix]
+    return PRIORITIES.get(category or "", DEFAULT_PRIORITY)
+
+
+@dataclass(order=True)
+class _Request:
+    """A queued admission request (ordered by priority, then shortest job)."""
+
+    priority: int
+    cpu_ms: int
+    seq: int
+    plugin_id: str = field(compare=False)
+    mem_mb: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class AdmissionController:
+    """Packs plugin runs into the worker and memory budget."""
+
+    def __init__(
+        self,
+        max_workers: int = 3,
+        mem_budget_mb: int = 400,
+        max_ram_mb: int = 900,
+        high_water_pct: float = 0.9,
+        shed_priority: int = 7,
+        max_queue: int = 50,
+        queue_timeout_s: float = 60.0,
+        rss_fn: Optional[Callable[[], float]] = None,
+    ):
+        """
+        Initialize admission controller.
+
+        Args:
+            max_workers: Concurrent plugin runs
+            mem_budget_mb: Memory that may be reserved by running plugins
+            max_ram_mb: Whole-process RAM limit (system.max_ram_mb)
+            high_water_pct: RSS fraction of max_ram_mb that counts as saturated
+            shed_priority: Runs with this priority or lower importance are shed
+                when saturated instead of queued
+            max_queue: Queue length that counts as saturated
+            queue_timeout_s: Queued runs waiting longer than this are shed
+            rss_fn: Returns current process RSS in MB (default: psutil)
+        """
+        self.max_workers = max_workers
+        self.mem_budget_mb = mem_budget_mb
+        self.max_ram_mb = max_ram_mb
+        self.high_water_pct = high_water_pct
+        self.shed_priority = shed_priority
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.rss_fn = rss_fn or self._process_rss_mb
+
+        self._running: Dict[int, _Request] = {}
+        self._mem_reserved = 0
+        self._queue: List[_Request] = []
+        self._seq = itertools.count()
+        self._stats = {"admitted": 0, "deferred": 0, "shed": 0, "timed_out": 0}
+
+    @staticmethod
+    def _process_rss_mb() -> float:
+        import psutil
+
+        return psutil.Process().memory_info().rss / 1024 / 1024
+
+    def is_saturated(self) -> bool:
+        """True when the admission queue or process RSS is past its limit."""
+        if len(self._queue) >= self.max_queue:
+            return True
+        return self.rss_fn() >= self.max_ram_mb * self.high_water_pct
+
+    def _fits(self, request: _Request, reserved_for: int = 0) -> bool:
+        if len(self._running) >= self.max_workers:
+            return False
+        # A run larger than the whole budget may still go when nothing else runs
+        if not self._running and request.mem_mb > self.mem_budget_mb:
+            return reserved_for == 0
+        return self._mem_reserved + request.mem_mb + reserved_for <= self.mem_budget_mb
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        plugin_id: str,
+        priority: int,
+        cpu_ms: int,
+        mem_mb: int,
+    ) -> AsyncIterator[None]:
+        """
+        Hold a worker slot and memory reservation for the duration of a run.
+
+        Args:
+            plugin_id: Plugin identifier
+            priority: See ``plugin_priority`` (lower = more important)
+            cpu_ms: Estimated CPU time (shorter jobs go first within a priority)
+            mem_mb: Memory to reserve
+
+        Raises:
+            AdmissionRejected: If the run was shed
+        """
+        request = await self.acquire(plugin_id, priority, cpu_ms, mem_mb)
+        try:
+            yield
+        finally:
+            self.release(request)
+
+    async def acquire(self, plugin_id: str, priority: int, cpu_ms: int, mem_mb: int) -> _Request:
+        """Wait for admission; pair with ``release``. See ``admit``."""
+        loop = asyncio.get_running_loop()
+        request = _Request(
+            priority=priority,
+            cpu_ms=cpu_ms,
+            seq=next(self._seq),
+            plugin_id=plugin_id,
+            mem_mb=mem_mb,
+            future=loop.create_future(),
+            enqueued_at=time.monotonic(),
+        )
+
+        if priority >= self.shed_priority and self.is_saturated():
+            self._stats["shed"] += 1
+            logger.warning(f"Shed {plugin_id} (priority {priority}): box saturated")
+            raise AdmissionRejected(f"{plugin_id} shed: box saturated")
+
+        if not self._queue and self._fits(request):
+            self._grant(request)
+            return request
+
+        heapq.heappush(self._queue, request)
+        self._stats["deferred"] += 1
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(request.future), self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            if request.future.done():
+                return request
+            self._remove_queued(request)
+            self._stats["timed_out"] += 1
+            self._stats["shed"] += 1
+            logger.warning(f"Shed {plugin_id}: waited > {self.queue_timeout_s}s for admission")
+            raise AdmissionRejected(f"{plugin_id} shed: admission timeout")
+        except asyncio.CancelledError:
+            if request.future.done() and not request.future.cancelled():
+                self.release(request)
+            else:
+                self._remove_queued(request)
+            raise
+        return request
+
+    def release(self, request: _Request) -> None:
+        """Return a run's slot and memory, then admit waiting runs."""
+        if self._running.pop(request.seq, None) is not None:
+            self._mem_reserved -= request.mem_mb
+            self._dispatch()
+
+    def _grant(self, request: _Request) -> None:
+        self._running[request.seq] = request
+        self._mem_reserved += request.mem_mb
+        self._stats["admitted"] += 1
+        if not request.future.done():
+            request.future.set_result(None)
+
+    def _remove_queued(self, request: _Request) -> None:
+        if request in self._queue:
+            self._queue.remove(request)
+            heapq.heapify(self._queue)
+        if not request.future.done():
+            request.future.cancel()
+
+    def _dispatch(self) -> None:
+        """Admit queued runs in priority order with conservative backfill."""
+        blocked_mem = 0
+        for request in sorted(self._queue):
+            if len(self._running) >= self.max_workers:
+                break
+            if self._fits(request, reserved_for=blocked_mem):
+                self._queue.remove(request)
+                self._grant(request)
+            elif not blocked_mem:
+                # Keep room for the most important blocked run
+                blocked_mem = request.mem_mb
+        heapq.heapify(self._queue)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current load and admission counters."""
+        return {
+            **self._stats,
+            "running": len(self._running),
+            "queued": len(self._queue),
+            "mem_reserved_mb": self._mem_reserved,
+            "mem_budget_mb": self.mem_budget_mb,
+            "max_workers": self.max_workers,
+            "running_plugins": [r.plugin_id for r in self._running.values()],
+            "queued_plugins": [r.plugin_id for r in sorted(self._queue)],
+        }
@@ -2,22 +2,53 @@
 Event bus for pub/sub communication between components.
 """
 import asyncio
-from typing import Any, Callable, Dict, List
-from dataclasses import dataclass
+import re
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 import json
 
 from .logger import logger
+from .errors import ConfigError
+
+try:
+    import orjson
+except ImportError:  # Optional fast path
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional binary encoding
+    msgpack = None
+
+
+def _encode_default(obj: Any) -> Any:
+    """Fallback for values the JSON/msgpack encoders do not understand."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # numpy arrays and scalars
+        return obj.tolist()
+    return str(obj)
 
 
 @dataclass
 class Event:
-    """Event data structure."""
+    """
+    Event data structure.
+
+    Wire encodings (JSON, SSE frame, msgpack) are computed lazily and cached
+    on the event, so every network or persistence subscriber shares one
+    serialization. Treat events as immutable once published.
+    """
 
     type: str
     data: Any
     source: str
     timestamp: datetime = None
+    _wire: Dict[str, bytes] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.timestamp is None:
@@ -34,74 +65,497 @@ class Event:
 
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict(), default=str)
+        return self.to_json_bytes().decode()
+
+    def to_json_bytes(self) -> bytes:
+        """Compact UTF-8 JSON encoding (cached, orjson when installed)."""
+        encoded = self._wire.get("json")
+        if encoded is None:
+            if orjson is not None:
+                encoded = orjson.dumps(
+                    self.to_dict(),
+                    default=_encode_default,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                )
+            else:
+                encoded = json.dumps(
+                    self.to_dict(), default=_encode_default, separators=(",", ":")
+                ).encode()
+            self._wire["json"] = encoded
+        return encoded
+
+    def to_sse(self) -> bytes:
+        """Server-Sent Events frame ("data: <json>\\n\\n", cached)."""
+        encoded = self._wire.get("sse")
+        if encoded is None:
+            encoded = b"data: " + self.to_json_bytes() + b"\n\n"
+            self._wire["sse"] = encoded
+        return encoded
+
+    def to_msgpack(self) -> bytes:
+        """
+        Compact binary encoding (cached).
+
+        Raises:
+            ImportError: If msgpack is not installed
+        """
+        encoded = self._wire.get("msgpack")
+        if encoded is None:
+            if msgpack is None:
+                raise ImportError("msgpack is required for binary event encoding")
+            encoded = msgpack.packb(self.to_dict(), default=_encode_default)
+            self._wire["msgpack"] = encoded
+        return encoded
+
+
+def is_wildcard_pattern(pattern: str) -> bool:
+    """True if a subscription pattern contains wildcard segments."""
+    return any(seg in ("*", "#") for seg in pattern.split("."))
+
+
+def compile_topic_pattern(pattern: str) -> "re.Pattern[str]":
+    """
+    Compile a dotted topic pattern into a regex.
+
+    Topics are dot-separated (e.g. "risk.var_budget.update"). In patterns,
+    "*" matches exactly one segment and "#" matches zero or more segments,
+    so "alpha.#" matches every alpha topic and "*.update" matches
+    "fe.update" but not "fe.kalman.update". A bare "*" is the legacy
+    catch-all and matches every topic.
+
+    Args:
+        pattern: Subscription pattern
+
+    Returns:
+        Compiled regex matching full topic names
+    """
+    if pattern in ("*", "#"):
+        return re.compile(r".*", re.DOTALL)
+
+    segments = pattern.split(".")
+    regex = ""
+    for i, seg in enumerate(segments):
+        first, last = i == 0, i == len(segments) - 1
+        # Separator before this segment, unless it follows a leading "#"
+        sep = "" if first or (i == 1 and segments[0] == "#") else r"\."
+
+        if seg == "#":
+            if first:
+                regex += r"(?:.+\.)?" if not last else r".*"
+            else:
+                regex += r"(?:\..+)?"
+        elif seg == "*":
+            regex += sep + r"[^.]+"
+        else:
+            regex += sep + re.escape(seg)
+
+    return re.compile(regex, re.DOTALL)
+
+
+class OverflowPolicy:
+    """What a bounded queue does when it is full."""
+
+    BLOCK = "block"  # Publisher waits for space (backpressure)
+    DROP_OLDEST = "drop_oldest"  # Oldest pending event is discarded
+    COALESCE = "coalesce"  # Keep only the latest pending event per type
+
+    ALL = (BLOCK, DROP_OLDEST, COALESCE)
+
+
+class BoundedEventQueue:
+    """
+    Bounded FIFO of events with a configurable overflow policy.
+
+    With COALESCE, a new event replaces any pending event of the same type
+    in place, so a slow consumer sees the latest value rather than a backlog.
+    If the queue is still full (more distinct types than slots), the oldest
+    event is dropped.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        policy: str = OverflowPolicy.BLOCK,
+        counters: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Initialize queue.
+
+        Args:
+            maxsize: Maximum pending events (0 = unbounded)
+            policy: Overflow policy (see OverflowPolicy)
+            counters: Optional shared dict to also receive dropped/coalesced counts
+        """
+        if policy not in OverflowPolicy.ALL:
+            raise ConfigError(
+                f"Invalid overflow policy '{policy}' (expected one of {OverflowPolicy.ALL})"
+            )
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.coalesced = 0
+        self._counters = counters
+
+        # COALESCE keys pending events by type; other policies keep a plain FIFO
+        self._items: deque = deque()
+        self._latest: "OrderedDict[str, Event]" = OrderedDict()
+
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._all_done = asyncio.Event()
+        self._all_done.set()
+        self._unfinished = 0
+
+    def qsize(self) -> int:
+        """Number of pending events."""
+        return len(self._latest) if self.policy == OverflowPolicy.COALESCE else len(self._items)
+
+    def empty(self) -> bool:
+        """True if no events are pending."""
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """True if the queue is at capacity."""
+        return 0 < self.maxsize <= self.qsize()
+
+    async def put(self, event: Event) -> None:
+        """Enqueue an event, waiting for space only under the BLOCK policy."""
+        if self.policy == OverflowPolicy.BLOCK:
+            while self.full():
+                self._not_full.clear()
+                await self._not_full.wait()
+        self.put_nowait(event)
+
+    def put_nowait(self, event: Event) -> None:
+        """
+        Enqueue an event without waiting.
+
+        Raises:
+            asyncio.QueueFull: If full under the BLOCK policy
+        """
+        if self.policy == OverflowPolicy.COALESCE:
+            if event.type in self._latest:
+                # The newer event takes over the pending one's unfinished slot
+                self._latest[event.type] = event
+                self._count("coalesced", finish=False)
+                return
+            if self.full():
+                self._latest.popitem(last=False)
+                self._count("dropped")
+            self._latest[event.type] = event
+
+        elif self.policy == OverflowPolicy.DROP_OLDEST:
+            if self.full():
+                self._items.popleft()
+                self._count("dropped")
+            self._items.append(event)
+
+        else:
+            if self.full():
+                raise asyncio.QueueFull()
+            self._items.append(event)
+
+        self._unfinished += 1
+        self._all_done.clear()
+        self._update_flags()
+
+    async def get(self) -> Event:
+        """Remove and return the next event, waiting if necessary."""
+        while self.empty():
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def get_nowait(self) -> Event:
+        """
+        Remove and return the next event.
+
+        Raises:
+            asyncio.QueueEmpty: If no events are pending
+        """
+        if self.empty():
+            raise asyncio.QueueEmpty()
+        if self.policy == OverflowPolicy.COALESCE:
+            _, event = self._latest.popitem(last=False)
+        else:
+            event = self._items.popleft()
+        self._update_flags()
+        return event
+
+    def task_done(self) -> None:
+        """Mark a previously fetched event as processed."""
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._finish(1)
+
+    async def join(self) -> None:
+        """Wait until every enqueued event has been processed or discarded."""
+        await self._all_done.wait()
+
+    def _count(self, kind: str, finish: bool = True) -> None:
+        """Record a dropped/coalesced event; ``finish``: it will never be processed."""
+        setattr(self, kind, getattr(self, kind) + 1)
+        if self._counters is not None:
+            self._counters[kind] = self._counters.get(kind, 0) + 1
+        if finish:
+            self._finish(1)
+
+    def _finish(self, n: int) -> None:
+        self._unfinished -= n
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._all_done.set()
+
+    def _update_flags(self) -> None:
+        if self.empty():
+            self._not_empty.clear()
+        else:
+            self._not_empty.set()
+        if self.full():
+            self._not_full.clear()
+        else:
+            self._not_full.set()
 
 
 class EventBus:
     """
     Async event bus for decoupled communication.
-    Thread-safe, supports wildcard subscriptions.
+    Thread-safe, supports hierarchical wildcard subscriptions
+    (see ``compile_topic_pattern``).
+
+    Dispatch modes:
+        - "concurrent" (default): each topic gets its own bounded queue and
+          worker task, so a slow handler only delays later events on the same
+          topic. Handlers for one event run concurrently; per-topic ordering
+          is preserved.
+        - "serial": a single bounded queue and worker dispatch every event and
+          await each handler in turn (legacy behaviour).
+
+    Queues are bounded by ``max_queue_size`` and handle overflow according to
+    ``queue_policy``. Subscribers can also request their own bounded queue
+    (see ``subscribe``/``subscribe_queue``) so one stalled consumer cannot
+    hold up the rest of the topic.
     """
 
-    def __init__(self):
-        """Initialize event bus."""
+    DISPATCH_MODES = ("concurrent", "serial")
+    MAX_CACHED_ROUTES = 4096
+
+    def __init__(
+        self,
+        dispatch_mode: str = "concurrent",
+        worker_idle_timeout: float = 30.0,
+        max_queue_size: int = 10000,
+        queue_policy: str = OverflowPolicy.BLOCK,
+    ):
+        """
+        Initialize event bus.
+
+        Args:
+            dispatch_mode: "concurrent" or "serial"
+            worker_idle_timeout: Seconds an idle topic worker lingers before exiting
+            max_queue_size: Capacity of the bus and per-topic queues (0 = unbounded)
+            queue_policy: Overflow policy for bus and per-topic queues
+        """
+        if dispatch_mode not in self.DISPATCH_MODES:
+            raise ConfigError(
+                f"Invalid dispatch mode '{dispatch_mode}' "
+                f"(expected one of {self.DISPATCH_MODES})"
+            )
+
+        self.dispatch_mode = dispatch_mode
+        self.worker_idle_timeout = worker_idle_timeout
+        self.max_queue_size = max_queue_size
+        self.queue_policy = queue_policy
+
+        self._stats = {
+            "published": 0,
+            "dispatched": 0,
+            "handler_errors": 0,
+            "dropped": 0,
+            "coalesced": 0,
+        }
+
+        # Handler lists are copy-on-write: dispatch iterates over a snapshot,
+        # so subscribe/unsubscribe never wait for in-flight handlers.
         self._subscribers: Dict[str, List[Callable]] = {}
+
+        # Wildcard patterns are compiled on subscribe; resolved handler tuples
+        # per concrete topic are cached so publishing costs one dict lookup.
+        self._patterns: Dict[str, "re.Pattern[str]"] = {}
+        self._routes: Dict[str, Tuple[Callable, ...]] = {}
         self._lock = asyncio.Lock()
-        self._queue: asyncio.Queue = asyncio.Queue()
+        self._queue = BoundedEventQueue(max_queue_size, queue_policy, self._stats)
         self._running = False
+        self._router_task: Optional[asyncio.Task] = None
+
+        # Concurrent mode: topic -> queue / worker task
+        self._topic_queues: Dict[str, BoundedEventQueue] = {}
+        self._topic_workers: Dict[str, asyncio.Task] = {}
+
+        # Subscribers with their own queue: (event_type, handler) -> (queue, worker)
+        self._subscriber_queues: Dict[
+            Tuple[str, Callable], Tuple[BoundedEventQueue, Optional[asyncio.Task]]
+        ] = {}
 
     async def start(self) -> None:
         """Start event bus processing."""
         self._running = True
-        asyncio.create_task(self._process_events())
-        logger.info("Event bus started")
+        if self.dispatch_mode == "serial":
+            self._router_task = asyncio.create_task(self._process_events())
+        else:
+            # Topics published to before start() get their workers now
+            for topic, queue in self._topic_queues.items():
+                if topic not in self._topic_workers:
+                    self._start_topic_worker(topic, queue)
+        logger.info(f"Event bus started ({self.dispatch_mode} dispatch)")
 
     async def stop(self) -> None:
         """Stop event bus processing."""
         self._running = False
+
+        tasks = list(self._topic_workers.values())
+        tasks.extend(task for _, task in self._subscriber_queues.values() if task)
+        if self._router_task:
+            tasks.append(self._router_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._router_task = None
+        self._topic_workers.clear()
+        self._topic_queues.clear()
         logger.info("Event bus stopped")
 
+    async def drain(self) -> None:
+        """Wait until every published event has been dispatched."""
+        await self._queue.join()
+        for queue in list(self._topic_queues.values()):
+            await queue.join()
+        for queue, task in list(self._subscriber_queues.values()):
+            if task:
+                await queue.join()
+
     async def _process_events(self) -> None:
-        """Process events from queue."""
+        """Process events from queue (serial mode)."""
         while self._running:
             try:
                 event = await asyncio.wait_for(self._queue.get(), timeout=1.0)
-                await self._dispatch_event(event)
             except asyncio.TimeoutError:
                 continue
+
+            try:
+                await self._dispatch_event(event)
             except Exception as e:
                 logger.error(f"Error processing event: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _route_to_topic(self, event: Event) -> None:
+        """Hand an event to its topic worker, starting one if needed."""
+        queue = self._topic_queues.get(event.type)
+        if queue is None:
+            queue = BoundedEventQueue(self.max_queue_size, self.queue_policy, self._stats)
+            self._topic_queues[event.type] = queue
+            if self._running:
+                self._start_topic_worker(event.type, queue)
+
+        await queue.put(event)
+
+    def _start_topic_worker(self, topic: str, queue: BoundedEventQueue) -> None:
+        self._topic_workers[topic] = asyncio.create_task(self._topic_worker(topic, queue))
+
+    async def _topic_worker(self, topic: str, queue: BoundedEventQueue) -> None:
+        """Dispatch events of one topic in order."""
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=self.worker_idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        # No await between the check and the removal, so a
+                        # publisher cannot enqueue into an orphaned queue.
+                        break
+                    continue
+
+                try:
+                    await self._dispatch_event(event)
+                except Exception as e:
+                    logger.error(f"Error dispatching {topic}: {e}")
+                finally:
+                    queue.task_done()
+        finally:
+            if self._topic_workers.get(topic) is asyncio.current_task():
+                del self._topic_workers[topic]
+                self._topic_queues.pop(topic, None)
+
+    async def _subscriber_worker(
+        self,
+        handler: Callable,
+        queue: BoundedEventQueue,
+    ) -> None:
+        """Feed one queued subscriber from its private queue."""
+        while True:
+            event = await queue.get()
+            try:
+                await self._call_handler(handler, event)
+            finally:
+                queue.task_done()
+
+    def _get_handlers(self, event_type: str) -> Tuple[Callable, ...]:
+        """Handlers for a topic from the routing table (exact match, then wildcards)."""
+        handlers = self._routes.get(event_type)
+        if handlers is None:
+            if len(self._routes) >= self.MAX_CACHED_ROUTES:
+                self._routes.clear()
+            handlers = self._resolve_route(event_type)
+            self._routes[event_type] = handlers
+        return handlers
+
+    def _resolve_route(self, topic: str) -> Tuple[Callable, ...]:
+        """Match a topic against every subscription pattern."""
+        handlers = list(self._subscribers.get(topic, ()))
+        for pattern, regex in self._patterns.items():
+            if regex.fullmatch(topic):
+                handlers.extend(self._subscribers[pattern])
+        return tuple(handlers)
+
+    def _rebuild_routes(self) -> None:
+        """Recompute cached routes after the subscription set changed."""
+        self._routes = {topic: self._resolve_route(topic) for topic in self._routes}
 
     async def _dispatch_event(self, event: Event) -> None:
         """Dispatch event to subscribers."""
-        async with self._lock:
-            # Exact match
-            if event.type in self._subscribers:
-                for handler in self._subscribers[event.type]:
-                    try:
-                        if asyncio.iscoroutinefunction(handler):
-                            await handler(event)
-                        else:
-                            handler(event)
-                    except Exception as e:
-                        logger.error(
-                            f"Error in event handler for {event.type}: {e}",
-                            exc_info=True,
-                        )
-
-            # Wildcard match (*)
-            if "*" in self._subscribers:
-                for handler in self._subscribers["*"]:
-                    try:
-                        if asyncio.iscoroutinefunction(handler):
-                            await handler(event)
-                        else:
-                            handler(event)
-                    except Exception as e:
-                        logger.error(
-                            f"Error in wildcard event handler: {e}",
-                            exc_info=True,
-                        )
+        handlers = self._get_handlers(event.type)
+        self._stats["dispatched"] += 1
+
+        if not handlers:
+            return
+
+        if self.dispatch_mode == "serial":
+            for handler in handlers:
+                await self._call_handler(handler, event)
+        else:
+            await asyncio.gather(
+                *(self._call_handler(handler, event) for handler in handlers)
+            )
+
+    async def _call_handler(self, handler: Callable, event: Event) -> None:
+        """Invoke one handler, isolating its failures from other subscribers."""
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                await handler(event)
+            else:
+                handler(event)
+        except Exception as e:
+            self._stats["handler_errors"] += 1
+            logger.error(
+                f"Error in event handler for {event.type}: {e}",
+                exc_info=True,
+            )
 
     async def publish(
         self,
@@ -112,36 +566,79 @@ class EventBus:
         """
         Publish an event.
 
+        Under the BLOCK policy this waits while the target queue is full.
+
         Args:
             event_type: Event type identifier
             data: Event data
             source: Event source identifier
         """
-        event = Event(type=event_type, data=data, source=source)
-        await self._queue.put(event)
-        logger.debug(f"Published event: {event_type} from {source}")
+        await self.publish_event(Event(type=event_type, data=data, source=source))
+
+    async def publish_event(self, event: Event) -> None:
+        """
+        Publish a pre-built event, keeping its original timestamp.
+
+        Used for replaying recorded events (see ``optifire.core.journal``).
+
+        Args:
+            event: Event to publish
+        """
+        if self.dispatch_mode == "serial":
+            await self._queue.put(event)
+        else:
+            await self._route_to_topic(event)
+        self._stats["published"] += 1
+        logger.debug(f"Published event: {event.type} from {event.source}")
 
     async def subscribe(
         self,
         event_type: str,
         handler: Callable[[Event], Any],
+        maxsize: int = 0,
+        policy: str = OverflowPolicy.BLOCK,
     ) -> None:
         """
         Subscribe to events.
 
+        With ``maxsize`` > 0 the handler gets its own bounded queue and worker,
+        so it runs decoupled from the topic and overflow follows ``policy``.
+
         Args:
-            event_type: Event type to subscribe to (use "*" for all)
+            event_type: Topic or pattern ("risk.*.update", "alpha.#", "*" for all)
             handler: Callback function (sync or async)
+            maxsize: Private queue capacity (0 = call handler inline)
+            policy: Overflow policy for the private queue
         """
-        async with self._lock:
-            if event_type not in self._subscribers:
-                self._subscribers[event_type] = []
+        if maxsize > 0:
+            queue = BoundedEventQueue(maxsize, policy, self._stats)
+            worker = asyncio.create_task(self._subscriber_worker(handler, queue))
+            self._subscriber_queues[(event_type, handler)] = (queue, worker)
+            await self._add_handler(event_type, queue.put, handler.__name__)
+        else:
+            await self._add_handler(event_type, handler, handler.__name__)
 
-            self._subscribers[event_type].append(handler)
-            logger.debug(
-                f"Subscribed to {event_type}: {handler.__name__} "
-                f"({len(self._subscribers[event_type])} total)"
-            )
+    async def subscribe_queue(
+        self,
+        event_type: str,
+        maxsize: int = 100,
+        policy: str = OverflowPolicy.COALESCE,
+    ) -> BoundedEventQueue:
+        """
+        Subscribe with a bounded queue that the caller drains itself.
+
+        Args:
+            event_type: Topic or pattern ("risk.*.update", "alpha.#", "*" for all)
+            maxsize: Queue capacity
+            policy: Overflow policy
+
+        Returns:
+            Queue receiving matching events; pass it to ``unsubscribe_queue``
+        """
+        queue = BoundedEventQueue(maxsize, policy, self._stats)
+        self._subscriber_queues[(event_type, queue.put)] = (queue, None)
+        await self._add_handler(event_type, queue.put, "queue")
+        return queue
 
     async def unsubscribe(
         self,
@@ -155,11 +652,41 @@ class EventBus:
             event_type: Event type
             handler: Handler to remove
         """
+        queued = self._subscriber_queues.pop((event_type, handler), None)
+        if queued:
+            queue, worker = queued
+            if worker:
+                worker.cancel()
+            await self._remove_handler(event_type, queue.put)
+        else:
+            await self._remove_handler(event_type, handler)
+        logger.debug(f"Unsubscribed from {event_type}: {getattr(handler, '__name__', handler)}")
+
+    async def unsubscribe_queue(self, event_type: str, queue: BoundedEventQueue) -> None:
+        """Remove a queue registered with ``subscribe_queue``."""
+        await self.unsubscribe(event_type, queue.put)
+
+    async def _add_handler(self, event_type: str, handler: Callable, name: str) -> None:
+        async with self._lock:
+            handlers = self._subscribers.get(event_type, []) + [handler]
+            self._subscribers[event_type] = handlers
+            if is_wildcard_pattern(event_type) and event_type not in self._patterns:
+                self._patterns[event_type] = compile_topic_pattern(event_type)
+            self._rebuild_routes()
+            logger.debug(f"Subscribed to {event_type}: {name} ({len(handlers)} total)")
+
+    async def _remove_handler(self, event_type: str, handler: Callable) -> None:
         async with self._lock:
-            if event_type in self._subscribers:
-                if handler in self._subscribers[event_type]:
-                    self._subscribers[event_type].remove(handler)
-                    logger.debug(f"Unsubscribed from {event_type}: {handler.__name__}")
+            handlers = self._subscribers.get(event_type)
+            if handlers and handler in handlers:
+                handlers = list(handlers)
+                handlers.remove(handler)
+                if handlers:
+                    self._subscribers[event_type] = handlers
+                else:
+                    del self._subscribers[event_type]
+                    self._patterns.pop(event_type, None)
+                self._rebuild_routes()
 
     def get_subscriber_count(self, event_type: str) -> int:
         """Get number of subscribers for an event type."""
@@ -168,3 +695,20 @@ class EventBus:
     def get_all_event_types(self) -> List[str]:
         """Get all subscribed event types."""
         return list(self._subscribers.keys())
+
+    def get_matching_handler_count(self, topic: str) -> int:
+        """Get number of handlers (exact and wildcard) a topic is routed to."""
+        return len(self._get_handlers(topic))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bus counters and queue depths."""
+        return {
+            **self._stats,
+            "dispatch_mode": self.dispatch_mode,
+            "queue_depth": self._queue.qsize(),
+            "active_topics": len(self._topic_workers),
+            "topic_backlog": sum(q.qsize() for q in self._topic_queues.values()),
+            "subscriber_backlog": sum(
+                q.qsize() for q, _ in self._subscriber_queues.values()
+            ),
+        }
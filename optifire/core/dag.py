@@ -0,0 +1,293 @@
+"""
+Dependency-aware DAG execution of plugins.
+
+Edges come from two declarations:
+    - ``PluginMetadata.inputs`` / ``outputs``: B depends on A if one of B's
+      inputs is one of A's outputs
+    - ``plan()["dependencies"]``: explicit upstream plugin IDs
+
+Each plugin starts as soon as all of its upstream plugins have finished
+(no stage barriers), with at most ``max_concurrency`` running at once, or
+as admitted by an AdmissionController when one is given.
+Upstream ``PluginResult.data`` is merged into the downstream context.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from optifire.plugins import Plugin, PluginContext, PluginResult
+
+from .admission import AdmissionController, plugin_priority
+from .errors import AdmissionRejected, PluginError
+from .logger import logger
+
+
+@dataclass
+class DagRunReport:
+    """Outcome of one DAG cycle."""
+
+    results: Dict[str, PluginResult]
+    timings: Dict[str, Tuple[float, float]]  # plugin_id -> (start, end), seconds from cycle start
+    wall_ms: float
+    critical_path: List[str]
+    critical_path_ms: float
+    skipped: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary suitable for the event bus / API."""
+        return {
+            "plugins": len(self.results),
+            "succeeded": sum(1 for r in self.results.values() if r.success),
+            "skipped": self.skipped,
+            "wall_ms": round(self.wall_ms, 1),
+            "critical_path": self.critical_path,
+            "critical_path_ms": round(self.critical_path_ms, 1),
+            "parallelism": round(
+                sum(end - start for start, end in self.timings.values()) * 1000 / self.wall_ms, 2
+            ) if self.wall_ms > 0 else 0.0,
+        }
+
+
+class PluginDAG:
+    """Plugin dependency graph built from metadata and plans."""
+
+    def __init__(self, plugins: Iterable[Plugin]):
+        """
+        Build the graph.
+
+        Args:
+            plugins: Plugins to include (typically the enabled ones)
+
+        Raises:
+            PluginError: If the declarations contain a cycle
+        """
+        self.plugins: Dict[str, Plugin] = {p.metadata.plugin_id: p for p in plugins}
+        self.upstream: Dict[str, Set[str]] = {pid: set() for pid in self.plugins}
+        self.downstream: Dict[str, Set[str]] = {pid: set() for pid in self.plugins}
+
+        producers: Dict[str, Set[str]] = {}
+        for pid, plugin in self.plugins.items():
+            for output in plugin.metadata.outputs:
+                producers.setdefault(output, set()).add(pid)
+
+        for pid, plugin in self.plugins.items():
+            deps = set(plugin.plan().get("dependencies") or [])
+            for name in plugin.metadata.inputs:
+                deps |= producers.get(name, set())
+            for dep in deps:
+                if dep != pid and dep in self.plugins:
+                    self.upstream[pid].add(dep)
+                    self.downstream[dep].add(pid)
+
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm; deterministic (sorted) tie-breaking."""
+        indegree = {pid: len(ups) for pid, ups in self.upstream.items()}
+        ready = sorted(pid for pid, n in indegree.items() if n == 0)
+        order = []
+
+        while ready:
+            pid = ready.pop(0)
+            order.append(pid)
+            for child in sorted(self.downstream[pid]):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+
+        if len(order) != len(self.plugins):
+            cyclic = sorted(pid for pid, n in indegree.items() if n > 0)
+            raise PluginError(f"Plugin dependency cycle among: {', '.join(cyclic)}")
+        return order
+
+    def stages(self) -> List[List[str]]:
+        """Group plugins by depth (plugins in one stage are independent)."""
+        depth: Dict[str, int] = {}
+        for pid in self.order:
+            depth[pid] = 1 + max((depth[u] for u in self.upstream[pid]), default=-1)
+        stages: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for pid in self.order:
+            stages[depth[pid]].append(pid)
+        return stages
+
+    def descendants(self, roots: Iterable[str]) -> Set[str]:
+        """Roots plus everything downstream of them."""
+        seen: Set[str] = set()
+        stack = [r for r in roots if r in self.plugins]
+        while stack:
+            pid = stack.pop()
+            if pid not in seen:
+                seen.add(pid)
+                stack.extend(self.downstream[pid])
+        return seen
+
+
+class DagExecutor:
+    """
+    Runs a PluginDAG, starting each plugin as soon as its inputs are ready.
+
+    Outputs of the latest run of every plugin are kept, so a partial cycle
+    (``roots=[...]``) re-runs only the triggered plugins and their
+    descendants while reusing cached upstream outputs.
+    """
+
+    def __init__(
+        self,
+        dag: PluginDAG,
+        max_concurrency: int = 3,
+        budget_fn: Optional[Callable[[str], Dict[str, int]]] = None,
+        on_result: Optional[Callable[..., Any]] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        """
+        Initialize executor.
+
+        Args:
+            dag: Plugin graph
+            max_concurrency: Maximum plugins running at once
+            budget_fn: plugin_id -> {"cpu_ms", "mem_mb"} (default: 2x estimates)
+            on_result: Optional async callback(plugin_id, result, started_at, completed_at)
+            admission: Admission controller (replaces the max_concurrency semaphore)
+        """
+        self.dag = dag
+        self.max_concurrency = max_concurrency
+        self.budget_fn = budget_fn or self._default_budget
+        self.on_result = on_result
+        self.admission = admission
+        self._last_outputs: Dict[str, Dict[str, Any]] = {}
+        self.last_report: Optional[DagRunReport] = None
+
+    def _default_budget(self, plugin_id: str) -> Dict[str, int]:
+        meta = self.dag.plugins[plugin_id].metadata
+        return {"cpu_ms": meta.est_cpu_ms * 2, "mem_mb": meta.est_mem_mb * 2}
+
+    async def run_cycle(
+        self,
+        base_context: PluginContext,
+        roots: Optional[Iterable[str]] = None,
+    ) -> DagRunReport:
+        """
+        Execute one cycle.
+
+        Args:
+            base_context: Context shared by all plugins (data is copied per plugin)
+            roots: Only run these plugins and their descendants (default: all)
+
+        Returns:
+            Cycle report with per-plugin timings and the critical path
+        """
+        selected = self.dag.descendants(roots) if roots is not None else set(self.dag.order)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[str, asyncio.Task] = {}
+        results: Dict[str, PluginResult] = {}
+        timings: Dict[str, Tuple[float, float]] = {}
+        skipped: List[str] = []
+        t0 = time.perf_counter()
+
+        async def run_node(pid: str) -> bool:
+            upstream = [u for u in self.dag.upstream[pid] if u in selected]
+            if upstream:
+                ok = await asyncio.gather(*(tasks[u] for u in upstream))
+                if not all(ok):
+                    failed = [u for u, good in zip(upstream, ok) if not good]
+                    results[pid] = PluginResult(
+                        success=False, error=f"Upstream failed: {', '.join(sorted(failed))}"
+                    )
+                    skipped.append(pid)
+                    return False
+
+            # Inputs: base data, then outputs of every upstream plugin
+            data = dict(base_context.data)
+            for u in self.dag.upstream[pid]:
+                data.update(self._last_outputs.get(u, {}))
+            context = PluginContext(
+                config=base_context.config, db=base_context.db, bus=base_context.bus, data=data
+            )
+
+            budget = self.budget_fn(pid)
+            try:
+                async with self._slot(pid, budget, semaphore):
+                    started_wall = time.time()
+                    start = time.perf_counter() - t0
+                    result = await self.dag.plugins[pid].execute_with_budget(
+                        context,
+                        cpu_budget_ms=budget["cpu_ms"],
+                        mem_budget_mb=budget["mem_mb"],
+                        timeout_s=budget.get("timeout_s"),
+                    )
+                    timings[pid] = (start, time.perf_counter() - t0)
+            except AdmissionRejected as e:
+                results[pid] = PluginResult(success=False, error=str(e))
+                skipped.append(pid)
+                return False
+
+            results[pid] = result
+            if result.success:
+                self._last_outputs[pid] = result.data or {}
+            if self.on_result:
+                await self.on_result(pid, result, started_wall, time.time())
+            return result.success
+
+        # Tasks are created in topological order so every upstream task exists
+        for pid in self.dag.order:
+            if pid in selected:
+                tasks[pid] = asyncio.create_task(run_node(pid))
+        await asyncio.gather(*tasks.values())
+
+        wall_ms = (time.perf_counter() - t0) * 1000
+        critical_path, critical_ms = self._critical_path(timings)
+        report = DagRunReport(
+            results=results,
+            timings=timings,
+            wall_ms=wall_ms,
+            critical_path=critical_path,
+            critical_path_ms=critical_ms,
+            skipped=skipped,
+        )
+        self.last_report = report
+
+        logger.info(
+            f"DAG cycle: {len(timings)} plugins in {wall_ms:.0f}ms, "
+            f"critical path {critical_ms:.0f}ms ({' -> '.join(critical_path) or '-'})"
+        )
+        return report
+
+    def _slot(self, pid: str, budget: Dict[str, int], semaphore: asyncio.Semaphore):
+        """Admission-controlled slot, or the plain concurrency semaphore."""
+        if self.admission is None:
+            return semaphore
+        plugin = self.dag.plugins[pid]
+        return self.admission.admit(
+            pid,
+            plugin_priority(pid, plugin.metadata.category),
+            cpu_ms=budget["cpu_ms"],
+            mem_mb=budget["mem_mb"],
+        )
+
+    def _critical_path(self, timings: Dict[str, Tuple[float, float]]) -> Tuple[List[str], float]:
+        """Longest chain of dependent run durations among executed plugins."""
+        finish: Dict[str, float] = {}
+        prev: Dict[str, Optional[str]] = {}
+
+        for pid in self.dag.order:
+            if pid not in timings:
+                continue
+            duration = (timings[pid][1] - timings[pid][0]) * 1000
+            best_up, best = None, 0.0
+            for u in self.dag.upstream[pid]:
+                if u in finish and finish[u] > best:
+                    best_up, best = u, finish[u]
+            finish[pid] = best + duration
+            prev[pid] = best_up
+
+        if not finish:
+            return [], 0.0
+
+        node: Optional[str] = max(finish, key=finish.get)
+        total = finish[node]
+        path = []
+        while node is not None:
+            path.append(node)
+            node = prev[node]
+        return list(reversed(path)), total
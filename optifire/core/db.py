@@ -164,12 +164,18 @@ class Database:
                 status TEXT NOT NULL,
                 cpu_ms INTEGER,
                 mem_mb INTEGER,
+                wall_ms INTEGER,
                 error_msg TEXT,
                 started_at TIMESTAMP,
                 completed_at TIMESTAMP
             )
         """)
 
+        # plugin_log.wall_ms was added after the first release
+        columns = await db.execute_fetchall("PRAGMA table_info(plugin_log)")
+        if "wall_ms" not in {c[1] for c in columns}:
+            await db.execute("ALTER TABLE plugin_log ADD COLUMN wall_ms INTEGER")
+
         # Create indices
         await db.execute("CREATE INDEX IF NOT EXISTS idx_orders_symbol ON orders(symbol)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)")
@@ -178,6 +184,7 @@ class Database:
         await db.execute("CREATE INDEX IF NOT EXISTS idx_signals_created ON signals(created_at)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_features_symbol ON features(symbol)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_performance_timestamp ON performance(timestamp)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_plugin_log_started ON plugin_log(started_at)")
 
     @asynccontextmanager
     async def connection(self):
@@ -356,13 +363,45 @@ class Database:
         error_msg: Optional[str] = None,
         started_at: Optional[str] = None,
         completed_at: Optional[str] = None,
+        wall_ms: Optional[int] = None,
     ) -> None:
         """Log plugin execution."""
         await self.execute(
             """
             INSERT INTO plugin_log (
-                plugin_id, status, cpu_ms, mem_mb, error_msg, started_at, completed_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                plugin_id, status, cpu_ms, mem_mb, wall_ms, error_msg, started_at, completed_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (plugin_id, status, cpu_ms, mem_mb, wall_ms, error_msg, started_at, completed_at),
+        )
+
+    async def get_plugin_usage(self, since: str) -> List[Dict[str, Any]]:
+        """
+        Aggregate plugin resource usage from plugin_log.
+
+        Args:
+            since: ISO timestamp; only runs started at or after it count
+
+        Returns:
+            One row per plugin, heaviest total CPU first
+        """
+        return await self.fetch_all(
+            """
+            SELECT
+                plugin_id,
+                COUNT(*) AS runs,
+                SUM(status = 'error') AS errors,
+                SUM(status = 'timeout') AS timeouts,
+                SUM(cpu_ms) AS total_cpu_ms,
+                AVG(cpu_ms) AS avg_cpu_ms,
+                MAX(cpu_ms) AS max_cpu_ms,
+                AVG(mem_mb) AS avg_mem_mb,
+                MAX(mem_mb) AS max_mem_mb,
+                AVG(wall_ms) AS avg_wall_ms
+            FROM plugin_log
+            WHERE started_at >= ?
+            GROUP BY plugin_id
+            ORDER BY total_cpu_ms DESC
             """,
-            (plugin_id, status, cpu_ms, mem_mb, error_msg, started_at, completed_at),
+            (since,),
         )
@@ -38,6 +38,11 @@ class ResourceBudgetExceeded(OptiFIREError):
     pass
 
 
+class AdmissionRejected(OptiFIREError):
+    """Plugin run shed by admission control (box saturated or queue timeout)."""
+    pass
+
+
 class AuthenticationError(OptiFIREError):
     """Authentication or authorization errors."""
     pass
@@ -133,16 +133,18 @@ class FeatureFlags:
             plugin_id: Plugin identifier
 
         Returns:
-            Budget dictionary with cpu_ms and mem_mb
+            Budget dictionary with cpu_ms, mem_mb and timeout_s (None = derived
+            from cpu_ms)
         """
         config = self.get_config(plugin_id)
         if not config:
-            return {"cpu_ms": 1000, "mem_mb": 50}  # Defaults
+            return {"cpu_ms": 1000, "mem_mb": 50, "timeout_s": None}  # Defaults
 
         budget = config.get("budget", {})
         return {
             "cpu_ms": budget.get("cpu_ms", 1000),
             "mem_mb": budget.get("mem_mb", 50),
+            "timeout_s": budget.get("timeout_s"),
         }
 
     def get_schedule(self, plugin_id: str) -> Optional[str]:
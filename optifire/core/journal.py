@@ -0,0 +1,377 @@
+"""
+Append-only event journal with replay support.
+
+Events are appended to segmented, memory-mapped log files in a compact
+binary encoding (msgpack when installed, compact JSON otherwise). Dirty
+pages are flushed to disk in groups rather than per event. A journal can be
+replayed through any EventBus at accelerated speed, which lets production
+sessions be reproduced offline.
+
+Segment layout:
+    header:  b"OFJ" | version (u8) | encoding (u8) | 3 bytes padding
+    records: length (u32) | crc32 (u32) | payload
+A zero length marks the end of the written region. Payloads are the
+event's own cached wire encoding (``Event.to_msgpack``/``to_json_bytes``),
+so an event streamed to clients is not serialized again for the journal;
+version 1 segments ([timestamp, type, source, data] lists) still replay.
+"""
+import asyncio
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence
+
+from .bus import Event, EventBus
+from .errors import DataError
+from .logger import logger
+
+try:
+    import msgpack
+except ImportError:  # Optional binary encoding
+    msgpack = None
+
+
+MAGIC = b"OFJ"
+VERSION = 2
+READ_VERSIONS = (1, 2)
+ENCODING_JSON = 0
+ENCODING_MSGPACK = 1
+
+_SEGMENT_HEADER = struct.Struct("<3sBB3x")
+_RECORD_HEADER = struct.Struct("<II")
+
+
+def _encode_record(event: Event, encoding: int) -> bytes:
+    """The event's cached wire encoding (shared with network subscribers)."""
+    if encoding == ENCODING_MSGPACK:
+        return event.to_msgpack()
+    return event.to_json_bytes()
+
+
+def _decode_record(payload: bytes, encoding: int) -> Event:
+    """Decode a payload written by ``_encode_record`` (or a version 1 list)."""
+    if encoding == ENCODING_MSGPACK:
+        record = msgpack.unpackb(payload, strict_map_key=False)
+    else:
+        record = json.loads(payload)
+    if isinstance(record, list):
+        ts, event_type, source, data = record
+        timestamp = datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+        return Event(type=event_type, data=data, source=source, timestamp=timestamp)
+    return Event(
+        type=record["type"],
+        data=record["data"],
+        source=record["source"],
+        timestamp=datetime.fromisoformat(record["timestamp"]),
+    )
+
+
+class _Segment:
+    """One memory-mapped journal file opened for appending."""
+
+    def __init__(self, path: Path, size: int, encoding: int):
+        self.path = path
+        self.encoding = encoding
+        self.size = size
+
+        self._file = open(path, "w+b")
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        _SEGMENT_HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, encoding)
+        self.offset = _SEGMENT_HEADER.size
+        self.synced = self.offset
+
+        # Group syncs run in a worker thread; never close mid-flush
+        self._sync_lock = threading.Lock()
+
+    def fits(self, n: int) -> bool:
+        # Leave room for the zero terminator
+        return self.offset + _RECORD_HEADER.size + n + _RECORD_HEADER.size <= self.size
+
+    def append(self, payload: bytes) -> None:
+        _RECORD_HEADER.pack_into(
+            self._mmap, self.offset, len(payload), zlib.crc32(payload)
+        )
+        start = self.offset + _RECORD_HEADER.size
+        self._mmap[start:start + len(payload)] = payload
+        self.offset = start + len(payload)
+
+    def sync(self) -> None:
+        """msync the region written since the last sync."""
+        with self._sync_lock:
+            end = self.offset
+            if self._mmap.closed or end == self.synced:
+                return
+            start = self.synced - (self.synced % mmap.PAGESIZE)
+            self._mmap.flush(start, end - start)
+            self.synced = end
+
+    def close(self) -> None:
+        """Sync, unmap and trim the preallocated tail."""
+        self.sync()
+        with self._sync_lock:
+            self._mmap.close()
+            # Keep one zero terminator after the last record
+            self._file.truncate(self.offset + _RECORD_HEADER.size)
+            self._file.close()
+
+
+def _scan_end(buf: Any, size: int) -> int:
+    """Find the end of the valid record region in a segment buffer."""
+    offset = _SEGMENT_HEADER.size
+    while offset + _RECORD_HEADER.size <= size:
+        length, crc = _RECORD_HEADER.unpack_from(buf, offset)
+        end = offset + _RECORD_HEADER.size + length
+        if length == 0 or end > size:
+            break
+        if zlib.crc32(buf[offset + _RECORD_HEADER.size:end]) != crc:
+            logger.warning(f"Journal record at offset {offset} failed CRC; truncating")
+            break
+        offset = end
+    return offset
+
+
+class EventJournal:
+    """
+    Append-only, segmented, memory-mapped event journal.
+
+    Usage:
+        journal = EventJournal(Path("data/journal"))
+        await journal.attach(bus)          # record everything
+        ...
+        await journal.close()
+
+        # Later / offline
+        await replay_journal(Path("data/journal"), bus, speed=50.0)
+    """
+
+    SEGMENT_PREFIX = "events-"
+    SEGMENT_SUFFIX = ".log"
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_size_mb: int = 64,
+        sync_interval: float = 1.0,
+        sync_every: int = 1000,
+    ):
+        """
+        Initialize journal.
+
+        Args:
+            directory: Directory holding segment files
+            segment_size_mb: Preallocated size of each segment
+            sync_interval: Seconds between group fsyncs
+            sync_every: Also fsync after this many unsynced records
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size_mb * 1024 * 1024
+        self.sync_interval = sync_interval
+        self.sync_every = sync_every
+        self.encoding = ENCODING_MSGPACK if msgpack is not None else ENCODING_JSON
+
+        self._segment: Optional[_Segment] = None
+        self._unsynced = 0
+        self._sync_task: Optional[asyncio.Task] = None
+        self._bus: Optional[EventBus] = None
+        self._pattern = "*"
+        self.records_written = 0
+        self.bytes_written = 0
+
+        self._open_segment(self._next_segment_path())
+
+    def _next_segment_path(self) -> Path:
+        # Each process run starts a fresh segment; earlier ones are never rewritten
+        existing = list_segments(self.directory)
+        index = int(existing[-1].stem[len(self.SEGMENT_PREFIX):]) + 1 if existing else 0
+        return self.directory / f"{self.SEGMENT_PREFIX}{index:08d}{self.SEGMENT_SUFFIX}"
+
+    def _open_segment(self, path: Path) -> None:
+        self._segment = _Segment(path, self.segment_size, self.encoding)
+        logger.debug(f"Opened journal segment {path.name}")
+
+    def append(self, event: Event) -> None:
+        """
+        Append one event (synchronous; cheap enough to run as a bus handler).
+
+        Args:
+            event: Event to record
+        """
+        payload = _encode_record(event, self._segment.encoding)
+        if not self._segment.fits(len(payload)):
+            if len(payload) + 2 * _RECORD_HEADER.size + _SEGMENT_HEADER.size > self.segment_size:
+                logger.warning(
+                    f"Event {event.type} ({len(payload)} bytes) exceeds journal segment size; skipped"
+                )
+                return
+            self._segment.close()
+            self._open_segment(self._next_segment_path())
+
+        self._segment.append(payload)
+        self.records_written += 1
+        self.bytes_written += len(payload) + _RECORD_HEADER.size
+        self._unsynced += 1
+
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush all appended records to disk."""
+        if self._segment:
+            self._segment.sync()
+        self._unsynced = 0
+
+    async def attach(self, bus: EventBus, pattern: str = "*") -> None:
+        """
+        Subscribe the journal to a bus and start group syncing.
+
+        Args:
+            bus: Event bus to record
+            pattern: Topic pattern to record (default: everything)
+        """
+        self._bus = bus
+        self._pattern = pattern
+        await bus.subscribe(pattern, self.append)
+        self._sync_task = asyncio.create_task(self._sync_loop())
+        logger.info(f"Event journal recording '{pattern}' to {self.directory}")
+
+    async def _sync_loop(self) -> None:
+        """Periodically fsync dirty pages off the event loop."""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            if self._unsynced and self._segment:
+                self._unsynced = 0
+                await asyncio.to_thread(self._segment.sync)
+
+    async def close(self) -> None:
+        """Detach from the bus, flush and close the active segment."""
+        if self._bus:
+            await self._bus.unsubscribe(self._pattern, self.append)
+            self._bus = None
+        if self._sync_task:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+        if self._segment:
+            self._segment.close()
+            self._segment = None
+        logger.info(f"Event journal closed ({self.records_written} records)")
+
+    def get_stats(self) -> dict:
+        """Get journal counters."""
+        return {
+            "records_written": self.records_written,
+            "bytes_written": self.bytes_written,
+            "segments": len(list_segments(self.directory)),
+            "encoding": "msgpack" if self.encoding == ENCODING_MSGPACK else "json",
+        }
+
+
+def list_segments(directory: Path) -> List[Path]:
+    """Journal segment files in write order."""
+    return sorted(
+        Path(directory).glob(f"{EventJournal.SEGMENT_PREFIX}*{EventJournal.SEGMENT_SUFFIX}")
+    )
+
+
+def read_journal(
+    directory: Path,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    types: Optional[Sequence[str]] = None,
+) -> Iterator[Event]:
+    """
+    Iterate recorded events in order.
+
+    Args:
+        directory: Journal directory
+        start: Skip events before this (naive UTC) time
+        end: Stop at events after this (naive UTC) time
+        types: Only yield these event types
+
+    Yields:
+        Recorded events with their original timestamps
+    """
+    wanted = set(types) if types else None
+
+    for path in list_segments(directory):
+        with open(path, "rb") as f:
+            size = os.path.getsize(path)
+            if size <= _SEGMENT_HEADER.size:
+                continue
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as buf:
+                magic, version, encoding = _SEGMENT_HEADER.unpack_from(buf, 0)
+                if magic != MAGIC or version not in READ_VERSIONS:
+                    raise DataError(f"Not a journal segment: {path}")
+                if encoding == ENCODING_MSGPACK and msgpack is None:
+                    raise DataError(f"msgpack is required to read {path}")
+
+                end_offset = _scan_end(buf, size)
+                offset = _SEGMENT_HEADER.size
+                while offset < end_offset:
+                    length, _ = _RECORD_HEADER.unpack_from(buf, offset)
+                    start_payload = offset + _RECORD_HEADER.size
+                    offset = start_payload + length
+                    event = _decode_record(buf[start_payload:offset], encoding)
+
+                    if wanted is not None and event.type not in wanted:
+                        continue
+                    if start and event.timestamp < start:
+                        continue
+                    if end and event.timestamp > end:
+                        return
+                    yield event
+
+
+async def replay_journal(
+    directory: Path,
+    bus: EventBus,
+    speed: float = 0.0,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    types: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    Feed a recorded journal back through a bus.
+
+    Args:
+        directory: Journal directory
+        bus: Target event bus (must be started)
+        speed: Time acceleration factor (e.g. 60 = one hour per minute);
+            0 replays as fast as the bus accepts events
+        start: Skip events before this (naive UTC) time
+        end: Stop at events after this (naive UTC) time
+        types: Only replay these event types
+
+    Returns:
+        Number of events replayed
+    """
+    count = 0
+    first_ts: Optional[datetime] = None
+    wall_start = time.perf_counter()
+
+    for event in read_journal(directory, start=start, end=end, types=types):
+        if speed > 0:
+            if first_ts is None:
+                first_ts = event.timestamp
+            due = (event.timestamp - first_ts).total_seconds() / speed
+            delay = due - (time.perf_counter() - wall_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        await bus.publish_event(event)
+        count += 1
+
+    await bus.drain()
+    logger.info(
+        f"Replayed {count} events from {directory} "
+        f"in {time.perf_counter() - wall_start:.2f}s"
+    )
+    return count
@@ -0,0 +1,328 @@
+"""
+Content-addressed memoization for pure plugin computations.
+
+Inputs are hashed by content (numpy arrays by their raw buffer, not their
+repr), so identical evaluations map to the same key no matter which caller
+asks. Results are kept in an LRU bounded by entry count and bytes, expire
+after a TTL, and can optionally be persisted to disk so they survive a
+restart. Concurrent requests for the same key share one computation.
+"""
+import asyncio
+import hashlib
+import os
+import pickle
+import struct
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .logger import logger
+
+
+class UnhashableInput(TypeError):
+    """Input contains a value that cannot be content-hashed."""
+
+
+def _feed(digest: "hashlib._Hash", value: Any) -> None:
+    """Feed a value into a digest with type tags (so 1, 1.0 and "1" differ)."""
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        digest.update(type(value).__name__.encode())
+        digest.update(repr(value).encode() if not isinstance(value, bytes) else value)
+        digest.update(b"\x00")
+        return
+
+    if isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+        digest.update(b"}")
+        return
+
+    if isinstance(value, (list, tuple)):
+        digest.update(b"[" if isinstance(value, list) else b"(")
+        for item in value:
+            _feed(digest, item)
+        digest.update(b"]")
+        return
+
+    np = sys.modules.get("numpy")
+    if np is not None:
+        if isinstance(value, np.ndarray):
+            if value.dtype == object:
+                _feed(digest, value.tolist())
+                return
+            digest.update(b"ndarray")
+            digest.update(value.dtype.str.encode())
+            digest.update(struct.pack(f"<{value.ndim}q", *value.shape))
+            # Hash the buffer directly; copy only if it is not contiguous
+            digest.update(memoryview(np.ascontiguousarray(value)).cast("B"))
+            return
+        if isinstance(value, np.generic):
+            _feed(digest, value.item())
+            return
+
+    # pandas Series/DataFrame: values plus labels
+    if hasattr(value, "to_numpy") and hasattr(value, "index"):
+        digest.update(type(value).__name__.encode())
+        _feed(digest, value.to_numpy())
+        _feed(digest, list(value.index))
+        if hasattr(value, "columns"):
+            _feed(digest, list(value.columns))
+        return
+
+    raise UnhashableInput(f"Cannot content-hash {type(value).__name__}")
+
+
+def hash_inputs(*parts: Any) -> str:
+    """
+    Content hash of arbitrary (nested) inputs.
+
+    Raises:
+        UnhashableInput: If a value type is not supported
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        _feed(digest, part)
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+
+
+class MemoCache:
+    """LRU + TTL result cache with optional disk persistence."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_mb: float = 64,
+        ttl_s: float = 300.0,
+        disk_dir: Optional[Path] = None,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Entry limit (least recently used evicted first)
+            max_mb: Memory limit for cached values (pickled size)
+            ttl_s: Default time to live
+            disk_dir: Also persist entries here (None = memory only)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_s = ttl_s
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "disk_hits": 0,
+            "shared": 0,  # Waited on an identical in-flight computation
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key.
+
+        Returns:
+            (hit, value)
+        """
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is not None:
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return True, entry.value
+            self._drop(key)
+            self._stats["expirations"] += 1
+
+        if self.disk_dir:
+            loaded = self._disk_get(key, now)
+            if loaded is not None:
+                value, expires_at, size = loaded
+                self._store(key, _Entry(value, expires_at, size))
+                self._stats["hits"] += 1
+                self._stats["disk_hits"] += 1
+                return True, value
+
+        self._stats["misses"] += 1
+        return False, None
+
+    def set(self, key: str, value: Any, ttl_s: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Picklable value
+            ttl_s: Time to live (default: the cache TTL)
+        """
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Not caching unpicklable result for {key}: {e}")
+            return
+
+        if len(blob) > self.max_bytes:
+            return
+        expires_at = time.time() + (self.ttl_s if ttl_s is None else ttl_s)
+        self._store(key, _Entry(value, expires_at, len(blob)))
+        if self.disk_dir:
+            self._disk_set(key, blob, expires_at)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl_s: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value for a key, computing it at most once.
+
+        Callers waiting on another caller's computation compute the value
+        themselves if that caller is cancelled (e.g. its plugin timed out).
+
+        Args:
+            key: Cache key (see ``hash_inputs``)
+            compute: Coroutine function producing the value on a miss
+            ttl_s: Time to live for a newly computed value
+        """
+        while True:
+            hit, value = self.get(key)
+            if hit:
+                return value
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self._stats["shared"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Re-raise our own cancellation, not the computing caller's
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; silence "never retrieved"
+            raise
+        else:
+            self.set(key, value, ttl_s)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> int:
+        """Drop all entries (memory and disk); return how many were in memory."""
+        count = len(self._entries)
+        self._entries.clear()
+        self._bytes = 0
+        if self.disk_dir:
+            for path in self.disk_dir.glob("*/*.pkl"):
+                path.unlink(missing_ok=True)
+        return count
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats["evictions"] += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.pkl"
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[Any, float, int]]:
+        path = self._disk_path(key)
+        try:
+            blob = path.read_bytes()
+        except OSError:
+            return None
+        expires_at = struct.unpack_from("<d", blob)[0]
+        if expires_at <= now:
+            path.unlink(missing_ok=True)
+            self._stats["expirations"] += 1
+            return None
+        try:
+            return pickle.loads(blob[8:]), expires_at, len(blob) - 8
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _disk_set(self, key: str, blob: bytes, expires_at: float) -> None:
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(struct.pack("<d", expires_at) + blob)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Cannot persist cache entry {key}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "mb": round(self._bytes / 1024 / 1024, 2),
+            "max_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "disk": str(self.disk_dir) if self.disk_dir else None,
+        }
+
+
+_memo: Optional[MemoCache] = None
+
+
+def get_memo_cache() -> MemoCache:
+    """Shared cache used by plugins with ``"memoize"`` in their plan."""
+    global _memo
+    if _memo is None:
+        _memo = MemoCache()
+    return _memo
+
+
+def configure_memo_cache(**kwargs: Any) -> MemoCache:
+    """Replace the shared cache (see ``MemoCache`` for arguments)."""
+    global _memo
+    _memo = MemoCache(**kwargs)
+    return _memo
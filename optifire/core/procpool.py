@@ -0,0 +1,278 @@
+"""
+Warm process pool for CPU-heavy plugin work.
+
+Plugins that declare ``"execution": "process"`` in ``plan()`` run their
+``compute()`` step in a shared ProcessPoolExecutor instead of on the event
+loop. Workers are started once and reused; each worker instantiates a
+plugin class the first time it sees it. Large numpy arrays in the inputs
+travel through shared memory rather than being pickled.
+"""
+import asyncio
+import importlib
+import os
+import resource
+import signal
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+from .errors import PluginError
+from .logger import logger
+
+
+# Arrays at least this large go through shared memory
+SHM_MIN_BYTES = 64 * 1024
+
+
+class _SharedArray:
+    """Picklable handle to a numpy array placed in shared memory."""
+
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name: str, shape: Tuple[int, ...], dtype: str):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    def __reduce__(self):
+        return (_SharedArray, (self.name, self.shape, self.dtype))
+
+
+def _export_arrays(
+    data: Dict[str, Any], min_bytes: int
+) -> Tuple[Dict[str, Any], List[shared_memory.SharedMemory]]:
+    """Replace large top-level arrays with shared-memory handles."""
+    exported: Dict[str, Any] = {}
+    blocks: List[shared_memory.SharedMemory] = []
+
+    # No numpy loaded means no arrays to share (and no reason to import it)
+    np = sys.modules.get("numpy")
+    if np is None:
+        return dict(data), blocks
+
+    for key, value in data.items():
+        if (
+            isinstance(value, np.ndarray)
+            and value.nbytes >= min_bytes
+            and value.dtype != object
+        ):
+            block = shared_memory.SharedMemory(create=True, size=value.nbytes)
+            np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+            blocks.append(block)
+            exported[key] = _SharedArray(block.name, value.shape, value.dtype.str)
+        else:
+            exported[key] = value
+    return exported, blocks
+
+
+# ---- worker side ------------------------------------------------------------
+
+_worker_plugins: Dict[str, Any] = {}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a parent-owned block without adopting it for cleanup."""
+    # Spawned workers share the parent's resource tracker, so the
+    # registration made by attaching is the parent's own (a set entry it
+    # removes when it unlinks the block); unregistering here would drop it
+    # early and make the parent's unlink fail in the tracker
+    return shared_memory.SharedMemory(name=name)
+
+
+def _worker_init() -> None:
+    # Ctrl-C is handled by the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    tracemalloc.start(1)
+
+
+def _cpu_ms() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return (usage.ru_utime + usage.ru_stime) * 1000
+
+
+def _worker_ping() -> int:
+    return os.getpid()
+
+
+def _worker_plugin(class_path: str) -> Any:
+    plugin = _worker_plugins.get(class_path)
+    if plugin is None:
+        module_name, _, class_name = class_path.rpartition(".")
+        cls = getattr(importlib.import_module(module_name), class_name)
+        plugin = _worker_plugins[class_path] = cls()
+    return plugin
+
+
+def _worker_compute(class_path: str, data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Run ``compute()`` for a plugin inside a pool worker."""
+    wall_start = time.perf_counter()
+    cpu_start = _cpu_ms()
+    tracemalloc.reset_peak()
+
+    attached: List[shared_memory.SharedMemory] = []
+    inputs: Dict[str, Any] = {}
+    try:
+        for key, value in data.items():
+            if isinstance(value, _SharedArray):
+                import numpy as np
+
+                block = _attach(value.name)
+                attached.append(block)
+                # Read-only view: the parent owns the block
+                array = np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=block.buf)
+                array.flags.writeable = False
+                inputs[key] = array
+            else:
+                inputs[key] = value
+
+        output = _worker_plugin(class_path).compute(inputs)
+    finally:
+        inputs.clear()
+        for block in attached:
+            block.close()
+
+    return output, {
+        "cpu_ms": _cpu_ms() - cpu_start,
+        "wall_ms": (time.perf_counter() - wall_start) * 1000,
+        "peak_mb": tracemalloc.get_traced_memory()[1] / 1024 / 1024,
+        "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "pid": os.getpid(),
+    }
+
+
+# ---- parent side ------------------------------------------------------------
+
+class PluginProcessPool:
+    """Lazily started, reusable process pool for plugin ``compute()`` calls."""
+
+    def __init__(self, max_workers: int = 2, shm_min_bytes: int = SHM_MIN_BYTES):
+        """
+        Initialize pool (workers start on first use or ``warm()``).
+
+        Args:
+            max_workers: Worker processes
+            shm_min_bytes: Arrays at least this large are passed via shared memory
+        """
+        self.max_workers = max_workers
+        self.shm_min_bytes = shm_min_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Calls still awaited per executor, so a retired one is stopped only
+        # once nobody waits on it any more
+        self._active: Dict[ProcessPoolExecutor, int] = {}
+        self._stats = {"calls": 0, "errors": 0, "restarts": 0, "shm_bytes": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process with a running event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=get_context("spawn"),
+                initializer=_worker_init,
+            )
+        return self._executor
+
+    async def warm(self) -> None:
+        """Start every worker now rather than on the first plugin run."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        pids = await asyncio.gather(
+            *(loop.run_in_executor(executor, _worker_ping) for _ in range(self.max_workers))
+        )
+        logger.info(f"Plugin process pool warm ({len(set(pids))} workers)")
+
+    async def run(self, plugin: Any, data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Run ``plugin.compute(data)`` in a worker.
+
+        Args:
+            plugin: Plugin instance (its class is re-instantiated in the worker)
+            data: Picklable inputs; large numpy arrays are shared, not copied
+
+        Returns:
+            (compute output, worker stats: cpu_ms (rusage), wall_ms, peak_mb, maxrss_mb, pid)
+
+        Raises:
+            PluginError: If the worker process died
+
+        If the call is cancelled (e.g. a plugin timeout) the worker is still
+        busy with it, so the pool is recycled: later calls go to fresh
+        workers and the old ones are terminated.
+        """
+        cls = type(plugin)
+        class_path = f"{cls.__module__}.{cls.__qualname__}"
+        exported, blocks = _export_arrays(data, self.shm_min_bytes)
+        self._stats["calls"] += 1
+        self._stats["shm_bytes"] += sum(b.size for b in blocks)
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        self._active[executor] = self._active.get(executor, 0) + 1
+        retire = False
+        try:
+            return await loop.run_in_executor(executor, _worker_compute, class_path, exported)
+        except asyncio.CancelledError:
+            retire = True
+            raise
+        except BrokenProcessPool as e:
+            self._stats["errors"] += 1
+            retire = True
+            raise PluginError(f"Process pool worker died running {class_path}") from e
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._release(executor, retire)
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def _release(self, executor: ProcessPoolExecutor, retire: bool) -> None:
+        """End one call on ``executor``; ``retire`` replaces it (recreated on next use)."""
+        self._active[executor] -= 1
+        if retire and executor is self._executor:
+            self._executor = None
+            self._stats["restarts"] += 1
+        if executor is not self._executor and not self._active[executor]:
+            del self._active[executor]
+            _terminate(executor)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop all workers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool counters."""
+        return {**self._stats, "max_workers": self.max_workers, "started": self._executor is not None}
+
+
+def _terminate(executor: ProcessPoolExecutor) -> None:
+    """Stop an executor's workers, including any still running a cancelled call."""
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[PluginProcessPool] = None
+
+
+def get_process_pool() -> PluginProcessPool:
+    """Shared pool used by ``execution: process`` plugins."""
+    global _pool
+    if _pool is None:
+        _pool = PluginProcessPool()
+    return _pool
+
+
+def configure_process_pool(max_workers: int, shm_min_bytes: int = SHM_MIN_BYTES) -> PluginProcessPool:
+    """Replace the shared pool (call before any plugin runs)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+    _pool = PluginProcessPool(max_workers=max_workers, shm_min_bytes=shm_min_bytes)
+    return _pool
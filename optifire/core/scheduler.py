@@ -50,7 +50,8 @@ class Scheduler:
 
         Args:
             plugin_id: Plugin identifier
-            schedule: Schedule string (cron, @idle, @open, @close, interval_Xs)
+            schedule: Schedule string (cron, interval_Xs, @idle, @open, @close,
+                @hourly, @daily, @eod, @pre_earnings, @weekly, @monthly, @quarterly)
             func: Function to execute
             *args: Function arguments
             **kwargs: Function keyword arguments
@@ -122,6 +123,56 @@ class Scheduler:
                 timezone="America/New_York",
             )
 
+        elif schedule == "@hourly":
+            return CronTrigger(minute=0)
+
+        elif schedule == "@daily":
+            # After the close, once bars are final
+            return CronTrigger(
+                day_of_week="mon-fri",
+                hour=16,
+                minute=15,
+                timezone="America/New_York",
+            )
+
+        elif schedule == "@eod":
+            # Just before the close, while orders can still be placed
+            return CronTrigger(
+                day_of_week="mon-fri",
+                hour=15,
+                minute=45,
+                timezone="America/New_York",
+            )
+
+        elif schedule == "@pre_earnings":
+            # Afternoon before next-day earnings (see earnings_calendar)
+            return CronTrigger(
+                day_of_week="mon-fri",
+                hour=15,
+                minute=30,
+                timezone="America/New_York",
+            )
+
+        elif schedule == "@weekly":
+            return CronTrigger(
+                day_of_week="sat",
+                hour=6,
+                minute=0,
+                timezone="America/New_York",
+            )
+
+        elif schedule == "@monthly":
+            return CronTrigger(day=1, hour=6, minute=0, timezone="America/New_York")
+
+        elif schedule == "@quarterly":
+            return CronTrigger(
+                month="1,4,7,10",
+                day=1,
+                hour=6,
+                minute=0,
+                timezone="America/New_York",
+            )
+
         elif schedule.startswith("interval_"):
             # Interval trigger: interval_30s, interval_5m, interval_1h
             value, unit = schedule[9:-1], schedule[-1]
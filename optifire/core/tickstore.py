@@ -0,0 +1,222 @@
+"""
+Process-wide tick and bar store shared by microstructure plugins.
+
+Each (symbol, kind) is an append-only ``Tape`` backed by a structured numpy
+array. Rows below the published length are never written again, and the
+(array, length) pair is published as one tuple, so a reader takes a
+consistent snapshot with a single attribute read and no lock:
+
+    trades = get_tick_store().trades("SPY")     # TapeSnapshot, no copy
+    recent = trades.last(5000)                  # still a view
+    window = trades.between(t0_ns, t1_ns)       # binary search, a view
+    recent["price"], recent["size"]             # column views
+
+When a tape outgrows its array, the newest rows move to a larger one (or,
+past ``max_rows``, the newest half is kept); snapshots already handed out
+keep the old array alive and stay valid. Writers serialise on a per-tape
+lock; readers never take it.
+"""
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+TRADE_DTYPE = np.dtype([
+    ("t", "i8"),  # Epoch ns
+    ("price", "f8"),
+    ("size", "f8"),
+    ("off_exchange", "?"),  # Reported to a TRF (dark pool / internalised)
+])
+QUOTE_DTYPE = np.dtype([
+    ("t", "i8"),
+    ("bid", "f8"),
+    ("ask", "f8"),
+    ("bid_size", "f8"),
+    ("ask_size", "f8"),
+])
+BAR_DTYPE = np.dtype([
+    ("t", "i8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+DTYPES = {"trade": TRADE_DTYPE, "quote": QUOTE_DTYPE, "bar": BAR_DTYPE}
+
+
+class TapeSnapshot:
+    """Read-only, zero-copy view of a tape at one point in time."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: np.ndarray):
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.rows[field]
+
+    @property
+    def nbytes(self) -> int:
+        return self.rows.nbytes
+
+    def last(self, n: int) -> "TapeSnapshot":
+        """Newest ``n`` rows."""
+        return TapeSnapshot(self.rows[max(len(self.rows) - n, 0):])
+
+    def between(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> "TapeSnapshot":
+        """Rows with start_ns <= t < end_ns (either bound optional)."""
+        t = self.rows["t"]
+        lo = 0 if start_ns is None else int(np.searchsorted(t, start_ns, "left"))
+        hi = len(t) if end_ns is None else int(np.searchsorted(t, end_ns, "left"))
+        return TapeSnapshot(self.rows[lo:hi])
+
+    def latest(self) -> Optional[np.void]:
+        """Newest row (None if empty)."""
+        return self.rows[-1] if len(self.rows) else None
+
+
+class Tape:
+    """Append-only structured array with lock-free consistent snapshots."""
+
+    def __init__(self, dtype: np.dtype, capacity: int = 1024, max_rows: int = 1_000_000):
+        """
+        Initialize tape.
+
+        Args:
+            dtype: Row dtype (first field "t", epoch ns, non-decreasing)
+            capacity: Initial rows allocated
+            max_rows: Retention; past it the oldest half is dropped
+        """
+        self.dtype = dtype
+        self.max_rows = max(max_rows, 2)
+        self._state: Tuple[np.ndarray, int] = (np.empty(min(capacity, self.max_rows), dtype), 0)
+        self._write_lock = threading.Lock()
+        self.appended = 0  # Rows ever appended
+        self.dropped = 0  # Rows removed by retention
+
+    def __len__(self) -> int:
+        return self._state[1]
+
+    def snapshot(self) -> TapeSnapshot:
+        """Current rows as a read-only view (one atomic read, no copy)."""
+        rows, n = self._state
+        view = rows[:n]
+        view.flags.writeable = False
+        return TapeSnapshot(view)
+
+    def append(self, row: tuple) -> None:
+        """Append one row (a tuple in dtype field order)."""
+        with self._write_lock:
+            rows, n = self._reserve(1)
+            rows[n] = row
+            self._state = (rows, n + 1)
+            self.appended += 1
+
+    def extend(self, rows_in: np.ndarray) -> None:
+        """Append many rows (array of this dtype, time-ordered)."""
+        rows_in = np.asarray(rows_in, dtype=self.dtype)
+        if not len(rows_in):
+            return
+        with self._write_lock:
+            self.appended += len(rows_in)
+            if len(rows_in) > self.max_rows:
+                self.dropped += len(rows_in) - self.max_rows
+                rows_in = rows_in[-self.max_rows:]
+            rows, n = self._reserve(len(rows_in))
+            rows[n:n + len(rows_in)] = rows_in
+            self._state = (rows, n + len(rows_in))
+
+    def _reserve(self, extra: int) -> Tuple[np.ndarray, int]:
+        """
+        Array with room for ``extra`` more rows. Never writes into the
+        published prefix: growth and retention copy into a new array.
+        """
+        rows, n = self._state
+        if n + extra <= len(rows):
+            return rows, n
+
+        keep = n
+        if n + extra > self.max_rows:
+            keep = max(min(n, self.max_rows // 2, self.max_rows - extra), 0)
+        capacity = min(max(2 * len(rows), keep + extra), self.max_rows)
+        grown = np.empty(capacity, self.dtype)
+        grown[:keep] = rows[n - keep:n]
+        self.dropped += n - keep
+        self._state = (grown, keep)
+        return grown, keep
+
+
+class TickStore:
+    """Tapes per (kind, symbol): trades, quotes and bars."""
+
+    def __init__(self, max_rows: int = 1_000_000):
+        """
+        Initialize store.
+
+        Args:
+            max_rows: Retention per tape (rows)
+        """
+        self.max_rows = max_rows
+        self._tapes: Dict[Tuple[str, str], Tape] = {}
+        self._lock = threading.Lock()
+
+    def tape(self, kind: str, symbol: str) -> Tape:
+        """Tape of a symbol ("trade", "quote" or "bar"), created on first use."""
+        key = (kind, symbol.upper())
+        tape = self._tapes.get(key)
+        if tape is None:
+            with self._lock:
+                tape = self._tapes.get(key)
+                if tape is None:
+                    tape = self._tapes[key] = Tape(DTYPES[kind], max_rows=self.max_rows)
+        return tape
+
+    def trades(self, symbol: str) -> TapeSnapshot:
+        return self.tape("trade", symbol).snapshot()
+
+    def quotes(self, symbol: str) -> TapeSnapshot:
+        return self.tape("quote", symbol).snapshot()
+
+    def bars(self, symbol: str) -> TapeSnapshot:
+        return self.tape("bar", symbol).snapshot()
+
+    def symbols(self, kind: Optional[str] = None) -> Iterable[str]:
+        """Symbols with at least one row (of ``kind`` if given)."""
+        return sorted({s for (k, s), tape in list(self._tapes.items()) if len(tape) and kind in (None, k)})
+
+    def clear(self) -> None:
+        """Drop all tapes (snapshots already taken stay valid)."""
+        with self._lock:
+            self._tapes = {}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Tape count, rows held, bytes allocated and rows dropped by retention."""
+        tapes = list(self._tapes.values())
+        return {
+            "tapes": len(tapes),
+            "rows": sum(len(t) for t in tapes),
+            "mb": round(sum(t._state[0].nbytes for t in tapes) / 1024 / 1024, 2),
+            "dropped": sum(t.dropped for t in tapes),
+        }
+
+
+_store: Optional[TickStore] = None
+
+
+def get_tick_store() -> TickStore:
+    """Shared store fed by the market stream and read by plugins."""
+    global _store
+    if _store is None:
+        _store = TickStore()
+    return _store
+
+
+def configure_tick_store(**kwargs) -> TickStore:
+    """Replace the shared store (see ``TickStore`` for arguments)."""
+    global _store
+    _store = TickStore(**kwargs)
+    return _store
@@ -0,0 +1,379 @@
+"""
+Event- and calendar-triggered plugin scheduling.
+
+Plugins declare when they should run through ``plan()``:
+
+    {"schedule": "@continuous", "triggers": ["vix_update"], ...}
+
+The trigger engine turns every schedule token and trigger name into either
+a bus subscription (``@continuous``, ``@signal``, ``@trade``, ``@event``,
+``@prediction`` and plain event names, mapped onto topics that are actually
+published) or a calendar job on the Scheduler (``@daily``, ``@weekly``,
+``@news``, ``market_close``, ``every_5min``, cron, ...). Bursts of triggering events are debounced and coalesced, so a plugin
+runs once per burst instead of once per event, and never overlaps itself.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .bus import Event, EventBus, compile_topic_pattern
+from .errors import ConfigError
+from .logger import logger
+from .scheduler import Scheduler
+
+
+# Event-driven schedule tokens -> default bus topics (plan triggers are added)
+EVENT_SCHEDULES: Dict[str, List[str]] = {
+    "@continuous": ["market.bar.#", "market.trade.#"],
+    "@signal": ["new_signal"],
+    "@trade": ["order_submitted", "order_canceled"],
+    "@prediction": ["new_signal"],
+    "@event": [],
+}
+
+# Trigger names used by plugin plans -> the published topic that carries them
+TOPIC_ALIASES: Dict[str, str] = {
+    "market_data": "market.bar.#",
+    "data_update": "market.bar.#",
+    "new_data": "market.bar.#",
+    "data_ingest": "market.bar.#",
+    "tick": "market.trade.#",
+    "tick_data": "market.trade.#",
+    "signal_generated": "new_signal",
+    "prediction": "new_signal",
+    "prediction_ready": "new_signal",
+    "model_prediction": "new_signal",
+    # Fills are not streamed; the order lifecycle events are the closest signal
+    "order_filled": "order_submitted",
+    "new_order": "order_submitted",
+    "order_received": "order_submitted",
+    "pre_trade": "order_submitted",
+    "transaction": "order_submitted",
+    "trade_close": "order_submitted",
+    "position_update": "order_submitted",
+    "config_change": "config_updated",
+    "log_level_change": "config_updated",
+    "vix_update": "vix_regime_update",
+}
+
+# Topics that something publishes on the server bus: the market stream
+# ("market.<kind>.<SYMBOL>"), the API, the runner and plugins
+PUBLISHED_TOPICS = (
+    "market.bar.#",
+    "market.trade.#",
+    "market.quote.#",
+    "order_submitted",
+    "order_canceled",
+    "new_signal",
+    "config_updated",
+    "config_rollback",
+    "flag_toggled",
+    "heartbeat",
+    "dag_cycle_complete",
+    "vix_regime_update",
+)
+
+# Trigger names that describe time rather than an event -> Scheduler schedule
+CALENDAR_TRIGGERS: Dict[str, Optional[str]] = {
+    "market_open": "@open",
+    "market_close": "@close",
+    "every_minute": "interval_1m",
+    "every_1min": "interval_1m",
+    "every_5min": "interval_5m",
+    "every_15min": "interval_15m",
+    "weekend": "@weekly",
+    "month_end": "@monthly",
+    # News is polled over REST, not pushed
+    "@news": "interval_15m",
+    "news_update": "interval_15m",
+    "new_news": "interval_15m",
+    # Scheduled releases are checked once a day
+    "economic_release": "@daily",
+    "fomc_release": "@daily",
+    "earnings_tomorrow": "@daily",
+    "filing_date": "@daily",
+    "scheduled": None,  # Covered by the plugin's own schedule
+}
+
+# Tokens that never run automatically
+MANUAL_SCHEDULES = ("@manual", None, "")
+
+
+def resolve_plan(plan: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Split a plugin plan into calendar schedules and bus topics.
+
+    Args:
+        plan: Plugin plan with "schedule" and optional "triggers"
+
+    Returns:
+        (calendar schedules for Scheduler, bus topics to subscribe to)
+    """
+    calendar: List[str] = []
+    topics: List[str] = []
+
+    tokens = [plan.get("schedule")] + list(plan.get("triggers") or [])
+    for token in tokens:
+        if token in MANUAL_SCHEDULES:
+            continue
+        if token in EVENT_SCHEDULES:
+            topics.extend(EVENT_SCHEDULES[token])
+        elif token in CALENDAR_TRIGGERS:
+            if CALENDAR_TRIGGERS[token]:
+                calendar.append(CALENDAR_TRIGGERS[token])
+        elif token.startswith(("@", "interval_")) or " " in token:
+            calendar.append(token)
+        else:
+            topics.append(TOPIC_ALIASES.get(token, token))
+
+    topics = list(dict.fromkeys(topics))
+    for topic in topics:
+        if not has_publisher(topic):
+            logger.warning(f"Trigger topic {topic!r} has no known publisher; it will never fire")
+    return list(dict.fromkeys(calendar)), topics
+
+
+def has_publisher(topic: str) -> bool:
+    """Whether a subscription topic (or pattern) is covered by ``PUBLISHED_TOPICS``."""
+    return any(
+        topic == published or compile_topic_pattern(published).fullmatch(topic)
+        for published in PUBLISHED_TOPICS
+    )
+
+
+@dataclass
+class _TriggerState:
+    """Per-plugin trigger bookkeeping."""
+
+    func: Callable
+    args: Tuple
+    kwargs: Dict[str, Any]
+    calendar: List[str]
+    topics: List[str]
+    handler: Optional[Callable] = None
+    pending: int = 0
+    first_pending_at: Optional[float] = None
+    last_event: Optional[Event] = None
+    timer: Optional[asyncio.TimerHandle] = None
+    task: Optional[asyncio.Task] = None
+    runs: int = 0
+    triggers_received: int = 0
+    errors: int = 0
+    last_run_ms: float = 0.0
+    reasons: Dict[str, int] = field(default_factory=dict)
+
+
+class TriggerEngine:
+    """
+    Maps plugin plans to bus subscriptions and calendar jobs.
+
+    Each trigger (event or calendar fire) marks the plugin pending. The run
+    starts once no new trigger arrived for ``debounce_s`` seconds, or at the
+    latest ``max_delay_s`` after the first pending trigger, so a continuous
+    stream still produces regular runs. Triggers that arrive while the
+    plugin is running are coalesced into a single follow-up run.
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        scheduler: Optional[Scheduler] = None,
+        debounce_s: float = 0.5,
+        max_delay_s: float = 5.0,
+    ):
+        """
+        Initialize trigger engine.
+
+        Args:
+            bus: Event bus to subscribe on
+            scheduler: Scheduler for calendar triggers (None = events only)
+            debounce_s: Quiet period before a pending plugin runs
+            max_delay_s: Upper bound on how long a trigger can wait
+        """
+        self.bus = bus
+        self.scheduler = scheduler
+        self.debounce_s = debounce_s
+        self.max_delay_s = max_delay_s
+        self._states: Dict[str, _TriggerState] = {}
+
+    async def register(
+        self,
+        plugin_id: str,
+        plan: Dict[str, Any],
+        func: Callable,
+        *args,
+        **kwargs,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Register a plugin's plan.
+
+        Args:
+            plugin_id: Plugin identifier
+            plan: Plugin plan ("schedule", "triggers")
+            func: Coroutine function to run
+            *args: Function arguments
+            **kwargs: Function keyword arguments
+
+        Returns:
+            (calendar schedules, bus topics) the plugin was bound to
+
+        Raises:
+            ConfigError: If a calendar schedule cannot be parsed
+        """
+        if plugin_id in self._states:
+            await self.unregister(plugin_id)
+
+        calendar, topics = resolve_plan(plan)
+        if calendar and self.scheduler is None:
+            raise ConfigError(f"{plugin_id} needs a scheduler for {calendar}")
+
+        state = _TriggerState(
+            func=func, args=args, kwargs=kwargs, calendar=calendar, topics=topics
+        )
+        self._states[plugin_id] = state
+
+        try:
+            for schedule in calendar:
+                self.scheduler.schedule_plugin(
+                    self._job_id(plugin_id, schedule),
+                    schedule,
+                    self._fire_scheduled,
+                    plugin_id,
+                    schedule,
+                )
+        except ConfigError:
+            await self.unregister(plugin_id)
+            raise
+
+        if topics:
+            def on_trigger_event(event: Event) -> None:
+                # A plugin's own output never re-triggers it
+                if event.source != plugin_id:
+                    self.fire(plugin_id, event.type, event)
+
+            state.handler = on_trigger_event
+            for topic in topics:
+                await self.bus.subscribe(topic, on_trigger_event)
+
+        logger.info(
+            f"Triggers for {plugin_id}: calendar={calendar or '-'} events={topics or '-'}"
+        )
+        return calendar, topics
+
+    async def unregister(self, plugin_id: str) -> None:
+        """Remove all triggers of a plugin and cancel any pending run."""
+        state = self._states.pop(plugin_id, None)
+        if not state:
+            return
+
+        if state.timer:
+            state.timer.cancel()
+        for schedule in state.calendar:
+            self.scheduler.unschedule_plugin(self._job_id(plugin_id, schedule))
+        if state.handler:
+            for topic in state.topics:
+                await self.bus.unsubscribe(topic, state.handler)
+
+    async def stop(self) -> None:
+        """Unregister everything and wait for in-flight runs."""
+        tasks = [s.task for s in self._states.values() if s.task and not s.task.done()]
+        for plugin_id in list(self._states):
+            await self.unregister(plugin_id)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def fire(self, plugin_id: str, reason: str = "manual", event: Optional[Event] = None) -> None:
+        """
+        Record a trigger for a plugin (debounced).
+
+        Args:
+            plugin_id: Plugin identifier
+            reason: Event type or schedule that fired
+            event: Triggering event, if any
+        """
+        state = self._states.get(plugin_id)
+        if state is None:
+            return
+
+        now = time.monotonic()
+        state.pending += 1
+        state.triggers_received += 1
+        state.reasons[reason] = state.reasons.get(reason, 0) + 1
+        if event is not None:
+            state.last_event = event
+        if state.first_pending_at is None:
+            state.first_pending_at = now
+
+        # A running plugin picks up pending triggers when it finishes
+        if state.task and not state.task.done():
+            return
+        self._arm(plugin_id, state, now)
+
+    async def _fire_scheduled(self, plugin_id: str, schedule: str) -> None:
+        # Coroutine so APScheduler runs it on the event loop, not a thread
+        self.fire(plugin_id, schedule)
+
+    def _arm(self, plugin_id: str, state: _TriggerState, now: float) -> None:
+        """(Re)start the debounce timer, capped by max_delay_s."""
+        if state.timer:
+            state.timer.cancel()
+        deadline = state.first_pending_at + self.max_delay_s
+        delay = max(0.0, min(self.debounce_s, deadline - now))
+        state.timer = asyncio.get_running_loop().call_later(
+            delay, self._launch, plugin_id
+        )
+
+    def _launch(self, plugin_id: str) -> None:
+        state = self._states.get(plugin_id)
+        if state is None or state.pending == 0:
+            return
+        state.timer = None
+        state.task = asyncio.create_task(self._run(plugin_id, state))
+
+    async def _run(self, plugin_id: str, state: _TriggerState) -> None:
+        """Run the plugin once for everything pending so far."""
+        coalesced = state.pending
+        state.pending = 0
+        state.first_pending_at = None
+        start = time.perf_counter()
+
+        try:
+            await state.func(*state.args, **state.kwargs)
+        except Exception as e:
+            state.errors += 1
+            logger.error(f"Triggered run of {plugin_id} failed: {e}", exc_info=True)
+        finally:
+            state.runs += 1
+            state.last_run_ms = (time.perf_counter() - start) * 1000
+            logger.debug(
+                f"Ran {plugin_id} for {coalesced} trigger(s) in {state.last_run_ms:.0f}ms"
+            )
+
+        if state.pending and self._states.get(plugin_id) is state:
+            state.first_pending_at = time.monotonic()
+            self._arm(plugin_id, state, state.first_pending_at)
+
+    def get_last_event(self, plugin_id: str) -> Optional[Event]:
+        """Most recent event that triggered a plugin."""
+        state = self._states.get(plugin_id)
+        return state.last_event if state else None
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-plugin trigger statistics."""
+        return {
+            plugin_id: {
+                "calendar": state.calendar,
+                "events": state.topics,
+                "runs": state.runs,
+                "triggers_received": state.triggers_received,
+                "coalesced": max(0, state.triggers_received - state.runs - state.pending),
+                "pending": state.pending,
+                "errors": state.errors,
+                "last_run_ms": round(state.last_run_ms, 1),
+            }
+            for plugin_id, state in self._states.items()
+        }
+
+    @staticmethod
+    def _job_id(plugin_id: str, schedule: str) -> str:
+        return f"{plugin_id}:{schedule}"
@@ -0,0 +1,152 @@
+"""
+Per-run CPU and memory accounting for plugins.
+
+Plugins share one event-loop thread, so process-wide counters (RSS, wall
+time) say nothing about a single run. ``UsageMeter`` wraps a plugin
+coroutine and measures only the steps that coroutine itself executes:
+
+    - CPU: ``time.thread_time()`` around every step on the loop thread
+    - memory: tracemalloc allocations made during those steps (live bytes
+      carried between steps plus the peak within each step)
+
+Work offloaded to the process pool reports its own rusage CPU time and
+tracemalloc peak, which ``record_offload`` adds to the current run.
+"""
+import asyncio
+import contextvars
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Awaitable, Generator, Optional
+
+from .errors import ResourceBudgetExceeded
+
+
+@dataclass
+class RunUsage:
+    """Resources used by one plugin run."""
+
+    cpu_ms: float = 0.0
+    peak_mb: float = 0.0
+    offload_cpu_ms: float = 0.0
+    offload_peak_mb: float = 0.0
+
+    @property
+    def total_cpu_ms(self) -> float:
+        return self.cpu_ms + self.offload_cpu_ms
+
+    @property
+    def total_peak_mb(self) -> float:
+        return max(self.peak_mb, self.offload_peak_mb)
+
+
+_current_usage: contextvars.ContextVar[Optional[RunUsage]] = contextvars.ContextVar(
+    "plugin_run_usage", default=None
+)
+
+
+def record_offload(cpu_ms: float, peak_mb: float) -> None:
+    """Charge work done in another process to the current plugin run."""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.offload_cpu_ms += cpu_ms
+        usage.offload_peak_mb = max(usage.offload_peak_mb, peak_mb)
+
+
+def start_memory_tracing(frames: int = 1) -> None:
+    """Enable tracemalloc (needed for per-run memory figures)."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+class UsageMeter:
+    """
+    Awaitable wrapper that meters a coroutine step by step.
+
+    Between steps the run is checked against hard limits; a run over its
+    limit is cancelled at its next suspension point and the meter raises
+    ResourceBudgetExceeded.
+    """
+
+    def __init__(
+        self,
+        coro: Awaitable[Any],
+        cpu_limit_ms: Optional[float] = None,
+        mem_limit_mb: Optional[float] = None,
+    ):
+        """
+        Initialize meter.
+
+        Args:
+            coro: Coroutine to run
+            cpu_limit_ms: Cancel the run once it has used this much CPU
+            mem_limit_mb: Cancel the run once its peak allocation passes this
+        """
+        self._coro = coro
+        self.cpu_limit_ms = cpu_limit_ms
+        self.mem_limit_mb = mem_limit_mb
+        self.usage = RunUsage()
+        self.exceeded: Optional[str] = None
+        self._live_bytes = 0
+        self._peak_bytes = 0
+
+    def _check(self) -> None:
+        usage = self.usage
+        if self.cpu_limit_ms is not None and usage.total_cpu_ms > self.cpu_limit_ms:
+            self.exceeded = f"CPU {usage.total_cpu_ms:.0f}ms > limit {self.cpu_limit_ms:.0f}ms"
+        elif self.mem_limit_mb is not None and usage.total_peak_mb > self.mem_limit_mb:
+            self.exceeded = f"memory {usage.total_peak_mb:.1f}MB > limit {self.mem_limit_mb:.0f}MB"
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        token = _current_usage.set(self.usage)
+        try:
+            return (yield from self._drive())
+        finally:
+            _current_usage.reset(token)
+
+    def _drive(self) -> Generator[Any, Any, Any]:
+        gen = self._coro.__await__()
+        send: Any = None
+        error: Optional[BaseException] = None
+        tracing = tracemalloc.is_tracing()
+
+        while True:
+            if tracing:
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+            cpu_start = time.thread_time()
+            try:
+                if error is not None:
+                    yielded = gen.throw(error)
+                else:
+                    yielded = gen.send(send)
+                finished, result = False, yielded
+            except StopIteration as stop:
+                finished, result = True, stop.value
+            except asyncio.CancelledError:
+                if self.exceeded:
+                    raise ResourceBudgetExceeded(self.exceeded) from None
+                raise
+            finally:
+                self.usage.cpu_ms += (time.thread_time() - cpu_start) * 1000
+                if tracing:
+                    current, peak = tracemalloc.get_traced_memory()
+                    self._peak_bytes = max(self._peak_bytes, self._live_bytes + peak - before)
+                    self._live_bytes = max(0, self._live_bytes + current - before)
+                    self.usage.peak_mb = self._peak_bytes / 1024 / 1024
+
+            if finished:
+                if self.exceeded:
+                    raise ResourceBudgetExceeded(self.exceeded)
+                return result
+
+            if self.exceeded is None:
+                self._check()
+                if self.exceeded:
+                    # Let the plugin unwind at its current await
+                    asyncio.current_task().cancel()
+
+            try:
+                send, error = (yield result), None
+            except BaseException as e:
+                send, error = None, e
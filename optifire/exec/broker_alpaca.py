@@ -1,8 +1,17 @@
 """
 Alpaca broker integration.
+
+All requests go through one long-lived ``httpx.AsyncClient`` whose pool
+keeps connections alive between calls, so the position/index loops and the
+SSE stream do not pay a TCP+TLS handshake per request. Call ``close()`` (or
+use the broker as an async context manager) on shutdown.
 """
+import asyncio
+import importlib.util
 import os
-from typing import Dict, List, Optional
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
 import httpx
 from datetime import datetime
 
@@ -10,17 +19,72 @@ from optifire.core.logger import logger
 from optifire.core.errors import ExecutionError
 
 
+class EndpointLatency:
+    """Request count, errors and recent latency samples per endpoint."""
+
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+
+    def record(self, endpoint: str, latency_ms: float, error: bool = False) -> None:
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            samples = self._samples[endpoint] = deque(maxlen=self.window)
+        samples.append(latency_ms)
+        self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+        if error:
+            self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """endpoint -> count, errors, mean/p50/p95/max latency (recent window)."""
+        stats = {}
+        for endpoint, samples in sorted(self._samples.items()):
+            ordered = sorted(samples)
+            stats[endpoint] = {
+                "count": self._counts[endpoint],
+                "errors": self._errors.get(endpoint, 0),
+                "mean_ms": round(sum(ordered) / len(ordered), 2),
+                "p50_ms": round(ordered[len(ordered) // 2], 2),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+                "max_ms": round(ordered[-1], 2),
+            }
+        return stats
+
+
 class AlpacaBroker:
     """
     Alpaca API client for paper/live trading.
     """
 
-    def __init__(self, paper: bool = True):
+    def __init__(
+        self,
+        paper: bool = True,
+        max_connections: int = 10,
+        max_keepalive: int = 5,
+        keepalive_s: float = 30.0,
+        http2: bool = False,
+        timeout_s: float = 10.0,
+        max_concurrency: int = 4,
+        symbols_per_request: int = 100,
+        base_url: Optional[str] = None,
+        data_url: Optional[str] = None,
+    ):
         """
         Initialize Alpaca broker.
 
         Args:
             paper: Use paper trading endpoint
+            max_connections: Connection pool size
+            max_keepalive: Idle connections kept open
+            keepalive_s: Close idle connections after this long
+            http2: Use HTTP/2 (requires the h2 package)
+            timeout_s: Request timeout
+            max_concurrency: Parallel requests when a multi-symbol call is split
+            symbols_per_request: Symbols per multi-symbol data request
+            base_url: Override the trading API endpoint (e.g. a local stand-in)
+            data_url: Override the market data API endpoint
         """
         self.api_key = os.getenv("ALPACA_API_KEY")
         self.api_secret = os.getenv("ALPACA_API_SECRET")
@@ -29,53 +93,107 @@ class AlpacaBroker:
             logger.warning("Alpaca credentials not found in environment")
 
         # Trading API endpoint
-        self.base_url = (
+        self.base_url = base_url or (
             "https://paper-api.alpaca.markets"
             if paper
             else "https://api.alpaca.markets"
         )
 
         # Market data API endpoint (same for paper and live)
-        self.data_url = "https://data.alpaca.markets"
+        self.data_url = data_url or "https://data.alpaca.markets"
 
         self.headers = {
             "APCA-API-KEY-ID": self.api_key or "",
             "APCA-API-SECRET-KEY": self.api_secret or "",
         }
 
-    async def get_account(self) -> Dict:
-        """Get account information."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/v2/account",
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.timeout_s = timeout_s
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_s,
+        )
+        self.symbols_per_request = symbols_per_request
+        self._fanout = asyncio.Semaphore(max_concurrency)
+        self.latency = EndpointLatency()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled client (created on first use, and again after close())."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
                 headers=self.headers,
-                timeout=10.0,
+                limits=self.limits,
+                timeout=self.timeout_s,
+                http2=self.http2,
             )
-            response.raise_for_status()
-            return response.json()
+        return self._client
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AlpacaBroker":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _request(self, method: str, url: str, endpoint: str, **kwargs) -> httpx.Response:
+        """
+        Send a request on the pooled client and record its latency.
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            endpoint: Label for latency stats (path template, e.g. /v2/orders/{id})
+        """
+        start = time.perf_counter()
+        error = True
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            error = response.is_error
+            return response
+        finally:
+            self.latency.record(f"{method} {endpoint}", (time.perf_counter() - start) * 1000, error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-endpoint latency and pool settings."""
+        return {
+            "endpoints": self.latency.get_stats(),
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "keepalive_s": self.limits.keepalive_expiry,
+        }
+
+    async def get_account(self) -> Dict:
+        """Get account information."""
+        response = await self._request("GET", f"{self.base_url}/v2/account", "/v2/account")
+        response.raise_for_status()
+        return response.json()
 
     async def get_positions(self) -> List[Dict]:
         """Get all positions."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/v2/positions",
-                headers=self.headers,
-                timeout=10.0,
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("GET", f"{self.base_url}/v2/positions", "/v2/positions")
+        response.raise_for_status()
+        return response.json()
 
     async def get_position(self, symbol: str) -> Optional[Dict]:
         """Get position for a symbol."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v2/positions/{symbol}",
-                    headers=self.headers,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._request(
+                "GET", f"{self.base_url}/v2/positions/{symbol}", "/v2/positions/{symbol}"
+            )
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 return None
@@ -128,53 +246,43 @@ class AlpacaBroker:
         if stop_price is not None:
             payload["stop_price"] = stop_price
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/v2/orders",
-                headers=self.headers,
-                json=payload,
-                timeout=10.0,
-            )
+        response = await self._request(
+            "POST", f"{self.base_url}/v2/orders", "/v2/orders", json=payload
+        )
 
-            # Better error handling
-            if response.status_code != 200:
-                error_detail = response.text
-                try:
-                    error_json = response.json()
-                    error_msg = error_json.get('message', error_detail)
-                except:
-                    error_msg = error_detail
+        # Better error handling
+        if response.status_code != 200:
+            error_detail = response.text
+            try:
+                error_json = response.json()
+                error_msg = error_json.get('message', error_detail)
+            except:
+                error_msg = error_detail
 
-                logger.error(f"Order failed: {error_msg}")
-                raise ExecutionError(f"Alpaca order failed: {error_msg}")
+            logger.error(f"Order failed: {error_msg}")
+            raise ExecutionError(f"Alpaca order failed: {error_msg}")
 
-            order = response.json()
+        order = response.json()
 
         logger.info(f"Order submitted: {symbol} {side} {qty or notional} - {order['id']}")
         return order
 
     async def cancel_order(self, order_id: str) -> None:
         """Cancel an order."""
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.base_url}/v2/orders/{order_id}",
-                headers=self.headers,
-                timeout=10.0,
-            )
-            response.raise_for_status()
+        response = await self._request(
+            "DELETE", f"{self.base_url}/v2/orders/{order_id}", "/v2/orders/{id}"
+        )
+        response.raise_for_status()
 
         logger.info(f"Order canceled: {order_id}")
 
     async def get_order(self, order_id: str) -> Dict:
         """Get order status."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/v2/orders/{order_id}",
-                headers=self.headers,
-                timeout=10.0,
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request(
+            "GET", f"{self.base_url}/v2/orders/{order_id}", "/v2/orders/{id}"
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_bars(
         self,
@@ -194,29 +302,27 @@ class AlpacaBroker:
         if end:
             params["end"] = end
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.data_url}/v2/stocks/{symbol}/bars",
-                headers=self.headers,
-                params=params,
-                timeout=10.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("bars", [])
+        response = await self._request(
+            "GET",
+            f"{self.data_url}/v2/stocks/{symbol}/bars",
+            "/v2/stocks/{symbol}/bars",
+            params=params,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data.get("bars", [])
 
     async def get_latest_trade(self, symbol: str) -> Dict:
         """Get latest trade."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.data_url}/v2/stocks/{symbol}/trades/latest",
-                    headers=self.headers,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("trade", {})
+            response = await self._request(
+                "GET",
+                f"{self.data_url}/v2/stocks/{symbol}/trades/latest",
+                "/v2/stocks/{symbol}/trades/latest",
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data.get("trade", {})
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 logger.warning(f"Trade data not available for {symbol} (market may be closed)")
@@ -236,15 +342,14 @@ class AlpacaBroker:
             }
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.data_url}/v2/stocks/{symbol}/quotes/latest",
-                    headers=self.headers,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("quote", {})
+            response = await self._request(
+                "GET",
+                f"{self.data_url}/v2/stocks/{symbol}/quotes/latest",
+                "/v2/stocks/{symbol}/quotes/latest",
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data.get("quote", {})
         except httpx.HTTPStatusError as e:
             # Fallback to latest trade if quote not available (e.g., for ETFs)
             if e.response.status_code == 404:
@@ -259,3 +364,113 @@ class AlpacaBroker:
                     "bs": trade.get("s", 0),
                 }
             raise
+
+    # ---- multi-symbol market data -------------------------------------------
+
+    def _chunks(self, symbols: Sequence[str]) -> List[List[str]]:
+        unique = list(dict.fromkeys(s.upper() for s in symbols))
+        size = self.symbols_per_request
+        return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+    async def _get_data_pages(self, path: str, params: Dict[str, Any]) -> List[Dict]:
+        """GET a data endpoint, following next_page_token; one request at a time per chain."""
+        pages = []
+        params = dict(params)
+        while True:
+            async with self._fanout:
+                response = await self._request("GET", f"{self.data_url}{path}", path, params=params)
+            response.raise_for_status()
+            page = response.json()
+            pages.append(page)
+            token = page.get("next_page_token")
+            if not token:
+                return pages
+            params["page_token"] = token
+
+    async def _fan_out(self, path: str, key: str, symbols: Sequence[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        """Query a multi-symbol endpoint in symbol chunks, concurrently; merge ``key`` maps."""
+        chunks = self._chunks(symbols)
+        results = await asyncio.gather(*(
+            self._get_data_pages(path, {**params, "symbols": ",".join(chunk)})
+            for chunk in chunks
+        ))
+        merged: Dict[str, Any] = {}
+        for pages in results:
+            for page in pages:
+                for symbol, value in (page.get(key) or {}).items():
+                    if isinstance(value, list):
+                        merged.setdefault(symbol, []).extend(value)
+                    else:
+                        merged[symbol] = value
+        return merged
+
+    async def get_latest_trades(self, symbols: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Latest trade for many symbols in one round-trip.
+
+        Returns:
+            symbol -> trade (symbols without data are omitted)
+        """
+        if not symbols:
+            return {}
+        return await self._fan_out("/v2/stocks/trades/latest", "trades", symbols, {})
+
+    async def get_quotes(self, symbols: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Latest quote for many symbols in one round-trip.
+
+        Symbols without a quote fall back to their latest trade (as in
+        ``get_quote``); symbols with neither are omitted.
+
+        Returns:
+            symbol -> {"ap", "bp", "as", "bs"}
+        """
+        if not symbols:
+            return {}
+        quotes = await self._fan_out("/v2/stocks/quotes/latest", "quotes", symbols, {})
+
+        missing = [s for s in dict.fromkeys(x.upper() for x in symbols) if s not in quotes]
+        if missing:
+            logger.debug(f"Quotes not available for {missing}, falling back to latest trades")
+            for symbol, trade in (await self.get_latest_trades(missing)).items():
+                price = trade.get("p", 0)
+                quotes[symbol] = {
+                    "ap": price,
+                    "bp": price,
+                    "as": trade.get("s", 0),
+                    "bs": trade.get("s", 0),
+                }
+        return quotes
+
+    async def get_bars_multi(
+        self,
+        symbols: Sequence[str],
+        timeframe: str = "1Day",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        page_size: int = 10000,
+        **params: Any,
+    ) -> Dict[str, List[Dict]]:
+        """
+        Historical bars for many symbols, following pagination.
+
+        Args:
+            symbols: Symbols to fetch
+            timeframe: Bar timeframe (1Min, 1Hour, 1Day, ...)
+            start: Start date/time (RFC-3339 or YYYY-MM-DD)
+            end: End date/time
+            page_size: Bars per response page (Alpaca maximum 10000)
+            **params: Extra query parameters (adjustment, feed, ...)
+
+        Returns:
+            symbol -> bars in time order (symbols without data are omitted)
+        """
+        if not symbols:
+            return {}
+        query = {"timeframe": timeframe, "limit": page_size, **params}
+        if start:
+            query["start"] = start
+        if end:
+            query["end"] = end
+        return await self._fan_out("/v2/stocks/bars", "bars", symbols, query)
+
@@ -0,0 +1,282 @@
+"""
+Market-data cache in front of the broker.
+
+AutoTrader loops, the SSE stream and API routes ask for the same account,
+positions and quotes within seconds of each other. ``CachedBroker`` serves
+those reads from a short-lived cache when the caller tolerates it:
+
+    await broker.get_account(max_age_s=2.0)   # any copy up to 2s old
+    await broker.get_account()                # always a fresh request
+
+Concurrent identical requests share one in-flight broker call, whatever
+their tolerance. Account and position entries are dropped when we submit
+or cancel orders and when an order we look up has (partially) filled.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+# Order states after which account and positions have changed
+FILL_STATES = {"filled", "partially_filled"}
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fetched_at: float
+
+
+class MarketDataCache:
+    """Keyed cache with per-read staleness tolerance and single-flight fetches."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._entries: Dict[str, _Entry] = {}
+        # invalidate() detaches keys from here: a fetch that started before an
+        # invalidation still answers its own callers, but later reads start a
+        # fresh fetch instead of joining it, and its result is not cached
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: str, outcome: str) -> None:
+        kind = key.partition(":")[0]
+        counts = self._stats.setdefault(
+            kind, {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+        )
+        counts[outcome] += 1
+
+    def peek(self, key: str, max_age_s: float) -> Optional[_Entry]:
+        """Cached entry no older than ``max_age_s`` (None if absent or stale)."""
+        entry = self._entries.get(key)
+        if entry is not None and max_age_s > 0 and self._clock() - entry.fetched_at <= max_age_s:
+            return entry
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries[key] = _Entry(value, self._clock())
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Any]], max_age_s: float = 0.0) -> Any:
+        """
+        Return a cached value or fetch it (at most one fetch per key at a time).
+
+        Args:
+            key: Cache key ("kind:detail")
+            fetch: Coroutine function calling the broker
+            max_age_s: Accept a cached value up to this old (0 = always fetch)
+        """
+        entry = self.peek(key, max_age_s)
+        if entry is not None:
+            self._count(key, "hits")
+            return entry.value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._count(key, "coalesced")
+            return await asyncio.shield(pending)
+
+        self._count(key, "misses")
+        values = await self._fetch([key], lambda: self._wrap(key, fetch))
+        return values[key]
+
+    async def get_many(
+        self,
+        kind: str,
+        ids: Sequence[str],
+        fetch_many: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        max_age_s: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        Batched ``get``: ids that are fresh or already in flight are not
+        fetched again; the rest are fetched with one ``fetch_many`` call.
+
+        Args:
+            kind: Key prefix ("quote" -> keys "quote:<id>")
+            ids: Ids to look up
+            fetch_many: Coroutine function ids -> {id: value} (missing ids allowed)
+            max_age_s: Accept cached values up to this old
+
+        Returns:
+            id -> value (ids without data are omitted)
+        """
+        found: Dict[str, Any] = {}
+        waits: Dict[str, asyncio.Future] = {}
+        missing: List[str] = []
+        for item in dict.fromkeys(ids):
+            key = f"{kind}:{item}"
+            entry = self.peek(key, max_age_s)
+            if entry is not None:
+                self._count(key, "hits")
+                found[item] = entry.value
+            elif key in self._inflight:
+                self._count(key, "coalesced")
+                waits[item] = self._inflight[key]
+            else:
+                self._count(key, "misses")
+                missing.append(item)
+
+        if missing:
+            keys = [f"{kind}:{item}" for item in missing]
+
+            async def fetch() -> Dict[str, Any]:
+                fetched = await fetch_many(missing)
+                return {f"{kind}:{item}": fetched.get(item) for item in missing}
+
+            values = await self._fetch(keys, fetch)
+            found.update((item, values[f"{kind}:{item}"]) for item in missing)
+
+        for item, future in waits.items():
+            found[item] = await asyncio.shield(future)
+        return {item: value for item, value in found.items() if value is not None}
+
+    @staticmethod
+    async def _wrap(key: str, fetch: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        return {key: await fetch()}
+
+    async def _fetch(self, keys: List[str], fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Run one fetch for ``keys`` with every key marked in flight.
+
+        The fetch runs as its own task, so cancelling the caller that started
+        it (e.g. a disconnected SSE client) does not cancel the callers
+        sharing it.
+        """
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in keys}
+        self._inflight.update(futures)
+        task = asyncio.ensure_future(self._settle(futures, fetch))
+        # Retrieve the outcome even if the starting caller is gone
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(task)
+
+    async def _settle(
+        self, futures: Dict[str, asyncio.Future], fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Await ``fetch`` and resolve the in-flight futures with its outcome."""
+        try:
+            values = await fetch()
+        except BaseException as e:
+            for future in futures.values():
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    future.exception()  # Waiters re-raise it; silence "never retrieved"
+            raise
+        else:
+            for key, future in futures.items():
+                # None = no data (e.g. unknown symbol): answered, not cached
+                if values[key] is not None and self._inflight.get(key) is future:
+                    self.put(key, values[key])
+                future.set_result(values[key])
+            return values
+        finally:
+            for key, future in futures.items():
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def invalidate(self, keys: Iterable[str] = (), prefix: Optional[str] = None) -> int:
+        """
+        Drop entries by key and/or key prefix; return how many were dropped.
+
+        Matching in-flight fetches are detached so later reads fetch again.
+        """
+        keys = list(keys)
+        dropped = [k for k in keys if k in self._entries]
+        if prefix is not None:
+            dropped += [k for k in self._entries if k.startswith(prefix) and k not in dropped]
+        for key in dropped:
+            del self._entries[key]
+            self._count(key, "invalidations")
+        detached = [k for k in self._inflight if k in keys or (prefix is not None and k.startswith(prefix))]
+        for key in detached:
+            del self._inflight[key]
+        return len(dropped)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-kind hits, misses, coalesced waits, invalidations and hit rate."""
+        kinds = {}
+        for kind, counts in sorted(self._stats.items()):
+            served = counts["hits"] + counts["coalesced"]
+            total = served + counts["misses"]
+            kinds[kind] = {**counts, "hit_rate": round(served / total, 3) if total else 0.0}
+        return {"entries": len(self._entries), "inflight": len(self._inflight), "kinds": kinds}
+
+
+class CachedBroker:
+    """
+    Broker proxy that caches reads and invalidates them on our own orders.
+
+    Read methods take ``max_age_s`` (default 0: never served from cache, but
+    still coalesced with an identical request already in flight). Other
+    attributes are passed through to the wrapped broker.
+    """
+
+    def __init__(self, broker: Any, cache: Optional[MarketDataCache] = None):
+        self.broker = broker
+        self.cache = cache or MarketDataCache()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.broker, name)
+
+    async def __aenter__(self) -> "CachedBroker":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.broker.close()
+
+    # ---- reads ----------------------------------------------------------------
+
+    async def get_account(self, max_age_s: float = 0.0) -> Dict:
+        return await self.cache.get("account", self.broker.get_account, max_age_s)
+
+    async def get_positions(self, max_age_s: float = 0.0) -> Any:
+        return await self.cache.get("positions", self.broker.get_positions, max_age_s)
+
+    async def get_position(self, symbol: str, max_age_s: float = 0.0) -> Optional[Dict]:
+        return await self.cache.get(
+            f"position:{symbol.upper()}", lambda: self.broker.get_position(symbol), max_age_s
+        )
+
+    async def get_quote(self, symbol: str, max_age_s: float = 0.0) -> Dict:
+        return await self.cache.get(
+            f"quote:{symbol.upper()}", lambda: self.broker.get_quote(symbol), max_age_s
+        )
+
+    async def get_quotes(self, symbols: Sequence[str], max_age_s: float = 0.0) -> Dict[str, Dict]:
+        """Quotes for many symbols; only stale ones are requested, in one call."""
+        return await self.cache.get_many(
+            "quote", [s.upper() for s in symbols], self.broker.get_quotes, max_age_s
+        )
+
+    # ---- writes (invalidate what they change) -----------------------------------
+
+    def invalidate_portfolio(self, symbol: Optional[str] = None) -> None:
+        """Drop account and position entries (after our own orders/fills)."""
+        keys = ["account", "positions"]
+        if symbol:
+            keys.append(f"position:{symbol.upper()}")
+        self.cache.invalidate(keys, prefix=None if symbol else "position:")
+
+    async def submit_order(self, symbol: str, *args: Any, **kwargs: Any) -> Dict:
+        try:
+            return await self.broker.submit_order(symbol, *args, **kwargs)
+        finally:
+            # Market orders can fill before the response arrives
+            self.invalidate_portfolio(symbol)
+
+    async def cancel_order(self, order_id: str) -> None:
+        try:
+            await self.broker.cancel_order(order_id)
+        finally:
+            self.invalidate_portfolio()
+
+    async def get_order(self, order_id: str) -> Dict:
+        order = await self.broker.get_order(order_id)
+        if order.get("status") in FILL_STATES:
+            self.invalidate_portfolio(order.get("symbol"))
+        return order
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Broker stats plus cache hit rates."""
+        return {**self.broker.get_stats(), "cache": self.cache.get_stats()}
@@ -0,0 +1,434 @@
+"""
+Streaming market data ingest.
+
+``MarketStream`` keeps one websocket to the Alpaca market data stream
+(``wss://stream.data.alpaca.markets/v2/<feed>``) and writes every trade,
+quote and minute bar into fixed-size per-symbol ring buffers:
+
+    stream = MarketStream(symbols=["SPY", "QQQ"], bus=bus)
+    await stream.start()
+    stream.latest_quote("SPY")      # {"ap": ..., "bp": ..., ...}, no request
+    stream.bars("SPY", 390)         # last 390 minute bars as numpy columns
+
+After each received frame it publishes one ``market.<kind>.<SYMBOL>`` bus
+event per updated (kind, symbol) carrying the latest row, so consumers
+wake on updates instead of polling ("market.quote.#", "market.*.SPY").
+Subscribers that may fall behind should use a COALESCE queue.
+
+Buffers are allocated on a symbol's first message and never grow. Every
+message is also appended to the process-wide ``TickStore``
+(``optifire.core.tickstore``), the longer append-only tape that
+microstructure plugins read.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from optifire.core.logger import logger
+from optifire.core.tickstore import TickStore, get_tick_store
+
+# Message type -> buffer kind, and buffer columns per kind (plus "t")
+KINDS = {"t": "trade", "q": "quote", "b": "bar", "u": "bar"}
+FIELDS = {
+    "trade": ("p", "s"),
+    "quote": ("bp", "ap", "bs", "as"),
+    "bar": ("o", "h", "l", "c", "v"),
+}
+# Subscribe message key per kind
+CHANNELS = {"trade": "trades", "quote": "quotes", "bar": "bars"}
+# Trade exchange code of FINRA's ADF/TRF prints (off-exchange volume)
+OFF_EXCHANGE = "D"
+
+DEFAULT_CAPACITY = {"trade": 2048, "quote": 2048, "bar": 1024}
+
+
+def parse_time(value: str) -> int:
+    """RFC 3339 timestamp ("2024-01-02T15:30:00.123456789Z") -> epoch ns."""
+    return int(np.datetime64(value.rstrip("Z"), "ns").astype(np.int64))
+
+
+class RingBuffer:
+    """Fixed-capacity columnar buffer of float rows keyed by an int64 ns timestamp."""
+
+    def __init__(self, fields: Sequence[str], capacity: int):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.t = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(self.fields)), dtype=np.float64)
+        self.count = 0  # Rows ever written
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, t: int, row: Sequence[float]) -> None:
+        i = self.count % self.capacity
+        self.t[i] = t
+        self.values[i] = row
+        self.count += 1
+
+    def upsert(self, t: int, row: Sequence[float]) -> None:
+        """Append, or overwrite the newest row if it has the same timestamp (bar updates)."""
+        if self.count and self.t[(self.count - 1) % self.capacity] == t:
+            self.values[(self.count - 1) % self.capacity] = row
+        else:
+            self.append(t, row)
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        """Newest row as {"t": ns, field: value} (None if empty)."""
+        if not self.count:
+            return None
+        i = (self.count - 1) % self.capacity
+        row = dict(zip(self.fields, self.values[i].tolist()))
+        row["t"] = int(self.t[i])
+        return row
+
+    def last(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Newest ``n`` rows (default all held) in time order, as copied columns.
+
+        Returns:
+            {"t": int64 ns, field: float64} arrays of equal length
+        """
+        size = len(self)
+        n = size if n is None else min(n, size)
+        start = self.count - n
+        index = np.arange(start, start + n) % self.capacity
+        columns = {"t": self.t[index]}
+        block = self.values[index]
+        for j, name in enumerate(self.fields):
+            columns[name] = block[:, j]
+        return columns
+
+
+class SymbolBuffers:
+    """Trade, quote and bar ring buffers of one symbol."""
+
+    def __init__(self, capacity: Optional[Dict[str, int]] = None):
+        sizes = {**DEFAULT_CAPACITY, **(capacity or {})}
+        self.rings = {kind: RingBuffer(fields, sizes[kind]) for kind, fields in FIELDS.items()}
+
+    def __getitem__(self, kind: str) -> RingBuffer:
+        return self.rings[kind]
+
+
+class MarketStream:
+    """Alpaca market data websocket client feeding per-symbol ring buffers."""
+
+    def __init__(
+        self,
+        symbols: Iterable[str] = (),
+        bus: Any = None,
+        feed: str = "iex",
+        url: Optional[str] = None,
+        key: Optional[str] = None,
+        secret: Optional[str] = None,
+        capacity: Optional[Dict[str, int]] = None,
+        channels: Sequence[str] = ("trade", "quote", "bar"),
+        reconnect_s: float = 1.0,
+        max_reconnect_s: float = 30.0,
+        tape: Optional[TickStore] = None,
+        max_age_s: Optional[float] = 60.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize stream (call ``start()`` to connect).
+
+        Args:
+            symbols: Initial subscriptions
+            bus: EventBus receiving ``market.<kind>.<SYMBOL>`` events (optional)
+            feed: Alpaca data feed ("iex", "sip", or "test")
+            url: Override the websocket URL (e.g. a local ReplayServer)
+            key: API key (default: ALPACA_API_KEY)
+            secret: API secret (default: ALPACA_API_SECRET)
+            capacity: Ring sizes per kind ({"trade", "quote", "bar"})
+            channels: Kinds to subscribe to
+            reconnect_s: First reconnect delay (doubles up to max_reconnect_s)
+            max_reconnect_s: Longest reconnect delay
+            tape: Tick store receiving every message (default: the shared one)
+            max_age_s: Quotes and trades older than this (by their exchange
+                timestamp) are not served (None = no limit)
+            clock: Wall-clock time in epoch seconds
+        """
+        self.url = url or f"wss://stream.data.alpaca.markets/v2/{feed}"
+        self.key = key or os.getenv("ALPACA_API_KEY", "")
+        self.secret = secret or os.getenv("ALPACA_API_SECRET", "")
+        self.bus = bus
+        self.capacity = capacity
+        self.channels = tuple(channels)
+        self.reconnect_s = reconnect_s
+        self.max_reconnect_s = max_reconnect_s
+        self.max_age_s = max_age_s
+        self._clock = clock
+
+        self.symbols: Set[str] = {s.upper() for s in symbols}
+        self.buffers: Dict[str, SymbolBuffers] = {}
+        self.tape = tape if tape is not None else get_tick_store()
+        self.connected = asyncio.Event()
+
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "connects": 0,
+            "frames": 0,
+            "messages": 0,
+            "errors": 0,
+            **{kind: 0 for kind in FIELDS},
+        }
+
+    # ---- lifecycle ------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Connect in the background (reconnects until ``stop()``)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Close the connection and stop reconnecting."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.connected.clear()
+
+    async def __aenter__(self) -> "MarketStream":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _run(self) -> None:
+        import aiohttp
+
+        delay = self.reconnect_s
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.ws_connect(self.url, heartbeat=30) as ws:
+                        self._ws = ws
+                        await self._handshake(ws)
+                        self._stats["connects"] += 1
+                        self.connected.set()
+                        delay = self.reconnect_s
+                        logger.info(f"Market stream connected ({len(self.symbols)} symbols)")
+
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                await self.handle_frame(json.loads(msg.data))
+                            elif msg.type == aiohttp.WSMsgType.ERROR:
+                                break
+                except asyncio.CancelledError:
+                    raise
+                except PermissionError as e:
+                    logger.error(f"Market stream stopped: {e}")
+                    return
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logger.warning(f"Market stream error: {e}")
+                finally:
+                    self._ws = None
+                    self.connected.clear()
+
+                logger.info(f"Market stream reconnecting in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_s)
+
+    async def _handshake(self, ws) -> None:
+        """connected -> auth -> subscribe (Alpaca stream protocol)."""
+        await self._expect(ws, "connected")
+        await ws.send_json({"action": "auth", "key": self.key, "secret": self.secret})
+        await self._expect(ws, "authenticated")
+        if self.symbols:
+            await self._send_subscription("subscribe", self.symbols)
+
+    @staticmethod
+    async def _expect(ws, status: str) -> None:
+        for message in await ws.receive_json(timeout=10):
+            if message.get("T") == "error":
+                error = f"{message.get('code')} {message.get('msg')}"
+                # Bad credentials will not fix themselves by reconnecting
+                raise PermissionError(error) if message.get("code") in (401, 402) else ConnectionError(error)
+            if message.get("T") == "success" and message.get("msg") == status:
+                return
+        raise ConnectionError(f"Expected '{status}' from market stream")
+
+    async def _send_subscription(self, action: str, symbols: Iterable[str]) -> None:
+        symbols = sorted(symbols)
+        await self._ws.send_json(
+            {"action": action, **{CHANNELS[kind]: symbols for kind in self.channels}}
+        )
+
+    # ---- subscriptions ----------------------------------------------------------
+
+    async def subscribe(self, symbols: Iterable[str]) -> None:
+        """Add symbols (sent now if connected, otherwise on connect)."""
+        new = {s.upper() for s in symbols} - self.symbols
+        if not new:
+            return
+        self.symbols |= new
+        if self._ws is not None and self.connected.is_set():
+            await self._send_subscription("subscribe", new)
+
+    async def unsubscribe(self, symbols: Iterable[str]) -> None:
+        """Drop symbols (their buffers are kept)."""
+        gone = {s.upper() for s in symbols} & self.symbols
+        if not gone:
+            return
+        self.symbols -= gone
+        if self._ws is not None and self.connected.is_set():
+            await self._send_subscription("unsubscribe", gone)
+
+    # ---- ingest -------------------------------------------------------------------
+
+    async def handle_frame(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Write one frame of stream messages into the buffers, then publish the
+        latest row of every (kind, symbol) the frame touched.
+        """
+        self._stats["frames"] += 1
+        updated: Dict[tuple, None] = {}
+        for message in messages:
+            kind = KINDS.get(message.get("T"))
+            if kind is None:
+                if message.get("T") == "error":
+                    self._stats["errors"] += 1
+                    logger.warning(f"Market stream: {message.get('code')} {message.get('msg')}")
+                continue
+
+            symbol = message["S"]
+            buffers = self.buffers.get(symbol)
+            if buffers is None:
+                buffers = self.buffers[symbol] = SymbolBuffers(self.capacity)
+            t = parse_time(message["t"])
+            row = [float(message.get(name, 0.0)) for name in FIELDS[kind]]
+            if kind == "bar":
+                buffers[kind].upsert(t, row)
+            else:
+                buffers[kind].append(t, row)
+            self._record(kind, symbol, t, row, message)
+            self._stats["messages"] += 1
+            self._stats[kind] += 1
+            updated[(kind, symbol)] = None
+
+        if self.bus is not None:
+            for kind, symbol in updated:
+                row = self.buffers[symbol][kind].latest()
+                await self.bus.publish(f"market.{kind}.{symbol}", {"symbol": symbol, **row}, source="market_stream")
+
+    def _record(self, kind: str, symbol: str, t: int, row: List[float], message: Dict[str, Any]) -> None:
+        """Append to the tick store (bar updates for an already stored minute are skipped)."""
+        tape = self.tape.tape(kind, symbol)
+        if kind == "trade":
+            tape.append((t, row[0], row[1], message.get("x") == OFF_EXCHANGE))
+        elif kind == "quote":
+            tape.append((t, *row))
+        else:
+            latest = tape.snapshot().latest()
+            if latest is None or latest["t"] < t:
+                tape.append((t, *row))
+
+    # ---- reads (no network) ---------------------------------------------------------
+
+    def ring(self, symbol: str, kind: str) -> Optional[RingBuffer]:
+        """Ring buffer of a symbol ("trade", "quote" or "bar"), None if no data yet."""
+        buffers = self.buffers.get(symbol.upper())
+        return buffers[kind] if buffers is not None else None
+
+    def _fresh(self, symbol: str, kind: str) -> Optional[Dict[str, float]]:
+        """Newest row of a ring if connected and not older than ``max_age_s``."""
+        if not self.connected.is_set():
+            return None
+        ring = self.ring(symbol, kind)
+        row = ring.latest() if ring is not None else None
+        if row is None or (self.max_age_s is not None and self._clock() - row["t"] / 1e9 > self.max_age_s):
+            return None
+        return row
+
+    def latest_quote(self, symbol: str) -> Optional[Dict[str, float]]:
+        """
+        Latest quote in the REST quote shape ({"ap", "bp", "as", "bs", "t"}),
+        or None if not connected, nothing was received or the quote is older
+        than ``max_age_s`` (callers fall back to the broker).
+        """
+        return self._fresh(symbol, "quote")
+
+    def get_quotes(self, symbols: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """``latest_quote`` for many symbols (symbols without data are omitted)."""
+        quotes = {}
+        for symbol in symbols:
+            quote = self.latest_quote(symbol)
+            if quote is not None:
+                quotes[symbol.upper()] = quote
+        return quotes
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        """Last trade price, else quote midpoint (None if unknown, stale or disconnected)."""
+        trade = self._fresh(symbol, "trade")
+        if trade is not None:
+            return trade["p"]
+        quote = self.latest_quote(symbol)
+        if quote is not None and quote["ap"] > 0 and quote["bp"] > 0:
+            return (quote["ap"] + quote["bp"]) / 2
+        return None
+
+    def bars(self, symbol: str, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Newest ``n`` minute bars as columns t, o, h, l, c, v (empty if none)."""
+        ring = self.ring(symbol, "bar")
+        if ring is None:
+            return {name: np.empty(0) for name in ("t",) + FIELDS["bar"]}
+        return ring.last(n)
+
+    def context_data(self, symbols: Sequence[str], n: int = 390) -> Dict[str, Any]:
+        """
+        Plugin inputs from buffered minute bars.
+
+        One symbol gives 1-D "prices"/"returns"/"volumes"; several give
+        (n, n_symbols) panels aligned on the newest bars, as ``run_batch``
+        expects (symbols with fewer bars are left-padded with NaN).
+
+        Returns:
+            {"symbols", "prices", "returns", "volumes"} (empty dict without bars)
+        """
+        columns = [self.bars(symbol, n) for symbol in symbols]
+        depth = max((len(c["c"]) for c in columns), default=0)
+        if depth < 2:
+            return {}
+
+        prices = np.full((depth, len(symbols)), np.nan)
+        volumes = np.full((depth, len(symbols)), np.nan)
+        for j, c in enumerate(columns):
+            if len(c["c"]):
+                prices[depth - len(c["c"]):, j] = c["c"]
+                volumes[depth - len(c["v"]):, j] = c["v"]
+        returns = prices[1:] / prices[:-1] - 1
+
+        if len(symbols) == 1:
+            prices, returns, volumes = prices[:, 0], returns[:, 0], volumes[:, 0]
+        return {"symbols": list(symbols), "prices": prices, "returns": returns, "volumes": volumes}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection state, message counts and buffered symbols."""
+        return {
+            **self._stats,
+            "connected": self.connected.is_set(),
+            "subscribed": len(self.symbols),
+            "buffered_symbols": len(self.buffers),
+        }
+
+
+_stream: Optional[MarketStream] = None
+
+
+def get_market_stream() -> Optional[MarketStream]:
+    """Process-wide stream set by the entry point (None when not streaming)."""
+    return _stream
+
+
+def set_market_stream(stream: Optional[MarketStream]) -> None:
+    """Register (or clear) the process-wide stream."""
+    global _stream
+    _stream = stream
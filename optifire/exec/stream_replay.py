@@ -0,0 +1,183 @@
+"""
+Local stand-in for the Alpaca market data stream.
+
+``ReplayServer`` speaks the same websocket protocol as
+``stream.data.alpaca.markets`` (connected -> auth -> subscribe) on
+localhost. After a client subscribes it replays recorded messages for the
+subscribed symbols; ``push()`` sends further messages live. Used by the
+tests and for running the stream consumers offline:
+
+    frames = BarStore().load_many(["SPY", "QQQ"], "1Min", "2024-01-02", "2024-01-02")
+    async with ReplayServer(bar_messages(frames), interval_s=0.01) as server:
+        stream = MarketStream(url=server.url, symbols=["SPY", "QQQ"], bus=bus)
+"""
+import asyncio
+import socket
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+from optifire.core.logger import logger
+from optifire.exec.market_stream import CHANNELS
+
+
+def bar_messages(frames: Dict[str, pd.DataFrame]) -> List[Dict[str, Any]]:
+    """Stored bars (``BarStore.load_many`` output) as time-ordered "b" messages."""
+    messages = []
+    for symbol, df in frames.items():
+        for row in df.itertuples(index=False):
+            messages.append({
+                "T": "b",
+                "S": symbol.upper(),
+                "t": pd.Timestamp(row.timestamp).isoformat() + "Z",
+                "o": float(row.open),
+                "h": float(row.high),
+                "l": float(row.low),
+                "c": float(row.close),
+                "v": float(row.volume),
+            })
+    messages.sort(key=lambda m: m["t"])
+    return messages
+
+
+class _Client:
+    def __init__(self, ws):
+        self.ws = ws
+        self.subscriptions: Dict[str, Set[str]] = {channel: set() for channel in CHANNELS.values()}
+
+    def wants(self, message: Dict[str, Any]) -> bool:
+        channel = {"t": "trades", "q": "quotes", "b": "bars", "u": "bars"}.get(message.get("T"))
+        subscribed = self.subscriptions.get(channel, ())
+        return "*" in subscribed or message.get("S") in subscribed
+
+
+class ReplayServer:
+    """Alpaca-protocol websocket server replaying recorded messages."""
+
+    def __init__(
+        self,
+        messages: Iterable[Dict[str, Any]] = (),
+        key: Optional[str] = None,
+        secret: Optional[str] = None,
+        frame_size: int = 100,
+        interval_s: float = 0.0,
+    ):
+        """
+        Initialize server (call ``start()``).
+
+        Args:
+            messages: Recorded stream messages, replayed to each new subscriber
+            key: Accepted API key (None = accept any)
+            secret: Accepted API secret (None = accept any)
+            frame_size: Messages per websocket frame
+            interval_s: Pause between replayed frames
+        """
+        self.messages = list(messages)
+        self.key = key
+        self.secret = secret
+        self.frame_size = frame_size
+        self.interval_s = interval_s
+        self.url: Optional[str] = None
+        self.clients: List[_Client] = []
+        self.connections = 0
+        self._runner = None
+
+    async def start(self) -> str:
+        """Listen on a free localhost port; returns the websocket URL."""
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/stream", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        site = web.SockSite(self._runner, sock)
+        await site.start()
+        self.url = f"ws://127.0.0.1:{sock.getsockname()[1]}/stream"
+        return self.url
+
+    async def stop(self) -> None:
+        await self.disconnect_all()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "ReplayServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def push(self, messages: Iterable[Dict[str, Any]]) -> None:
+        """Send messages to every connected client subscribed to them."""
+        messages = list(messages)
+        for client in list(self.clients):
+            wanted = [m for m in messages if client.wants(m)]
+            if wanted and not client.ws.closed:
+                await client.ws.send_json(wanted)
+
+    async def disconnect_all(self) -> None:
+        """Drop every client connection (to exercise reconnects)."""
+        for client in list(self.clients):
+            await client.ws.close()
+
+    async def _handle(self, request):
+        from aiohttp import WSMsgType, web
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        client = _Client(ws)
+        self.connections += 1
+        await ws.send_json([{"T": "success", "msg": "connected"}])
+
+        authenticated = False
+        replay: Optional[asyncio.Task] = None
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                request_msg = msg.json()
+                action = request_msg.get("action")
+                if action == "auth":
+                    if (self.key is None or request_msg.get("key") == self.key) and (
+                        self.secret is None or request_msg.get("secret") == self.secret
+                    ):
+                        authenticated = True
+                        self.clients.append(client)
+                        await ws.send_json([{"T": "success", "msg": "authenticated"}])
+                    else:
+                        await ws.send_json([{"T": "error", "code": 402, "msg": "auth failed"}])
+                        break
+                elif not authenticated:
+                    await ws.send_json([{"T": "error", "code": 401, "msg": "not authenticated"}])
+                elif action in ("subscribe", "unsubscribe"):
+                    for channel, subscribed in client.subscriptions.items():
+                        symbols = set(request_msg.get(channel, ()))
+                        if action == "subscribe":
+                            subscribed |= symbols
+                        else:
+                            subscribed -= symbols
+                    await ws.send_json([{
+                        "T": "subscription",
+                        **{channel: sorted(s) for channel, s in client.subscriptions.items()},
+                    }])
+                    if action == "subscribe" and replay is None and self.messages:
+                        replay = asyncio.create_task(self._replay(client))
+        finally:
+            if replay is not None:
+                replay.cancel()
+            if client in self.clients:
+                self.clients.remove(client)
+        return ws
+
+    async def _replay(self, client: _Client) -> None:
+        wanted = [m for m in self.messages if client.wants(m)]
+        for i in range(0, len(wanted), self.frame_size):
+            if client.ws.closed:
+                return
+            await client.ws.send_json(wanted[i:i + self.frame_size])
+            await asyncio.sleep(self.interval_s)
+        logger.debug(f"Replay server: replayed {len(wanted)} messages")
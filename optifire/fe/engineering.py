@@ -49,11 +49,17 @@ class FeatureEngineer:
         return atr
     
     @staticmethod
-    def calculate_rsi(close: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate RSI."""
+    def calculate_rsi(close: pd.Series, period: int = 14, wilder: bool = False) -> pd.Series:
+        """Calculate RSI (simple averages, or Wilder's smoothing)."""
         delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(period).mean()
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
+        if wilder:
+            gain = gain.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+            loss = loss.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+        else:
+            gain = gain.rolling(period).mean()
+            loss = loss.rolling(period).mean()
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
         return rsi
@@ -0,0 +1,416 @@
+"""
+Streaming technical indicators.
+
+Each indicator keeps its state in numpy arrays with one column per symbol
+and advances all columns with a fixed number of array operations per bar,
+so a bar costs O(1) per symbol however long the history is. Values match
+``FeatureEngineer`` on the same series: the rolling statistics use the
+same online add/remove updates as pandas' rolling windows, and the EMAs
+the same recursion as ``ewm(adjust=False)``.
+
+    index = SymbolIndex()
+    sma, rsi = SMA(20), RSI(14)
+    cols = index.columns(["SPY", "QQQ"])
+    sma.update_at(cols, closes)           # one bar for these symbols
+    sma.at(cols), sma.value               # those symbols / every column
+    rsi.update(row)                       # row: one value per column, NaN = no bar
+
+A NaN input means "no bar for this symbol": its state is left unchanged,
+so every column behaves like ``FeatureEngineer`` on that symbol's own bars.
+Indicators grow to new columns on first use.
+"""
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class SymbolIndex:
+    """Stable symbol -> column numbers for indicator state."""
+
+    def __init__(self, symbols: Iterable[str] = ()):
+        self._columns: Dict[str, int] = {}
+        for symbol in symbols:
+            self[symbol]
+
+    def __getitem__(self, symbol: str) -> int:
+        column = self._columns.get(symbol)
+        if column is None:
+            column = self._columns[symbol] = len(self._columns)
+        return column
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._columns
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def columns(self, symbols: Iterable[str]) -> np.ndarray:
+        """Columns of several symbols (new symbols are assigned one)."""
+        return np.fromiter((self[s] for s in symbols), dtype=np.intp)
+
+
+class Indicator:
+    """Base class: per-column state arrays that grow with the column count."""
+
+    # State array name -> initial value (arrays of shape (n,))
+    _STATE: Dict[str, float] = {}
+
+    def __init__(self, n: int = 1):
+        self.n = 0
+        self._grow(max(n, 1))
+
+    def _grow(self, n: int) -> None:
+        for name, initial in self._STATE.items():
+            old = getattr(self, name, None)
+            new = np.full(n, initial, dtype=type(initial))
+            if old is not None:
+                new[:self.n] = old
+            setattr(self, name, new)
+        self.n = n
+
+    def _ensure(self, columns: np.ndarray) -> None:
+        if len(columns) and columns.max() >= self.n:
+            self._grow(max(int(columns.max()) + 1, 2 * self.n))
+
+    def update(self, *rows) -> np.ndarray:
+        """Advance by one bar; each row has one value per column (NaN = no bar)."""
+        rows = [np.atleast_1d(np.asarray(row, dtype=float)) for row in rows]
+        columns = np.flatnonzero(~np.isnan(rows[0]))
+        self.update_at(columns, *(row[columns] for row in rows))
+        return self.value
+
+    def update_at(self, columns: Sequence[int], *values) -> None:
+        """Advance the given columns by one bar."""
+        columns = np.asarray(columns, dtype=np.intp)
+        self._ensure(columns)
+        self._update(columns, *(np.asarray(v, dtype=float) for v in values))
+
+    def _update(self, columns: np.ndarray, *values: np.ndarray) -> None:
+        raise NotImplementedError
+
+    @property
+    def value(self) -> np.ndarray:
+        """Current value of every column (NaN until warmed up)."""
+        return self.at(np.arange(self.n))
+
+    def at(self, columns: Sequence[int]) -> np.ndarray:
+        """Current value of the given columns (NaN for columns never updated)."""
+        columns = np.asarray(columns, dtype=np.intp)
+        self._ensure(columns)
+        return self._at(columns)
+
+    def _at(self, columns: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class RollingWindow(Indicator):
+    """The last ``size`` values per column (ring buffer)."""
+
+    _STATE = {"count": 0, "pos": 0}
+
+    def __init__(self, size: int, n: int = 1):
+        self.size = size
+        self.buffer = np.full((size, 0), np.nan)
+        super().__init__(n)
+
+    def _grow(self, n: int) -> None:
+        buffer = np.full((self.size, n), np.nan)
+        buffer[:, :self.n] = self.buffer
+        self.buffer = buffer
+        super()._grow(n)
+
+    def push(self, columns: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Store values; returns those they displaced (NaN while filling)."""
+        old = self.buffer[self.pos[columns], columns]
+        self.buffer[self.pos[columns], columns] = values
+        self.pos[columns] = (self.pos[columns] + 1) % self.size
+        self.count[columns] += 1
+        return old
+
+    def _update(self, columns: np.ndarray, values: np.ndarray) -> None:
+        self.push(columns, values)
+
+    def ago(self, k: int, columns: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Value ``k`` bars before the latest (0 = latest; NaN if not seen yet)."""
+        columns = np.arange(self.n) if columns is None else np.asarray(columns, dtype=np.intp)
+        self._ensure(columns)
+        result = self.buffer[(self.pos[columns] - 1 - k) % self.size, columns]
+        return np.where(self.count[columns] > k, result, np.nan)
+
+    def max(self, columns: Sequence[int]) -> np.ndarray:
+        """Largest value in the window (NaN until it is full)."""
+        columns = np.asarray(columns, dtype=np.intp)
+        self._ensure(columns)
+        return np.where(self.count[columns] >= self.size, self.buffer[:, columns].max(axis=0), np.nan)
+
+    def _at(self, columns: np.ndarray) -> np.ndarray:
+        return self.ago(0, columns)
+
+
+class SMA(Indicator):
+    """Simple moving average (``Series.rolling(period).mean()``)."""
+
+    _STATE = {
+        "nobs": 0, "sum": 0.0, "comp_add": 0.0, "comp_remove": 0.0,
+        "neg_ct": 0, "same_ct": 0, "prev_value": np.nan,
+    }
+
+    def __init__(self, period: int, n: int = 1):
+        self.period = period
+        self.window = RollingWindow(period, n)
+        super().__init__(n)
+
+    def _grow(self, n: int) -> None:
+        super()._grow(n)
+        self.window._grow(n)
+
+    def _update(self, columns: np.ndarray, values: np.ndarray) -> None:
+        old = self.window.push(columns, values)
+
+        # Remove the value leaving the window (Kahan-compensated, as pandas)
+        leaving = ~np.isnan(old)
+        if leaving.any():
+            c, x = columns[leaving], old[leaving]
+            self.nobs[c] -= 1
+            y = -x - self.comp_remove[c]
+            t = self.sum[c] + y
+            self.comp_remove[c] = t - self.sum[c] - y
+            self.sum[c] = t
+            self.neg_ct[c] -= x < 0
+
+        # Add the new value
+        c, x = columns, values
+        self.same_ct[c] = np.where(x == self.prev_value[c], self.same_ct[c] + 1, 1)
+        self.prev_value[c] = x
+        self.nobs[c] += 1
+        y = x - self.comp_add[c]
+        t = self.sum[c] + y
+        self.comp_add[c] = t - self.sum[c] - y
+        self.sum[c] = t
+        self.neg_ct[c] += x < 0
+
+    def _at(self, columns: np.ndarray) -> np.ndarray:
+        nobs, neg_ct = self.nobs[columns], self.neg_ct[columns]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = self.sum[columns] / nobs
+        # A constant window is returned exactly; clamp sign drift
+        result = np.where(self.same_ct[columns] >= nobs, self.prev_value[columns], result)
+        result = np.where((neg_ct == 0) & (result < 0), 0.0, result)
+        result = np.where((neg_ct == nobs) & (result > 0), 0.0, result)
+        return np.where(nobs >= self.period, result, np.nan)
+
+
+class RollingStd(Indicator):
+    """Rolling standard deviation (``Series.rolling(period).std(ddof=ddof)``)."""
+
+    _STATE = {"nobs": 0, "mean": 0.0, "ssqdm": 0.0, "comp_add": 0.0, "comp_remove": 0.0}
+
+    def __init__(self, period: int, ddof: int = 1, n: int = 1):
+        self.period = period
+        self.ddof = ddof
+        self.window = RollingWindow(period, n)
+        super().__init__(n)
+
+    def _grow(self, n: int) -> None:
+        super()._grow(n)
+        self.window._grow(n)
+
+    def _update(self, columns: np.ndarray, values: np.ndarray) -> None:
+        old = self.window.push(columns, values)
+
+        # Remove the value leaving the window (Welford with Kahan-compensated
+        # mean, as pandas)
+        leaving = ~np.isnan(old)
+        if leaving.any():
+            c, x = columns[leaving], old[leaving]
+            self.nobs[c] -= 1
+            prev_mean = self.mean[c] - self.comp_remove[c]
+            y = x - self.comp_remove[c]
+            t = y - self.mean[c]
+            self.comp_remove[c] = t + self.mean[c] - y
+            self.mean[c] -= t / self.nobs[c]
+            self.ssqdm[c] -= (x - prev_mean) * (x - self.mean[c])
+
+        # Add the new value
+        c, x = columns, values
+        self.nobs[c] += 1
+        prev_mean = self.mean[c] - self.comp_add[c]
+        y = x - self.comp_add[c]
+        t = y - self.mean[c]
+        self.comp_add[c] = t + self.mean[c] - y
+        self.mean[c] += t / self.nobs[c]
+        self.ssqdm[c] += (x - prev_mean) * (x - self.mean[c])
+
+    def _at(self, columns: np.ndarray) -> np.ndarray:
+        nobs = self.nobs[columns]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = self.ssqdm[columns] / (nobs - self.ddof)
+        var = np.where(nobs == 1, 0.0, var)
+        var = np.where((nobs >= self.period) & (nobs > self.ddof), np.maximum(var, 0.0), np.nan)
+        return np.sqrt(var)
+
+
+class EMA(Indicator):
+    """Exponential moving average (``Series.ewm(span=period, adjust=False).mean()``)."""
+
+    _STATE = {"weighted": np.nan, "count": 0}
+
+    def __init__(self, period: Optional[int] = None, alpha: Optional[float] = None, n: int = 1):
+        """
+        Initialize EMA.
+
+        Args:
+            period: Span (alpha = 2 / (period + 1))
+            alpha: Smoothing factor instead of a span (e.g. 1/period for Wilder)
+            n: Initial column count
+        """
+        self.alpha = alpha if alpha is not None else 2.0 / (period + 1.0)
+        super().__init__(n)
+
+    def _update(self, columns: np.ndarray, values: np.ndarray) -> None:
+        old_wt = 1.0 - self.alpha
+        weighted = self.weighted[columns]
+        blended = (old_wt * weighted + self.alpha * values) / (old_wt + self.alpha)
+        self.weighted[columns] = np.where(np.isnan(weighted) | (weighted == values), values, blended)
+        self.count[columns] += 1
+
+    def _at(self, columns: np.ndarray) -> np.ndarray:
+        return self.weighted[columns]
+
+
+class RSI(Indicator):
+    """
+    Relative Strength Index.
+
+    Average gain and loss are simple moving averages of the price changes
+    (``FeatureEngineer.calculate_rsi``) or, with ``wilder=True``, Wilder's
+    smoothing (an EMA with alpha = 1/period, reported from bar ``period``).
+    """
+
+    _STATE = {"prev_close": np.nan, "count": 0}
+
+    def __init__(self, period: int = 14, wilder: bool = False, n: int = 1):
+        self.period = period
+        self.wilder = wilder
+        if wilder:
+            self.gain, self.loss = EMA(alpha=1.0 / period, n=n), EMA(alpha=1.0 / period, n=n)
+        else:
+            self.gain, self.loss = SMA(period, n), SMA(period, n)
+        super().__init__(n)
+
+    def _grow(self, n: int) -> None:
+        super()._grow(n)
+        self.gain._grow(n)
+        self.loss._grow(n)
+
+    def _update(self, columns: np.ndarray, values: np.ndarray) -> None:
+        # The first bar has no change; pandas counts it as zero gain and loss
+        delta = values - self.prev_close[columns]
+        delta = np.where(np.isnan(delta), 0.0, delta)
+        self.gain.update_at(columns, np.where(delta > 0, delta, 0.0))
+        self.loss.update_at(columns, np.where(delta < 0, -delta, 0.0))
+        self.prev_close[columns] = values
+        self.count[columns] += 1
+
+    def _at(self, columns: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsi = 100 - (100 / (1 + self.gain.at(columns) / self.loss.at(columns)))
+        if self.wilder:
+            rsi = np.where(self.count[columns] >= self.period, rsi, np.nan)
+        return rsi
+
+
+class ATR(Indicator):
+    """Average True Range (``FeatureEngineer.calculate_atr``); update(high, low, close)."""
+
+    _STATE = {"prev_close": np.nan}
+
+    def __init__(self, period: int = 14, n: int = 1):
+        self.period = period
+        self.average = SMA(period, n)
+        super().__init__(n)
+
+    def _grow(self, n: int) -> None:
+        super()._grow(n)
+        self.average._grow(n)
+
+    def update(self, high, low, close) -> np.ndarray:
+        """Advance by one bar (columns where close is NaN are skipped)."""
+        high, low, close = (np.atleast_1d(np.asarray(row, dtype=float)) for row in (high, low, close))
+        columns = np.flatnonzero(~np.isnan(close))
+        self.update_at(columns, high[columns], low[columns], close[columns])
+        return self.value
+
+    def _update(self, columns: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> None:
+        # The first bar has no previous close: its range is high - low
+        prev_close = self.prev_close[columns]
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        self.average.update_at(columns, true_range)
+        self.prev_close[columns] = close
+
+    def _at(self, columns: np.ndarray) -> np.ndarray:
+        return self.average.at(columns)
+
+
+class Bollinger(Indicator):
+    """Bollinger Bands: value is (upper, middle, lower)."""
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0, ddof: int = 1, n: int = 1):
+        """
+        Initialize bands.
+
+        Args:
+            period: Window
+            std_dev: Band width in standard deviations
+            ddof: Delta degrees of freedom (1 as ``FeatureEngineer``, 0 = population)
+            n: Initial column count
+        """
+        self.std_dev = std_dev
+        self.sma = SMA(period, n)
+        self.std = RollingStd(period, ddof, n)
+        super().__init__(n)
+
+    def _grow(self, n: int) -> None:
+        super()._grow(n)
+        self.sma._grow(n)
+        self.std._grow(n)
+
+    def _update(self, columns: np.ndarray, values: np.ndarray) -> None:
+        self.sma.update_at(columns, values)
+        self.std.update_at(columns, values)
+
+    @property
+    def value(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.at(np.arange(self.n))
+
+    def _at(self, columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        middle, std = self.sma.at(columns), self.std.at(columns)
+        return middle + std * self.std_dev, middle, middle - std * self.std_dev
+
+
+class MACD(Indicator):
+    """MACD: value is (macd, signal, histogram)."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9, n: int = 1):
+        self.fast, self.slow, self.signal = EMA(fast, n=n), EMA(slow, n=n), EMA(signal, n=n)
+        super().__init__(n)
+
+    def _grow(self, n: int) -> None:
+        super()._grow(n)
+        for ema in (self.fast, self.slow, self.signal):
+            ema._grow(n)
+
+    def _update(self, columns: np.ndarray, values: np.ndarray) -> None:
+        self.fast.update_at(columns, values)
+        self.slow.update_at(columns, values)
+        macd = self.fast.weighted[columns] - self.slow.weighted[columns]
+        self.signal.update_at(columns, macd)
+
+    @property
+    def value(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.at(np.arange(self.n))
+
+    def _at(self, columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        macd = self.fast.at(columns) - self.slow.at(columns)
+        signal = self.signal.at(columns)
+        return macd, signal, macd - signal
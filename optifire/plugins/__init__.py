@@ -2,14 +2,26 @@
 Plugin architecture for OptiFIRE.
 All 75 plugin modules with unified interface.
 """
-from typing import Dict, Any, Optional, Protocol
+from typing import Dict, Any, List, Optional, Protocol, Sequence
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from pathlib import Path
+import asyncio
 import time
-import psutil
 
 from optifire.core.logger import logger
 from optifire.core.errors import PluginError, ResourceBudgetExceeded
+from optifire.core.memo import UnhashableInput, get_memo_cache, hash_inputs
+from optifire.core.procpool import get_process_pool
+from optifire.core.usage import UsageMeter, record_offload
+from optifire.plugins.manifest import MANIFEST_PATH, LazyPlugin, PluginSpec, load_manifest
+
+
+# A run is cancelled past HARD_LIMIT_FACTOR x its CPU/memory budget, or past
+# TIMEOUT_FACTOR x its CPU budget in wall-clock time (at least MIN_TIMEOUT_S)
+HARD_LIMIT_FACTOR = 3
+TIMEOUT_FACTOR = 10
+MIN_TIMEOUT_S = 5.0
 
 
 @dataclass
@@ -45,8 +57,10 @@ class PluginResult:
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
-    cpu_ms: int = 0
-    mem_mb: int = 0
+    cpu_ms: int = 0  # CPU time of this run (loop thread + pool worker)
+    mem_mb: int = 0  # Peak allocation of this run
+    wall_ms: int = 0
+    timed_out: bool = False
 
 
 class Plugin(ABC):
@@ -92,66 +106,197 @@ class Plugin(ABC):
         """
         pass
 
+    @property
+    def execution(self) -> str:
+        """Where ``compute()`` runs: "inline" (event loop) or "process" (pool)."""
+        return self.plan().get("execution", "inline")
+
+    def compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Pure, CPU-bound part of the plugin (optional).
+
+        Plugins with ``"execution": "process"`` or ``"memoize"`` in their plan
+        implement this and call ``run_compute`` from ``run()``. It must be a
+        pure function of ``data`` (no bus, database or other shared state),
+        and its inputs and outputs must be picklable.
+
+        Args:
+            data: Plugin inputs
+
+        Returns:
+            Computed outputs
+        """
+        raise NotImplementedError(f"{self.metadata.plugin_id} has no compute step")
+
+    async def run_compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run ``compute()`` inline or in the shared process pool.
+
+        Plugins with ``"memoize": True`` (or ``{"ttl_s": ...}``) in their plan
+        get results from the shared memo cache when ``data`` was seen before;
+        ``run()`` itself (bus publishing etc.) still runs every time.
+
+        Args:
+            data: Plugin inputs (large numpy arrays are passed via shared memory)
+
+        Returns:
+            Computed outputs
+        """
+        memoize = self.plan().get("memoize")
+        if not memoize:
+            return await self._compute(data)
+
+        try:
+            key = hash_inputs(self.metadata.plugin_id, self.metadata.version, data)
+        except UnhashableInput as e:
+            logger.debug(f"{self.metadata.plugin_id} not memoized: {e}")
+            return await self._compute(data)
+
+        ttl_s = memoize.get("ttl_s") if isinstance(memoize, dict) else None
+        result = await get_memo_cache().get_or_compute(key, lambda: self._compute(data), ttl_s)
+        return dict(result)
+
+    async def _compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        if self.execution != "process":
+            return self.compute(data)
+
+        output, stats = await get_process_pool().run(self, data)
+        record_offload(stats["cpu_ms"], stats["peak_mb"])
+        logger.debug(
+            f"{self.metadata.plugin_id} computed in worker {stats['pid']}: "
+            f"{stats['cpu_ms']:.0f}ms CPU, {stats['wall_ms']:.0f}ms wall"
+        )
+        return output
+
+    async def run_batch(
+        self,
+        context: PluginContext,
+        symbols: Sequence[str],
+    ) -> Dict[str, PluginResult]:
+        """
+        Evaluate many symbols in one call.
+
+        ``context.data`` holds 2-D panels (time x symbol, columns in
+        ``symbols`` order) for per-symbol inputs; anything else is shared by
+        all symbols. Plugins with a vectorized implementation override this;
+        the default runs ``run()`` once per symbol on the column slices.
+
+        Args:
+            context: Runtime context with panel inputs
+            symbols: Column labels of the panels
+
+        Returns:
+            symbol -> result
+        """
+        results: Dict[str, PluginResult] = {}
+        for symbol, data in zip(symbols, split_panels(context.data, symbols)):
+            symbol_context = PluginContext(
+                config=context.config, db=context.db, bus=context.bus, data=data
+            )
+            results[symbol] = await self.run(symbol_context)
+        return results
+
     async def execute_with_budget(
         self,
         context: PluginContext,
         cpu_budget_ms: int,
         mem_budget_mb: int,
+        timeout_s: Optional[float] = None,
     ) -> PluginResult:
         """
-        Execute with resource budget enforcement.
+        Execute with resource accounting and budget enforcement.
+
+        CPU time and peak allocation are measured for this run only (see
+        ``optifire.core.usage``). Going over budget logs a warning; going
+        over ``HARD_LIMIT_FACTOR`` times the budget, or past the wall-clock
+        timeout, cancels the run and returns a failed result.
 
         Args:
             context: Runtime context
             cpu_budget_ms: CPU time budget in milliseconds
             mem_budget_mb: Memory budget in MB
+            timeout_s: Wall-clock limit (default: TIMEOUT_FACTOR x CPU budget,
+                at least MIN_TIMEOUT_S)
 
         Returns:
-            Plugin result
-
-        Raises:
-            ResourceBudgetExceeded: If budget exceeded
+            Plugin result with cpu_ms, mem_mb (peak) and wall_ms filled in
         """
-        process = psutil.Process()
-        mem_before = process.memory_info().rss / 1024 / 1024  # MB
+        if timeout_s is None:
+            timeout_s = max(MIN_TIMEOUT_S, cpu_budget_ms * TIMEOUT_FACTOR / 1000)
+
+        meter = UsageMeter(
+            self.run(context),
+            cpu_limit_ms=cpu_budget_ms * HARD_LIMIT_FACTOR,
+            mem_limit_mb=mem_budget_mb * HARD_LIMIT_FACTOR,
+        )
         start_time = time.perf_counter()
+        task = asyncio.ensure_future(meter)
+        timed_out = False
 
         try:
-            result = await self.run(context)
-
-            # Measure actual usage
-            elapsed_ms = int((time.perf_counter() - start_time) * 1000)
-            mem_after = process.memory_info().rss / 1024 / 1024
-            mem_used = mem_after - mem_before
-
-            # Check budgets
-            if elapsed_ms > cpu_budget_ms:
+            done, _ = await asyncio.wait({task}, timeout=timeout_s)
+            if not done:
+                timed_out = True
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            result = None if timed_out else task.result()
+            error = f"Timed out after {timeout_s:.1f}s" if timed_out else None
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        except ResourceBudgetExceeded as e:
+            result, error = None, f"Budget exceeded: {e}"
+        except Exception as e:
+            logger.error(f"{self.metadata.plugin_id} failed: {e}", exc_info=True)
+            result, error = None, str(e)
+
+        usage = meter.usage
+        cpu_ms = int(usage.total_cpu_ms)
+        mem_mb = int(round(usage.total_peak_mb))
+        wall_ms = int((time.perf_counter() - start_time) * 1000)
+
+        if result is None:
+            logger.warning(f"{self.metadata.plugin_id} aborted: {error}")
+            result = PluginResult(success=False, error=error, timed_out=timed_out)
+        else:
+            if cpu_ms > cpu_budget_ms:
                 logger.warning(
                     f"{self.metadata.plugin_id} exceeded CPU budget: "
-                    f"{elapsed_ms}ms > {cpu_budget_ms}ms"
+                    f"{cpu_ms}ms > {cpu_budget_ms}ms"
                 )
-
-            if mem_used > mem_budget_mb:
+            if mem_mb > mem_budget_mb:
                 logger.warning(
                     f"{self.metadata.plugin_id} exceeded memory budget: "
-                    f"{mem_used:.1f}MB > {mem_budget_mb}MB"
+                    f"{mem_mb}MB > {mem_budget_mb}MB"
                 )
 
-            result.cpu_ms = elapsed_ms
-            result.mem_mb = int(mem_used)
+        result.cpu_ms = cpu_ms
+        result.mem_mb = mem_mb
+        result.wall_ms = wall_ms
+        return result
 
-            return result
 
-        except Exception as e:
-            elapsed_ms = int((time.perf_counter() - start_time) * 1000)
-            logger.error(f"{self.metadata.plugin_id} failed: {e}", exc_info=True)
+def is_panel(value: Any, n_symbols: int) -> bool:
+    """True for a 2-D (time x symbol) array with one column per symbol."""
+    return getattr(value, "ndim", 0) == 2 and value.shape[1] == n_symbols
 
-            return PluginResult(
-                success=False,
-                error=str(e),
-                cpu_ms=elapsed_ms,
-                mem_mb=0,
-            )
+
+def split_panels(data: Dict[str, Any], symbols: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Per-symbol input dicts from batch inputs.
+
+    Args:
+        data: Inputs; panels are split by column, other values are shared
+        symbols: Panel column labels
+
+    Returns:
+        One input dict per symbol (with "symbol" set)
+    """
+    panels = {k: v for k, v in data.items() if is_panel(v, len(symbols))}
+    return [
+        {**data, **{k: v[:, i] for k, v in panels.items()}, "symbol": symbol}
+        for i, symbol in enumerate(symbols)
+    ]
 
 
 class PluginRegistry:
@@ -160,9 +305,35 @@ class PluginRegistry:
     def __init__(self):
         """Initialize registry."""
         self._plugins: Dict[str, Plugin] = {}
+        self._specs: Dict[str, PluginSpec] = {}
+
+    def discover(self, manifest_path: Path = MANIFEST_PATH) -> int:
+        """
+        Index all plugin packages from the manifest without importing them.
+
+        Args:
+            manifest_path: Cached manifest (stale entries are refreshed)
+
+        Returns:
+            Number of plugins available
+        """
+        self._specs = load_manifest(manifest_path)
+        return len(self._specs)
+
+    def list_available(self, category: Optional[str] = None) -> list[str]:
+        """List discovered plugin IDs (registered or not)."""
+        return sorted(
+            pid for pid, spec in self._specs.items()
+            if category is None or spec.category == category
+        )
+
+    def lazy(self, plugin_id: str) -> Optional[LazyPlugin]:
+        """Proxy for a discovered plugin that imports it on first run."""
+        spec = self._specs.get(plugin_id)
+        return LazyPlugin(spec) if spec else None
 
     def register(self, plugin: Plugin) -> None:
-        """Register a plugin."""
+        """Register a plugin (or a LazyPlugin proxy)."""
         plugin_id = plugin.metadata.plugin_id
         self._plugins[plugin_id] = plugin
         logger.info(f"Registered plugin: {plugin_id}")
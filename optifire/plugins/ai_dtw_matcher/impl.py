@@ -35,34 +35,28 @@ class AiDtwMatcher(Plugin):
             "schedule": "@daily",
             "triggers": ["market_close"],
             "dependencies": [],
+            "execution": "process",  # O(n*m) DTW per pattern
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Find similar patterns via DTW."""
         try:
-            current_pattern = params.get("current_pattern", None)
+            current_pattern = context.data.get("current_pattern")
             if current_pattern is None:
                 # Mock: last 10 days of returns
                 current_pattern = np.random.randn(10)
 
-            # Mock: historical patterns
-            n_patterns = 100
-            pattern_length = 10
-            history = [np.random.randn(pattern_length) for _ in range(n_patterns)]
+            history = context.data.get("history")
+            if history is None:
+                # Mock: historical patterns
+                n_patterns = 100
+                pattern_length = 10
+                history = np.random.randn(n_patterns, pattern_length)
 
-            # Find best match via DTW
-            best_match_idx, best_distance = self._find_best_match(current_pattern, history)
-
-            # Predict next move based on what happened after best match
-            # In production: look at actual historical data
-            predicted_return = np.random.uniform(-0.02, 0.02)
-
-            result_data = {
-                "best_match_idx": best_match_idx,
-                "dtw_distance": best_distance,
-                "predicted_return": predicted_return,
-                "interpretation": f"📊 Found match (distance: {best_distance:.2f}) → Predicted: {predicted_return*100:+.2f}%",
-            }
+            result_data = await self.run_compute({
+                "current_pattern": np.asarray(current_pattern, dtype=float),
+                "history": np.asarray(history, dtype=float),
+            })
 
             if context.bus:
                 await context.bus.publish(
@@ -77,6 +71,23 @@ class AiDtwMatcher(Plugin):
             logger.error(f"Error in DTW matcher: {e}", exc_info=True)
             return PluginResult(success=False, error=str(e))
 
+    def compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Best DTW match of the current pattern against history."""
+        best_match_idx, best_distance = self._find_best_match(
+            data["current_pattern"], data["history"]
+        )
+
+        # Predict next move based on what happened after best match
+        # In production: look at actual historical data
+        predicted_return = float(np.random.uniform(-0.02, 0.02))
+
+        return {
+            "best_match_idx": best_match_idx,
+            "dtw_distance": float(best_distance),
+            "predicted_return": predicted_return,
+            "interpretation": f"📊 Found match (distance: {best_distance:.2f}) → Predicted: {predicted_return*100:+.2f}%",
+        }
+
     def _find_best_match(self, pattern, history):
         """Find best matching pattern via DTW."""
         best_distance = float('inf')
@@ -5,6 +5,7 @@ FULL IMPLEMENTATION
 from typing import Dict, Any
 from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
 from optifire.core.logger import logger
+from optifire.core.tickstore import get_tick_store
 
 
 class AlphaDarkPoolFlow(Plugin):
@@ -18,6 +19,7 @@ class AlphaDarkPoolFlow(Plugin):
     def __init__(self):
         super().__init__()
         self.recent_prints = {}  # symbol -> list of (time, volume, price)
+        self.last_seen_t = {}  # symbol -> newest tape timestamp already scanned
 
     def describe(self) -> PluginMetadata:
         return PluginMetadata(
@@ -36,7 +38,7 @@ class AlphaDarkPoolFlow(Plugin):
     def plan(self) -> Dict[str, Any]:
         return {
             "schedule": "@continuous",
-            "triggers": ["tick_data", "every_1min"],
+            "triggers": ["tick_data", "every_1min", "market.trade.#"],
             "dependencies": [],
         }
 
@@ -44,9 +46,23 @@ class AlphaDarkPoolFlow(Plugin):
         """Detect dark pool flow."""
         try:
             symbol = context.data.get("symbol", "SPY")
-            volume = context.data.get("volume", 0)
+            volume = context.data.get("volume")
             price = context.data.get("price", 0.0)
 
+            if volume is None:
+                # Largest off-exchange print on the shared tape since the last run
+                trades = get_tick_store().trades(symbol)
+                last_seen = self.last_seen_t.get(symbol)
+                if last_seen is not None:
+                    trades = trades.between(last_seen + 1)
+                dark = trades.rows[trades["off_exchange"]]
+                volume, price = 0, 0.0
+                if len(dark):
+                    largest = dark[dark["size"].argmax()]
+                    volume, price = int(largest["size"]), float(largest["price"])
+                if len(trades):
+                    self.last_seen_t[symbol] = int(trades["t"][-1])
+
             # Get average daily volume (mock - in production use real ADV)
             avg_daily_volume = context.data.get("avg_daily_volume", 10_000_000)
 
@@ -6,6 +6,7 @@ from typing import Dict, Any
 import random
 from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
 from optifire.core.logger import logger
+from optifire.core.tickstore import get_tick_store
 
 
 class AlphaMicroImbalance(Plugin):
@@ -34,18 +35,26 @@ class AlphaMicroImbalance(Plugin):
     def plan(self) -> Dict[str, Any]:
         return {
             "schedule": "@continuous",
-            "triggers": ["tick_data"],
+            "triggers": ["tick_data", "market.quote.#"],
             "dependencies": [],
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Calculate order book imbalance."""
         try:
+            # Get params from context.data (backward compat with context.config)
+            params = context.data if context.data else context.config
             symbol = params.get("symbol", "SPY")
 
-            # Mock: bid and ask volumes
-            bid_volume = random.randint(1000, 10000)
-            ask_volume = random.randint(1000, 10000)
+            # Displayed size over the recent quotes on the shared tape
+            quotes = get_tick_store().quotes(symbol).last(params.get("window", 100))
+            if len(quotes):
+                bid_volume = float(quotes["bid_size"].sum())
+                ask_volume = float(quotes["ask_size"].sum())
+            else:
+                # Mock: bid and ask volumes
+                bid_volume = random.randint(1000, 10000)
+                ask_volume = random.randint(1000, 10000)
 
             # Calculate imbalance
             total_volume = bid_volume + ask_volume
@@ -37,33 +37,15 @@ class AlphaVixRegime(Plugin):
             "schedule": "@continuous",
             "triggers": ["market_open", "every_5min"],
             "dependencies": [],
+            "memoize": True,
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Classify VIX regime."""
         try:
-            vix = params.get("vix_level", 20.0)
-
-            # Classify regime
-            if vix < 15:
-                regime = "LOW"
-                exposure_mult = 1.2
-            elif vix < 25:
-                regime = "NORMAL"
-                exposure_mult = 1.0
-            elif vix < 35:
-                regime = "ELEVATED"
-                exposure_mult = 0.7
-            else:
-                regime = "CRISIS"
-                exposure_mult = 0.3
-
-            result_data = {
-                "vix_level": vix,
-                "regime": regime,
-                "exposure_multiplier": exposure_mult,
-                "interpretation": f"VIX {vix:.1f} → {regime} regime → {exposure_mult}x exposure",
-            }
+            result_data = await self.run_compute(
+                {"vix_level": float(context.data.get("vix_level", 20.0))}
+            )
 
             if context.bus:
                 await context.bus.publish(
@@ -77,3 +59,28 @@ class AlphaVixRegime(Plugin):
         except Exception as e:
             logger.error(f"Error in VIX regime: {e}", exc_info=True)
             return PluginResult(success=False, error=str(e))
+
+    def compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a VIX level to its regime and exposure multiplier."""
+        vix = data["vix_level"]
+
+        # Classify regime
+        if vix < 15:
+            regime = "LOW"
+            exposure_mult = 1.2
+        elif vix < 25:
+            regime = "NORMAL"
+            exposure_mult = 1.0
+        elif vix < 35:
+            regime = "ELEVATED"
+            exposure_mult = 0.7
+        else:
+            regime = "CRISIS"
+            exposure_mult = 0.3
+
+        return {
+            "vix_level": vix,
+            "regime": regime,
+            "exposure_multiplier": exposure_mult,
+            "interpretation": f"VIX {vix:.1f} → {regime} regime → {exposure_mult}x exposure",
+        }
@@ -7,6 +7,7 @@ import random
 import numpy as np
 from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
 from optifire.core.logger import logger
+from optifire.core.tickstore import get_tick_store
 
 
 class AlphaVpin(Plugin):
@@ -34,28 +35,36 @@ class AlphaVpin(Plugin):
     def plan(self) -> Dict[str, Any]:
         return {
             "schedule": "@continuous",
-            "triggers": ["tick_data"],
+            "triggers": ["tick_data", "market.trade.#"],
             "dependencies": [],
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Calculate VPIN."""
         try:
+            # Get params from context.data (backward compat with context.config)
+            params = context.data if context.data else context.config
             symbol = params.get("symbol", "SPY")
             trades = params.get("trades", None)
 
-            if trades is None:
+            if trades is not None:
+                prices = np.array([t["price"] for t in trades], dtype=float)
+                volumes = np.array([t["volume"] for t in trades], dtype=float)
+            else:
+                # Shared tape (views, no copy)
+                tape = get_tick_store().trades(symbol).last(params.get("window", 5000))
+                prices, volumes = tape["price"], tape["size"]
+
+            if not len(prices):
                 # Mock trade data
                 n = 50
-                trades = [
-                    {"price": 450 + random.uniform(-1, 1), "volume": random.randint(10, 1000)}
-                    for _ in range(n)
-                ]
+                prices = np.array([450 + random.uniform(-1, 1) for _ in range(n)])
+                volumes = np.array([random.randint(10, 1000) for _ in range(n)], dtype=float)
 
             # Classify trades as buy or sell (simplified: compare to mid)
-            mid_price = np.mean([t["price"] for t in trades])
-            buy_volume = sum(t["volume"] for t in trades if t["price"] > mid_price)
-            sell_volume = sum(t["volume"] for t in trades if t["price"] <= mid_price)
+            mid_price = prices.mean()
+            buy_volume = float(volumes[prices > mid_price].sum())
+            sell_volume = float(volumes[prices <= mid_price].sum())
 
             # VPIN = |buy_volume - sell_volume| / total_volume
             total_volume = buy_volume + sell_volume
@@ -0,0 +1,450 @@
+"""
+Plugin performance benchmarks.
+
+Every plugin is run against synthetic inputs at several sizes (series
+length, and symbol count through ``run_batch``). Each case records wall
+latency percentiles, CPU time and peak allocation (via ``UsageMeter``).
+Results are appended to a JSON history so later runs can be compared
+against a baseline, and the reference case is checked against the
+plugin's declared ``est_cpu_ms`` / ``est_mem_mb``.
+
+Benchmarks run offline: outbound network connections fail immediately,
+so plugins that fetch data report an error instead of hanging.
+
+Command line: ``bench_plugins.py`` / ``make bench-plugins``.
+"""
+import asyncio
+import json
+import platform
+import signal
+import socket
+import statistics
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from optifire.core.logger import logger
+from optifire.core.memo import configure_memo_cache
+from optifire.core.usage import UsageMeter, start_memory_tracing
+
+HISTORY_PATH = Path("data/bench/plugins.json")
+HISTORY_VERSION = 1
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    """One input size."""
+
+    name: str
+    points: int
+    symbols: int = 1  # > 1: inputs are (points x symbols) panels via run_batch
+
+
+DEFAULT_CASES = (
+    BenchCase("100", 100),
+    BenchCase("10k", 10_000),
+    BenchCase("1M", 1_000_000),
+    BenchCase("10sym", 1_000, 10),
+    BenchCase("500sym", 1_000, 500),
+)
+
+# Case compared against est_cpu_ms / est_mem_mb
+REFERENCE_CASE = "10k"
+
+# Synthetic input kinds by input name; other inputs are left to plugin defaults
+RETURN_INPUTS = {
+    "returns", "spy_returns", "tlt_returns", "portfolio_returns", "benchmark_returns",
+    "signal", "primary_signal", "actual", "predictions", "x", "y",
+}
+LEVEL_INPUTS = {"prices", "equity_curve", "history", "vix"}
+VOLUME_INPUTS = {"volume", "volumes"}
+MATRIX_INPUTS = {"features", "embeddings"}
+
+
+class BenchTimeout(Exception):
+    """A benchmark run exceeded its time limit."""
+
+
+def synthetic_inputs(
+    inputs: Sequence[str], points: int, symbols: int = 1, seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Deterministic inputs for a plugin's declared input names.
+
+    Args:
+        inputs: Input names from the plugin metadata
+        points: Series length
+        symbols: Panel width (1 = plain 1-D series)
+        seed: RNG seed
+
+    Returns:
+        Input dict for ``PluginContext.data``
+    """
+    rng = np.random.default_rng(seed)
+    shape = (points,) if symbols == 1 else (points, symbols)
+    returns = rng.normal(0.0, 0.01, shape)
+
+    data: Dict[str, Any] = {}
+    for name in inputs:
+        if name in RETURN_INPUTS:
+            data[name] = returns
+        elif name in LEVEL_INPUTS:
+            data[name] = 100.0 * np.exp(np.cumsum(returns, axis=0))
+        elif name in VOLUME_INPUTS:
+            data[name] = rng.integers(1_000, 1_000_000, shape).astype(float)
+        elif name in MATRIX_INPUTS:
+            data[name] = rng.normal(size=(points, 8))
+        elif name == "symbol" and symbols == 1:
+            data[name] = "SYM0"
+    return data
+
+
+def case_symbols(case: BenchCase) -> List[str]:
+    return [f"SYM{i}" for i in range(case.symbols)]
+
+
+@contextmanager
+def offline() -> Iterator[None]:
+    """Refuse outbound network connections (local sockets still work)."""
+    real_connect = socket.socket.connect
+    real_getaddrinfo = socket.getaddrinfo
+
+    def connect(sock, address):
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            raise OSError("network disabled during benchmark")
+        return real_connect(sock, address)
+
+    def getaddrinfo(host, *args, **kwargs):
+        if host in (None, "localhost", "127.0.0.1", "::1"):
+            return real_getaddrinfo(host, *args, **kwargs)
+        raise socket.gaierror(f"network disabled during benchmark: {host}")
+
+    socket.socket.connect = connect
+    socket.getaddrinfo = getaddrinfo
+    try:
+        yield
+    finally:
+        socket.socket.connect = real_connect
+        socket.getaddrinfo = real_getaddrinfo
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Interrupt the block after ``seconds`` (also inside blocking plugin code).
+
+    Uses SIGALRM, so it only applies in the main thread; elsewhere the block
+    runs to completion.
+    """
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise BenchTimeout(f"exceeded {seconds:.0f}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+async def _run_case(plugin: Any, case: BenchCase, data: Dict[str, Any]) -> Dict[str, Any]:
+    """One metered run: wall/CPU/peak plus the first error, if any."""
+    from optifire.plugins import PluginContext
+
+    context = PluginContext(config={}, db=None, bus=None, data=data)
+    if case.symbols > 1:
+        coro = plugin.run_batch(context, case_symbols(case))
+    else:
+        coro = plugin.run(context)
+
+    meter = UsageMeter(coro)
+    start = time.perf_counter()
+    output = await meter
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    results = output.values() if isinstance(output, dict) else [output]
+    error = next((r.error or "failed" for r in results if not r.success), None)
+    return {
+        "wall_ms": wall_ms,
+        "cpu_ms": meter.usage.total_cpu_ms,
+        "peak_mb": meter.usage.total_peak_mb,
+        "error": error,
+    }
+
+
+def measure(
+    plugin: Any,
+    case: BenchCase,
+    repeats: int = 5,
+    max_case_s: float = 10.0,
+    timeout_s: float = 30.0,
+) -> Dict[str, Any]:
+    """
+    Benchmark one plugin at one input size.
+
+    One warm-up run is discarded; then up to ``repeats`` runs are timed,
+    stopping early (after at least one) once the case has used
+    ``max_case_s``.
+
+    Args:
+        plugin: Plugin instance
+        case: Input size
+        repeats: Timed runs
+        max_case_s: Time allowance for the timed runs
+        timeout_s: Limit for any single run
+
+    Returns:
+        status ("ok", "error", "timeout"), runs, p50_ms, p90_ms, p99_ms,
+        max_ms, cpu_ms (median), peak_mb (max), error
+    """
+    data = synthetic_inputs(plugin.metadata.inputs, case.points, case.symbols)
+    samples: List[Dict[str, Any]] = []
+    status, error = "ok", None
+    started = time.perf_counter()
+
+    try:
+        for i in range(repeats + 1):
+            with deadline(timeout_s):
+                sample = asyncio.run(_run_case(plugin, case, data))
+            if sample["error"]:
+                status, error = "error", sample["error"]
+                break
+            if i > 0:
+                samples.append(sample)
+            if samples and time.perf_counter() - started > max_case_s:
+                break
+    except BenchTimeout as e:
+        status, error = "timeout", str(e)
+    except Exception as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+
+    wall = [s["wall_ms"] for s in samples]
+    return {
+        "status": status,
+        "runs": len(samples),
+        "p50_ms": round(percentile(wall, 50), 3),
+        "p90_ms": round(percentile(wall, 90), 3),
+        "p99_ms": round(percentile(wall, 99), 3),
+        "max_ms": round(max(wall, default=0.0), 3),
+        "cpu_ms": round(statistics.median([s["cpu_ms"] for s in samples]), 3) if samples else 0.0,
+        "peak_mb": round(max((s["peak_mb"] for s in samples), default=0.0), 3),
+        "error": error[:200] if error else None,
+    }
+
+
+def bench_plugin(
+    plugin: Any,
+    cases: Sequence[BenchCase] = DEFAULT_CASES,
+    **kwargs: Any,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark a plugin across cases.
+
+    Cases are run smallest first; after a timeout the larger cases of the
+    same kind (single series / panel) are skipped.
+
+    Returns:
+        case name -> measurement (see ``measure``)
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    timed_out = set()
+    for case in sorted(cases, key=lambda c: (c.symbols > 1, c.points * c.symbols)):
+        kind = case.symbols > 1
+        if kind in timed_out:
+            results[case.name] = {"status": "skipped", "runs": 0}
+            continue
+        results[case.name] = measure(plugin, case, **kwargs)
+        if results[case.name]["status"] == "timeout":
+            timed_out.add(kind)
+    return results
+
+
+def check_estimates(
+    metadata: Any,
+    result: Dict[str, Any],
+    under_factor: float = 2.0,
+    over_factor: float = 10.0,
+) -> List[str]:
+    """
+    Compare a reference-case measurement with the declared estimates.
+
+    Admission control packs runs by ``est_mem_mb`` and budgets CPU from
+    ``est_cpu_ms``, so both under- and over-estimates are worth fixing.
+
+    Returns:
+        Flags such as "cpu underestimated (340ms vs est 100ms)"
+    """
+    if result.get("status") != "ok":
+        return []
+    flags = []
+    for label, measured, declared, unit in (
+        ("cpu", result["cpu_ms"], metadata.est_cpu_ms, "ms"),
+        ("mem", result["peak_mb"], metadata.est_mem_mb, "MB"),
+    ):
+        if not declared:
+            continue
+        if measured > declared * under_factor:
+            flags.append(f"{label} underestimated ({measured:.1f}{unit} vs est {declared}{unit})")
+        elif measured * over_factor < declared:
+            flags.append(f"{label} overestimated ({measured:.1f}{unit} vs est {declared}{unit})")
+    return flags
+
+
+def load_history(path: Path = HISTORY_PATH) -> Dict[str, Any]:
+    """Benchmark history (empty if missing or unreadable)."""
+    try:
+        history = json.loads(path.read_text())
+        if history.get("version") == HISTORY_VERSION:
+            return history
+    except (OSError, ValueError):
+        pass
+    return {"version": HISTORY_VERSION, "runs": []}
+
+
+def append_history(run: Dict[str, Any], path: Path = HISTORY_PATH, keep: int = 50) -> None:
+    """Append a run to the history file, keeping the last ``keep`` runs."""
+    history = load_history(path)
+    history["runs"] = (history["runs"] + [run])[-keep:]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(history, indent=1, sort_keys=True) + "\n")
+    tmp.replace(path)
+
+
+def find_regressions(
+    run: Dict[str, Any],
+    history: Dict[str, Any],
+    window: int = 5,
+    tolerance: float = 0.25,
+    min_delta_ms: float = 0.5,
+    min_delta_mb: float = 1.0,
+) -> List[Dict[str, Any]]:
+    """
+    Compare a run against the median of earlier runs on the same host.
+
+    A case regresses when its p50 latency (or peak memory) exceeds the
+    baseline by more than ``tolerance`` and by more than the absolute noise
+    floor.
+
+    Args:
+        run: New run (as produced by ``run_benchmarks``)
+        history: Earlier runs (see ``load_history``)
+        window: Number of most recent comparable runs in the baseline
+
+    Returns:
+        One entry per regression: plugin, case, metric, baseline, current
+    """
+    earlier = [r for r in history.get("runs", []) if r.get("host") == run.get("host")]
+    regressions = []
+    for plugin_id, cases in run["results"].items():
+        for case, current in cases.items():
+            if current.get("status") != "ok":
+                continue
+            previous = [
+                r["results"][plugin_id][case]
+                for r in earlier
+                if r["results"].get(plugin_id, {}).get(case, {}).get("status") == "ok"
+            ][-window:]
+            if not previous:
+                continue
+            for metric, floor in (("p50_ms", min_delta_ms), ("peak_mb", min_delta_mb)):
+                baseline = statistics.median(p[metric] for p in previous)
+                value = current[metric]
+                if value > baseline * (1 + tolerance) and value - baseline > floor:
+                    regressions.append({
+                        "plugin": plugin_id,
+                        "case": case,
+                        "metric": metric,
+                        "baseline": round(baseline, 3),
+                        "current": value,
+                    })
+    return regressions
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(
+    plugin_ids: Optional[Sequence[str]] = None,
+    cases: Sequence[BenchCase] = DEFAULT_CASES,
+    progress: Any = None,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Benchmark discovered plugins.
+
+    Args:
+        plugin_ids: Plugins to run (default: all in the manifest)
+        cases: Input sizes
+        progress: Optional callback(plugin_id, results) after each plugin
+        **kwargs: Passed to ``measure``
+
+    Returns:
+        Run record: timestamp, git_rev, host, python, cases, results
+        (plugin -> case -> measurement) and estimate flags
+    """
+    from optifire.core.procpool import get_process_pool
+    from optifire.plugins import PluginRegistry
+
+    registry = PluginRegistry()
+    registry.discover()
+    plugin_ids = list(plugin_ids or registry.list_available())
+
+    start_memory_tracing()
+    configure_memo_cache(max_entries=0)  # Measure computations, not cache hits
+
+    results: Dict[str, Dict[str, Any]] = {}
+    estimates: Dict[str, List[str]] = {}
+    try:
+        with offline():
+            for plugin_id in plugin_ids:
+                lazy = registry.lazy(plugin_id)
+                if lazy is None:
+                    logger.warning(f"Unknown plugin {plugin_id}")
+                    continue
+                try:
+                    plugin = lazy.load()
+                except Exception as e:
+                    results[plugin_id] = {"load": {"status": "error", "runs": 0, "error": str(e)[:200]}}
+                    continue
+
+                results[plugin_id] = bench_plugin(plugin, cases, **kwargs)
+                reference = results[plugin_id].get(REFERENCE_CASE, {})
+                flags = check_estimates(plugin.metadata, reference)
+                if flags:
+                    estimates[plugin_id] = flags
+                if progress:
+                    progress(plugin_id, results[plugin_id])
+    finally:
+        get_process_pool().shutdown()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_rev": _git_rev(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "cases": [asdict(c) for c in cases],
+        "results": results,
+        "estimates": estimates,
+    }
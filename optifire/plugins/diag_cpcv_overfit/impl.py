@@ -3,13 +3,20 @@ diag_cpcv_overfit - Combinatorial Purged CV for overfit detection.
 FULL IMPLEMENTATION
 """
 from typing import Dict, Any
-import random
 from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
+from optifire.backtest.validation import report_from_params_async
 from optifire.core.logger import logger
 
 
 class DiagCpcvOverfit(Plugin):
-    """Detect overfitting via CPCV."""
+    """
+    Detect overfitting via CPCV.
+
+    Backtests every point of a strategy's parameter grid on stored daily
+    bars (or scores a given day x trial ``returns`` matrix), then measures
+    the probability of backtest overfitting across all purged, embargoed
+    train/test combinations.
+    """
 
     def describe(self) -> PluginMetadata:
         return PluginMetadata(
@@ -19,8 +26,8 @@ class DiagCpcvOverfit(Plugin):
             version="1.0.0",
             author="OptiFIRE",
             description="Combinatorial Purged Cross-Validation",
-            inputs=['model'],
-            outputs=['is_overfit'],
+            inputs=['returns', 'strategy', 'grid', 'symbols', 'start', 'end'],
+            outputs=['is_overfit', 'pbo', 'is_sharpe', 'oos_sharpe'],
             est_cpu_ms=3000,
             est_mem_mb=150,
         )
@@ -30,12 +37,10 @@ class DiagCpcvOverfit(Plugin):
 
     async def run(self, context: PluginContext) -> PluginResult:
         try:
-            # Mock: IS vs OOS performance
-            in_sample_sharpe = random.uniform(1.8, 2.5)
-            out_sample_sharpe = random.uniform(0.8, 1.5)
-
-            is_overfit = (in_sample_sharpe - out_sample_sharpe) > 0.5
-
-            return PluginResult(success=True, data={"is_overfit": is_overfit, "is_sharpe": in_sample_sharpe, "oos_sharpe": out_sample_sharpe})
+            # Get params from context.data (backward compat with context.config)
+            params = context.data if context.data else context.config
+            report = await report_from_params_async(params, "cpcv")
+            return PluginResult(success=True, data=report.to_dict())
         except Exception as e:
+            logger.error(f"Error in CPCV overfit check: {e}", exc_info=True)
             return PluginResult(success=False, error=str(e))
@@ -5,6 +5,7 @@ FULL IMPLEMENTATION
 from typing import Dict, Any
 import numpy as np
 from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
+from optifire.backtest.validation import report_from_params_async
 from optifire.core.logger import logger
 
 
@@ -14,6 +15,10 @@ class DiagOosDecayPlot(Plugin):
 
     Tracks how strategy performance degrades over time.
     Detects overfitting.
+
+    Fits the decay of a given ``sharpe_ratios`` series, or of the
+    out-of-sample Sharpe ratios of a purged walk-forward validation (see
+    ``optifire.backtest.validation``) in time order.
     """
 
     def describe(self) -> PluginMetadata:
@@ -24,8 +29,8 @@ class DiagOosDecayPlot(Plugin):
             version="1.0.0",
             author="OptiFIRE",
             description="Out-of-sample performance decay",
-            inputs=['sharpe_ratios'],
-            outputs=['plot_data', 'decay_rate'],
+            inputs=['sharpe_ratios', 'returns', 'strategy', 'grid', 'symbols', 'start', 'end'],
+            outputs=['plot_data', 'decay_rate', 'sharpe_decay'],
             est_cpu_ms=300,
             est_mem_mb=30,
         )
@@ -40,11 +45,15 @@ class DiagOosDecayPlot(Plugin):
     async def run(self, context: PluginContext) -> PluginResult:
         """Analyze OOS decay."""
         try:
+            # Get params from context.data (backward compat with context.config)
+            params = context.data if context.data else context.config
             sharpe_ratios = params.get("sharpe_ratios", None)
+            validation = {}
             if sharpe_ratios is None:
-                # Mock: declining Sharpe over time (overfitting indicator)
-                months = np.arange(12)
-                sharpe_ratios = 2.0 * np.exp(-0.1 * months) + np.random.normal(0, 0.2, 12)
+                report = await report_from_params_async(params, "walk_forward")
+                sharpe_ratios = report.oos_sharpe
+                summary = report.to_dict()
+                validation = {name: summary[name] for name in ("is_sharpe", "oos_sharpe", "sharpe_decay", "best_params")}
 
             sharpe_ratios = np.array(sharpe_ratios)
 
@@ -59,8 +68,8 @@ class DiagOosDecayPlot(Plugin):
 
             # Generate plot data
             plot_data = {
-                "x": list(x),
-                "y": list(sharpe_ratios),
+                "x": x.tolist(),
+                "y": sharpe_ratios.tolist(),
                 "decay_rate": float(decay_rate),
             }
 
@@ -76,6 +85,7 @@ class DiagOosDecayPlot(Plugin):
                 "plot_data": plot_data,
                 "decay_rate": float(decay_rate),
                 "interpretation": interpretation,
+                **validation,
             }
 
             if context.bus:
@@ -3,8 +3,10 @@ exec_iceberg_detect - Iceberg Detector.
 FULL IMPLEMENTATION
 """
 from typing import Dict, Any
+import numpy as np
 from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
 from optifire.core.logger import logger
+from optifire.core.tickstore import get_tick_store
 
 
 class ExecIcebergDetect(Plugin):
@@ -18,26 +20,57 @@ class ExecIcebergDetect(Plugin):
             version="1.0.0",
             author="OptiFIRE",
             description="Detect hidden large orders",
-            inputs=['orderbook'],
+            inputs=['orderbook', 'symbol'],
             outputs=['iceberg_detected'],
             est_cpu_ms=250,
             est_mem_mb=30,
         )
 
     def plan(self) -> Dict[str, Any]:
-        return {"schedule": "@continuous", "triggers": ["tick"], "dependencies": []}
+        return {"schedule": "@continuous", "triggers": ["tick", "market.trade.#"], "dependencies": []}
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Detect hidden large orders"""
         try:
             # Get params from context.data (backward compat with context.config)
             params = context.data if context.data else context.config
-            book = params.get("orderbook", {})
-            detected = len(book) > 100  # Mock detection
-            result_data = {"iceberg_detected": detected, "estimated_size": 10000 if detected else 0}
+            book = params.get("orderbook")
+            symbol = params.get("symbol", "SPY")
+            store = get_tick_store()
+            trades = store.trades(symbol).last(params.get("window", 2000))
+            if book is None and len(trades):
+                result_data = {"symbol": symbol, **self._detect_from_tape(trades, store.quotes(symbol).between(int(trades["t"][0])), params)}
+            else:
+                detected = len(book or {}) > 100  # Mock detection
+                result_data = {"iceberg_detected": detected, "estimated_size": 10000 if detected else 0}
             if context.bus:
                 await context.bus.publish("exec_iceberg_detect_update", result_data, source="exec_iceberg_detect")
             return PluginResult(success=True, data=result_data)
         except Exception as e:
             logger.error(f"Error in exec_iceberg_detect: {e}", exc_info=True)
             return PluginResult(success=False, error=str(e))
+
+    @staticmethod
+    def _detect_from_tape(trades, quotes, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        A price level that keeps printing far more than is ever displayed
+        there is being refilled from hidden size.
+        """
+        levels, index = np.unique(trades["price"], return_inverse=True)
+        traded = np.bincount(index, weights=trades["size"])
+        prints = np.bincount(index)
+        if len(quotes):
+            displayed = float(np.median(np.maximum(quotes["bid_size"], quotes["ask_size"])))
+        else:
+            displayed = float(np.median(trades["size"]))
+
+        ratio = params.get("refill_ratio", 5.0)
+        hidden = (traded > ratio * max(displayed, 1.0)) & (prints >= params.get("min_prints", 5))
+        best = int(np.argmax(np.where(hidden, traded, -1.0)))
+        detected = bool(hidden.any())
+        return {
+            "iceberg_detected": detected,
+            "estimated_size": float(traded[best]) if detected else 0,
+            "price_level": float(levels[best]) if detected else None,
+            "displayed_size": displayed,
+        }
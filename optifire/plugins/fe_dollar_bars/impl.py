@@ -6,6 +6,7 @@ from typing import Dict, Any, List
 import numpy as np
 from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
 from optifire.core.logger import logger
+from optifire.core.tickstore import get_tick_store
 
 
 class FeDollarBars(Plugin):
@@ -27,7 +28,7 @@ class FeDollarBars(Plugin):
             version="1.0.0",
             author="OptiFIRE",
             description="Volume-weighted bar sampling",
-            inputs=['prices', 'volumes'],
+            inputs=['symbol', 'prices', 'volumes'],
             outputs=['dollar_bars'],
             est_cpu_ms=600,
             est_mem_mb=60,
@@ -36,17 +37,31 @@ class FeDollarBars(Plugin):
     def plan(self) -> Dict[str, Any]:
         return {
             "schedule": "@continuous",
-            "triggers": ["tick_data"],
+            "triggers": ["tick_data", "market.trade.#"],
             "dependencies": [],
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Generate dollar bars."""
         try:
+            # Get params from context.data (backward compat with context.config)
+            params = context.data if context.data else context.config
+            symbol = params.get("symbol", "SPY")
             prices = params.get("prices", None)
             volumes = params.get("volumes", None)
             threshold = params.get("threshold", 100000)  # $100k per bar
 
+            # Triggered by a trade: sample the shared tape (views, no copy),
+            # not the minute bars the runner adds for market events
+            trigger = params.get("trigger_event")
+            from_tape = prices is None or volumes is None or (
+                trigger is not None and trigger.type.startswith("market.trade.")
+            )
+            if from_tape:
+                trades = get_tick_store().trades(symbol).last(params.get("window", 50_000))
+                if len(trades):
+                    prices, volumes = trades["price"], trades["size"]
+
             if prices is None or volumes is None:
                 # Mock tick data
                 n = 1000
@@ -57,6 +72,7 @@ class FeDollarBars(Plugin):
             dollar_bars = self._create_dollar_bars(prices, volumes, threshold)
 
             result_data = {
+                "symbol": symbol,
                 "n_ticks": len(prices),
                 "n_dollar_bars": len(dollar_bars),
                 "threshold": threshold,
@@ -84,6 +100,8 @@ class FeDollarBars(Plugin):
         bar_prices = []
         bar_volumes = []
 
+        prices = np.asarray(prices, dtype=float).tolist()
+        volumes = np.asarray(volumes, dtype=float).tolist()
         for price, volume in zip(prices, volumes):
             dollar_value = price * volume
             cumulative_dollar += dollar_value
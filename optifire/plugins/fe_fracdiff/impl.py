@@ -37,26 +37,22 @@ class FeFracdiff(Plugin):
             "schedule": "@daily",
             "triggers": ["market_close"],
             "dependencies": [],
+            "execution": "process",
+            "memoize": True,
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Apply fractional differentiation."""
         try:
-            prices = params.get("prices", None)
+            prices = context.data.get("prices")
             if prices is None:
                 # Mock price data
                 prices = 100 * np.cumprod(1 + np.random.normal(0.001, 0.02, 100))
 
-            d = params.get("d", 0.5)  # Fractional order
-
-            # Apply fractional differentiation
-            fracdiff_prices = self._fractional_diff(prices, d)
-
-            result_data = {
-                "original_prices": list(prices[-10:]),
-                "fracdiff_prices": list(fracdiff_prices[-10:]),
-                "order_d": d,
-            }
+            result_data = await self.run_compute({
+                "prices": np.asarray(prices, dtype=float),
+                "d": context.data.get("d", 0.5),  # Fractional order
+            })
 
             if context.bus:
                 await context.bus.publish(
@@ -71,6 +67,16 @@ class FeFracdiff(Plugin):
             logger.error(f"Error in fractional diff: {e}", exc_info=True)
             return PluginResult(success=False, error=str(e))
 
+    def compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Fractionally differentiate the price series."""
+        prices, d = data["prices"], data["d"]
+        fracdiff_prices = self._fractional_diff(prices, d)
+        return {
+            "original_prices": prices[-10:].tolist(),
+            "fracdiff_prices": fracdiff_prices[-10:].tolist(),
+            "order_d": d,
+        }
+
     def _fractional_diff(self, series, d):
         """
         Fractional differentiation.
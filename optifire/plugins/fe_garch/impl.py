@@ -2,7 +2,7 @@
 fe_garch - GARCH volatility forecasting.
 FULL IMPLEMENTATION
 """
-from typing import Dict, Any
+from typing import Dict, Any, Sequence
 import numpy as np
 from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
 from optifire.core.logger import logger
@@ -34,32 +34,18 @@ class FeGarch(Plugin):
             "schedule": "@daily",
             "triggers": ["market_close"],
             "dependencies": [],
+            "execution": "process",
+            "memoize": True,
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Forecast volatility with GARCH."""
         try:
-            returns = params.get("returns", np.random.normal(0.001, 0.015, 100))
+            returns = np.asarray(
+                context.data.get("returns", np.random.normal(0.001, 0.015, 100))
+            )
 
-            # Simple GARCH(1,1): σ²(t+1) = ω + α*ε²(t) + β*σ²(t)
-            omega = 0.0001
-            alpha = 0.1
-            beta = 0.85
-
-            # Current squared return
-            epsilon_sq = returns[-1] ** 2
-
-            # Previous variance (use realized)
-            sigma_sq = np.var(returns[-21:])
-
-            # GARCH forecast
-            forecast_var = omega + alpha * epsilon_sq + beta * sigma_sq
-            forecast_vol = float(np.sqrt(forecast_var * 252))
-
-            result_data = {
-                "forecast_vol": forecast_vol,
-                "interpretation": f"GARCH forecast: {forecast_vol*100:.1f}% annualized",
-            }
+            result_data = await self.run_compute({"returns": returns})
 
             if context.bus:
                 await context.bus.publish(
@@ -73,3 +59,59 @@ class FeGarch(Plugin):
         except Exception as e:
             logger.error(f"Error in GARCH: {e}", exc_info=True)
             return PluginResult(success=False, error=str(e))
+
+    async def run_batch(
+        self, context: PluginContext, symbols: Sequence[str]
+    ) -> Dict[str, PluginResult]:
+        """Forecast volatility for a (time x symbol) returns panel in one pass."""
+        try:
+            forecast_vol = self._forecast_vol(np.asarray(context.data["returns"], dtype=float))
+        except Exception as e:
+            logger.error(f"Error in batch GARCH: {e}", exc_info=True)
+            return {symbol: PluginResult(success=False, error=str(e)) for symbol in symbols}
+
+        results = {
+            symbol: PluginResult(
+                success=True,
+                data={
+                    "forecast_vol": float(vol),
+                    "interpretation": f"GARCH forecast: {vol*100:.1f}% annualized",
+                },
+            )
+            for symbol, vol in zip(symbols, forecast_vol)
+        }
+
+        if context.bus:
+            await context.bus.publish(
+                "garch_batch_update",
+                {"forecast_vol": dict(zip(symbols, forecast_vol.tolist()))},
+                source="fe_garch",
+            )
+
+        return results
+
+    def compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """One-step GARCH(1,1) volatility forecast."""
+        forecast_vol = float(self._forecast_vol(data["returns"]))
+
+        return {
+            "forecast_vol": forecast_vol,
+            "interpretation": f"GARCH forecast: {forecast_vol*100:.1f}% annualized",
+        }
+
+    def _forecast_vol(self, returns: np.ndarray) -> np.ndarray:
+        """Annualized forecast per column (scalar for a 1-D series)."""
+        # Simple GARCH(1,1): σ²(t+1) = ω + α*ε²(t) + β*σ²(t)
+        omega = 0.0001
+        alpha = 0.1
+        beta = 0.85
+
+        # Current squared return
+        epsilon_sq = returns[-1] ** 2
+
+        # Previous variance (use realized)
+        sigma_sq = np.var(returns[-21:], axis=0)
+
+        # GARCH forecast
+        forecast_var = omega + alpha * epsilon_sq + beta * sigma_sq
+        return np.sqrt(forecast_var * 252)
@@ -35,40 +35,22 @@ class FeMiniPca(Plugin):
             "schedule": "@weekly",
             "triggers": ["weekend"],
             "dependencies": [],
+            "execution": "process",
+            "memoize": True,
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Apply mini-batch PCA."""
         try:
-            features = params.get("features", None)
-            n_components = params.get("n_components", 3)
-
+            features = context.data.get("features")
             if features is None:
                 # Mock feature matrix (100 samples, 10 features)
                 features = np.random.randn(100, 10)
 
-            # Standardize features
-            features_std = (features - features.mean(axis=0)) / (features.std(axis=0) + 1e-8)
-
-            # Simple PCA via SVD
-            U, S, Vt = np.linalg.svd(features_std, full_matrices=False)
-
-            # Explained variance
-            explained_variance = (S ** 2) / (len(features) - 1)
-            explained_variance_ratio = explained_variance / explained_variance.sum()
-
-            # Principal components
-            components = Vt[:n_components]
-
-            # Transform data
-            transformed = U[:, :n_components] * S[:n_components]
-
-            result_data = {
-                "n_components": n_components,
-                "explained_variance_ratio": list(explained_variance_ratio[:n_components]),
-                "total_variance_explained": float(explained_variance_ratio[:n_components].sum()),
-                "components_shape": components.shape,
-            }
+            result_data = await self.run_compute({
+                "features": np.asarray(features, dtype=float),
+                "n_components": context.data.get("n_components", 3),
+            })
 
             if context.bus:
                 await context.bus.publish(
@@ -82,3 +64,27 @@ class FeMiniPca(Plugin):
         except Exception as e:
             logger.error(f"Error in mini-batch PCA: {e}", exc_info=True)
             return PluginResult(success=False, error=str(e))
+
+    def compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """PCA of the standardized feature matrix via SVD."""
+        features, n_components = data["features"], data["n_components"]
+
+        # Standardize features
+        features_std = (features - features.mean(axis=0)) / (features.std(axis=0) + 1e-8)
+
+        # Simple PCA via SVD
+        U, S, Vt = np.linalg.svd(features_std, full_matrices=False)
+
+        # Explained variance
+        explained_variance = (S ** 2) / (len(features) - 1)
+        explained_variance_ratio = explained_variance / explained_variance.sum()
+
+        # Principal components
+        components = Vt[:n_components]
+
+        return {
+            "n_components": n_components,
+            "explained_variance_ratio": explained_variance_ratio[:n_components].tolist(),
+            "total_variance_explained": float(explained_variance_ratio[:n_components].sum()),
+            "components_shape": components.shape,
+        }
@@ -35,25 +35,20 @@ class FeWavelet(Plugin):
             "schedule": "@continuous",
             "triggers": ["new_signal"],
             "dependencies": [],
+            "execution": "process",
+            "memoize": True,
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Apply wavelet denoising."""
         try:
-            signal = params.get("signal", None)
+            signal = context.data.get("signal")
             if signal is None:
                 # Mock noisy signal
                 t = np.linspace(0, 1, 128)
                 signal = np.sin(2 * np.pi * 5 * t) + np.random.normal(0, 0.5, 128)
 
-            # Simple wavelet denoising (Haar wavelet)
-            denoised = self._wavelet_denoise(signal)
-
-            result_data = {
-                "original_signal": list(signal[-20:]),
-                "denoised_signal": list(denoised[-20:]),
-                "snr_improvement": self._calculate_snr_improvement(signal, denoised),
-            }
+            result_data = await self.run_compute({"signal": np.asarray(signal, dtype=float)})
 
             if context.bus:
                 await context.bus.publish(
@@ -68,6 +63,16 @@ class FeWavelet(Plugin):
             logger.error(f"Error in wavelet denoising: {e}", exc_info=True)
             return PluginResult(success=False, error=str(e))
 
+    def compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Denoise the signal with a one-level Haar transform."""
+        signal = data["signal"]
+        denoised = self._wavelet_denoise(signal)
+        return {
+            "original_signal": signal[-20:].tolist(),
+            "denoised_signal": denoised[-20:].tolist(),
+            "snr_improvement": self._calculate_snr_improvement(signal, denoised),
+        }
+
     def _wavelet_denoise(self, signal):
         """
         Simple wavelet denoising.
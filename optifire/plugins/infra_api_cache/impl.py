@@ -3,22 +3,22 @@ infra_api_cache - API response caching.
 FULL IMPLEMENTATION
 """
 from typing import Dict, Any
-import time
 from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
 from optifire.core.logger import logger
+from optifire.core.memo import MemoCache
 
 
 class InfraApiCache(Plugin):
     """
     API response caching.
 
-    Caches API responses with TTL.
+    Caches API responses with TTL and LRU eviction.
     Reduces API calls and latency.
     """
 
     def __init__(self):
         super().__init__()
-        self.cache = {}
+        self.cache = MemoCache(max_entries=10_000, max_mb=32, ttl_s=300)
 
     def describe(self) -> PluginMetadata:
         return PluginMetadata(
@@ -28,7 +28,7 @@ class InfraApiCache(Plugin):
             version="1.0.0",
             author="OptiFIRE",
             description="Cache API responses (5min TTL)",
-            inputs=['key', 'value', 'action'],
+            inputs=['key', 'value', 'action', 'ttl'],
             outputs=['cached_value', 'hit'],
             est_cpu_ms=50,
             est_mem_mb=10,
@@ -44,17 +44,18 @@ class InfraApiCache(Plugin):
     async def run(self, context: PluginContext) -> PluginResult:
         """Cache API responses."""
         try:
-            action = params.get("action", "get")
-            key = params.get("key", "")
-            ttl = params.get("ttl", 300)  # 5 minutes
+            action = context.data.get("action", "get")
+            key = context.data.get("key", "")
+            ttl = context.data.get("ttl", 300)  # 5 minutes
 
             if action == "get":
                 result = self._get(key)
             elif action == "set":
-                value = params.get("value")
-                result = self._set(key, value, ttl)
+                result = self._set(key, context.data.get("value"), ttl)
             elif action == "clear":
                 result = self._clear()
+            elif action == "stats":
+                result = self.cache.get_stats()
             else:
                 return PluginResult(success=False, error=f"Unknown action: {action}")
 
@@ -66,31 +67,12 @@ class InfraApiCache(Plugin):
 
     def _get(self, key):
         """Get cached value."""
-        if key not in self.cache:
-            return {"hit": False, "value": None}
-
-        entry = self.cache[key]
-        now = time.time()
-
-        # Check expiration
-        if now > entry["expires"]:
-            del self.cache[key]
-            return {"hit": False, "value": None}
-
-        return {
-            "hit": True,
-            "value": entry["value"],
-            "age_seconds": now - entry["created"],
-        }
+        hit, value = self.cache.get(key)
+        return {"hit": hit, "value": value}
 
     def _set(self, key, value, ttl):
         """Set cache entry."""
-        now = time.time()
-        self.cache[key] = {
-            "value": value,
-            "created": now,
-            "expires": now + ttl,
-        }
+        self.cache.set(key, value, ttl_s=ttl)
 
         return {
             "action": "set",
@@ -101,10 +83,7 @@ class InfraApiCache(Plugin):
 
     def _clear(self):
         """Clear cache."""
-        size_before = len(self.cache)
-        self.cache = {}
-
         return {
             "action": "clear",
-            "cleared": size_before,
+            "cleared": self.cache.clear(),
         }
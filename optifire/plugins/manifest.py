@@ -0,0 +1,281 @@
+"""
+Plugin manifest: discover plugins without importing them.
+
+``manifest.json`` next to this file caches, for every plugin package, what
+the runner needs before a plugin actually runs: metadata, plan (schedule,
+triggers, dependencies, execution) and the plugin.yaml budget. Entries are
+keyed by a hash of the package sources; only packages whose sources changed
+are imported to refresh their entry.
+
+Plugins are then handed out as ``LazyPlugin`` proxies that import the
+implementation (and its numpy/pandas/... dependencies) on first run.
+
+Rebuild the whole manifest with ``make manifest``.
+"""
+import hashlib
+import importlib
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from optifire.core.errors import PluginError
+from optifire.core.logger import logger
+
+PLUGINS_DIR = Path(__file__).parent
+MANIFEST_PATH = PLUGINS_DIR / "manifest.json"
+MANIFEST_VERSION = 1
+
+# Files whose content identifies a plugin version
+_SOURCE_FILES = ("__init__.py", "impl.py", "plugin.yaml")
+
+
+@dataclass
+class PluginSpec:
+    """Cached description of one plugin package."""
+
+    plugin_id: str
+    module: str
+    class_name: str
+    name: str
+    category: str
+    version: str
+    author: str
+    description: str
+    inputs: List[str]
+    outputs: List[str]
+    est_cpu_ms: int
+    est_mem_mb: int
+    plan: Dict[str, Any]
+    budget: Dict[str, Any] = field(default_factory=dict)
+    source_hash: str = ""
+
+    def to_metadata(self):
+        from optifire.plugins import PluginMetadata
+
+        return PluginMetadata(
+            plugin_id=self.plugin_id,
+            name=self.name,
+            category=self.category,
+            version=self.version,
+            author=self.author,
+            description=self.description,
+            inputs=list(self.inputs),
+            outputs=list(self.outputs),
+            est_cpu_ms=self.est_cpu_ms,
+            est_mem_mb=self.est_mem_mb,
+        )
+
+
+def plugin_packages(plugins_dir: Path = PLUGINS_DIR) -> List[Path]:
+    """Plugin package directories (those with an impl.py)."""
+    return sorted(p.parent for p in plugins_dir.glob("*/impl.py"))
+
+
+def source_hash(package_dir: Path) -> str:
+    """Content hash of a plugin package's sources."""
+    digest = hashlib.blake2b(digest_size=12)
+    for name in _SOURCE_FILES:
+        path = package_dir / name
+        if path.exists():
+            digest.update(name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _find_plugin_class(module: Any) -> Optional[type]:
+    from optifire.plugins import Plugin
+
+    for name in getattr(module, "__all__", dir(module)):
+        obj = getattr(module, name, None)
+        if isinstance(obj, type) and issubclass(obj, Plugin) and obj is not Plugin:
+            return obj
+    return None
+
+
+def index_plugin(package_dir: Path, package: str = "optifire.plugins") -> PluginSpec:
+    """
+    Import one plugin package and describe it.
+
+    Args:
+        package_dir: Plugin package directory
+        package: Parent package name
+
+    Returns:
+        Plugin spec
+
+    Raises:
+        PluginError: If the package has no Plugin class
+    """
+    module_name = f"{package}.{package_dir.name}"
+    cls = _find_plugin_class(importlib.import_module(module_name))
+    if cls is None:
+        # Some packages do not re-export their class from __init__
+        module_name += ".impl"
+        cls = _find_plugin_class(importlib.import_module(module_name))
+    if cls is None:
+        raise PluginError(f"No Plugin class found in {package}.{package_dir.name}")
+
+    plugin = cls()
+    meta = plugin.metadata
+
+    budget: Dict[str, Any] = {}
+    yaml_path = package_dir / "plugin.yaml"
+    if yaml_path.exists():
+        budget = (yaml.safe_load(yaml_path.read_text()) or {}).get("budget") or {}
+
+    return PluginSpec(
+        plugin_id=meta.plugin_id,
+        module=module_name,
+        class_name=cls.__name__,
+        name=meta.name,
+        category=meta.category,
+        version=meta.version,
+        author=meta.author,
+        description=meta.description,
+        inputs=list(meta.inputs),
+        outputs=list(meta.outputs),
+        est_cpu_ms=meta.est_cpu_ms,
+        est_mem_mb=meta.est_mem_mb,
+        # Round-trip through JSON so the cached and fresh plans compare equal
+        plan=json.loads(json.dumps(plugin.plan(), default=str)),
+        budget=budget,
+        source_hash=source_hash(package_dir),
+    )
+
+
+def load_manifest(
+    path: Path = MANIFEST_PATH,
+    plugins_dir: Path = PLUGINS_DIR,
+    package: str = "optifire.plugins",
+    refresh: bool = True,
+) -> Dict[str, PluginSpec]:
+    """
+    Load plugin specs, re-indexing only packages whose sources changed.
+
+    Args:
+        path: Manifest file
+        plugins_dir: Directory holding the plugin packages
+        package: Python package of plugins_dir
+        refresh: Re-index stale or new packages (and save the manifest)
+
+    Returns:
+        plugin_id -> spec
+    """
+    cached: Dict[str, Dict[str, Any]] = {}
+    if path.exists():
+        try:
+            raw = json.loads(path.read_text())
+            if raw.get("version") == MANIFEST_VERSION:
+                cached = raw.get("plugins", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable plugin manifest {path}: {e}")
+
+    specs: Dict[str, PluginSpec] = {}
+    refreshed = 0
+    for package_dir in plugin_packages(plugins_dir):
+        entry = cached.get(package_dir.name)
+        if entry and entry.get("source_hash") == source_hash(package_dir):
+            specs[entry["plugin_id"]] = PluginSpec(**entry)
+            continue
+        if not refresh:
+            continue
+        try:
+            spec = index_plugin(package_dir, package)
+        except Exception as e:
+            logger.warning(f"Cannot index plugin {package_dir.name}: {e}")
+            continue
+        specs[spec.plugin_id] = spec
+        refreshed += 1
+
+    if refreshed or (refresh and len(specs) != len(cached)):
+        save_manifest(specs, path, package)
+        logger.info(f"Plugin manifest: re-indexed {refreshed} of {len(specs)} plugins")
+    return specs
+
+
+def rebuild_manifest(path: Path = MANIFEST_PATH) -> Dict[str, PluginSpec]:
+    """Discard the cache and re-index every plugin package."""
+    if path.exists():
+        path.unlink()
+    return load_manifest(path)
+
+
+def save_manifest(
+    specs: Dict[str, PluginSpec],
+    path: Path = MANIFEST_PATH,
+    package: str = "optifire.plugins",
+) -> None:
+    """Write specs to the manifest file (best effort)."""
+    payload = {
+        "version": MANIFEST_VERSION,
+        # Keyed by package directory, which is what staleness checks look up
+        "plugins": {
+            spec.module[len(package) + 1:].partition(".")[0]: asdict(spec)
+            for spec in sorted(specs.values(), key=lambda s: s.module)
+        },
+    }
+    try:
+        path.write_text(json.dumps(payload, indent=1, sort_keys=True) + "\n")
+    except OSError as e:
+        logger.warning(f"Cannot write plugin manifest {path}: {e}")
+
+
+class LazyPlugin:
+    """
+    Stand-in for a Plugin that imports its implementation on first use.
+
+    Metadata, plan and execution mode come from the manifest, so the DAG,
+    trigger engine and admission controller can be set up without
+    importing any plugin code.
+    """
+
+    def __init__(self, spec: PluginSpec):
+        self.spec = spec
+        self.metadata = spec.to_metadata()
+        self._plugin = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._plugin is not None
+
+    @property
+    def execution(self) -> str:
+        return self.plan().get("execution", "inline")
+
+    def plan(self) -> Dict[str, Any]:
+        if self._plugin is not None:
+            return self._plugin.plan()
+        return dict(self.spec.plan)
+
+    def load(self):
+        """Import and instantiate the plugin (once)."""
+        if self._plugin is None:
+            start = time.perf_counter()
+            module = importlib.import_module(self.spec.module)
+            self._plugin = getattr(module, self.spec.class_name)()
+            logger.debug(
+                f"Imported plugin {self.spec.plugin_id} in "
+                f"{(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+        return self._plugin
+
+    async def run(self, context):
+        return await self.load().run(context)
+
+    async def execute_with_budget(self, context, *args, **kwargs):
+        return await self.load().execute_with_budget(context, *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not defined on the proxy
+        if name.startswith("__") or name in ("spec", "metadata", "_plugin"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "lazy"
+        return f"<LazyPlugin {self.spec.plugin_id} ({state})>"
+
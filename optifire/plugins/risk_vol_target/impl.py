@@ -24,7 +24,7 @@ class RiskVolTarget(Plugin):
             version="1.0.0",
             author="OptiFIRE",
             description="Target constant portfolio volatility",
-            inputs=['returns'],
+            inputs=['returns', 'forecast_vol'],
             outputs=['current_vol', 'multiplier'],
             est_cpu_ms=200,
             est_mem_mb=20,
@@ -34,17 +34,21 @@ class RiskVolTarget(Plugin):
         return {
             "schedule": "@daily",
             "triggers": ["market_close"],
-            "dependencies": [],
+            "dependencies": ["fe_garch"],
         }
 
     async def run(self, context: PluginContext) -> PluginResult:
         """Calculate vol target multiplier."""
         try:
-            returns = params.get("returns", np.random.normal(0.001, 0.015, 21))
-            target_vol = params.get("target_vol", 0.15)
+            returns = context.data.get("returns", np.random.normal(0.001, 0.015, 21))
+            target_vol = context.data.get("target_vol", 0.15)
 
-            # Calculate current volatility
-            current_vol = float(np.std(returns) * np.sqrt(252))
+            # Prefer the GARCH forecast (fe_garch, upstream in the DAG)
+            forecast_vol = context.data.get("forecast_vol")
+            if forecast_vol is not None:
+                current_vol = float(forecast_vol)
+            else:
+                current_vol = float(np.std(returns) * np.sqrt(252))
 
             # Vol target multiplier
             if current_vol > 0:
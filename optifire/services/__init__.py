@@ -1,5 +1,17 @@
 """Services for auto-trading."""
-from .earnings_calendar import EarningsCalendar
-from .news_scanner import NewsScanner
+import importlib
 
 __all__ = ["EarningsCalendar", "NewsScanner"]
+
+_LAZY = {
+    "EarningsCalendar": ".earnings_calendar",
+    "NewsScanner": ".news_scanner",
+}
+
+
+def __getattr__(name):
+    # Imported on first use so `optifire.services.runner` does not pull in
+    # yfinance/pandas/httpx
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
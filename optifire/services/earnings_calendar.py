@@ -5,7 +5,6 @@ Fetches upcoming earnings dates for stocks.
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import asyncio
-import yfinance as yf
 
 from optifire.core.logger import logger
 
@@ -68,6 +67,9 @@ class EarningsCalendar:
                 logger.debug(f"{symbol} earnings from cache: {days_until} days")
                 return days_until
 
+        # yfinance pulls in pandas; import it on first lookup, not at startup
+        import yfinance as yf
+
         # Retry with exponential backoff
         for attempt in range(max_retries):
             try:
@@ -2,20 +2,50 @@
 Main service runner - single process, asyncio-based.
 """
 import asyncio
+import importlib
+import os
 import signal
+import time
+from datetime import datetime
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
 
 from optifire.core.config import Config
 from optifire.core.flags import FeatureFlags
 from optifire.core.db import Database
-from optifire.core.bus import EventBus
+from optifire.core.bus import Event, EventBus
 from optifire.core.scheduler import Scheduler
+from optifire.core.triggers import TriggerEngine
+from optifire.core.dag import DagExecutor, PluginDAG
+from optifire.core.admission import AdmissionController, plugin_priority
+from optifire.core.errors import AdmissionRejected, PluginError
+from optifire.core.memo import configure_memo_cache
+from optifire.core.procpool import configure_process_pool
+from optifire.core.tickstore import configure_tick_store
+from optifire.core.usage import start_memory_tracing
 from optifire.core.logger import logger
+from optifire.exec.market_stream import MarketStream, set_market_stream
+from optifire.plugins import Plugin, PluginContext, PluginResult, registry
 from optifire.api.server import create_app
 import uvicorn
 
 
+def trigger_data(trigger: Optional[Event], stream: Optional[MarketStream]) -> Dict[str, Any]:
+    """
+    Plugin context data for a triggered run.
+
+    Market events add the symbol (its ticks are on the shared tape) and its
+    buffered minute bars as prices/returns. Tick-driven plugins triggered by
+    "market.trade.*" read the tape rather than these bars.
+    """
+    data: Dict[str, Any] = {"trigger_event": trigger}
+    if stream and trigger is not None and trigger.type.startswith("market."):
+        data["symbol"] = trigger.data["symbol"]
+        data.update(stream.context_data([data["symbol"]]))
+    return data
+
+
 class OptiFIRERunner:
     """
     Main runner for OptiFIRE system.
@@ -33,8 +63,61 @@ class OptiFIRERunner:
         self.config = Config(self.config_path)
         self.flags = FeatureFlags(self.flags_path)
         self.db = Database(self.db_path)
-        self.bus = EventBus()
+        self.bus = EventBus(
+            dispatch_mode=self.config.get("bus.dispatch_mode", "concurrent"),
+            max_queue_size=self.config.get("bus.max_queue_size", 10000),
+            queue_policy=self.config.get("bus.queue_policy", "block"),
+        )
         self.scheduler = Scheduler()
+        self.triggers = TriggerEngine(
+            self.bus,
+            self.scheduler,
+            debounce_s=self.config.get("scheduler.debounce_seconds", 0.5),
+            max_delay_s=self.config.get("scheduler.max_trigger_delay_seconds", 5.0),
+        )
+
+        # Packs plugin runs into the worker/RAM budget of the box
+        self.admission = AdmissionController(
+            max_workers=self.config.get("system.max_workers", 3),
+            mem_budget_mb=self.config.get("system.plugin_mem_budget_mb", 400),
+            max_ram_mb=self.config.get("system.max_ram_mb", 900),
+            shed_priority=self.config.get("system.shed_priority", 7),
+            queue_timeout_s=self.config.get("system.admission_timeout_seconds", 60),
+        )
+
+        # Warm worker processes for "execution: process" plugins
+        self.process_pool = configure_process_pool(
+            max_workers=self.config.get("system.process_workers", 2)
+        )
+
+        # Shared results of "memoize" plugins
+        memo_dir = self.config.get("memo.disk_dir")
+        configure_memo_cache(
+            max_entries=self.config.get("memo.max_entries", 1024),
+            max_mb=self.config.get("memo.max_mb", 64),
+            ttl_s=self.config.get("memo.ttl_seconds", 300),
+            disk_dir=self.base_path / memo_dir if memo_dir else None,
+        )
+
+        # Streaming market data (plugins can trigger on "market.bar.#" etc.)
+        self.stream: Optional[MarketStream] = None
+        if self.config.get("stream.enabled", True) and os.getenv("ALPACA_API_KEY"):
+            configure_tick_store(max_rows=self.config.get("stream.tape_max_rows", 200_000))
+            self.stream = MarketStream(
+                symbols=self.config.get("stream.symbols", ["SPY", "QQQ"]),
+                bus=self.bus,
+                feed=self.config.get("stream.feed", "iex"),
+                capacity={
+                    "trade": self.config.get("stream.trade_capacity", 2048),
+                    "quote": self.config.get("stream.quote_capacity", 2048),
+                    "bar": self.config.get("stream.bar_capacity", 1024),
+                },
+                max_age_s=self.config.get("stream.max_age_s", 60.0),
+            )
+            set_market_stream(self.stream)
+
+        # Built once plugins are loaded
+        self.dag_executor: Optional[DagExecutor] = None
 
         # Thread pool for blocking operations
         self.executor = ThreadPoolExecutor(max_workers=3)
@@ -52,6 +135,10 @@ class OptiFIRERunner:
         # Initialize database
         await self.db.initialize()
 
+        # Per-run plugin memory accounting
+        if self.config.get("system.plugin_tracemalloc", True):
+            start_memory_tracing()
+
         # Start event bus
         await self.bus.start()
 
@@ -61,6 +148,13 @@ class OptiFIRERunner:
         # Load and register enabled plugins
         await self._load_plugins()
 
+        # Start pool workers before the first CPU-heavy plugin is triggered
+        if any(registry.get(pid).execution == "process" for pid in registry.list_all()):
+            await self.process_pool.warm()
+
+        if self.stream:
+            await self.stream.start()
+
         logger.info("OptiFIRE started successfully")
 
     async def stop(self) -> None:
@@ -69,40 +163,174 @@ class OptiFIRERunner:
 
         self._shutdown = True
 
+        # Stop market data first so no new triggers arrive
+        if self.stream:
+            await self.stream.stop()
+
+        # Stop plugin triggers (waits for in-flight runs)
+        await self.triggers.stop()
+
         # Stop scheduler
         await self.scheduler.stop()
 
         # Stop event bus
         await self.bus.stop()
 
-        # Shutdown thread pool
+        # Shutdown thread and process pools
         self.executor.shutdown(wait=True)
+        self.process_pool.shutdown(wait=True)
 
         logger.info("OptiFIRE stopped")
 
     async def _load_plugins(self) -> None:
         """Load and schedule enabled plugins."""
         enabled = self.flags.get_enabled_plugins()
-        logger.info(f"Loading {len(enabled)} enabled plugins")
+        available = registry.discover()
+        logger.info(f"Loading {len(enabled)} enabled plugins ({available} available)")
 
         for plugin_id in enabled:
             try:
-                # Dynamic import would happen here
-                # For now, just log
+                # Manifest entries are imported on first run, others right away
+                plugin = registry.lazy(plugin_id) or self._instantiate_plugin(plugin_id)
+                if plugin is None:
+                    continue
+                registry.register(plugin)
+
                 schedule = self.flags.get_schedule(plugin_id)
                 budget = self.flags.get_budget(plugin_id)
 
+                # features.yaml schedule overrides the plugin's own plan
+                plan = dict(plugin.plan())
+                if schedule:
+                    plan["schedule"] = schedule
+
+                await self.triggers.register(plugin_id, plan, self._run_plugin, plugin_id)
+
                 logger.info(
                     f"Loaded plugin: {plugin_id} "
-                    f"(schedule={schedule}, budget={budget})"
+                    f"(schedule={plan.get('schedule')}, budget={budget})"
                 )
 
-                # Would schedule plugin execution here
-                # self.scheduler.schedule_plugin(plugin_id, schedule, plugin.run)
-
             except Exception as e:
                 logger.error(f"Failed to load plugin {plugin_id}: {e}")
 
+        self._build_dag()
+
+    def _build_dag(self) -> None:
+        """Build the dependency graph over all loaded plugins."""
+        plugins = [registry.get(pid) for pid in registry.list_all()]
+        try:
+            dag = PluginDAG(plugins)
+        except PluginError as e:
+            logger.error(f"Plugin DAG disabled, running plugins independently: {e}")
+            return
+
+        self.dag_executor = DagExecutor(
+            dag,
+            max_concurrency=self.config.get("system.max_workers", 3),
+            budget_fn=self.flags.get_budget,
+            on_result=self._log_plugin_result,
+            admission=self.admission,
+        )
+        logger.info(
+            f"Plugin DAG: {len(dag.order)} plugins in {len(dag.stages())} stages"
+        )
+
+    def _instantiate_plugin(self, plugin_id: str) -> Optional[Plugin]:
+        """Import a plugin package and instantiate its Plugin class."""
+        module = importlib.import_module(f"optifire.plugins.{plugin_id}")
+        for name in getattr(module, "__all__", dir(module)):
+            obj = getattr(module, name, None)
+            if isinstance(obj, type) and issubclass(obj, Plugin) and obj is not Plugin:
+                return obj()
+
+        logger.warning(f"No Plugin class found in optifire.plugins.{plugin_id}")
+        return None
+
+    async def _run_plugin(self, plugin_id: str) -> None:
+        """Run a triggered plugin, then its downstream plugins, and record results."""
+        plugin = registry.get(plugin_id)
+        if plugin is None:
+            return
+
+        trigger = self.triggers.get_last_event(plugin_id)
+        context = PluginContext(
+            config=self.config.get_all(),
+            db=self.db,
+            bus=self.bus,
+            data=trigger_data(trigger, self.stream),
+        )
+
+        if self.dag_executor is not None:
+            report = await self.dag_executor.run_cycle(context, roots=[plugin_id])
+            await self._publish_signals(report.results)
+            await self.bus.publish(
+                "dag_cycle_complete",
+                {
+                    "trigger": plugin_id,
+                    **report.to_dict(),
+                    "admission": self.admission.get_stats(),
+                },
+                source="runner",
+            )
+            return
+
+        budget = self.flags.get_budget(plugin_id)
+        try:
+            async with self.admission.admit(
+                plugin_id,
+                plugin_priority(plugin_id, plugin.metadata.category),
+                cpu_ms=budget["cpu_ms"],
+                mem_mb=budget["mem_mb"],
+            ):
+                started_at = time.time()
+                result = await plugin.execute_with_budget(
+                    context,
+                    cpu_budget_ms=budget["cpu_ms"],
+                    mem_budget_mb=budget["mem_mb"],
+                    timeout_s=budget.get("timeout_s"),
+                )
+        except AdmissionRejected as e:
+            logger.info(f"Skipped {plugin_id}: {e}")
+            return
+        await self._log_plugin_result(plugin_id, result, started_at, time.time())
+        await self._publish_signals({plugin_id: result})
+
+    async def _publish_signals(self, results: Dict[str, PluginResult]) -> None:
+        """Publish "new_signal" for every run that produced a non-zero signal (@signal triggers)."""
+        for plugin_id, result in results.items():
+            data = result.data if result.success and isinstance(result.data, dict) else {}
+            signal = data.get("signal")
+            if isinstance(signal, (int, float)) and not isinstance(signal, bool) and signal:
+                await self.bus.publish(
+                    "new_signal",
+                    {"plugin_id": plugin_id, "symbol": data.get("symbol"), "signal": float(signal)},
+                    source=plugin_id,
+                )
+
+    async def _log_plugin_result(
+        self,
+        plugin_id: str,
+        result: PluginResult,
+        started_at: float,
+        completed_at: float,
+    ) -> None:
+        """Record a plugin run in plugin_log."""
+        if result.success:
+            status = "success"
+        else:
+            status = "timeout" if result.timed_out else "error"
+        await self.db.log_plugin_execution(
+            plugin_id,
+            status,
+            cpu_ms=result.cpu_ms,
+            mem_mb=result.mem_mb,
+            wall_ms=result.wall_ms,
+            error_msg=result.error,
+            started_at=datetime.utcfromtimestamp(started_at).isoformat(),
+            completed_at=datetime.utcfromtimestamp(completed_at).isoformat(),
+        )
+
     def run_api(self, host: str = "0.0.0.0", port: int = 8000) -> None:
         """
         Run FastAPI server.
@@ -0,0 +1,338 @@
+"""Tests for the backtesting data layer and engine."""
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from optifire.backtest import BacktestConfig, BacktestEngine, strategies
+from optifire.backtest.bar_store import BarStore
+
+
+def make_fetcher(calls):
+    """Fetcher producing one bar per business day (close = day of year)."""
+
+    def fetch(symbols, start, end):
+        calls.append((tuple(symbols), str(start), str(end)))
+        days = pd.bdate_range(start, end).tz_localize("America/New_York")
+        return {
+            symbol: pd.DataFrame({
+                "timestamp": days,
+                "open": 1.0, "high": 2.0, "low": 0.5,
+                "close": days.dayofyear.astype(float),
+                "volume": 100,
+            })
+            for symbol in symbols if symbol != "NONE"
+        }
+
+    return fetch
+
+
+def test_bar_store_fetches_only_missing_ranges(tmp_path):
+    """Cold run downloads once per range; warm runs read memory-mapped columns."""
+    calls = []
+    store = BarStore(tmp_path)
+    fetch = make_fetcher(calls)
+
+    frames = store.update_sync(["SPY", "QQQ", "NONE"], "1Day", "2023-01-01", "2023-06-30", fetch)
+    assert calls == [(("SPY", "QQQ", "NONE"), "2023-01-01", "2023-06-30")]
+    assert len(frames["SPY"]) == len(pd.bdate_range("2023-01-01", "2023-06-30"))
+    assert frames["NONE"].empty
+
+    # Warm: nothing fetched, sub-range sliced without copying; symbols that
+    # came back empty are not recorded as covered and are asked for again
+    calls.clear()
+    assert store.coverage("NONE") is None
+    frames = store.update_sync(["SPY", "QQQ", "NONE"], "1Day", "2023-02-01", "2023-02-28", fetch)
+    assert calls == [(("NONE",), "2023-02-01", "2023-02-28")]
+    calls.clear()
+    assert frames["SPY"]["timestamp"].dt.month.unique().tolist() == [2]
+    close = frames["SPY"]["close"].to_numpy()
+    assert not close.flags.writeable and not close.flags.owndata
+
+    # Extending both ends fetches the head and the (re-fetched) last day onward
+    store.update_sync(["SPY"], "1Day", "2022-12-01", "2023-07-31", fetch)
+    assert calls == [
+        (("SPY",), "2022-12-01", "2022-12-31"),
+        (("SPY",), "2023-06-30", "2023-07-31"),
+    ]
+    spy = store.load("SPY")
+    assert spy["timestamp"].is_monotonic_increasing and spy["timestamp"].is_unique
+    assert store.coverage("SPY")[0].isoformat() == "2022-12-01"
+    assert np.isclose(spy["close"].iloc[-1], pd.Timestamp("2023-07-31").dayofyear)
+
+    # The engine reads the same store (no download for a covered range)
+    engine = BacktestEngine(BacktestConfig("2023-03-01", "2023-03-31", symbols=["SPY"]), store=store)
+    loaded = asyncio.run(engine.load_historical_data_multi(["SPY"]))
+    assert len(loaded["SPY"]) == len(pd.bdate_range("2023-03-01", "2023-03-31"))
+    assert len(calls) == 2
+
+
+def test_bar_store_failed_fetch_does_not_extend_coverage(tmp_path):
+    """A fetch that returns nothing leaves the range missing for the next run."""
+    calls = []
+    store = BarStore(tmp_path)
+    store.update_sync(["SPY"], "1Day", "2023-01-01", "2023-03-31", make_fetcher(calls))
+
+    store.update_sync(["SPY"], "1Day", "2023-01-01", "2023-06-30", lambda symbols, start, end: {})
+    assert store.coverage("SPY")[1].isoformat() == "2023-03-31"
+    assert store.missing("SPY", "1Day", "2023-01-01", "2023-06-30") != []
+
+    store.update_sync(["SPY"], "1Day", "2023-01-01", "2023-06-30", make_fetcher(calls))
+    assert calls[-1] == (("SPY",), "2023-03-31", "2023-06-30")
+    assert store.coverage("SPY")[1].isoformat() == "2023-06-30"
+
+
+def test_bar_store_refetches_today(tmp_path):
+    """Today's bar may be partial, so it is fetched again even when covered."""
+    from datetime import date, timedelta
+
+    today = date.today()
+    store = BarStore(tmp_path)
+    store.write("SPY", "1Day", pd.DataFrame(columns=["timestamp", "open", "high", "low", "close", "volume"]),
+                today - timedelta(days=30), today)
+    assert store.missing("SPY", "1Day", today - timedelta(days=10), None) == [(today, today)]
+    assert store.missing("SPY", "1Day", today - timedelta(days=10), today - timedelta(days=1)) == []
+
+
+def random_walk_store(root, symbols, start, end, seed=0, timeframe="1Day"):
+    """Store with seeded random-walk daily bars; symbols listed on staggered dates."""
+    rng = np.random.default_rng(seed)
+    store = BarStore(root)
+    days = pd.bdate_range(start, end)
+    for k, symbol in enumerate(symbols):
+        listed = days[(k * 7) % 60:]
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, len(listed))))
+        bars = pd.DataFrame({
+            "timestamp": listed,
+            "open": close, "high": close * 1.01, "low": close * 0.99,
+            "close": close, "volume": 1e6,
+        })
+        store.write(symbol, timeframe, bars, start, end)
+    return store
+
+
+@pytest.mark.parametrize("strategy_class", [
+    strategies.SimpleStrategy,
+    strategies.TrendFollowingStrategy,
+    strategies.MomentumStrategy,
+    strategies.MeanReversionStrategy,
+    strategies.BuyAndHoldStrategy,
+])
+def test_panel_mode_matches_per_day_run(tmp_path, strategy_class):
+    """Vectorized strategies trade exactly like their per-day counterparts."""
+    symbols = [f"S{k:02d}" for k in range(12)]
+    store = random_walk_store(tmp_path, symbols, "2022-01-01", "2022-12-31")
+    config = dict(start_date="2022-01-01", end_date="2022-12-31", symbols=symbols)
+
+    per_day = BacktestEngine(BacktestConfig(**config), store=store)
+    expected = asyncio.run(per_day.run(strategy_class().generate_signals))
+    panel = BacktestEngine(BacktestConfig(**config), store=store)
+    metrics = asyncio.run(panel.run_panel(strategy_class()))
+
+    key = lambda t: (t["timestamp"], t["symbol"], t["action"], t["shares"])
+    assert expected["total_trades"] > 0
+    assert [key(t) for t in metrics["trades"]] == [key(t) for t in expected["trades"]]
+    assert np.isclose(metrics["final_equity"], expected["final_equity"])
+
+
+def test_parameter_sweep_runs_in_parallel_and_caches(tmp_path):
+    """Workers read the shared panel; re-runs only compute new points."""
+    from optifire.backtest.panel import PricePanel
+    from optifire.backtest.sweep import ParameterSweep
+
+    symbols = [f"S{k:02d}" for k in range(8)]
+    store = random_walk_store(tmp_path / "bars", symbols, "2022-01-01", "2022-12-31")
+    panel = PricePanel.from_frames(store.load_many(symbols), symbols)
+    config = BacktestConfig("2022-01-01", "2022-12-31", symbols=symbols, max_total_exposure=1.0)
+    grid = {"stop_loss_pct": [0.02, 0.04], "trailing_stop": [True, False], "period": [10, 20]}
+
+    csv_path = tmp_path / "results.csv"
+    sweep = ParameterSweep(
+        panel, config, strategies.BreakoutStrategy, workers=2,
+        cache_dir=tmp_path / "cache", results_path=csv_path,
+        score=lambda row: row["total_return_pct"],
+    )
+    streamed = []
+    results = sweep.run(grid, on_result=streamed.append)
+    assert sweep.stats == {"points": 8, "cached": 0, "computed": 8, "failed": 0}
+    assert [(r["stop_loss_pct"], r["trailing_stop"], r["period"]) for r in results][:2] == [
+        (0.02, True, 10), (0.02, True, 20)
+    ]
+    assert len(streamed) == 8 and len(pd.read_csv(csv_path)) == 8
+    assert len({r["final_equity"] for r in results}) > 1
+
+    # Same as running in-process
+    serial = ParameterSweep(panel, config, strategies.BreakoutStrategy, workers=1, cache_dir=None)
+    assert serial.run(grid) == [{k: v for k, v in r.items() if k != "score"} for r in results]
+
+    # A fresh sweep on the same cache recomputes only the new points
+    sweep = ParameterSweep(
+        panel, config, strategies.BreakoutStrategy, workers=2, cache_dir=tmp_path / "cache",
+    )
+    rerun = sweep.run({**grid, "period": [10, 20, 30]})
+    assert sweep.stats == {"points": 12, "cached": 8, "computed": 4, "failed": 0}
+    assert rerun[:2] == [{k: v for k, v in r.items() if k != "score"} for r in results[:2]]
+
+
+def test_purged_splits_and_overfitting_probability():
+    """Purge/embargo drop training days around test blocks; PBO flags noise mining."""
+    from optifire.backtest.validation import cpcv_splits, validate_returns, walk_forward_splits
+
+    splits = cpcv_splits(120, n_groups=6, n_test_groups=2, purge=3, embargo=2)
+    assert len(splits) == 15
+    first = splits[0]  # Test blocks 0 and 1 (days 0-39)
+    assert first.test.tolist() == list(range(40)) and first.train[0] == 42
+    middle = next(s for s in splits if s.test_groups == (2, 4))  # Days 40-59 and 80-99
+    assert not set(middle.train) & {37, 38, 39, 60, 61, 77, 78, 79, 100, 101}
+    assert {36, 62, 76, 102} <= set(middle.train)
+
+    walk = walk_forward_splits(120, n_groups=4, purge=5, window=1)
+    assert [s.test[0] for s in walk] == [30, 60, 90]
+    assert walk[1].train.tolist() == list(range(30, 55))
+
+    rng = np.random.default_rng(0)
+    # Pure noise: the IS winner is mined luck and gives it back OOS
+    noise = validate_returns(rng.normal(0, 0.01, (600, 40)), cpcv_splits(600, 8, 4, 0, 0))
+    assert noise.is_overfit and noise.sharpe_decay > 1
+    # One genuinely better trial is selected everywhere and holds up OOS
+    skill = rng.normal(0, 0.01, (600, 40))
+    skill[:, 7] += 0.004
+    report = validate_returns(skill, cpcv_splits(600, 8, 4, 0, 0))
+    assert report.pbo == 0 and set(report.selected) == {7}
+    assert report.best_params == {"trial": 7} and not report.is_overfit
+    assert report.to_dict()["splits"] == 70
+
+
+def test_backtest_validator_runs_each_trial_once(tmp_path):
+    """Trials are backtested in parallel over the whole panel, then split into folds."""
+    from optifire.backtest.panel import PricePanel
+    from optifire.backtest.sweep import run_point
+    from optifire.backtest.validation import BacktestValidator
+
+    symbols = [f"S{k:02d}" for k in range(6)]
+    store = random_walk_store(tmp_path / "bars", symbols, "2021-01-01", "2022-12-31")
+    panel = PricePanel.from_frames(store.load_many(symbols), symbols)
+    config = BacktestConfig("2021-01-01", "2022-12-31", symbols=symbols, max_total_exposure=1.0)
+    grid = {"fast_period": [5, 10], "slow_period": [30, 60]}
+
+    validator = BacktestValidator(
+        panel, config, strategies.TrendFollowingStrategy, workers=2, cache_dir=tmp_path / "cache"
+    )
+    trials, returns = validator.returns(grid)
+    assert returns.shape == (len(panel), 4) and trials[1] == {"fast_period": 5, "slow_period": 60}
+    row = run_point(panel, config, strategies.TrendFollowingStrategy, {}, trials[1], keep_returns=True)
+    assert np.allclose(np.prod(1 + returns[:, 1]) * config.initial_capital, row["final_equity"])
+
+    report = validator.cpcv(grid, n_groups=5, n_test_groups=2)
+    assert validator.sweep.stats["cached"] == 4  # Folds reuse the trial backtests
+    assert len(report.selected) == 10 and 0 <= report.pbo <= 1
+    assert report.best_params in trials
+    walk = validator.walk_forward(grid, n_groups=5)
+    assert len(walk.oos_sharpe) == 4
+
+
+def trade_rows(trades):
+    """Trades as the records daily runs return in metrics["trades"]."""
+    return [
+        {"timestamp": t.timestamp.isoformat(), "symbol": t.symbol, "action": t.action,
+         "price": t.price, "shares": t.shares, "pnl": t.pnl, "reason": t.reason}
+        for t in trades
+    ]
+
+
+@pytest.mark.parametrize("strategy_class", [
+    strategies.SimpleStrategy,
+    strategies.MeanReversionStrategy,
+    strategies.BuyAndHoldStrategy,
+])
+def test_intraday_stream_matches_daily_panel(tmp_path, strategy_class):
+    """With one bar per day, the streamed intraday run is the daily panel run."""
+    from optifire.backtest.engine import TradeLog
+
+    symbols = [f"S{k:02d}" for k in range(12)]
+    store = random_walk_store(tmp_path, symbols, "2022-01-01", "2022-12-31")
+    random_walk_store(tmp_path, symbols, "2022-01-01", "2022-12-31", timeframe="1Min")
+    config = dict(start_date="2022-01-01", end_date="2022-12-31", symbols=symbols)
+
+    expected = asyncio.run(BacktestEngine(BacktestConfig(**config), store=store).run_panel(strategy_class()))
+    for run in ("run_panel", "run"):
+        engine = BacktestEngine(BacktestConfig(**config, timeframe="1Min"), store=store)
+        strategy = strategy_class()
+        metrics = asyncio.run(getattr(engine, run)(strategy if run == "run_panel" else strategy.generate_signals))
+        assert isinstance(engine.trades, TradeLog) and len(engine.equity_log) == metrics["bars"]
+        assert "trades" not in metrics and trade_rows(engine.trades) == expected["trades"]
+        for name in ("final_equity", "max_drawdown", "sharpe_ratio", "sortino_ratio", "total_trades",
+                     "winning_trades", "losing_trades"):
+            assert metrics[name] == expected[name]
+        for name in ("avg_win", "avg_loss", "avg_trade", "profit_factor"):
+            assert metrics[name] == pytest.approx(expected[name])
+
+
+def test_intraday_stream_merges_chunks_in_time_order(tmp_path):
+    """Minute bars are heap-merged chunk by chunk; equity/trade columns can spill to disk."""
+    from optifire.backtest.columnar import ColumnBuffer
+
+    rng = np.random.default_rng(1)
+    store = BarStore(tmp_path / "bars")
+    minutes = pd.DatetimeIndex([
+        minute for day in pd.bdate_range("2023-03-01", "2023-03-03")
+        for minute in pd.date_range(day + pd.Timedelta("14:30:00"), periods=390, freq="min")
+    ])
+    symbols = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+    total = 0
+    for symbol in symbols:
+        listed = minutes[rng.random(len(minutes)) < 0.8]  # Sparse trading
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.002, len(listed))))
+        store.write(symbol, "1Min", pd.DataFrame({
+            "timestamp": listed, "open": close, "high": close * 1.001, "low": close * 0.999,
+            "close": close, "volume": 100.0,
+        }), "2023-03-01", "2023-03-03")
+        total += len(listed)
+
+    blocks = list(store.stream(symbols, "1Min", chunk_rows=64))
+    t = np.concatenate([block[0] for block in blocks])
+    owner = np.concatenate([block[1] for block in blocks])
+    assert len(blocks) > 5 and len(t) == total
+    assert np.all((np.diff(t) > 0) | ((np.diff(t) == 0) & (np.diff(owner) > 0)))
+    assert all(a[0][-1] < b[0][0] for a, b in zip(blocks, blocks[1:]))
+
+    config = BacktestConfig("2023-03-01", "2023-03-03", symbols=symbols, timeframe="1Min")
+    small = BacktestEngine(config, store=store)
+    metrics = asyncio.run(small.run_intraday(strategies.SimpleStrategy(), chunk_rows=64, spill_dir=tmp_path / "spill"))
+    large = BacktestEngine(config, store=store)
+    expected = asyncio.run(large.run_intraday(strategies.SimpleStrategy(), chunk_rows=10_000))
+    assert metrics["total_trades"] > 0 and trade_rows(small.trades) == trade_rows(large.trades)
+    assert metrics["trades_spill_dir"] == str(tmp_path / "spill" / "trades")
+    assert metrics["profit_factor"] == pytest.approx(expected["profit_factor"])
+    small.trades.to_csv(tmp_path / "trades.csv")
+    assert pd.read_csv(tmp_path / "trades.csv", float_precision="round_trip").to_dict("records") == pd.DataFrame(trade_rows(large.trades)).to_dict("records")
+    assert metrics["bars"] == len(np.unique(t)) and len(metrics["equity_curve"]) == 3
+    assert np.array_equal(small.equity_log.column("equity"), large.equity_log.column("equity"))
+
+    buffer = ColumnBuffer({"t": "int64", "x": float}, chunk_rows=100, spill_dir=tmp_path / "buffer")
+    for k in range(250):
+        buffer.append(k, k / 2)
+    assert len(list((tmp_path / "buffer").glob("part-*.x.npy"))) == 2
+    assert np.array_equal(buffer.column("x"), np.arange(250) / 2) and len(buffer) == 250
+
+
+def test_intraday_equity_is_sampled_per_new_york_session(tmp_path):
+    """Winter after-hours bars past UTC midnight stay in their session's equity point."""
+    store = BarStore(tmp_path)
+    minutes = pd.DatetimeIndex([
+        minute for day in ("2023-01-05", "2023-01-06")  # Thursday, Friday (EST)
+        # 9:00 ET to 19:59 ET = 14:00 to 00:59 UTC next day
+        for minute in pd.date_range(pd.Timestamp(day) + pd.Timedelta("14:00:00"), periods=660, freq="min")
+    ])
+    close = 100 + np.arange(len(minutes)) * 0.01
+    store.write("SPY", "1Min", pd.DataFrame({
+        "timestamp": minutes, "open": close, "high": close, "low": close, "close": close, "volume": 100.0,
+    }), "2023-01-05", "2023-01-07")
+
+    config = BacktestConfig("2023-01-05", "2023-01-07", symbols=["SPY"], timeframe="1Min")
+    engine = BacktestEngine(config, store=store)
+    metrics = asyncio.run(engine.run_intraday(strategies.BuyAndHoldStrategy()))
+    assert metrics["bars"] == len(minutes)
+    assert [t for t, _ in engine.equity_curve] == [minutes[659], minutes[-1]]
+
@@ -1,8 +1,10 @@
 """Tests for core modules."""
 import pytest
 import asyncio
+import json
 from pathlib import Path
 import tempfile
+from datetime import timezone
 
 from optifire.core.config import Config
 from optifire.core.flags import FeatureFlags
@@ -54,3 +56,470 @@ def test_config_default_values():
         # Should fall back to defaults
         assert config.get("system.max_workers") == 3
         assert config.get("risk.max_exposure_total") == 0.30
+
+
+@pytest.mark.asyncio
+async def test_event_bus_slow_handler_does_not_block_other_topics():
+    """A slow subscriber only delays its own topic; order is kept per topic."""
+    bus = EventBus(dispatch_mode="concurrent")
+    await bus.start()
+
+    slow_release = asyncio.Event()
+    fast_received = []
+    slow_received = []
+
+    async def slow_handler(event: Event):
+        await slow_release.wait()
+        slow_received.append(event.data)
+
+    async def fast_handler(event: Event):
+        fast_received.append(event.data)
+
+    await bus.subscribe("slow_update", slow_handler)
+    await bus.subscribe("fast_update", fast_handler)
+
+    await bus.publish("slow_update", 1)
+    for i in range(5):
+        await bus.publish("fast_update", i)
+
+    await asyncio.sleep(0.05)
+    assert fast_received == [0, 1, 2, 3, 4]
+    assert slow_received == []
+
+    await bus.publish("slow_update", 2)
+    slow_release.set()
+    await bus.drain()
+    assert slow_received == [1, 2]
+
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue_overflow_policies():
+    """Drop-oldest and coalesce queues stay bounded and count overflow."""
+    from optifire.core.bus import BoundedEventQueue, OverflowPolicy
+
+    drop = BoundedEventQueue(maxsize=2, policy=OverflowPolicy.DROP_OLDEST)
+    for i in range(5):
+        await drop.put(Event(type="tick", data=i, source="test"))
+    assert drop.qsize() == 2
+    assert drop.dropped == 3
+    assert [drop.get_nowait().data for _ in range(2)] == [3, 4]
+
+    coalesce = BoundedEventQueue(maxsize=2, policy=OverflowPolicy.COALESCE)
+    for i in range(5):
+        await coalesce.put(Event(type="kalman_update", data=i, source="test"))
+    await coalesce.put(Event(type="garch_update", data="g", source="test"))
+    assert coalesce.qsize() == 2
+    assert coalesce.coalesced == 4
+    assert coalesce.get_nowait().data == 4
+    assert coalesce.get_nowait().data == "g"
+
+
+@pytest.mark.asyncio
+async def test_coalesce_queue_task_accounting():
+    """A coalesced event leaves exactly one unit of work pending."""
+    from optifire.core.bus import BoundedEventQueue, OverflowPolicy
+
+    queue = BoundedEventQueue(maxsize=4, policy=OverflowPolicy.COALESCE)
+    queue.put_nowait(Event(type="quote", data=1, source="test"))
+    queue.put_nowait(Event(type="quote", data=2, source="test"))
+
+    join = asyncio.ensure_future(queue.join())
+    await asyncio.sleep(0)
+    assert not join.done()  # The newer event is still pending
+
+    assert (await queue.get()).data == 2
+    queue.task_done()
+    await asyncio.wait_for(join, 1.0)
+    with pytest.raises(ValueError):
+        queue.task_done()
+
+
+@pytest.mark.asyncio
+async def test_event_bus_queued_subscriber_backpressure():
+    """A stalled queued subscriber drops events without blocking publishers."""
+    from optifire.core.bus import OverflowPolicy
+
+    bus = EventBus()
+    await bus.start()
+
+    queue = await bus.subscribe_queue("*", maxsize=3, policy=OverflowPolicy.DROP_OLDEST)
+    for i in range(10):
+        await bus.publish("price_update", i)
+    await bus.drain()
+
+    stats = bus.get_stats()
+    assert queue.qsize() == 3
+    assert stats["dropped"] == 7
+    assert stats["published"] == 10
+
+    await bus.unsubscribe_queue("*", queue)
+    assert bus.get_subscriber_count("*") == 0
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_event_bus_hierarchical_topics():
+    """Dotted topics route through exact, single- and multi-segment wildcards."""
+    bus = EventBus()
+    await bus.start()
+
+    received = {"risk": [], "update": [], "all": []}
+
+    await bus.subscribe("risk.#", lambda e: received["risk"].append(e.type))
+    await bus.subscribe("*.*.update", lambda e: received["update"].append(e.type))
+    await bus.subscribe("*", lambda e: received["all"].append(e.type))
+
+    await bus.publish("risk.var_budget.update", {})
+    await bus.publish("alpha.vix_regime.update", {})
+    await bus.publish("risk.alert", {})
+    await bus.drain()
+
+    assert received["risk"] == ["risk.var_budget.update", "risk.alert"]
+    assert received["update"] == ["risk.var_budget.update", "alpha.vix_regime.update"]
+    assert len(received["all"]) == 3
+    assert bus.get_matching_handler_count("risk.var_budget.update") == 3
+
+    await bus.stop()
+
+
+def test_event_wire_encoding_is_cached():
+    """JSON/SSE encodings are computed once and shared across consumers."""
+    import json
+    import numpy as np
+
+    event = Event(
+        type="kalman_update",
+        data={"state": np.float64(1.5), "history": np.arange(3)},
+        source="fe_kalman",
+    )
+
+    encoded = event.to_json_bytes()
+    assert event.to_json_bytes() is encoded
+    assert event.to_sse() is event.to_sse()
+    assert event.to_sse() == b"data: " + encoded + b"\n\n"
+
+    decoded = json.loads(event.to_json())
+    assert decoded["data"] == {"state": 1.5, "history": [0, 1, 2]}
+    assert decoded["type"] == "kalman_update"
+
+
+@pytest.mark.asyncio
+async def test_event_journal_roundtrip_and_replay():
+    """Journaled events survive segment rotation and replay in order."""
+    from optifire.core.journal import EventJournal, list_segments, read_journal, replay_journal
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal_dir = Path(tmp)
+
+        bus = EventBus()
+        await bus.start()
+        journal = EventJournal(journal_dir, segment_size_mb=1, sync_every=100)
+        await journal.attach(bus)
+
+        payload = "x" * 2000
+        for i in range(1000):
+            await bus.publish("kalman_update", {"i": i, "pad": payload}, source="fe_kalman")
+        await bus.drain()
+        await journal.close()
+        await bus.stop()
+
+        assert len(list_segments(journal_dir)) > 1
+        events = list(read_journal(journal_dir))
+        assert [e.data["i"] for e in events] == list(range(1000))
+        assert events[0].source == "fe_kalman"
+
+        replay_bus = EventBus()
+        await replay_bus.start()
+        replayed = []
+        await replay_bus.subscribe("kalman_update", lambda e: replayed.append(e))
+
+        count = await replay_journal(journal_dir, replay_bus)
+        assert count == 1000
+        assert [e.data["i"] for e in replayed] == list(range(1000))
+        assert replayed[0].timestamp == events[0].timestamp
+
+        await replay_bus.stop()
+
+
+def test_event_journal_writes_the_cached_wire_encoding():
+    """Journal records reuse the event's encoding; version 1 records still decode."""
+    import msgpack
+    from optifire.core.journal import ENCODING_JSON, ENCODING_MSGPACK, _decode_record, _encode_record
+
+    event = Event(type="quote", data={"ap": 1.5}, source="market_stream")
+    packed = event.to_msgpack()
+    assert _encode_record(event, ENCODING_MSGPACK) is packed
+    assert _encode_record(event, ENCODING_JSON) is event.to_json_bytes()
+    for encoding in (ENCODING_MSGPACK, ENCODING_JSON):
+        assert _decode_record(_encode_record(event, encoding), encoding) == event
+
+    legacy = msgpack.packb([event.timestamp.replace(tzinfo=timezone.utc).timestamp(), "quote", "market_stream", {"ap": 1.5}])
+    assert _decode_record(legacy, ENCODING_MSGPACK) == event
+
+
+def test_resolve_plan_splits_calendar_and_events():
+    """Plugin schedule tokens map to calendar jobs or bus topics."""
+    from optifire.core.triggers import resolve_plan
+
+    calendar, topics = resolve_plan(
+        {"schedule": "@continuous", "triggers": ["vix_update", "every_5min"]}
+    )
+    assert calendar == ["interval_5m"]
+    assert topics == ["market.bar.#", "market.trade.#", "vix_regime_update"]
+
+    calendar, topics = resolve_plan({"schedule": "@daily", "triggers": ["market_close"]})
+    assert calendar == ["@daily", "@close"]
+    assert topics == []
+
+    assert resolve_plan({"schedule": "@manual", "triggers": []}) == ([], [])
+
+
+def test_manifest_plugins_resolve_to_published_triggers():
+    """Every scheduled plugin in the manifest can actually fire."""
+    from optifire.core.triggers import MANUAL_SCHEDULES, has_publisher, resolve_plan
+
+    manifest = json.loads((Path(__file__).parent.parent / "plugins" / "manifest.json").read_text())
+    dead = []
+    for plugin_id, entry in manifest["plugins"].items():
+        plan = entry.get("plan") or {}
+        if plan.get("schedule") in MANUAL_SCHEDULES:
+            continue
+        calendar, topics = resolve_plan(plan)
+        if not calendar and not any(has_publisher(topic) for topic in topics):
+            dead.append(plugin_id)
+    assert dead == []
+
+
+def test_has_publisher_matches_whole_topics():
+    """Topics sharing a prefix with a published one have no publisher."""
+    from optifire.core.triggers import has_publisher
+
+    assert has_publisher("heartbeat") and has_publisher("market.bar.SPY") and has_publisher("market.trade.#")
+    for topic in ("heartbeat_missed", "new_signals", "order_submitted_ack", "market.barx.SPY"):
+        assert not has_publisher(topic), topic
+
+
+@pytest.mark.asyncio
+async def test_trigger_engine_ignores_own_events():
+    """A plugin's own published events do not re-trigger it."""
+    from optifire.core.triggers import TriggerEngine
+
+    bus = EventBus()
+    await bus.start()
+    engine = TriggerEngine(bus, debounce_s=0.01, max_delay_s=1.0)
+
+    runs = []
+
+    async def run_plugin(plugin_id):
+        runs.append(plugin_id)
+
+    await engine.register("alpha", {"schedule": "@signal"}, run_plugin, "alpha")
+
+    await bus.publish("new_signal", {"signal": 1.0}, source="alpha")
+    await bus.drain()
+    await asyncio.sleep(0.05)
+    assert runs == []
+
+    await bus.publish("new_signal", {"signal": 1.0}, source="beta")
+    await bus.drain()
+    await asyncio.sleep(0.05)
+    assert runs == ["alpha"]
+
+    await engine.stop()
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_trigger_engine_coalesces_event_bursts():
+    """A burst of triggering events produces one run, not one per event."""
+    from optifire.core.triggers import TriggerEngine
+
+    bus = EventBus()
+    await bus.start()
+    engine = TriggerEngine(bus, debounce_s=0.05, max_delay_s=1.0)
+
+    runs = []
+
+    async def run_plugin(plugin_id):
+        runs.append(plugin_id)
+
+    await engine.register("risk_vol_target", {"schedule": "@signal"}, run_plugin, "risk_vol_target")
+
+    for i in range(50):
+        await bus.publish("new_signal", {"i": i})
+    await bus.drain()
+    await asyncio.sleep(0.15)
+
+    assert runs == ["risk_vol_target"]
+    status = engine.get_status()["risk_vol_target"]
+    assert status["triggers_received"] == 50
+    assert status["coalesced"] == 49
+    assert engine.get_last_event("risk_vol_target").data == {"i": 49}
+
+    await engine.stop()
+    await bus.stop()
+
+
+def test_memo_hash_is_content_based():
+    """Equal arrays hash equal regardless of layout; dtype and values matter."""
+    import numpy as np
+    from optifire.core.memo import hash_inputs
+
+    a = np.arange(12, dtype=float).reshape(3, 4)
+    assert hash_inputs({"x": a, "d": 0.5}) == hash_inputs({"d": 0.5, "x": np.asfortranarray(a)})
+    assert hash_inputs({"x": a}) != hash_inputs({"x": a.astype(np.float32)})
+    assert hash_inputs({"x": a}) != hash_inputs({"x": a + 1e-12})
+    assert hash_inputs(1) != hash_inputs(1.0) != hash_inputs("1")
+
+
+@pytest.mark.asyncio
+async def test_memo_cache_lru_ttl_disk_and_single_flight():
+    """Evicts LRU/expired entries, persists to disk, computes concurrent misses once."""
+    from optifire.core.memo import MemoCache
+
+    cache = MemoCache(max_entries=2, ttl_s=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # Evicts b (least recently used)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    cache.set("short", 4, ttl_s=0)
+    assert cache.get("short") == (False, None)
+
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"v": 42}
+
+    results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+    assert results == [{"v": 42}] * 5
+    assert len(calls) == 1
+    stats = cache.get_stats()
+    assert stats["shared"] == 4 and stats["evictions"] >= 1 and stats["expirations"] == 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        MemoCache(disk_dir=Path(tmp)).set("p", [1, 2, 3])
+        restarted = MemoCache(disk_dir=Path(tmp))
+        assert restarted.get("p") == (True, [1, 2, 3])
+        assert restarted.get_stats()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_memo_cache_waiters_survive_owner_cancellation():
+    """Waiters recompute when the caller computing the value is cancelled."""
+    from optifire.core.memo import MemoCache
+
+    cache = MemoCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    owner = asyncio.create_task(cache.get_or_compute("k", compute))
+    await asyncio.sleep(0.01)
+    waiters = [asyncio.create_task(cache.get_or_compute("k", compute)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    owner.cancel()
+    assert await asyncio.gather(*waiters) == [2, 2, 2]  # One waiter recomputed, once
+    assert owner.cancelled() and len(calls) == 2
+
+
+def test_tick_store_snapshots_are_stable_zero_copy_views():
+    """Appends, growth and retention never disturb snapshots already taken."""
+    import numpy as np
+    from optifire.core.tickstore import TickStore
+
+    store = TickStore(max_rows=64)
+    tape = store.tape("trade", "spy")
+    for i in range(10):
+        tape.append((i * 1000, 100.0 + i, 10.0, i % 2 == 0))
+
+    before = store.trades("SPY")
+    assert len(before) == 10 and not before.rows.flags.writeable
+
+    # Slicing returns views into the tape's array
+    window = before.between(3000, 7000)
+    assert window["price"].tolist() == [103.0, 104.0, 105.0, 106.0]
+    assert np.shares_memory(window.rows, before.rows)
+    assert np.shares_memory(before.last(2).rows, before.rows)
+
+    # Growth and retention move rows to new arrays; the old snapshot is unchanged
+    rows = np.zeros(100, dtype=tape.dtype)
+    rows["t"] = np.arange(10, 110) * 1000
+    rows["price"] = np.arange(10, 110) + 100.0
+    tape.extend(rows)
+    for i in range(110, 150):
+        tape.append((i * 1000, 100.0 + i, 1.0, False))
+
+    after = store.trades("SPY")
+    assert before["price"].tolist() == [100.0 + i for i in range(10)]
+    assert len(after) <= 64 and after["t"][-1] == 149_000
+    assert (np.diff(after["t"]) == 1000).all()
+    assert tape.appended == 150 and tape.dropped == 150 - len(after)
+    assert store.symbols("trade") == ["SPY"] and store.get_stats()["tapes"] == 1
+
+
+def test_streaming_indicators_match_feature_engineer():
+    """Per-bar O(1) updates reproduce FeatureEngineer on each symbol's own bars."""
+    import numpy as np
+    import pandas as pd
+
+    from optifire.fe import indicators
+    from optifire.fe.engineering import FeatureEngineer as FE
+
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (600, 3)), axis=0))
+    close[100:130, 1] = close[99, 1]  # Flat stretch
+    close[:150, 2] = np.nan  # Listed later
+    high, low = close * 1.01, close * 0.985
+
+    sma, std, ema = indicators.SMA(20, 3), indicators.RollingStd(20, n=3), indicators.EMA(12, n=3)
+    rsi, wilder = indicators.RSI(14, n=3), indicators.RSI(14, wilder=True, n=3)
+    atr, bands, macd = indicators.ATR(14, 3), indicators.Bollinger(20, 2.0, n=3), indicators.MACD(n=3)
+    got = {name: [] for name in ("sma", "std", "ema", "rsi", "wilder", "atr", "upper", "macd", "signal")}
+    for i in range(len(close)):
+        got["sma"].append(sma.update(close[i]))
+        got["std"].append(std.update(close[i]))
+        got["ema"].append(ema.update(close[i]))
+        got["rsi"].append(rsi.update(close[i]))
+        got["wilder"].append(wilder.update(close[i]))
+        got["atr"].append(atr.update(high[i], low[i], close[i]))
+        got["upper"].append(bands.update(close[i])[0])
+        line, signal, _ = macd.update(close[i])
+        got["macd"].append(line)
+        got["signal"].append(signal)
+    got = {name: np.array(rows) for name, rows in got.items()}
+
+    for j in range(3):
+        listed = ~np.isnan(close[:, j])
+        c, h, lo = (pd.Series(x[listed, j]) for x in (close, high, low))
+        expected = {
+            "sma": c.rolling(20).mean(),
+            "std": c.rolling(20).std(),
+            "ema": FE.calculate_ema(c, 12),
+            "rsi": FE.calculate_rsi(c, 14),
+            "wilder": FE.calculate_rsi(c, 14, wilder=True),
+            "atr": FE.calculate_atr(h, lo, c, 14),
+            "upper": FE.calculate_bollinger_bands(c, 20, 2.0)[0],
+            "macd": FE.calculate_macd(c)[0],
+            "signal": FE.calculate_macd(c)[1],
+        }
+        for name, series in expected.items():
+            assert np.array_equal(got[name][listed, j], series.to_numpy(), equal_nan=True), (name, j)
+
+    # Sparse per-symbol updates (new symbols grow the state) give the same values
+    index = indicators.SymbolIndex()
+    sparse = indicators.SMA(20)
+    for i in range(len(close)):
+        for j in np.flatnonzero(~np.isnan(close[i])):
+            sparse.update_at([index[f"S{j}"]], [close[i, j]])
+    assert np.array_equal(sparse.at(index.columns(["S0", "S1", "S2"])), got["sma"][-1])
+    assert np.isnan(sparse.at([index["NEW"]])[0])
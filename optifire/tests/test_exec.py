@@ -0,0 +1,352 @@
+"""Tests for broker integration against a local stand-in Alpaca server."""
+import asyncio
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from optifire.exec.broker_alpaca import AlpacaBroker
+from optifire.core.bus import Event, EventBus
+from optifire.exec.market_cache import CachedBroker, MarketDataCache
+from optifire.exec.market_stream import MarketStream
+from optifire.exec.stream_replay import ReplayServer
+
+
+class FakeAlpaca(BaseHTTPRequestHandler):
+    """Minimal Alpaca trading/data API."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    connections = set()
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        FakeAlpaca.connections.add(self.client_address)
+        FakeAlpaca.requests.append((url.path, parse_qs(url.query)))
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        symbols = query.get("symbols", "").split(",")
+        if url.path == "/v2/account":
+            self._reply(200, {"equity": "1000", "cash": "500"})
+        elif url.path == "/v2/stocks/quotes/latest":
+            # No quotes for VIX: served from trades instead
+            quotes = {s: {"ap": 2.0, "bp": 1.0, "as": 1, "bs": 1} for s in symbols if s != "VIX"}
+            self._reply(200, {"quotes": quotes})
+        elif url.path == "/v2/stocks/trades/latest":
+            self._reply(200, {"trades": {s: {"p": 20.0, "s": 5} for s in symbols}})
+        elif url.path == "/v2/stocks/bars":
+            # Two bars per symbol, served two bars per page
+            bars = [(s, day) for s in symbols for day in (1, 2)]
+            offset = int(query.get("page_token", 0))
+            page = bars[offset:offset + 2]
+            payload = {"bars": {}, "next_page_token": None}
+            for symbol, day in page:
+                payload["bars"].setdefault(symbol, []).append({"t": f"2024-01-0{day}", "c": day})
+            if offset + 2 < len(bars):
+                payload["next_page_token"] = str(offset + 2)
+            self._reply(200, payload)
+        elif url.path == "/v2/positions/NONE":
+            self._reply(404, {"message": "position does not exist"})
+        elif url.path.endswith("/quotes/latest"):
+            self._reply(200, {"quote": {"ap": 10.1, "bp": 10.0, "as": 1, "bs": 2}})
+        else:
+            self._reply(404, {"message": "not found"})
+
+    def do_POST(self):
+        FakeAlpaca.connections.add(self.client_address)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._reply(200, {"id": "o1", **body})
+
+
+@pytest.fixture
+def alpaca_server():
+    FakeAlpaca.connections = set()
+    FakeAlpaca.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAlpaca)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_broker_reuses_pooled_connection(alpaca_server):
+    """Sequential calls share one keep-alive connection; latency is per endpoint."""
+    async with AlpacaBroker(base_url=alpaca_server, data_url=alpaca_server) as broker:
+        for _ in range(5):
+            assert (await broker.get_account())["equity"] == "1000"
+        assert (await broker.get_quote("AAPL"))["bp"] == 10.0
+        assert await broker.get_position("NONE") is None
+        order = await broker.submit_order("AAPL", qty=1)
+        assert order["symbol"] == "AAPL"
+
+        assert len(FakeAlpaca.connections) == 1
+        endpoints = broker.get_stats()["endpoints"]
+        assert endpoints["GET /v2/account"]["count"] == 5
+        assert endpoints["GET /v2/positions/{symbol}"]["errors"] == 1
+        assert endpoints["POST /v2/orders"]["p95_ms"] > 0
+
+    assert broker._client is None
+    await broker.get_account()  # A closed broker reopens its pool on demand
+    assert len(FakeAlpaca.connections) == 2
+    await broker.close()
+
+
+@pytest.mark.asyncio
+async def test_broker_multi_symbol_data(alpaca_server):
+    """Multi-symbol calls batch symbols, fall back to trades and follow pagination."""
+    async with AlpacaBroker(base_url=alpaca_server, data_url=alpaca_server, symbols_per_request=2) as broker:
+        quotes = await broker.get_quotes(["SPY", "QQQ", "VIX"])
+        assert quotes["SPY"]["ap"] == 2.0
+        assert quotes["VIX"] == {"ap": 20.0, "bp": 20.0, "as": 5, "bs": 5}
+
+        trades = await broker.get_latest_trades(["aapl"])
+        assert trades == {"AAPL": {"p": 20.0, "s": 5}}
+
+        FakeAlpaca.requests.clear()
+        bars = await broker.get_bars_multi(["A", "B", "C"], start="2024-01-01")
+        assert {s: [b["c"] for b in v] for s, v in bars.items()} == {"A": [1, 2], "B": [1, 2], "C": [1, 2]}
+        # Chunks [A, B] (two pages) and [C] (one page)
+        assert len(FakeAlpaca.requests) == 3
+        assert await broker.get_quotes([]) == {}
+
+
+class CountingBroker:
+    """Broker stand-in that counts calls and answers after a short delay."""
+
+    def __init__(self):
+        self.calls = {}
+        self.status = "new"
+
+    async def _answer(self, name, value):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        await asyncio.sleep(0.01)
+        return value
+
+    async def get_account(self):
+        return await self._answer("account", {"equity": str(self.calls.get("account", 0))})
+
+    async def get_quotes(self, symbols):
+        return await self._answer("quotes", {s: {"ap": 1.0} for s in symbols if s != "NONE"})
+
+    async def submit_order(self, symbol, **kwargs):
+        return await self._answer("submit", {"id": "o1", "symbol": symbol})
+
+    async def get_order(self, order_id):
+        return await self._answer("order", {"id": order_id, "symbol": "AAPL", "status": self.status})
+
+
+@pytest.mark.asyncio
+async def test_cached_broker_single_flight_staleness_and_invalidation():
+    """Identical reads coalesce; max_age_s bounds staleness; our orders invalidate."""
+    now = [0.0]
+    raw = CountingBroker()
+    broker = CachedBroker(raw, MarketDataCache(clock=lambda: now[0]))
+
+    accounts = await asyncio.gather(*(broker.get_account() for _ in range(5)))
+    assert raw.calls["account"] == 1 and len({a["equity"] for a in accounts}) == 1
+
+    await broker.get_account(max_age_s=2.0)
+    assert raw.calls["account"] == 1
+    now[0] = 3.0
+    await broker.get_account(max_age_s=2.0)  # Too old
+    await broker.get_account()  # Fresh by default
+    assert raw.calls["account"] == 3
+
+    # Only stale symbols are requested; in-flight ones are shared
+    first, second = await asyncio.gather(
+        broker.get_quotes(["SPY", "QQQ"], max_age_s=5.0),
+        broker.get_quotes(["qqq", "VIX", "NONE"], max_age_s=5.0),
+    )
+    assert set(first) == {"SPY", "QQQ"} and set(second) == {"QQQ", "VIX"}
+    assert raw.calls["quotes"] == 2
+    await broker.get_quotes(["SPY", "VIX"], max_age_s=5.0)
+    assert raw.calls["quotes"] == 2
+
+    await broker.submit_order("AAPL", qty=1)
+    await broker.get_account(max_age_s=60.0)
+    assert raw.calls["account"] == 4
+    raw.status = "filled"
+    await broker.get_order("o1")
+    await broker.get_account(max_age_s=60.0)
+    assert raw.calls["account"] == 5
+
+    kinds = broker.cache.get_stats()["kinds"]
+    assert kinds["account"]["coalesced"] == 4 and kinds["account"]["invalidations"] == 2
+    assert kinds["quote"]["hit_rate"] > 0
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidate_detaches_inflight_fetch():
+    """Reads after an invalidation do not join a fetch that started before it."""
+    cache = MarketDataCache()
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await release.wait()
+        return {"equity": len(calls)}
+
+    stale = asyncio.create_task(cache.get("account", fetch))
+    await asyncio.sleep(0.01)
+    assert calls == [0]
+
+    cache.invalidate(["account"])
+    fresh = await cache.get("account", fetch, max_age_s=60.0)
+    assert len(calls) == 2 and fresh == {"equity": 2}
+
+    release.set()
+    assert await stale == {"equity": 2}  # Answers its caller with whatever it read
+    assert await cache.get("account", fetch, max_age_s=60.0) == {"equity": 2}
+    assert len(calls) == 2  # The pre-invalidation result was not cached
+
+
+@pytest.mark.asyncio
+async def test_cache_owner_cancellation_does_not_cancel_waiters():
+    """A shared fetch outlives the cancelled caller that started it."""
+    release = asyncio.Event()
+    calls = []
+
+    class SlowBroker(CountingBroker):
+        async def get_account(self):
+            calls.append(1)
+            await release.wait()
+            return {"equity": 42}
+
+    broker = CachedBroker(SlowBroker())
+    owner = asyncio.create_task(broker.get_account())
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(broker.get_account())
+    await asyncio.sleep(0.01)
+
+    owner.cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+    assert await waiter == {"equity": 42}
+    assert owner.cancelled() and calls == [1]
+
+
+async def _until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_market_stream_fills_ring_buffers_and_publishes():
+    recorded = [
+        {"T": "b", "S": "SPY", "t": f"2024-01-02T14:{30 + i}:00Z", "o": i, "h": i, "l": i, "c": 100.0 + i, "v": 10}
+        for i in range(6)
+    ] + [
+        {"T": "b", "S": "QQQ", "t": f"2024-01-02T14:{30 + i}:00Z", "o": i, "h": i, "l": i, "c": 50.0 + i, "v": 5}
+        for i in range(3)
+    ] + [
+        {"T": "q", "S": "SPY", "t": "2024-01-02T14:35:00.000000001Z", "bp": 104.9, "ap": 105.1, "bs": 3, "as": 4},
+        {"T": "t", "S": "IWM", "t": "2024-01-02T14:35:01Z", "p": 200.0, "s": 7},
+    ]
+    bus = EventBus()
+    await bus.start()
+    updates = await bus.subscribe_queue("market.bar.*", maxsize=16)
+
+    now = [datetime.fromisoformat("2024-01-02T14:35:30+00:00").timestamp()]
+
+    async with ReplayServer(recorded, key="k", secret="s", frame_size=4) as server:
+        stream = MarketStream(
+            symbols=["SPY", "QQQ"], bus=bus, url=server.url, key="k", secret="s",
+            capacity={"bar": 4}, reconnect_s=0.05, clock=lambda: now[0],
+        )
+        async with stream:
+            await _until(lambda: stream.get_stats()["messages"] == 10)
+
+            # Ring keeps the newest 4 bars in time order; IWM was not subscribed
+            spy = stream.bars("SPY")
+            assert spy["c"].tolist() == [102.0, 103.0, 104.0, 105.0]
+            assert (spy["t"][1:] > spy["t"][:-1]).all()
+            assert "IWM" not in stream.buffers
+            assert stream.latest_quote("SPY")["ap"] == 105.1
+            assert stream.last_price("SPY") == pytest.approx(105.0)
+
+            panel = stream.context_data(["SPY", "QQQ"])
+            assert panel["prices"].shape == (4, 2) and panel["returns"].shape == (3, 2)
+            assert panel["prices"][-1].tolist() == [105.0, 52.0]
+            assert panel["prices"][0, 1] != panel["prices"][0, 1]  # NaN padding
+
+            await bus.drain()
+            topics = set()
+            while not updates.empty():
+                topics.add(updates.get_nowait().type)
+            assert topics == {"market.bar.SPY", "market.bar.QQQ"}
+
+            # Live pushes, late subscriptions and bar updates (same minute)
+            await stream.subscribe(["IWM"])
+            await _until(lambda: "IWM" in server.clients[0].subscriptions["trades"])
+            await server.push([
+                {"T": "t", "S": "IWM", "t": "2024-01-02T14:36:00Z", "p": 201.0, "s": 1},
+                {"T": "u", "S": "SPY", "t": "2024-01-02T14:35:00Z", "o": 5, "h": 5, "l": 5, "c": 106.0, "v": 20},
+            ])
+            await _until(lambda: stream.get_stats()["messages"] == 12)
+            assert stream.last_price("IWM") == 201.0
+            assert stream.bars("SPY")["c"].tolist() == [102.0, 103.0, 104.0, 106.0]
+
+            # Quotes and trades past max_age_s are not served: callers fall back
+            now[0] += 5 * 60
+            assert stream.latest_quote("SPY") is None and stream.get_quotes(["SPY"]) == {}
+            assert stream.last_price("SPY") is None and stream.last_price("IWM") is None
+
+            # Dropped connections are re-established and resubscribed
+            await server.disconnect_all()
+            await _until(lambda: stream.get_stats()["connects"] == 2 and server.clients)
+            await _until(lambda: "IWM" in server.clients[0].subscriptions["trades"])
+
+        assert stream.latest_quote("SPY") is None  # Disconnected: callers fall back
+
+        # Rejected credentials stop the stream instead of retrying
+        bad = MarketStream(symbols=["SPY"], url=server.url, key="x", secret="y", reconnect_s=0.05)
+        await bad.start()
+        await asyncio.wait_for(bad._task, 5)
+        assert server.connections == 3 and bad.get_stats()["connects"] == 0
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_trade_triggered_dollar_bars_sample_the_tape():
+    """Runner context for a trade event leaves tick plugins on the tick tape."""
+    from optifire.core.tickstore import configure_tick_store
+    from optifire.plugins import PluginContext
+    from optifire.plugins.fe_dollar_bars import FeDollarBars
+    from optifire.services.runner import trigger_data
+
+    tape = configure_tick_store()
+    stream = MarketStream(symbols=["SPY"], tape=tape)
+    await stream.handle_frame([
+        {"T": "b", "S": "SPY", "t": f"2024-01-02T14:{30 + i}:00Z", "o": 1, "h": 1, "l": 1, "c": 100.0 + i, "v": 1000}
+        for i in range(5)
+    ] + [
+        {"T": "t", "S": "SPY", "t": f"2024-01-02T14:35:{i:02d}Z", "p": 105.0, "s": 100}
+        for i in range(40)
+    ])
+
+    for kind, n_ticks in (("bar", 5), ("trade", 40)):
+        trigger = Event(type=f"market.{kind}.SPY", data={"symbol": "SPY"}, source="market_stream")
+        data = trigger_data(trigger, stream)
+        assert len(data["prices"]) == 5  # Buffered minute bars for every market event
+        result = await FeDollarBars().run(PluginContext(config={}, db=None, bus=None, data=data))
+        assert result.success and result.data["n_ticks"] == n_ticks
+
@@ -0,0 +1,423 @@
+"""Tests for plugin infrastructure."""
+import pytest
+import asyncio
+from typing import Any, Dict
+
+from optifire.plugins import Plugin, PluginMetadata, PluginContext, PluginResult
+from optifire.core.admission import AdmissionController, plugin_priority
+from optifire.core.dag import PluginDAG, DagExecutor
+from optifire.core.errors import AdmissionRejected, PluginError
+
+
+class SleepPlugin(Plugin):
+    """Test plugin that sleeps and echoes a value."""
+
+    def __init__(self, plugin_id, inputs=(), outputs=(), delay=0.05, deps=(), fail=False):
+        self._spec = (plugin_id, list(inputs), list(outputs), delay, list(deps), fail)
+        super().__init__()
+
+    def describe(self) -> PluginMetadata:
+        plugin_id, inputs, outputs = self._spec[:3]
+        return PluginMetadata(
+            plugin_id=plugin_id,
+            name=plugin_id,
+            category="test",
+            version="1.0.0",
+            author="test",
+            description="test plugin",
+            inputs=inputs,
+            outputs=outputs,
+            est_cpu_ms=100,
+            est_mem_mb=10,
+        )
+
+    def plan(self) -> Dict[str, Any]:
+        return {"schedule": "@manual", "triggers": [], "dependencies": self._spec[4]}
+
+    async def run(self, context: PluginContext) -> PluginResult:
+        plugin_id, inputs, outputs, delay, _, fail = self._spec
+        await asyncio.sleep(delay)
+        if fail:
+            return PluginResult(success=False, error="boom")
+        seen = {name: context.data.get(name) for name in inputs}
+        return PluginResult(
+            success=True,
+            data={**{name: plugin_id for name in outputs}, "seen": seen},
+        )
+
+
+def make_context(**data):
+    return PluginContext(config={}, db=None, bus=None, data=data)
+
+
+@pytest.mark.asyncio
+async def test_dag_runs_independent_plugins_concurrently():
+    """Independent plugins overlap; downstream waits for its inputs."""
+    dag = PluginDAG([
+        SleepPlugin("fe_garch", outputs=["forecast_vol"], delay=0.1),
+        SleepPlugin("fe_kalman", outputs=["state"], delay=0.1),
+        SleepPlugin("fe_entropy", outputs=["entropy"], delay=0.1),
+        SleepPlugin("risk_vol_target", inputs=["forecast_vol"], outputs=["multiplier"]),
+    ])
+    assert dag.stages() == [["fe_entropy", "fe_garch", "fe_kalman"], ["risk_vol_target"]]
+
+    executor = DagExecutor(dag, max_concurrency=3)
+    report = await executor.run_cycle(make_context())
+
+    assert all(r.success for r in report.results.values())
+    assert report.results["risk_vol_target"].data["seen"] == {"forecast_vol": "fe_garch"}
+    assert report.critical_path == ["fe_garch", "risk_vol_target"]
+    # Three 100ms plugins in parallel + 50ms downstream, well under serial 350ms
+    assert report.wall_ms < 300
+    assert report.critical_path_ms >= 140
+
+
+@pytest.mark.asyncio
+async def test_dag_partial_cycle_and_upstream_failure():
+    """Triggered roots re-run with descendants; failures skip downstream."""
+    dag = PluginDAG([
+        SleepPlugin("a", outputs=["x"], delay=0.01),
+        SleepPlugin("b", deps=["a"], delay=0.01),
+        SleepPlugin("c", outputs=["y"], delay=0.01, fail=True),
+        SleepPlugin("d", inputs=["y"], delay=0.01),
+    ])
+    executor = DagExecutor(dag)
+
+    report = await executor.run_cycle(make_context(), roots=["a"])
+    assert set(report.results) == {"a", "b"}
+
+    report = await executor.run_cycle(make_context(), roots=["c"])
+    assert report.skipped == ["d"]
+    assert not report.results["d"].success
+
+
+def test_dag_rejects_cycles():
+    """Circular declarations raise PluginError."""
+    with pytest.raises(PluginError):
+        PluginDAG([
+            SleepPlugin("a", inputs=["y"], outputs=["x"]),
+            SleepPlugin("b", inputs=["x"], outputs=["y"]),
+        ])
+
+
+@pytest.mark.asyncio
+async def test_admission_priority_and_memory_packing():
+    """Queued runs are admitted by priority and packed into the memory budget."""
+    ctl = AdmissionController(max_workers=2, mem_budget_mb=100, rss_fn=lambda: 0.0)
+    order = []
+
+    async def job(pid, mem_mb):
+        async with ctl.admit(pid, plugin_priority(pid), cpu_ms=100, mem_mb=mem_mb):
+            order.append(pid)
+            await asyncio.sleep(0.02)
+
+    blocker = asyncio.create_task(job("alpha_blocker", 100))
+    await asyncio.sleep(0)
+    await asyncio.gather(
+        blocker,
+        job("ux_dashboard", 10),
+        job("risk_kelly", 60),
+        job("exec_twap", 30),
+    )
+
+    assert order == ["alpha_blocker", "risk_kelly", "exec_twap", "ux_dashboard"]
+    assert ctl.get_stats()["mem_reserved_mb"] == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_sheds_low_priority_when_saturated():
+    """Diagnostics are shed under memory pressure; risk still runs."""
+    ctl = AdmissionController(max_ram_mb=900, rss_fn=lambda: 880.0)
+
+    with pytest.raises(AdmissionRejected):
+        async with ctl.admit("diag_latency", plugin_priority("diag_latency"), 10, 10):
+            pass
+    async with ctl.admit("risk_kelly", plugin_priority("risk_kelly"), 10, 10):
+        pass
+
+    stats = ctl.get_stats()
+    assert stats["shed"] == 1
+    assert stats["admitted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_execution_matches_inline():
+    """A process-executed plugin gives the inline result; big arrays use shared memory."""
+    import numpy as np
+    from optifire.core.procpool import configure_process_pool
+    from optifire.plugins.fe_garch import FeGarch
+
+    plugin = FeGarch()
+    assert plugin.execution == "process"
+    returns = np.random.default_rng(0).normal(0.0, 0.01, 20_000)
+
+    pool = configure_process_pool(max_workers=1)
+    try:
+        await pool.warm()
+        result = await plugin.execute_with_budget(
+            make_context(returns=returns), cpu_budget_ms=5000, mem_budget_mb=100
+        )
+        stats = pool.get_stats()
+    finally:
+        pool.shutdown()
+
+    assert result.success
+    assert result.data["forecast_vol"] == pytest.approx(
+        plugin.compute({"returns": returns})["forecast_vol"]
+    )
+    assert stats["calls"] == 1
+    assert stats["shm_bytes"] >= returns.nbytes
+
+
+class SlowComputePlugin(SleepPlugin):
+    """Test plugin whose process-pool compute step sleeps ``data["sleep"]`` seconds."""
+
+    def __init__(self):
+        super().__init__("slow_compute")
+
+    def plan(self) -> Dict[str, Any]:
+        return {**super().plan(), "execution": "process"}
+
+    def compute(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        import os
+        import time
+
+        time.sleep(data["sleep"])
+        return {"pid": os.getpid()}
+
+    async def run(self, context: PluginContext) -> PluginResult:
+        return PluginResult(success=True, data=await self.run_compute(dict(context.data)))
+
+
+@pytest.mark.asyncio
+async def test_process_pool_recycles_after_timeout():
+    """A timed-out compute does not keep its worker busy for later runs."""
+    from optifire.core.procpool import configure_process_pool
+
+    plugin = SlowComputePlugin()
+    pool = configure_process_pool(max_workers=1)
+    try:
+        await pool.warm()
+        stuck = await plugin.execute_with_budget(
+            make_context(sleep=60), cpu_budget_ms=100, mem_budget_mb=100, timeout_s=0.5
+        )
+        assert stuck.timed_out and not stuck.success
+        assert pool.get_stats()["restarts"] == 1
+
+        # Would wait out the 60s sleep if the busy worker were reused
+        result = await asyncio.wait_for(
+            plugin.execute_with_budget(make_context(sleep=0), cpu_budget_ms=100, mem_budget_mb=100, timeout_s=20),
+            timeout=30,
+        )
+        stats = pool.get_stats()
+    finally:
+        pool.shutdown()
+
+    assert result.success
+    assert stats["calls"] == 2 and stats["restarts"] == 1
+
+
+class BurnPlugin(SleepPlugin):
+    """Test plugin that spins the CPU and allocates memory between awaits."""
+
+    def __init__(self, plugin_id, burn_ms=50, alloc_mb=0, steps=5):
+        self._burn = (burn_ms, alloc_mb, steps)
+        super().__init__(plugin_id)
+
+    async def run(self, context: PluginContext) -> PluginResult:
+        import time
+
+        burn_ms, alloc_mb, steps = self._burn
+        held = bytearray(alloc_mb * 1024 * 1024)
+        for _ in range(steps):
+            end = time.thread_time() + burn_ms / steps / 1000
+            while time.thread_time() < end:
+                pass
+            await asyncio.sleep(0)
+        return PluginResult(success=True, data={"held": len(held)})
+
+
+@pytest.mark.asyncio
+async def test_budget_accounting_is_per_run():
+    """Concurrent runs are charged only their own CPU time and allocations."""
+    from optifire.core.usage import start_memory_tracing
+
+    start_memory_tracing()
+    burner = BurnPlugin("burner", burn_ms=80, alloc_mb=20)
+    sleeper = SleepPlugin("sleeper", delay=0.1)
+
+    burned, slept = await asyncio.gather(
+        burner.execute_with_budget(make_context(), cpu_budget_ms=1000, mem_budget_mb=100),
+        sleeper.execute_with_budget(make_context(), cpu_budget_ms=1000, mem_budget_mb=100),
+    )
+
+    assert burned.success and slept.success
+    assert burned.cpu_ms >= 70
+    assert slept.cpu_ms < 20
+    assert burned.mem_mb >= 19
+    assert slept.mem_mb < 5
+    assert slept.wall_ms >= 100
+
+
+@pytest.mark.asyncio
+async def test_budget_enforced_by_timeout_and_cancellation():
+    """Runs past the wall-clock timeout or the hard CPU limit are cancelled."""
+    slow = await SleepPlugin("slow", delay=1.0).execute_with_budget(
+        make_context(), cpu_budget_ms=1000, mem_budget_mb=100, timeout_s=0.05
+    )
+    assert not slow.success and slow.timed_out
+    assert slow.wall_ms < 500
+
+    hog = await BurnPlugin("hog", burn_ms=300, steps=30).execute_with_budget(
+        make_context(), cpu_budget_ms=20, mem_budget_mb=100
+    )
+    assert not hog.success and not hog.timed_out
+    assert "Budget exceeded" in hog.error
+    assert hog.cpu_ms < 150
+
+
+@pytest.mark.asyncio
+async def test_manifest_discovery_is_lazy(tmp_path):
+    """Plugins are indexed from the manifest and imported on first run only."""
+    import shutil
+    import sys
+    from optifire.plugins import PluginRegistry
+    from optifire.plugins.manifest import MANIFEST_PATH
+
+    manifest = tmp_path / "manifest.json"
+    shutil.copy(MANIFEST_PATH, manifest)
+    sys.modules.pop("optifire.plugins.alpha_vrp.impl", None)
+    sys.modules.pop("optifire.plugins.alpha_vrp", None)
+
+    reg = PluginRegistry()
+    assert reg.discover(manifest) >= 100
+    assert manifest.read_bytes() == MANIFEST_PATH.read_bytes()  # Nothing stale
+
+    plugin = reg.lazy("alpha_vrp")
+    assert plugin.metadata.category == "alpha"
+    assert "schedule" in plugin.plan()
+    assert "optifire.plugins.alpha_vrp" not in sys.modules
+
+    await plugin.execute_with_budget(make_context(), cpu_budget_ms=1000, mem_budget_mb=100)
+    assert plugin.loaded
+    assert "optifire.plugins.alpha_vrp" in sys.modules
+
+
+@pytest.mark.asyncio
+async def test_memoized_plugin_reuses_results():
+    """Same inputs hit the memo cache; the plugin still publishes each run."""
+    import numpy as np
+    from optifire.core.memo import configure_memo_cache
+    from optifire.plugins.fe_entropy import FeEntropy
+
+    cache = configure_memo_cache(max_entries=16)
+    plugin = FeEntropy()
+    signal = np.random.default_rng(1).normal(size=500)
+
+    first = await plugin.run(make_context(signal=signal))
+    second = await plugin.run(make_context(signal=signal.copy()))
+    other = await plugin.run(make_context(signal=signal * 2 + 1))
+
+    assert first.data == second.data
+    assert other.success
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_run_batch_vectorized_matches_per_symbol():
+    """Native batch paths agree with running each symbol on its own."""
+    import numpy as np
+    from optifire.core.memo import configure_memo_cache
+    from optifire.plugins.fe_entropy import FeEntropy
+    from optifire.plugins.fe_kalman.impl import FeKalman
+
+    configure_memo_cache(max_entries=0)  # Compare fresh computations
+    symbols = [f"S{i}" for i in range(20)]
+    panel = np.random.default_rng(2).normal(size=(250, len(symbols)))
+    panel[:, 3] = 1.0  # Constant column
+
+    for plugin in (FeEntropy(), FeKalman()):
+        context = make_context(signal=panel)
+        batch = await plugin.run_batch(context, symbols)
+        single = await Plugin.run_batch(plugin, context, symbols)
+        assert list(batch) == symbols
+        for symbol in symbols:
+            assert batch[symbol].success and single[symbol].success
+            for key, value in single[symbol].data.items():
+                assert batch[symbol].data[key] == pytest.approx(value)
+
+    # Default: one run() per symbol on its column, shared inputs passed through
+    echo = SleepPlugin("echo", inputs=["signal", "window", "symbol"], delay=0)
+    results = await echo.run_batch(make_context(signal=panel[:, :3], window=5), symbols[:3])
+    assert results["S1"].data["seen"]["symbol"] == "S1"
+    assert results["S1"].data["seen"]["window"] == 5
+    assert np.array_equal(results["S1"].data["seen"]["signal"], panel[:, 1])
+
+
+def test_benchmark_measures_and_flags_regressions():
+    """Benchmark cases record percentiles; slower runs and bad estimates are flagged."""
+    import socket
+    from optifire.plugins.benchmark import (
+        BenchCase, check_estimates, find_regressions, measure, offline, synthetic_inputs,
+    )
+
+    plugin = SleepPlugin("bench", inputs=["returns", "symbol"], delay=0.002)
+    single = measure(plugin, BenchCase("100", 100), repeats=3)
+    batch = measure(plugin, BenchCase("10sym", 50, 10), repeats=1)
+    assert single["status"] == "ok" and single["runs"] == 3
+    assert 2 <= single["p50_ms"] <= single["p99_ms"]
+    assert batch["status"] == "ok" and batch["p50_ms"] >= 20  # One run() per symbol
+
+    assert synthetic_inputs(["returns", "unknown"], 100, 10)["returns"].shape == (100, 10)
+    assert check_estimates(plugin.metadata, {**single, "cpu_ms": 500.0})[0].startswith("cpu under")
+
+    def run(p50):
+        return {"host": "h", "results": {"bench": {"100": {**single, "p50_ms": p50}}}}
+
+    history = {"runs": [run(10.0), run(11.0), run(9.0)]}
+    assert find_regressions(run(10.5), history) == []
+    [regression] = find_regressions(run(20.0), history)
+    assert regression["metric"] == "p50_ms" and regression["baseline"] == 10.0
+
+    with offline(), pytest.raises(OSError):
+        socket.create_connection(("example.com", 80), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_microstructure_plugins_share_the_tick_store(monkeypatch):
+    import numpy as np
+    from optifire.core import tickstore
+    from optifire.plugins.alpha_dark_pool_flow.impl import AlphaDarkPoolFlow
+    from optifire.plugins.alpha_vpin.impl import AlphaVpin
+    from optifire.plugins.exec_iceberg_detect.impl import ExecIcebergDetect
+    from optifire.plugins.fe_dollar_bars.impl import FeDollarBars
+
+    store = tickstore.TickStore()
+    monkeypatch.setattr(tickstore, "_store", store)
+
+    # Buys at 101 keep printing 200 shares against 100 displayed (an iceberg),
+    # sells at 100 print 20
+    # plus one 80k-share off-exchange block
+    trades = np.zeros(41, dtype=tickstore.TRADE_DTYPE)
+    trades["t"] = np.arange(41)
+    trades["price"] = np.where(np.arange(41) % 2 == 0, 101.0, 100.0)
+    trades["size"] = np.where(np.arange(41) % 2 == 0, 200.0, 20.0)
+    trades[40] = (40, 100.9, 80_000.0, True)
+    store.tape("trade", "SPY").extend(trades)
+    store.tape("quote", "SPY").append((0, 100.0, 101.0, 100.0, 100.0))
+
+    context = PluginContext(config={}, db=None, bus=None, data={"symbol": "SPY"})
+    vpin = (await AlphaVpin().run(context)).data
+    assert vpin["buy_volume"] == 20 * 200.0 + 80_000.0  # Above the tape's mean price
+
+    iceberg = (await ExecIcebergDetect().run(context)).data
+    assert iceberg["iceberg_detected"] and iceberg["price_level"] == 101.0
+
+    bars = (await FeDollarBars().run(context)).data
+    assert bars["n_ticks"] == 41 and bars["n_dollar_bars"] > 0
+
+    dark = AlphaDarkPoolFlow()
+    assert (await dark.run(context)).data["print_volume"] == 80_000
+    # Only prints newer than the last run are scanned
+    assert (await dark.run(context)).data["print_volume"] == 0
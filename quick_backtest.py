@@ -2,11 +2,12 @@
 """
 Quick backtest using Yahoo Finance (free data)
 """
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from optifire.backtest.bar_store import BarStore, fetch_yfinance
+
 # Config - OPTIMIZED for better risk-adjusted returns
 INITIAL_CAPITAL = 10000
 SYMBOLS = ["SPY", "QQQ", "AAPL", "NVDA", "TSLA", "MSFT", "GOOGL", "META", "AMZN"]
@@ -31,19 +32,16 @@ print(f"Take Profit: {TAKE_PROFIT*100}%")
 print(f"Trailing Stop: {TRAILING_STOP}")
 print("="*60 + "\n")
 
-# Download data
-print("📊 Downloading data from Yahoo Finance...")
+# Load data (local bar store; only missing days come from Yahoo Finance)
+print("📊 Loading data (bar store + Yahoo Finance)...")
 data = {}
-for symbol in SYMBOLS:
-    try:
-        df = yf.download(symbol, start=START_DATE, end=END_DATE, progress=False)
-        if not df.empty:
-            data[symbol] = df
-            print(f"✓ {symbol}: {len(df)} days")
-        else:
-            print(f"✗ {symbol}: No data")
-    except Exception as e:
-        print(f"✗ {symbol}: {e}")
+frames = BarStore().update_sync(SYMBOLS, "1Day", START_DATE, END_DATE, fetch_yfinance)
+for symbol, df in frames.items():
+    if not df.empty:
+        data[symbol] = df.set_index("timestamp").rename(columns=str.title)
+        print(f"✓ {symbol}: {len(df)} days")
+    else:
+        print(f"✗ {symbol}: No data")
 
 if not data:
     print("\n❌ No data available - cannot run backtest")
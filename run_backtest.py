@@ -16,6 +16,9 @@ Examples:
 
     # Run momentum strategy
     python run_backtest.py --strategy momentum --start 2023-01-01 --end 2024-12-31
+
+    # Run the simple strategy on 1-minute bars
+    python run_backtest.py --timeframe 1Min --start 2024-01-01 --symbols SPY,QQQ
 """
 import asyncio
 import argparse
@@ -29,23 +32,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from optifire.backtest.engine import BacktestEngine, BacktestConfig
 from optifire.backtest.visualizer import BacktestVisualizer
-from optifire.backtest.strategies import (
-    SimpleStrategy,
-    TrendFollowingStrategy,
-    MomentumStrategy,
-    MeanReversionStrategy,
-    BuyAndHoldStrategy,
-)
-
-
-# Strategy mapping
-STRATEGIES = {
-    "simple": SimpleStrategy,
-    "trend": TrendFollowingStrategy,
-    "momentum": MomentumStrategy,
-    "mean_reversion": MeanReversionStrategy,
-    "buy_hold": BuyAndHoldStrategy,
-}
+from optifire.backtest.strategies import STRATEGIES
 
 
 def load_env():
@@ -95,6 +82,13 @@ async def main():
         help="Comma-separated list of symbols (default: SPY,QQQ,AAPL,NVDA,TSLA,MSFT,GOOGL,META,AMZN)",
     )
 
+    parser.add_argument(
+        "--timeframe",
+        type=str,
+        default="1Day",
+        help="Bar timeframe, e.g. 1Day, 1Hour, 5Min, 1Min (default: 1Day; intraday bars are streamed from disk)",
+    )
+
     parser.add_argument(
         "--output",
         type=str,
@@ -107,11 +101,10 @@ async def main():
     # Load environment
     load_env()
 
-    # Validate API keys
+    # Validate API keys (only needed for bars not yet in the local bar store)
     if not os.getenv("ALPACA_API_KEY"):
-        print("❌ Error: ALPACA_API_KEY not found in environment")
-        print("   Make sure secrets.env contains your Alpaca credentials")
-        sys.exit(1)
+        print("⚠️  ALPACA_API_KEY not found in environment")
+        print("   Only bars already in the local store (data/market) are available")
 
     # Default date range: 6 months
     end_date = args.end or datetime.now().strftime("%Y-%m-%d")
@@ -133,6 +126,7 @@ async def main():
         end_date=end_date,
         initial_capital=args.capital,
         symbols=symbols,
+        timeframe=args.timeframe,
     )
 
     print("\n" + "="*60)
@@ -140,6 +134,7 @@ async def main():
     print("="*60)
     print(f"\nStrategy:        {args.strategy}")
     print(f"Date Range:      {start_date} to {end_date}")
+    print(f"Timeframe:       {args.timeframe}")
     print(f"Initial Capital: ${args.capital:,.2f}")
     print(f"Symbols:         {', '.join(symbols)}")
     print(f"\nRisk Parameters:")
@@ -160,7 +155,7 @@ async def main():
     print("🚀 Starting backtest...\n")
 
     try:
-        metrics = await engine.run(strategy.generate_signals)
+        metrics = await engine.run_panel(strategy)
 
         if "error" in metrics:
             print(f"❌ Backtest failed: {metrics['error']}")
@@ -186,11 +181,14 @@ async def main():
             json.dump(serializable_metrics, f, indent=2)
         print(f"✓ Metrics saved to {metrics_file}")
 
-        # Save trade log
+        # Save trade log (intraday runs keep trades in columns, not in metrics)
         trades_file = output_dir / "trades.csv"
-        import pandas as pd
-        df_trades = pd.DataFrame(metrics["trades"])
-        df_trades.to_csv(trades_file, index=False)
+        if "trades" in metrics:
+            import pandas as pd
+            df_trades = pd.DataFrame(metrics["trades"])
+            df_trades.to_csv(trades_file, index=False)
+        else:
+            engine.trades.to_csv(trades_file)
         print(f"✓ Trade log saved to {trades_file}")
 
         print(f"\n✅ Backtest complete! Results saved to {output_dir}/")
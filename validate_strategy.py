@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+OptiFIRE Strategy Validation Script
+
+Check a strategy's parameter grid for overfitting with purged walk-forward
+or combinatorial purged cross-validation (CPCV).
+
+Usage:
+    python validate_strategy.py [--strategy STRATEGY] [--grid JSON] [--method {cpcv,walk_forward}]
+
+Examples:
+    # CPCV of the trend strategy's MA periods over the last 3 years
+    python validate_strategy.py --strategy trend \\
+        --grid '{"fast_period": [5, 10, 20], "slow_period": [50, 100, 200]}'
+
+    # Walk-forward of breakout stops, 8 folds, 4 workers
+    python validate_strategy.py --strategy breakout --method walk_forward --groups 8 \\
+        --grid '{"stop_loss_pct": [0.02, 0.03, 0.05], "period": [10, 20]}' --workers 4
+"""
+import asyncio
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from optifire.backtest.engine import BacktestEngine, BacktestConfig
+from optifire.backtest.strategies import STRATEGIES
+from optifire.backtest.validation import BacktestValidator
+
+
+def load_env():
+    """Load environment variables from secrets.env"""
+    env_file = Path(__file__).parent / "secrets.env"
+    if env_file.exists():
+        with open(env_file) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#") and "=" in line:
+                    key, value = line.split("=", 1)
+                    os.environ[key.strip()] = value.strip()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Validate OptiFIRE strategy parameters out of sample")
+
+    parser.add_argument(
+        "--strategy",
+        choices=list(STRATEGIES.keys()),
+        default="trend",
+        help="Trading strategy to validate (default: trend)",
+    )
+
+    parser.add_argument(
+        "--grid",
+        type=str,
+        default="{}",
+        help='Parameter grid as JSON, e.g. \'{"fast_period": [5, 10]}\' (strategy or BacktestConfig fields)',
+    )
+
+    parser.add_argument(
+        "--method",
+        choices=["cpcv", "walk_forward"],
+        default="cpcv",
+        help="Validation scheme (default: cpcv)",
+    )
+
+    parser.add_argument("--start", type=str, help="Start date (YYYY-MM-DD). Default: 3 years ago")
+    parser.add_argument("--end", type=str, help="End date (YYYY-MM-DD). Default: today")
+    parser.add_argument(
+        "--symbols",
+        type=str,
+        help="Comma-separated list of symbols (default: SPY,QQQ,AAPL,NVDA,TSLA,MSFT,GOOGL,META,AMZN)",
+    )
+    parser.add_argument("--groups", type=int, default=6, help="Number of time blocks (default: 6)")
+    parser.add_argument("--test-groups", type=int, default=2, help="CPCV blocks held out per split (default: 2)")
+    parser.add_argument("--purge", type=int, default=5, help="Training days dropped before each test block (default: 5)")
+    parser.add_argument("--embargo", type=int, default=5, help="CPCV training days dropped after each test block (default: 5)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", type=str, help="Write the report as JSON to this file")
+
+    args = parser.parse_args()
+
+    load_env()
+
+    end_date = args.end or datetime.now().strftime("%Y-%m-%d")
+    start_date = args.start or (datetime.now() - timedelta(days=3 * 365)).strftime("%Y-%m-%d")
+    if args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(",")]
+    else:
+        symbols = ["SPY", "QQQ", "AAPL", "NVDA", "TSLA", "MSFT", "GOOGL", "META", "AMZN"]
+    grid = json.loads(args.grid)
+
+    config = BacktestConfig(start_date=start_date, end_date=end_date, symbols=symbols)
+
+    print("\n" + "="*60)
+    print("OptiFIRE STRATEGY VALIDATION")
+    print("="*60)
+    print(f"\nStrategy:        {args.strategy}")
+    print(f"Method:          {args.method} ({args.groups} blocks, purge {args.purge}d)")
+    print(f"Date Range:      {start_date} to {end_date}")
+    print(f"Symbols:         {', '.join(symbols)}")
+    print(f"Grid:            {grid or 'default parameters'}")
+    print("\n" + "="*60 + "\n")
+
+    # Load (and fetch missing) bars once; every trial shares the panel
+    panel = await BacktestEngine(config).build_panel()
+    if not len(panel):
+        print("❌ No price data loaded")
+        sys.exit(1)
+
+    validator = BacktestValidator(panel, config, STRATEGIES[args.strategy], workers=args.workers)
+    if args.method == "cpcv":
+        report = validator.cpcv(grid, args.groups, args.test_groups, args.purge, args.embargo)
+    else:
+        report = validator.walk_forward(grid, args.groups, args.purge)
+    summary = report.to_dict()
+
+    print(f"Trials:          {summary['trials']}")
+    print(f"Splits:          {summary['splits']}")
+    print(f"IS Sharpe:       {summary['is_sharpe']:.2f}")
+    print(f"OOS Sharpe:      {summary['oos_sharpe']:.2f}")
+    print(f"Sharpe Decay:    {summary['sharpe_decay']*100:.0f}%")
+    print(f"P(OOS loss):     {summary['prob_oos_loss']*100:.0f}%")
+    print(f"PBO:             {summary['pbo']*100:.0f}%")
+    print(f"Best Params:     {summary['best_params']}")
+
+    print("\n" + "="*60)
+    print("VERDICT")
+    print("="*60)
+    if summary["trials"] > 1 and report.is_overfit:
+        print("❌ OVERFIT - the in-sample winner usually underperforms out of sample")
+    elif summary["oos_sharpe"] <= 0:
+        print("⚠ NO EDGE - out-of-sample Sharpe is not positive")
+    else:
+        print("✅ ROBUST - in-sample selection holds up out of sample")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2, default=str)
+        print(f"\n✓ Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())